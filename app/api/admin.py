@@ -0,0 +1,27 @@
+from fastapi import APIRouter, HTTPException, Path, Query
+from models.response_models import SlowQueriesResponse, SlowQueryDetail
+from utils.slow_query_log import slow_query_log
+
+router = APIRouter()
+
+@router.get("/admin/slow-queries", response_model=SlowQueriesResponse)
+async def get_slow_queries(
+    sort_by: str = Query("total_ms", regex="^(total_ms|avg_ms|max_ms|count|last_seen)$", description="並び順（降順）"),
+    limit: int = Query(50, ge=1, le=500, description="取得するクエリの形の数")
+):
+    """しきい値を超えたクエリのクエリの形ごとの集計"""
+    return slow_query_log.get_summary(sort_by=sort_by, limit=limit)
+
+@router.get("/admin/slow-queries/{shape_id}", response_model=SlowQueryDetail)
+async def get_slow_query(shape_id: str = Path(..., regex="^[0-9a-f]{16}$", description="クエリの形のID")):
+    """クエリの形の集計・直近の記録・実行計画"""
+    shape = slow_query_log.get_shape(shape_id)
+    if shape is None:
+        raise HTTPException(status_code=404, detail=f"記録がありません: {shape_id}")
+    return shape
+
+@router.delete("/admin/slow-queries")
+async def reset_slow_queries():
+    """集計を破棄（ログファイルはそのまま）"""
+    slow_query_log.reset()
+    return {"success": True}
@@ -1,15 +1,71 @@
-from fastapi import APIRouter, Path, Query, HTTPException
-from typing import Optional
+import asyncio
+from fastapi import APIRouter, Header, Path, Query, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import Optional, Tuple, Union
 from datetime import datetime
-from models.response_models import DuplicatesResponse
+from models.response_models import (
+    CompactDuplicateGroup, CompactDuplicatesResponse, DuplicatesResponse, DuplicateGroupsResponse, DuplicateGroup
+)
 from models.request_models import FilterRequest
 from services.duplicate_service import DuplicateService
+from database import db_manager
+from utils.compact_format import compact_duplicates_response, compact_group
+from utils.json_response import FastJSONResponse, GzipStream, accepts_gzip, dumps
 
 router = APIRouter()
 
-@router.get("/duplicates/{duplicate_type}", response_model=DuplicatesResponse)
+def build_duplicate_request(
+    sort_order: Optional[str],
+    keyword: Optional[str],
+    content_keyword: Optional[str],
+    status_keyword: Optional[str],
+    progress: Optional[str],
+    system_type: Optional[str],
+    product: Optional[str],
+    date_from: Optional[str],
+    date_to: Optional[str],
+    date_field: str,
+    include_deleted: bool
+) -> Tuple[Optional[str], Optional[FilterRequest]]:
+    """ソート順の検証とフィルター条件の構築（通常版・ストリーミング版で共通）"""
+    # ソートパラメータの検証（セキュリティ対策）
+    if sort_order:
+        # カンマ区切りの各要素が asc または desc であることを確認
+        sort_orders = [s.strip().lower() for s in sort_order.split(',')]
+        for order in sort_orders:
+            if order not in ('asc', 'desc'):
+                raise HTTPException(status_code=400, detail=f"Invalid sort order: {order}")
+        sort_order = ','.join(sort_orders)
+
+    # 日付文字列をdatetimeオブジェクトに変換
+    date_from_dt = None
+    date_to_dt = None
+    if date_from:
+        date_from_dt = datetime.fromisoformat(date_from.replace('Z', '+00:00'))
+    if date_to:
+        date_to_dt = datetime.fromisoformat(date_to.replace('Z', '+00:00'))
+
+    # フィルター条件構築
+    filters = None
+    if any([keyword, content_keyword, status_keyword, progress, system_type, product, date_from_dt, date_to_dt, include_deleted]):
+        filters = FilterRequest(
+            keyword=keyword,
+            content_keyword=content_keyword,
+            status_keyword=status_keyword,
+            progress=progress,
+            system_type=system_type,
+            product=product,
+            date_from=date_from_dt,
+            date_to=date_to_dt,
+            date_field=date_field,
+            include_deleted=include_deleted
+        )
+
+    return sort_order, filters
+
+@router.get("/duplicates/{duplicate_type}", response_model=Union[DuplicatesResponse, CompactDuplicatesResponse])
 async def detect_duplicates(
-    duplicate_type: str = Path(..., regex="^(exact|content|status)$", description="重複タイプ"),
+    duplicate_type: str = Path(..., regex="^(exact|content|status|similar)$", description="重複タイプ"),
     sort_by: Optional[str] = Query(None, description="ソート列（カンマ区切り）"),
     sort_order: Optional[str] = Query(None, description="ソート順（カンマ区切り）"),
     keyword: Optional[str] = Query(None, description="キーワード検索（後方互換性）"),
@@ -21,59 +77,247 @@ async def detect_duplicates(
     date_from: Optional[str] = Query(None, description="開始日時"),
     date_to: Optional[str] = Query(None, description="終了日時"),
     date_field: str = Query("reception_datetime", description="日付フィルター対象"),
-    include_deleted: bool = Query(False, description="削除済みデータを含む")
+    include_deleted: bool = Query(False, description="削除済みデータを含む"),
+    similarity_threshold: float = Query(0.8, ge=0.1, le=1.0, description="類似度の閾値（similarのみ）"),
+    min_group_size: int = Query(2, ge=2, description="グループの最小件数"),
+    group_order: str = Query("first_id", regex="^(first_id|size)$", description="グループの並び順（first_id: 最小ID順、size: 件数の多い順）"),
+    group_offset: int = Query(0, ge=0, description="グループ単位のオフセット"),
+    group_limit: Optional[int] = Query(None, ge=1, description="取得するグループ数（省略時は全件）"),
+    response_format: str = Query(
+        "verbose", alias="format", regex="^(verbose|compact)$",
+        description="レスポンス形式（verbose: レコードごとに全項目 / compact: グループ共通の値を1回だけ送信）"
+    ),
+    accept_encoding: Optional[str] = Header(None, description="対応する圧縮形式（gzip で圧縮して返す）")
 ):
     """重複データ検出API"""
     try:
-        # ソートパラメータの検証（セキュリティ対策）
-        if sort_order:
-            # カンマ区切りの各要素が asc または desc であることを確認
-            sort_orders = [s.strip().lower() for s in sort_order.split(',')]
-            for order in sort_orders:
-                if order not in ('asc', 'desc'):
-                    raise HTTPException(status_code=400, detail=f"Invalid sort order: {order}")
-            sort_order = ','.join(sort_orders)
-        
-        # 日付文字列をdatetimeオブジェクトに変換
-        date_from_dt = None
-        date_to_dt = None
-        if date_from:
-            date_from_dt = datetime.fromisoformat(date_from.replace('Z', '+00:00'))
-        if date_to:
-            date_to_dt = datetime.fromisoformat(date_to.replace('Z', '+00:00'))
-
-        # フィルター条件構築
-        filters = None
-        if any([keyword, content_keyword, status_keyword, progress, system_type, product, date_from_dt, date_to_dt, include_deleted]):
-            filters = FilterRequest(
-                keyword=keyword,
-                content_keyword=content_keyword,
-                status_keyword=status_keyword,
-                progress=progress,
-                system_type=system_type,
-                product=product,
-                date_from=date_from_dt,
-                date_to=date_to_dt,
-                date_field=date_field,
-                include_deleted=include_deleted
-            )
-
-        # 重複検出（ソート情報を渡す）
-        duplicate_groups = DuplicateService.detect_duplicates(
-            duplicate_type, 
+        sort_order, filters = build_duplicate_request(
+            sort_order, keyword, content_keyword, status_keyword, progress,
+            system_type, product, date_from, date_to, date_field, include_deleted
+        )
+
+        # 重複検出（ソート情報・グループ単位のページングを渡す）
+        duplicate_groups, total_groups, total_duplicates = await db_manager.run_blocking(
+            DuplicateService.get_duplicate_page,
+            duplicate_type,
             filters,
             sort_by=sort_by,
-            sort_order=sort_order
+            sort_order=sort_order,
+            similarity_threshold=similarity_threshold,
+            min_group_size=min_group_size,
+            group_order=group_order,
+            group_offset=group_offset,
+            group_limit=group_limit
         )
 
-        total_duplicates = sum(len(group.records) for group in duplicate_groups)
-
-        return DuplicatesResponse(
+        response = DuplicatesResponse(
             duplicates=duplicate_groups,
-            total_groups=len(duplicate_groups),
-            total_duplicates=total_duplicates
+            total_groups=total_groups,
+            total_duplicates=total_duplicates,
+            group_offset=group_offset,
+            group_limit=group_limit,
+            has_more=group_limit is not None and group_offset + group_limit < total_groups
+        )
+        if response_format == "compact":
+            return FastJSONResponse(compact_duplicates_response(response), accept_encoding=accept_encoding)
+        # 組み立て済みのモデルを response_model で再検証せずに送信
+        return FastJSONResponse(response, accept_encoding=accept_encoding)
+
+    except Exception as e:
+        print(f"重複検出エラー: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/duplicates/{duplicate_type}/stream")
+async def stream_duplicates(
+    duplicate_type: str = Path(..., regex="^(exact|content|status|similar)$", description="重複タイプ"),
+    sort_by: Optional[str] = Query(None, description="ソート列（カンマ区切り）"),
+    sort_order: Optional[str] = Query(None, description="ソート順（カンマ区切り）"),
+    keyword: Optional[str] = Query(None, description="キーワード検索（後方互換性）"),
+    content_keyword: Optional[str] = Query(None, description="受付内容キーワード"),
+    status_keyword: Optional[str] = Query(None, description="対応状況キーワード"),
+    progress: Optional[str] = Query(None, description="進捗フィルター"),
+    system_type: Optional[str] = Query(None, description="システム種別フィルター"),
+    product: Optional[str] = Query(None, description="製品フィルター"),
+    date_from: Optional[str] = Query(None, description="開始日時"),
+    date_to: Optional[str] = Query(None, description="終了日時"),
+    date_field: str = Query("reception_datetime", description="日付フィルター対象"),
+    include_deleted: bool = Query(False, description="削除済みデータを含む"),
+    similarity_threshold: float = Query(0.8, ge=0.1, le=1.0, description="類似度の閾値（similarのみ）"),
+    min_group_size: int = Query(2, ge=2, description="グループの最小件数"),
+    group_order: str = Query("first_id", regex="^(first_id|size)$", description="グループの並び順（first_id: 最小ID順、size: 件数の多い順）"),
+    group_offset: int = Query(0, ge=0, description="グループ単位のオフセット"),
+    group_limit: Optional[int] = Query(None, ge=1, description="取得するグループ数（省略時は全件）"),
+    response_format: str = Query(
+        "verbose", alias="format", regex="^(verbose|compact)$",
+        description="レスポンス形式（verbose: レコードごとに全項目 / compact: グループ共通の値を1回だけ送信）"
+    ),
+    accept_encoding: Optional[str] = Header(None, description="対応する圧縮形式（gzip で圧縮して返す）")
+):
+    """重複データ検出API（NDJSONストリーミング版）
+
+    1行に1グループ（DuplicateGroup、compact 形式ではコンパクト形式のグループ）を、
+    グループが確定した時点で順次送信する。gzip で圧縮する場合も1行ごとにフラッシュする。
+    送信開始後にエラーが発生した場合は {"error": ...} の行を送信して終了する。
+    """
+    try:
+        sort_order, filters = build_duplicate_request(
+            sort_order, keyword, content_keyword, status_keyword, progress,
+            system_type, product, date_from, date_to, date_field, include_deleted
         )
 
+        groups = db_manager.blocking_iterator(DuplicateService.iter_duplicate_groups(
+            duplicate_type,
+            filters,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            similarity_threshold=similarity_threshold,
+            min_group_size=min_group_size,
+            group_order=group_order,
+            group_offset=group_offset,
+            group_limit=group_limit
+        ))
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"重複検出エラー: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    try:
+        # 最初のグループまでは通常のエラーレスポンスを返せるよう、送信開始前に取得する
+        first_group = await groups.next()
+    except asyncio.CancelledError:
+        # 送信開始前のクライアント切断でもカーソルを閉じる
+        await groups.aclose()
+        raise
     except Exception as e:
+        await groups.aclose()
         print(f"重複検出エラー: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+    compressor = GzipStream() if accepts_gzip(accept_encoding) else None
+
+    def encode(line: bytes) -> bytes:
+        return compressor.compress(line) if compressor else line
+
+    async def generate():
+        group = first_group
+        try:
+            while group is not None:
+                line = compact_group(group) if response_format == "compact" else group
+                yield encode(dumps(line) + b"\n")
+                group = await groups.next()
+        except Exception as e:
+            print(f"重複検出ストリーミングエラー: {e}")
+            yield encode(dumps({"error": str(e)}) + b"\n")
+        finally:
+            # クライアント切断時もカーソルを閉じて接続を返却する（close はキャンセルされない）
+            await groups.aclose()
+        if compressor:
+            yield compressor.finish()
+
+    headers = {"Content-Encoding": "gzip", "Vary": "Accept-Encoding"} if compressor else None
+    return StreamingResponse(generate(), media_type="application/x-ndjson", headers=headers)
+
+
+@router.get("/duplicates/{duplicate_type}/groups", response_model=DuplicateGroupsResponse)
+async def list_duplicate_groups(
+    duplicate_type: str = Path(..., regex="^(exact|content|status|similar)$", description="重複タイプ"),
+    keyword: Optional[str] = Query(None, description="キーワード検索（後方互換性）"),
+    content_keyword: Optional[str] = Query(None, description="受付内容キーワード"),
+    status_keyword: Optional[str] = Query(None, description="対応状況キーワード"),
+    progress: Optional[str] = Query(None, description="進捗フィルター"),
+    system_type: Optional[str] = Query(None, description="システム種別フィルター"),
+    product: Optional[str] = Query(None, description="製品フィルター"),
+    date_from: Optional[str] = Query(None, description="開始日時"),
+    date_to: Optional[str] = Query(None, description="終了日時"),
+    date_field: str = Query("reception_datetime", description="日付フィルター対象"),
+    include_deleted: bool = Query(False, description="削除済みデータを含む"),
+    similarity_threshold: float = Query(0.8, ge=0.1, le=1.0, description="類似度の閾値（similarのみ）"),
+    min_group_size: int = Query(2, ge=2, description="グループの最小件数"),
+    group_order: str = Query("first_id", regex="^(first_id|size)$", description="グループの並び順（first_id: 最小ID順、size: 件数の多い順）"),
+    group_offset: int = Query(0, ge=0, description="グループ単位のオフセット"),
+    group_limit: int = Query(100, ge=1, le=1000, description="取得するグループ数"),
+    accept_encoding: Optional[str] = Header(None, description="対応する圧縮形式（gzip で圧縮して返す）")
+):
+    """重複グループ概要API（メンバーのレコードを含まない）"""
+    try:
+        _, filters = build_duplicate_request(
+            None, keyword, content_keyword, status_keyword, progress,
+            system_type, product, date_from, date_to, date_field, include_deleted
+        )
+
+        summaries, total_groups, total_duplicates = await db_manager.run_blocking(
+            DuplicateService.get_group_summaries,
+            duplicate_type,
+            filters,
+            similarity_threshold=similarity_threshold,
+            min_group_size=min_group_size,
+            group_order=group_order,
+            group_offset=group_offset,
+            group_limit=group_limit
+        )
+
+        return FastJSONResponse(DuplicateGroupsResponse(
+            groups=summaries,
+            total_groups=total_groups,
+            total_duplicates=total_duplicates,
+            group_offset=group_offset,
+            group_limit=group_limit,
+            has_more=group_offset + group_limit < total_groups
+        ), accept_encoding=accept_encoding)
+
+    except Exception as e:
+        print(f"重複グループ取得エラー: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/duplicates/{duplicate_type}/groups/{record_id}", response_model=Union[DuplicateGroup, CompactDuplicateGroup])
+async def get_duplicate_group_members(
+    duplicate_type: str = Path(..., regex="^(exact|content|status|similar)$", description="重複タイプ"),
+    record_id: int = Path(..., description="グループに属するレコードのID（概要APIの first_id）"),
+    sort_by: Optional[str] = Query(None, description="ソート列（カンマ区切り）"),
+    sort_order: Optional[str] = Query(None, description="ソート順（カンマ区切り）"),
+    keyword: Optional[str] = Query(None, description="キーワード検索（後方互換性）"),
+    content_keyword: Optional[str] = Query(None, description="受付内容キーワード"),
+    status_keyword: Optional[str] = Query(None, description="対応状況キーワード"),
+    progress: Optional[str] = Query(None, description="進捗フィルター"),
+    system_type: Optional[str] = Query(None, description="システム種別フィルター"),
+    product: Optional[str] = Query(None, description="製品フィルター"),
+    date_from: Optional[str] = Query(None, description="開始日時"),
+    date_to: Optional[str] = Query(None, description="終了日時"),
+    date_field: str = Query("reception_datetime", description="日付フィルター対象"),
+    include_deleted: bool = Query(False, description="削除済みデータを含む"),
+    similarity_threshold: float = Query(0.8, ge=0.1, le=1.0, description="類似度の閾値（similarのみ）"),
+    response_format: str = Query(
+        "verbose", alias="format", regex="^(verbose|compact)$",
+        description="レスポンス形式（verbose: レコードごとに全項目 / compact: グループ共通の値を1回だけ送信）"
+    ),
+    accept_encoding: Optional[str] = Header(None, description="対応する圧縮形式（gzip で圧縮して返す）")
+):
+    """重複グループのメンバー取得API（グループ概要から個別に遅延取得する）"""
+    try:
+        sort_order, filters = build_duplicate_request(
+            sort_order, keyword, content_keyword, status_keyword, progress,
+            system_type, product, date_from, date_to, date_field, include_deleted
+        )
+
+        group = await db_manager.run_blocking(
+            DuplicateService.get_group_members,
+            duplicate_type,
+            record_id,
+            filters,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            similarity_threshold=similarity_threshold
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"重複グループメンバー取得エラー: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if group is None:
+        raise HTTPException(status_code=404, detail=f"Duplicate group not found for record: {record_id}")
+    if response_format == "compact":
+        return FastJSONResponse(compact_group(group), accept_encoding=accept_encoding)
+    return FastJSONResponse(group, accept_encoding=accept_encoding)
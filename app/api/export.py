@@ -0,0 +1,153 @@
+import asyncio
+from fastapi import APIRouter, Header, Path, Query, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from datetime import datetime
+from api.duplicates import build_duplicate_request
+from services.export_service import ExportService
+from database import db_manager
+from utils.json_response import GzipStream, accepts_gzip
+
+router = APIRouter()
+
+# 出力形式ごとのメディアタイプと拡張子
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# Excel で UTF-8 の CSV として開くための BOM
+UTF8_BOM = b"\xef\xbb\xbf"
+
+async def stream_export(
+    query: str,
+    params: tuple,
+    export_format: str,
+    filename: str,
+    bom: bool,
+    accept_encoding: Optional[str]
+) -> StreamingResponse:
+    """エクスポートのクエリを実行してチャンク単位で送信
+
+    先頭のチャンクを取得してから応答を開始するため、クエリのエラーは500として返す。
+    送信開始後にエラーが発生した場合は接続を切断し、不完全なファイルを正常終了させない。
+    CSV は Accept-Encoding に gzip が含まれる場合、チャンクごとにフラッシュしながら圧縮する。
+    """
+    if export_format == "parquet":
+        if not ExportService.is_parquet_available():
+            raise HTTPException(status_code=400, detail="Parquet の出力には pyarrow のインストールが必要です")
+        chunks = db_manager.blocking_iterator(ExportService.iter_parquet(query, params))
+    else:
+        chunks = db_manager.blocking_iterator(ExportService.iter_csv(query, params))
+
+    try:
+        first_chunk = await chunks.next()
+    except asyncio.CancelledError:
+        # 送信開始前のクライアント切断でも COPY を中断する
+        await chunks.aclose()
+        raise
+    except Exception as e:
+        await chunks.aclose()
+        print(f"エクスポートエラー: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    # Parquet は圧縮済みの列形式のため gzip しない
+    compressor = GzipStream() if export_format == "csv" and accepts_gzip(accept_encoding) else None
+
+    def encode(chunk: bytes) -> bytes:
+        return compressor.compress(chunk) if compressor else chunk
+
+    async def generate():
+        chunk = first_chunk
+        try:
+            if bom and export_format == "csv":
+                yield encode(UTF8_BOM)
+            while chunk is not None:
+                yield encode(chunk)
+                chunk = await chunks.next()
+        except Exception as e:
+            print(f"エクスポート送信エラー: {e}")
+            raise
+        finally:
+            # クライアント切断時も COPY を中断して接続を返却する（close はキャンセルされない）
+            await chunks.aclose()
+        if compressor:
+            yield compressor.finish()
+
+    media_type, extension = EXPORT_FORMATS[export_format]
+    headers = {"Content-Disposition": f'attachment; filename="{filename}.{extension}"'}
+    if compressor:
+        headers.update({"Content-Encoding": "gzip", "Vary": "Accept-Encoding"})
+    return StreamingResponse(generate(), media_type=media_type, headers=headers)
+
+@router.get("/export/reception-data")
+async def export_reception_data(
+    export_format: str = Query("csv", alias="format", regex="^(csv|parquet)$", description="出力形式（csv/parquet）"),
+    bom: bool = Query(False, description="CSV の先頭に BOM を付ける（Excel で開く場合）"),
+    sort_by: str = Query("reception_datetime", description="ソート列（カンマ区切りで複数指定可）"),
+    sort_order: str = Query("desc", description="ソート順（カンマ区切りで複数指定可）"),
+    keyword: Optional[str] = Query(None, description="キーワード検索（後方互換性）"),
+    content_keyword: Optional[str] = Query(None, description="受付内容キーワード"),
+    status_keyword: Optional[str] = Query(None, description="対応状況キーワード"),
+    progress: Optional[str] = Query(None, description="進捗フィルター"),
+    system_type: Optional[str] = Query(None, description="システム種別フィルター"),
+    product: Optional[str] = Query(None, description="製品フィルター"),
+    date_from: Optional[str] = Query(None, description="開始日時"),
+    date_to: Optional[str] = Query(None, description="終了日時"),
+    date_field: str = Query("reception_datetime", description="日付フィルター対象"),
+    include_deleted: bool = Query(False, description="削除済みデータを含む"),
+    accept_encoding: Optional[str] = Header(None, description="対応する圧縮形式（CSV を gzip で圧縮して返す）")
+):
+    """受信データのエクスポートAPI（条件に合う全件を COPY で逐次出力）"""
+    sort_order, filters = build_duplicate_request(
+        sort_order, keyword, content_keyword, status_keyword, progress,
+        system_type, product, date_from, date_to, date_field, include_deleted
+    )
+    query, params = ExportService.build_reception_query(filters, sort_by, sort_order or "desc")
+    filename = f"reception_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    return await stream_export(query, params, export_format, filename, bom, accept_encoding)
+
+@router.get("/export/duplicates/{duplicate_type}")
+async def export_duplicates(
+    duplicate_type: str = Path(..., regex="^(exact|content|status|similar)$", description="重複タイプ"),
+    export_format: str = Query("csv", alias="format", regex="^(csv|parquet)$", description="出力形式（csv/parquet）"),
+    bom: bool = Query(False, description="CSV の先頭に BOM を付ける（Excel で開く場合）"),
+    sort_by: Optional[str] = Query(None, description="ソート列（カンマ区切り）"),
+    sort_order: Optional[str] = Query(None, description="ソート順（カンマ区切り）"),
+    keyword: Optional[str] = Query(None, description="キーワード検索（後方互換性）"),
+    content_keyword: Optional[str] = Query(None, description="受付内容キーワード"),
+    status_keyword: Optional[str] = Query(None, description="対応状況キーワード"),
+    progress: Optional[str] = Query(None, description="進捗フィルター"),
+    system_type: Optional[str] = Query(None, description="システム種別フィルター"),
+    product: Optional[str] = Query(None, description="製品フィルター"),
+    date_from: Optional[str] = Query(None, description="開始日時"),
+    date_to: Optional[str] = Query(None, description="終了日時"),
+    date_field: str = Query("reception_datetime", description="日付フィルター対象"),
+    include_deleted: bool = Query(False, description="削除済みデータを含む"),
+    similarity_threshold: float = Query(0.8, ge=0.1, le=1.0, description="類似度の閾値（similarのみ）"),
+    min_group_size: int = Query(2, ge=2, description="グループの最小件数"),
+    group_order: str = Query("first_id", regex="^(first_id|size)$", description="グループの並び順（first_id: 最小ID順、size: 件数の多い順）"),
+    accept_encoding: Optional[str] = Header(None, description="対応する圧縮形式（CSV を gzip で圧縮して返す）")
+):
+    """重複グループのエクスポートAPI（全グループのメンバーを1行ずつ、グループ番号・件数付きで出力）"""
+    sort_order, filters = build_duplicate_request(
+        sort_order, keyword, content_keyword, status_keyword, progress,
+        system_type, product, date_from, date_to, date_field, include_deleted
+    )
+    try:
+        # similar はグループの検出（署名の比較）を行ってからクエリを構築する
+        query, params = await db_manager.run_blocking(
+            ExportService.build_duplicate_query,
+            duplicate_type,
+            filters,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            similarity_threshold=similarity_threshold,
+            min_group_size=min_group_size,
+            group_order=group_order
+        )
+    except Exception as e:
+        print(f"重複エクスポートエラー: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    filename = f"duplicates_{duplicate_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    return await stream_export(query, params, export_format, filename, bom, accept_encoding)
@@ -0,0 +1,114 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from typing import List, Optional
+from models.response_models import JobResponse, JobResultResponse, JobResultItemsResponse
+from models.request_models import DeleteRequest, RestoreRequest, BulkDeleteRequest, DuplicateScanRequest
+from services.job_service import JobService, JobQueueFullError, FINISHED_STATUSES
+from database import db_manager
+
+router = APIRouter()
+
+async def submit_job(job_type: str, request) -> JobResponse:
+    """ジョブを登録して登録直後の状態を返す（受付上限に達している場合は429）"""
+    try:
+        job = await db_manager.run_blocking(JobService.submit, job_type, jsonable_encoder(request))
+        return JobResponse(**job)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"ジョブ登録エラー: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/jobs/delete", response_model=JobResponse, status_code=202)
+async def submit_delete_job(request: DeleteRequest):
+    """重複データ削除をバックグラウンドジョブとして登録"""
+    return await submit_job("delete", request)
+
+@router.post("/jobs/restore", response_model=JobResponse, status_code=202)
+async def submit_restore_job(request: RestoreRequest):
+    """データ復元をバックグラウンドジョブとして登録"""
+    return await submit_job("restore", request)
+
+@router.post("/jobs/bulk-delete", response_model=JobResponse, status_code=202)
+async def submit_bulk_delete_job(request: BulkDeleteRequest):
+    """チャンク単位の一括削除をバックグラウンドジョブとして登録（チャンクの区切りでキャンセル可能）"""
+    return await submit_job("bulk_delete", request)
+
+@router.post("/jobs/duplicates", response_model=JobResponse, status_code=202)
+async def submit_duplicate_scan_job(request: DuplicateScanRequest):
+    """重複検出の全件走査をバックグラウンドジョブとして登録（結果は /jobs/{job_id}/result で取得）"""
+    if request.duplicate_type not in ["exact", "content", "status", "similar"]:
+        raise HTTPException(status_code=400, detail="Invalid duplicate_type")
+    return await submit_job("duplicate_scan", request)
+
+@router.get("/jobs", response_model=List[JobResponse])
+async def list_jobs(
+    status: Optional[str] = Query(None, description="状態で絞り込み"),
+    job_type: Optional[str] = Query(None, description="種別で絞り込み"),
+    limit: int = Query(50, ge=1, le=500, description="取得件数")
+):
+    """ジョブ一覧（新しい順）"""
+    try:
+        jobs = await db_manager.run_blocking(JobService.list_jobs, status, job_type, limit)
+        return [JobResponse(**job) for job in jobs]
+    except Exception as e:
+        print(f"ジョブ一覧取得エラー: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """ジョブの状態と進捗"""
+    try:
+        job = await db_manager.run_blocking(JobService.get_job, job_id)
+    except Exception as e:
+        print(f"ジョブ状態取得エラー: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse(**job)
+
+@router.get("/jobs/{job_id}/result", response_model=JobResultResponse)
+async def get_job_result(job_id: str):
+    """ジョブの結果（終了前は409）"""
+    try:
+        job = await db_manager.run_blocking(JobService.get_result, job_id)
+    except Exception as e:
+        print(f"ジョブ結果取得エラー: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job['status'] not in FINISHED_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return JobResultResponse(**job)
+
+@router.get("/jobs/{job_id}/result/items", response_model=JobResultItemsResponse)
+async def get_job_result_items(
+    job_id: str,
+    offset: int = Query(0, ge=0, description="取得開始位置"),
+    limit: int = Query(100, ge=1, le=1000, description="取得件数")
+):
+    """ジョブが1件ずつ保存した結果（重複検出のグループなど）をページ単位で取得（終了前は409）"""
+    try:
+        job = await db_manager.run_blocking(JobService.get_result_items, job_id, offset, limit)
+    except Exception as e:
+        print(f"ジョブ結果取得エラー: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job['status'] not in FINISHED_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return JobResultItemsResponse(**job)
+
+@router.post("/jobs/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job(job_id: str):
+    """ジョブのキャンセルを要求（実行中のジョブは次の区切りで停止）"""
+    try:
+        job = await db_manager.run_blocking(JobService.cancel, job_id)
+    except Exception as e:
+        print(f"ジョブキャンセルエラー: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse(**job)
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, HTTPException
-from models.response_models import DeleteResponse, MetadataResponse, RestoreResponse
-from models.request_models import DeleteRequest, RestoreRequest
+from fastapi import APIRouter, HTTPException, Header
+from fastapi.responses import JSONResponse, Response
+from typing import Optional
+from models.response_models import DeleteResponse, BulkDeleteResponse, MetadataResponse, RestoreResponse
+from models.request_models import DeleteRequest, BulkDeleteRequest, RestoreRequest
 from services.delete_service import DeleteService
+from services.bulk_delete_service import BulkDeleteService
 from services.restore_service import RestoreService
+from services.metadata_service import MetadataService
 from database import db_manager
 
 router = APIRouter()
@@ -11,79 +15,59 @@ router = APIRouter()
 async def delete_duplicates(request: DeleteRequest):
     """重複データ削除API"""
     try:
-        return DeleteService.delete_duplicates(request)
+        return await db_manager.run_blocking(DeleteService.delete_duplicates, request)
     except Exception as e:
         print(f"削除処理エラー: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/metadata", response_model=MetadataResponse)
-async def get_metadata():
-    """マスタデータ取得API"""
+@router.post("/bulk-delete", response_model=BulkDeleteResponse)
+async def bulk_delete(request: BulkDeleteRequest):
+    """チャンク単位の一括削除API（大量データ向け、ロック中の行は後から再試行）"""
     try:
-        # 進捗オプション取得
-        progress_query = """
-        SELECT DISTINCT cond_item.itemname
-        FROM m_ctitem AS cond_item
-        JOIN exechead ON exechead.condition = cond_item.itemcd
-        WHERE cond_item.itemname IS NOT NULL
-        ORDER BY cond_item.itemname
-        """
-        progress_result = db_manager.execute_query(progress_query)
-        progress_options = [row['itemname'] for row in progress_result]
-
-        # システム種別オプション取得
-        system_type_query = """
-        SELECT DISTINCT stype_item.itemname
-        FROM m_ctitem AS stype_item
-        JOIN exechead ON exechead.stype = stype_item.itemcd
-        WHERE stype_item.itemname IS NOT NULL
-        ORDER BY stype_item.itemname
-        """
-        system_type_result = db_manager.execute_query(system_type_query)
-        system_type_options = [row['itemname'] for row in system_type_result]
-
-        # 製品オプション取得
-        product_query = """
-        SELECT DISTINCT prod_item.itemname
-        FROM m_ctitem AS prod_item
-        JOIN exechead ON exechead.producttype = prod_item.itemcd
-        WHERE prod_item.itemname IS NOT NULL
-        ORDER BY prod_item.itemname
-        """
-        product_result = db_manager.execute_query(product_query)
-        product_options = [row['itemname'] for row in product_result]
-
-        # 列定義
-        column_definitions = [
-            {"id": "id", "name": "ID", "type": "number", "filterable": True, "sortable": True},
-            {"id": "content", "name": "受付内容", "type": "text", "filterable": True, "sortable": True},
-            {"id": "status", "name": "対応状況", "type": "text", "filterable": True, "sortable": True},
-            {"id": "result", "name": "結果", "type": "text", "filterable": False, "sortable": True},
-            {"id": "report", "name": "レポート", "type": "text", "filterable": False, "sortable": True},
-            {"id": "progress", "name": "進捗", "type": "text", "filterable": True, "sortable": True},
-            {"id": "system_type", "name": "システム種別", "type": "text", "filterable": True, "sortable": True},
-            {"id": "product", "name": "製品", "type": "text", "filterable": True, "sortable": True},
-            {"id": "reception_moddt", "name": "削除フラグ日時", "type": "datetime", "filterable": True, "sortable": True},
-            {"id": "reception_datetime", "name": "受付日時", "type": "datetime", "filterable": True, "sortable": True},
-            {"id": "update_datetime", "name": "更新日時", "type": "datetime", "filterable": True, "sortable": True}
-        ]
-
-        return MetadataResponse(
-            progress_options=progress_options,
-            system_type_options=system_type_options,
-            product_options=product_options,
-            column_definitions=column_definitions
+        result = await db_manager.run_blocking(
+            BulkDeleteService.delete_in_chunks,
+            request.filter_conditions,
+            chunk_size=request.chunk_size,
+            resume_after_id=request.resume_after_id
         )
+        return BulkDeleteResponse(**result)
+    except Exception as e:
+        print(f"一括削除エラー: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
+def build_metadata_response(metadata: dict, etag: str, if_none_match: Optional[str] = None) -> Response:
+    """ETag付きのレスポンスを作成（If-None-Match が一致すれば304）"""
+    # no-cache: ブラウザは保存した内容を毎回ETagで再検証する
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if MetadataService.etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=metadata, headers=headers)
+
+@router.get("/metadata", response_model=MetadataResponse)
+async def get_metadata(if_none_match: Optional[str] = Header(None)):
+    """マスタデータ取得API（METADATA_CACHE_TTL 秒キャッシュ、ETagによる再検証に対応）"""
+    try:
+        metadata, etag = await db_manager.run_blocking(MetadataService.get_metadata)
+        return build_metadata_response(metadata, etag, if_none_match)
     except Exception as e:
         print(f"メタデータ取得エラー: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/metadata/refresh", response_model=MetadataResponse)
+async def refresh_metadata():
+    """マスタデータのキャッシュを破棄して再取得"""
+    try:
+        metadata, etag = await db_manager.run_blocking(MetadataService.refresh)
+        return build_metadata_response(metadata, etag)
+    except Exception as e:
+        print(f"メタデータ再取得エラー: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/restore-records", response_model=RestoreResponse)
 async def restore_records(request: RestoreRequest):
     """データ復元API"""
     try:
-        return RestoreService.restore_records(request)
+        return await db_manager.run_blocking(RestoreService.restore_records, request)
     except Exception as e:
         print(f"復元処理エラー: {e}")
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Header, Query, HTTPException
 from typing import Optional
 from datetime import datetime
 from models.response_models import ReceptionDataResponse, StatisticsResponse
 from models.request_models import FilterRequest
 from services.data_service import DataService
+from config.search_config import SearchConfig
+from utils.cursor import InvalidCursorError
+from utils.json_response import FastJSONResponse
+from database import db_manager
 
 router = APIRouter()
 
@@ -11,6 +15,12 @@ router = APIRouter()
 async def get_reception_data(
     offset: int = Query(0, ge=0, description="データ開始位置"),
     limit: int = Query(100, ge=1, le=500, description="取得件数"),
+    pagination: str = Query("offset", regex="^(offset|cursor)$", description="ページング方式（offset/cursor）"),
+    cursor: Optional[str] = Query(None, description="継続トークン（cursor方式の次ページ取得用）"),
+    count_mode: Optional[str] = Query(
+        None, regex="^(exact|estimate|none)$",
+        description="総件数の算出方式（exact: 全件集計 / estimate: 標本から推定 / none: 集計しない、省略時は COUNT_MODE）"
+    ),
     sort_by: str = Query("reception_datetime", description="ソート列（カンマ区切りで複数指定可）"),
     sort_order: str = Query("desc", description="ソート順（カンマ区切りで複数指定可）"),
     keyword: Optional[str] = Query(None, description="キーワード検索（後方互換性）"),
@@ -22,7 +32,8 @@ async def get_reception_data(
     date_from: Optional[str] = Query(None, description="開始日時"),
     date_to: Optional[str] = Query(None, description="終了日時"),
     date_field: str = Query("reception_datetime", description="日付フィルター対象"),
-    include_deleted: bool = Query(False, description="削除済みデータを含む")
+    include_deleted: bool = Query(False, description="削除済みデータを含む"),
+    accept_encoding: Optional[str] = Header(None, description="対応する圧縮形式（gzip で圧縮して返す）")
 ):
     """受信データ取得API"""
     try:
@@ -59,27 +70,59 @@ async def get_reception_data(
                 include_deleted=include_deleted
             )
 
-        # データ取得
-        records, total = DataService.get_reception_data(
+        count_mode = count_mode or SearchConfig.get_default_count_mode()
+
+        # キーセット（シーク）方式：継続トークンで次ページを取得
+        if pagination == "cursor" or cursor:
+            records, total, stats, next_cursor, count_info = await db_manager.run_blocking(
+                DataService.get_reception_page_by_cursor,
+                cursor=cursor,
+                limit=limit,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                filters=filters,
+                count_mode=count_mode
+            )
+
+            return FastJSONResponse(ReceptionDataResponse(
+                data=records,
+                total=total,
+                offset=0,
+                limit=limit,
+                has_more=count_info["has_more"],
+                statistics=StatisticsResponse(**stats) if stats else None,
+                next_cursor=next_cursor,
+                count_mode=count_info["count_mode"],
+                total_error=count_info["total_error"]
+            ), accept_encoding=accept_encoding)
+
+        # データ・総件数・統計情報を1回のクエリで取得（exact以外は総件数の集計を省略）
+        records, total, stats, count_info = await db_manager.run_blocking(
+            DataService.get_reception_page,
             offset=offset,
             limit=limit,
             sort_by=sort_by,
             sort_order=sort_order,
-            filters=filters
+            filters=filters,
+            count_mode=count_mode
         )
 
-        # 統計情報取得
-        stats = DataService.get_statistics(filters)
-
-        return ReceptionDataResponse(
+        # 組み立て済みのモデルを response_model で再検証せずに送信
+        return FastJSONResponse(ReceptionDataResponse(
             data=records,
             total=total,
             offset=offset,
             limit=limit,
-            has_more=offset + limit < total,
-            statistics=StatisticsResponse(**stats)
-        )
+            has_more=count_info["has_more"],
+            statistics=StatisticsResponse(**stats) if stats else None,
+            count_mode=count_info["count_mode"],
+            total_error=count_info["total_error"]
+        ), accept_encoding=accept_encoding)
 
+    except HTTPException:
+        raise
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"データ取得エラー: {e}")
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
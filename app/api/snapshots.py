@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Header, Path, Query, HTTPException
+from typing import Optional, Union
+from models.response_models import CompactDuplicatesResponse, DuplicatesResponse, DuplicateSnapshotResponse
+from services.snapshot_service import SnapshotService, SnapshotNotFoundError
+from database import db_manager
+from utils.compact_format import compact_duplicates_response
+from utils.json_response import FastJSONResponse
+
+router = APIRouter()
+
+@router.get("/snapshots/duplicates", response_model=DuplicateSnapshotResponse)
+async def get_duplicate_snapshot():
+    """重複グループのスナップショット（scan.py の走査結果）の情報"""
+    try:
+        return DuplicateSnapshotResponse(**await db_manager.run_blocking(SnapshotService.get_info))
+    except SnapshotNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        print(f"スナップショット情報取得エラー: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/snapshots/duplicates/{duplicate_type}", response_model=Union[DuplicatesResponse, CompactDuplicatesResponse])
+async def get_snapshot_duplicates(
+    duplicate_type: str = Path(..., regex="^(exact|content|status)$", description="重複タイプ"),
+    sort_by: Optional[str] = Query(None, description="グループ内のソート列（カンマ区切り）"),
+    sort_order: Optional[str] = Query(None, description="グループ内のソート順（カンマ区切り）"),
+    group_order: str = Query("first_id", regex="^(first_id|size)$", description="グループの並び順（first_id: 最小ID順、size: 件数の多い順）"),
+    group_offset: int = Query(0, ge=0, description="グループ単位のオフセット"),
+    group_limit: int = Query(100, ge=1, le=1000, description="取得するグループ数"),
+    response_format: str = Query(
+        "verbose", alias="format", regex="^(verbose|compact)$",
+        description="レスポンス形式（verbose: レコードごとに全項目 / compact: グループ共通の値を1回だけ送信）"
+    ),
+    accept_encoding: Optional[str] = Header(None, description="対応する圧縮形式（gzip で圧縮して返す）")
+):
+    """スナップショットの重複グループ取得API
+
+    グループ分けは走査時点の結果で、メンバーの表示列は現在のデータから取得する
+    （走査後に削除された行は含まれない）。スナップショットの作成日時は X-Snapshot-Created-At で返す。
+    """
+    # ソートパラメータの検証（セキュリティ対策）
+    if sort_order:
+        sort_orders = [s.strip().lower() for s in sort_order.split(',')]
+        for order in sort_orders:
+            if order not in ('asc', 'desc'):
+                raise HTTPException(status_code=400, detail=f"Invalid sort order: {order}")
+        sort_order = ','.join(sort_orders)
+
+    try:
+        duplicate_groups, total_groups, total_duplicates, created_at = await db_manager.run_blocking(
+            SnapshotService.get_duplicate_page,
+            duplicate_type,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            group_order=group_order,
+            group_offset=group_offset,
+            group_limit=group_limit
+        )
+    except SnapshotNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        print(f"スナップショット重複取得エラー: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    response = DuplicatesResponse(
+        duplicates=duplicate_groups,
+        total_groups=total_groups,
+        total_duplicates=total_duplicates,
+        group_offset=group_offset,
+        group_limit=group_limit,
+        has_more=group_offset + group_limit < total_groups
+    )
+    headers = {"X-Snapshot-Created-At": created_at}
+    if response_format == "compact":
+        return FastJSONResponse(compact_duplicates_response(response), accept_encoding=accept_encoding, headers=headers)
+    return FastJSONResponse(response, accept_encoding=accept_encoding, headers=headers)
@@ -0,0 +1,39 @@
+import os
+
+
+class BulkOperationConfig:
+    """チャンク単位の一括更新（論理削除）設定の管理クラス"""
+
+    @staticmethod
+    def _get_int(name: str, default: int) -> int:
+        try:
+            return int(os.getenv(name, str(default)))
+        except ValueError:
+            return default
+
+    @staticmethod
+    def _get_float(name: str, default: float) -> float:
+        try:
+            return float(os.getenv(name, str(default)))
+        except ValueError:
+            return default
+
+    @staticmethod
+    def get_chunk_size() -> int:
+        """1トランザクションで更新する最大行数（デフォルト: 5000行）"""
+        return max(1, BulkOperationConfig._get_int('BULK_CHUNK_SIZE', 5000))
+
+    @staticmethod
+    def get_max_retries() -> int:
+        """ロック競合時の再試行回数（チャンク単位・ロック中でスキップした行の再走査とも、デフォルト: 3回）"""
+        return max(0, BulkOperationConfig._get_int('BULK_MAX_RETRIES', 3))
+
+    @staticmethod
+    def get_retry_delay() -> float:
+        """再試行までの待機秒数（再試行ごとに倍増、デフォルト: 0.5秒）"""
+        return max(0.0, BulkOperationConfig._get_float('BULK_RETRY_DELAY', 0.5))
+
+    @staticmethod
+    def get_lock_timeout_ms() -> int:
+        """チャンク内でロックを待つ最大ミリ秒（デフォルト: 5000ミリ秒、0で無制限）"""
+        return max(0, BulkOperationConfig._get_int('BULK_LOCK_TIMEOUT_MS', 5000))
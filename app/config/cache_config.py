@@ -0,0 +1,47 @@
+import os
+
+
+class CacheConfig:
+    """キャッシュ設定の管理クラス"""
+
+    @staticmethod
+    def _get_int(name: str, default: int) -> int:
+        try:
+            return int(os.getenv(name, str(default)))
+        except ValueError:
+            return default
+
+    @staticmethod
+    def _get_float(name: str, default: float) -> float:
+        try:
+            return float(os.getenv(name, str(default)))
+        except ValueError:
+            return default
+
+    @staticmethod
+    def get_metadata_ttl() -> float:
+        """マスタデータ（/api/metadata）のキャッシュ有効期間（秒、デフォルト: 3600秒、0以下でキャッシュしない）"""
+        return CacheConfig._get_float('METADATA_CACHE_TTL', 3600.0)
+
+    @staticmethod
+    def is_result_cache_enabled() -> bool:
+        """検索結果（受信データ・統計・重複検出）のキャッシュを使うかどうか（デフォルト: 有効）"""
+        return os.getenv('RESULT_CACHE_ENABLED', 'true').lower() in ('true', '1', 'yes', 'on')
+
+    @staticmethod
+    def get_result_cache_ttl() -> float:
+        """検索結果の有効期間（秒、デフォルト: 60秒）
+
+        本アプリ経由の削除・復元は即時に反映されるため、他のシステムによる更新の反映待ち時間の上限となる。
+        """
+        return max(0.0, CacheConfig._get_float('RESULT_CACHE_TTL', 60.0))
+
+    @staticmethod
+    def get_result_cache_max_entries() -> int:
+        """保持する検索結果の最大件数（デフォルト: 1000件）"""
+        return max(1, CacheConfig._get_int('RESULT_CACHE_MAX_ENTRIES', 1000))
+
+    @staticmethod
+    def get_result_cache_max_bytes() -> int:
+        """検索結果の合計サイズの上限（RESULT_CACHE_MAX_MB、デフォルト: 64MB）"""
+        return max(1, CacheConfig._get_int('RESULT_CACHE_MAX_MB', 64)) * 1024 * 1024
@@ -0,0 +1,74 @@
+import os
+
+
+class DatabaseConfig:
+    """データベース接続プール設定の管理クラス"""
+
+    @staticmethod
+    def _get_int(name: str, default: int) -> int:
+        try:
+            return int(os.getenv(name, str(default)))
+        except ValueError:
+            return default
+
+    @staticmethod
+    def _get_float(name: str, default: float) -> float:
+        try:
+            return float(os.getenv(name, str(default)))
+        except ValueError:
+            return default
+
+    @staticmethod
+    def get_pool_min_size() -> int:
+        """プールに常時保持する最小接続数（デフォルト: 1）"""
+        return max(0, DatabaseConfig._get_int('DB_POOL_MIN_SIZE', 1))
+
+    @staticmethod
+    def get_pool_max_size() -> int:
+        """プールの最大接続数（デフォルト: 10）"""
+        return max(1, DatabaseConfig._get_int('DB_POOL_MAX_SIZE', 10))
+
+    @staticmethod
+    def get_pool_idle_timeout() -> float:
+        """アイドル接続を破棄するまでの秒数（デフォルト: 300秒、0以下で無効）"""
+        return DatabaseConfig._get_float('DB_POOL_IDLE_TIMEOUT', 300.0)
+
+    @staticmethod
+    def get_pool_timeout() -> float:
+        """プール枯渇時に接続の返却を待つ最大秒数（デフォルト: 30秒）"""
+        return DatabaseConfig._get_float('DB_POOL_TIMEOUT', 30.0)
+
+    @staticmethod
+    def is_health_check_enabled() -> bool:
+        """貸出時に接続の死活確認を行うかどうか（デフォルト: 有効）"""
+        return os.getenv('DB_POOL_HEALTH_CHECK', 'true').lower() in ('true', '1', 'yes', 'on')
+
+    @staticmethod
+    def get_executor_workers() -> int:
+        """DBアクセス用スレッドプールのワーカー数（デフォルト: プールの最大接続数）"""
+        return max(1, DatabaseConfig._get_int('DB_EXECUTOR_WORKERS', DatabaseConfig.get_pool_max_size()))
+
+    @staticmethod
+    def get_stream_itersize() -> int:
+        """サーバーサイドカーソルで1回に取得する行数（デフォルト: 2000行）"""
+        return max(1, DatabaseConfig._get_int('DB_STREAM_ITERSIZE', 2000))
+
+    @staticmethod
+    def is_prepared_statements_enabled() -> bool:
+        """検索系の定型クエリを準備済みステートメントで実行するかどうか（デフォルト: 有効）"""
+        return os.getenv('DB_PREPARED_STATEMENTS', 'true').lower() in ('true', '1', 'yes', 'on')
+
+    @staticmethod
+    def get_prepared_statements_per_connection() -> int:
+        """1接続あたりに保持する準備済みステートメントの最大数（デフォルト: 100、超過分は古いものから解放）"""
+        return max(1, DatabaseConfig._get_int('DB_PREPARED_STATEMENTS_PER_CONNECTION', 100))
+
+    @staticmethod
+    def get_plan_cache_mode() -> str:
+        """準備済みステートメントの実行計画の再利用方針（PostgreSQL の plan_cache_mode、未指定時はサーバー設定）
+
+        auto: 5回目以降、汎用計画のコストが見劣りしなければ計画を再利用 /
+        force_generic_plan: 常に再利用 / force_custom_plan: 毎回パラメータに合わせて計画
+        """
+        mode = os.getenv('DB_PLAN_CACHE_MODE', '').lower()
+        return mode if mode in ('auto', 'force_generic_plan', 'force_custom_plan') else ''
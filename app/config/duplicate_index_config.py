@@ -0,0 +1,30 @@
+import os
+
+
+class DuplicateIndexConfig:
+    """重複グループインデックス設定の管理クラス"""
+
+    @staticmethod
+    def is_enabled() -> bool:
+        """重複検出でインデックスを利用するかどうか（デフォルト: 有効、未構築時は全件走査）"""
+        return os.getenv('DUP_INDEX_ENABLED', 'true').lower() in ('true', '1', 'yes', 'on')
+
+    @staticmethod
+    def get_sync_interval() -> float:
+        """重複検出時に差分同期を行う最短間隔（秒、デフォルト: 60秒、0以下で毎回同期）"""
+        try:
+            return float(os.getenv('DUP_INDEX_SYNC_INTERVAL', '60'))
+        except ValueError:
+            return 60.0
+
+    @staticmethod
+    def get_overlap_seconds() -> int:
+        """ウォーターマークの重なり幅（秒、デフォルト: 300秒）
+
+        コミットの遅いトランザクションの更新を取りこぼさないよう、前回のウォーターマークより
+        この秒数だけ遡って変更行を再処理する（再処理は冪等）。
+        """
+        try:
+            return int(os.getenv('DUP_INDEX_OVERLAP_SECONDS', '300'))
+        except ValueError:
+            return 300
@@ -0,0 +1,33 @@
+import os
+
+
+class ExportConfig:
+    """エクスポート（CSV/Parquet の一括出力）設定の管理クラス"""
+
+    @staticmethod
+    def _get_int(name: str, default: int) -> int:
+        try:
+            return int(os.getenv(name, str(default)))
+        except ValueError:
+            return default
+
+    @staticmethod
+    def get_chunk_bytes() -> int:
+        """COPY の出力をまとめて送信する単位（バイト、デフォルト: 65536）"""
+        return max(1024, ExportConfig._get_int('EXPORT_CHUNK_BYTES', 65536))
+
+    @staticmethod
+    def get_queue_chunks() -> int:
+        """送信待ちで保持するチャンク数の上限（デフォルト: 8、超えるとCOPYの読み出しを待たせる）"""
+        return max(1, ExportConfig._get_int('EXPORT_QUEUE_CHUNKS', 8))
+
+    @staticmethod
+    def get_parquet_row_group_rows() -> int:
+        """Parquet の1行グループの行数（デフォルト: 50000、この行数ごとに書き出して送信）"""
+        return max(1000, ExportConfig._get_int('EXPORT_PARQUET_ROW_GROUP_ROWS', 50000))
+
+    @staticmethod
+    def get_parquet_compression() -> str:
+        """Parquet の圧縮方式（snappy / zstd / gzip / none、デフォルト: snappy）"""
+        compression = os.getenv('EXPORT_PARQUET_COMPRESSION', 'snappy').lower()
+        return compression if compression in ('snappy', 'zstd', 'gzip', 'none') else 'snappy'
@@ -0,0 +1,59 @@
+import os
+
+
+class JobConfig:
+    """バックグラウンドジョブ設定の管理クラス"""
+
+    @staticmethod
+    def _get_int(name: str, default: int) -> int:
+        try:
+            return int(os.getenv(name, str(default)))
+        except ValueError:
+            return default
+
+    @staticmethod
+    def _get_float(name: str, default: float) -> float:
+        try:
+            return float(os.getenv(name, str(default)))
+        except ValueError:
+            return default
+
+    @staticmethod
+    def get_workers() -> int:
+        """同時に実行するジョブ数（デフォルト: 2、接続プールの最大接続数より小さくすること）"""
+        return max(1, JobConfig._get_int('JOB_WORKERS', 2))
+
+    @staticmethod
+    def get_max_pending() -> int:
+        """プロセス内で受け付ける未完了ジョブ（待機中＋実行中）の上限（デフォルト: 100）"""
+        return max(1, JobConfig._get_int('JOB_MAX_PENDING', 100))
+
+    @staticmethod
+    def get_progress_interval() -> float:
+        """進捗を保存する最短間隔（秒、デフォルト: 1秒）"""
+        return max(0.0, JobConfig._get_float('JOB_PROGRESS_INTERVAL', 1.0))
+
+    @staticmethod
+    def get_retention_days() -> int:
+        """終了したジョブの保持日数（起動時に削除、デフォルト: 7日、0以下で削除しない）"""
+        return JobConfig._get_int('JOB_RETENTION_DAYS', 7)
+
+    @staticmethod
+    def get_result_page_size() -> int:
+        """結果を background_job_result へまとめて保存する件数（デフォルト: 100件）"""
+        return max(1, JobConfig._get_int('JOB_RESULT_PAGE_SIZE', 100))
+
+    @staticmethod
+    def get_result_max_bytes() -> int:
+        """1ジョブで保存する結果の合計サイズの上限（JOB_RESULT_MAX_MB、デフォルト: 64MB）"""
+        return max(1, JobConfig._get_int('JOB_RESULT_MAX_MB', 64)) * 1024 * 1024
+
+    @staticmethod
+    def get_heartbeat_interval() -> float:
+        """実行中・待機中のジョブの生存を記録する間隔（秒、デフォルト: 10秒）"""
+        return max(1.0, JobConfig._get_float('JOB_HEARTBEAT_INTERVAL', 10.0))
+
+    @staticmethod
+    def get_heartbeat_timeout() -> float:
+        """生存の記録がこの秒数途絶えたジョブを中断扱いにする（デフォルト: 60秒、間隔の2倍以上）"""
+        return max(JobConfig.get_heartbeat_interval() * 2, JobConfig._get_float('JOB_HEARTBEAT_TIMEOUT', 60.0))
@@ -0,0 +1,22 @@
+import os
+
+
+class MetricsConfig:
+    """メトリクス（/metrics）設定の管理クラス"""
+
+    @staticmethod
+    def is_enabled() -> bool:
+        """処理時間・行数・エラー件数を計測するかどうか（デフォルト: 有効、無効時は /metrics は空）"""
+        return os.getenv('METRICS_ENABLED', 'true').lower() in ('true', '1', 'yes', 'on')
+
+    @staticmethod
+    def get_latency_buckets() -> list:
+        """処理時間のヒストグラムの境界（秒、カンマ区切り）"""
+        default = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]
+        value = os.getenv('METRICS_LATENCY_BUCKETS')
+        if not value:
+            return default
+        try:
+            return sorted(float(bound) for bound in value.split(",") if bound.strip())
+        except ValueError:
+            return default
@@ -0,0 +1,27 @@
+import os
+
+
+class ResponseConfig:
+    """APIレスポンスの送信設定の管理クラス"""
+
+    @staticmethod
+    def _get_int(name: str, default: int) -> int:
+        try:
+            return int(os.getenv(name, str(default)))
+        except ValueError:
+            return default
+
+    @staticmethod
+    def is_compression_enabled() -> bool:
+        """Accept-Encoding に gzip を含むリクエストへ圧縮して返すかどうか（デフォルト: 有効）"""
+        return os.getenv('RESPONSE_COMPRESSION', 'true').lower() in ('true', '1', 'yes', 'on')
+
+    @staticmethod
+    def get_compression_min_bytes() -> int:
+        """圧縮する最小サイズ（バイト、デフォルト: 1024、これ未満は圧縮しない）"""
+        return max(0, ResponseConfig._get_int('RESPONSE_COMPRESSION_MIN_BYTES', 1024))
+
+    @staticmethod
+    def get_compression_level() -> int:
+        """gzip の圧縮レベル（1-9、デフォルト: 5）"""
+        return min(9, max(1, ResponseConfig._get_int('RESPONSE_COMPRESSION_LEVEL', 5)))
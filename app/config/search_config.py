@@ -0,0 +1,41 @@
+import os
+
+
+class SearchConfig:
+    """キーワード検索設定の管理クラス"""
+
+    @staticmethod
+    def get_mode() -> str:
+        """キーワード検索の方式（デフォルト: auto）
+
+        auto: N-gramインデックスが有効なら利用し、未作成なら ILIKE のみで検索
+        ilike: 常に ILIKE のみで検索（インデックスを利用しない）
+        """
+        mode = os.getenv('KEYWORD_SEARCH_MODE', 'auto').lower()
+        return mode if mode in ('auto', 'ilike') else 'auto'
+
+    @staticmethod
+    def get_check_interval() -> float:
+        """N-gramインデックスの有効状態を再確認する間隔（秒、デフォルト: 60秒）"""
+        try:
+            return max(0.0, float(os.getenv('KEYWORD_SEARCH_CHECK_INTERVAL', '60')))
+        except ValueError:
+            return 60.0
+
+    @staticmethod
+    def get_default_count_mode() -> str:
+        """受信データ一覧の総件数の算出方式の既定値（COUNT_MODE、デフォルト: exact）
+
+        exact: 条件に合う全件を数える / estimate: 標本から推定（誤差の目安付き） /
+        none: 数えずに1件多く取得して次ページの有無のみ判定
+        """
+        mode = os.getenv('COUNT_MODE', 'exact').lower()
+        return mode if mode in ('exact', 'estimate', 'none') else 'exact'
+
+    @staticmethod
+    def get_count_estimate_sample_rows() -> int:
+        """件数推定で標本とする recepthead の行数の目安（デフォルト: 20000行、これ以下の規模なら全件を数える）"""
+        try:
+            return max(100, int(os.getenv('COUNT_ESTIMATE_SAMPLE_ROWS', '20000')))
+        except ValueError:
+            return 20000
@@ -0,0 +1,37 @@
+import os
+
+
+class SimilarityConfig:
+    """類似重複（MinHash/LSH）検出設定の管理クラス"""
+
+    @staticmethod
+    def _get_int(name: str, default: int) -> int:
+        try:
+            return int(os.getenv(name, str(default)))
+        except ValueError:
+            return default
+
+    @staticmethod
+    def get_num_perm() -> int:
+        """MinHash署名の長さ（ハッシュ関数の数、デフォルト: 64）"""
+        return max(8, SimilarityConfig._get_int('SIMILAR_NUM_PERM', 64))
+
+    @staticmethod
+    def get_shingle_size() -> int:
+        """文字シングルの長さ（デフォルト: 3文字）"""
+        return max(1, SimilarityConfig._get_int('SIMILAR_SHINGLE_SIZE', 3))
+
+    @staticmethod
+    def get_seed() -> int:
+        """ハッシュ関数生成の乱数シード（変更すると署名キャッシュは再計算される）"""
+        return SimilarityConfig._get_int('SIMILAR_SEED', 1)
+
+    @staticmethod
+    def get_batch_shingles() -> int:
+        """1バッチで署名を計算するシングル数の上限（メモリ使用量の目安: 値×署名長×8バイト）"""
+        return max(1000, SimilarityConfig._get_int('SIMILAR_BATCH_SHINGLES', 100000))
+
+    @staticmethod
+    def get_max_bucket_size() -> int:
+        """LSHバケット内で全ペアを比較する最大件数（超過時は代表との比較に縮退）"""
+        return max(2, SimilarityConfig._get_int('SIMILAR_MAX_BUCKET_SIZE', 50))
@@ -0,0 +1,54 @@
+import os
+
+
+class SlowQueryConfig:
+    """スロークエリログの設定の管理クラス"""
+
+    @staticmethod
+    def _get_int(name: str, default: int) -> int:
+        try:
+            return int(os.getenv(name, str(default)))
+        except ValueError:
+            return default
+
+    @staticmethod
+    def _get_float(name: str, default: float) -> float:
+        try:
+            return float(os.getenv(name, str(default)))
+        except ValueError:
+            return default
+
+    @staticmethod
+    def is_enabled() -> bool:
+        """しきい値を超えたクエリを記録するかどうか（デフォルト: 有効）"""
+        return os.getenv('SLOW_QUERY_LOG_ENABLED', 'true').lower() in ('true', '1', 'yes', 'on')
+
+    @staticmethod
+    def get_threshold_ms() -> float:
+        """記録するクエリの処理時間のしきい値（ミリ秒、デフォルト: 500）"""
+        return max(0.0, SlowQueryConfig._get_float('SLOW_QUERY_THRESHOLD_MS', 500.0))
+
+    @staticmethod
+    def get_explain_sample_rate() -> float:
+        """しきい値を超えたクエリのうち実行計画を取得する割合（0〜1、デフォルト: 0.1、0で取得しない）"""
+        return min(1.0, max(0.0, SlowQueryConfig._get_float('SLOW_QUERY_EXPLAIN_SAMPLE_RATE', 0.1)))
+
+    @staticmethod
+    def get_explain_interval() -> float:
+        """同じクエリの形の実行計画を再取得するまでの最短間隔（秒、デフォルト: 600）"""
+        return max(0.0, SlowQueryConfig._get_float('SLOW_QUERY_EXPLAIN_INTERVAL', 600.0))
+
+    @staticmethod
+    def get_explain_timeout_ms() -> int:
+        """実行計画の取得（EXPLAIN ANALYZE）の statement_timeout（ミリ秒、デフォルト: 60000）"""
+        return max(1, SlowQueryConfig._get_int('SLOW_QUERY_EXPLAIN_TIMEOUT_MS', 60000))
+
+    @staticmethod
+    def get_max_shapes() -> int:
+        """集計を保持するクエリの形の最大数（デフォルト: 500、超えると最も古く記録された形から破棄）"""
+        return max(1, SlowQueryConfig._get_int('SLOW_QUERY_MAX_SHAPES', 500))
+
+    @staticmethod
+    def get_log_file() -> str:
+        """ログファイル名（ログディレクトリ内、デフォルト: slow_query.log）"""
+        return os.getenv('SLOW_QUERY_LOG_FILE', 'slow_query.log')
@@ -0,0 +1,27 @@
+import os
+
+
+class SnapshotConfig:
+    """重複グループのスナップショット（オフライン全件走査の結果）設定の管理クラス"""
+
+    @staticmethod
+    def _get_int(name: str, default: int) -> int:
+        try:
+            return int(os.getenv(name, str(default)))
+        except ValueError:
+            return default
+
+    @staticmethod
+    def get_snapshot_path() -> str:
+        """スナップショットファイルのパス（scan.py の出力先・APIの読み込み元、デフォルト: snapshots/duplicates.arrow）"""
+        return os.getenv('DUPLICATE_SNAPSHOT_PATH', os.path.join('snapshots', 'duplicates.arrow'))
+
+    @staticmethod
+    def get_scan_workers() -> int:
+        """指紋計算・グループ化のワーカープロセス数（デフォルト: CPUコア数）"""
+        return max(1, SnapshotConfig._get_int('SCAN_WORKERS', os.cpu_count() or 1))
+
+    @staticmethod
+    def get_scan_batch_bytes() -> int:
+        """1回にワーカーへ渡す COPY 出力のサイズ（バイト、デフォルト: 4MB）"""
+        return max(65536, SnapshotConfig._get_int('SCAN_BATCH_BYTES', 4 * 1024 * 1024))
@@ -1,13 +1,464 @@
 import psycopg2
 from psycopg2.extras import RealDictCursor
+from psycopg2 import extensions
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+from collections import OrderedDict, deque
+import asyncio
+import contextvars
+import functools
+import hashlib
 import os
-from typing import Generator
+import queue
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Generator, Iterator, Optional, Tuple
 from dotenv import load_dotenv
+from config.database_config import DatabaseConfig
+from utils.metrics import metrics, format_metric
+from utils.slow_query_log import slow_query_log
 
 # 環境変数を読み込み
 load_dotenv()
 
+class PoolTimeoutError(Exception):
+    """プール枯渇時に接続待ちがタイムアウトした場合の例外"""
+    pass
+
+class CopyCancelledError(Exception):
+    """COPY の出力の受け取りが打ち切られた場合の例外（COPY を中断する）"""
+    pass
+
+class CopyOutBuffer:
+    """COPY ... TO STDOUT の書き込み先
+
+    copy_expert から渡される行を chunk_bytes 程度にまとめ、上限付きのキューへ渡す。
+    キューが一杯の間は書き込みを待たせ、受け取り側が打ち切った場合は CopyCancelledError で COPY を中断する。
+    """
+
+    def __init__(self, chunks: queue.Queue, cancelled: threading.Event, chunk_bytes: int):
+        self._chunks = chunks
+        self._cancelled = cancelled
+        self._chunk_bytes = chunk_bytes
+        self._parts = []
+        self._size = 0
+
+    def write(self, data: bytes):
+        self._parts.append(data)
+        self._size += len(data)
+        if self._size >= self._chunk_bytes:
+            self.flush()
+
+    def flush(self):
+        if self._parts:
+            self.put(b"".join(self._parts))
+            self._parts = []
+            self._size = 0
+
+    def put(self, item: Any):
+        while True:
+            if self._cancelled.is_set():
+                raise CopyCancelledError("COPY の受け取りが打ち切られました")
+            try:
+                self._chunks.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+class BlockingIterator:
+    """名前付きカーソルや COPY を読み出す同期イテレーターを、スレッドプール経由で順に読み出すラッパー
+
+    読み出しと終了処理はロックで直列化するため、切断で読み出しの待機がキャンセルされ、
+    ワーカースレッドで読み出しが続いている間でも、その完了後に確実に close する。
+    """
+
+    def __init__(self, manager: "DatabaseManager", iterator: Iterator[Any]):
+        self._manager = manager
+        self._iterator = iterator
+        self._lock = threading.Lock()
+
+    def _next(self) -> Any:
+        with self._lock:
+            return next(self._iterator, None)
+
+    def _close(self):
+        with self._lock:
+            close = getattr(self._iterator, "close", None)
+            if close is not None:
+                close()
+
+    async def next(self) -> Any:
+        """次の要素（終端では None）"""
+        return await self._manager.run_blocking(self._next)
+
+    async def aclose(self):
+        """イテレーターを閉じてカーソル・接続を解放
+
+        クライアント切断時は待機自体がキャンセルされるため、close は shield してワーカースレッドで
+        最後まで実行させ、キャンセルは無視する（呼び出し元の例外はそのまま伝播する）。
+        """
+        try:
+            await asyncio.shield(self._manager.run_blocking(self._close))
+        except asyncio.CancelledError:
+            pass
+
+class PreparedConnection(extensions.connection):
+    """準備済みステートメントの名前を接続ごとに保持する接続クラス（古い順、上限超過時に解放）"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements: "OrderedDict[str, None]" = OrderedDict()
+        # pg_prepared_statements から最後に取得した計画の作成回数（名前 → (汎用計画, 個別計画)）
+        self.plan_counts: Dict[str, Tuple[int, int]] = {}
+        self.plan_counts_polled_at = 0.0
+
+    def forget_statement(self, name: str):
+        """解放したステートメントの記録を削除"""
+        self.prepared_statements.pop(name, None)
+        self.plan_counts.pop(name, None)
+
+# psycopg2 形式のプレースホルダー（%s）とエスケープされた % を検出
+PLACEHOLDER_PATTERN = re.compile(r"%%|%s")
+
+# 接続ごとに汎用計画・個別計画の作成回数（pg_prepared_statements）を取得する最短間隔（秒）
+PLAN_COUNT_POLL_SECONDS = 5.0
+
+class PreparedStatementRegistry:
+    """クエリの形ごとの準備済みステートメントの管理と統計
+
+    検索系のクエリは有効なフィルター条件・並び順の組み合わせごとに SQL 文が決まり、値はパラメータで渡す。
+    SQL 文のハッシュを名前とし、接続ごとに初回のみ PREPARE、以降は EXECUTE で解析・書き換え
+    （と、PostgreSQL が汎用計画へ切り替えた後は実行計画の作成）を省く。
+    計画時間は形ごとに一度 EXPLAIN (SUMMARY) で測定し、汎用計画で実行した回数と合わせて削減量の目安とする。
+    plan_cache_mode=auto では最初の5回と、汎用計画の方が高コストと判断された形は毎回個別計画を作成するため、
+    汎用計画・個別計画の回数は pg_prepared_statements（PostgreSQL 14以降）から接続ごとに
+    PLAN_COUNT_POLL_SECONDS 秒おきに取得する（取得できない場合は再利用回数による上限値を示す）。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._shapes: Dict[str, Dict[str, Any]] = {}
+        self._unpreparable: Dict[str, str] = {}  # PREPARE できない形 → エラー内容（以降は通常実行）
+        self.plan_counts_available = True  # pg_prepared_statements に計画の作成回数の列があるか
+
+    @staticmethod
+    def statement_name(query: str) -> str:
+        """クエリの形（SQL 文）から準備済みステートメント名を生成"""
+        return "ps_" + hashlib.md5(query.encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def to_server_sql(query: str) -> Tuple[str, int]:
+        """%s を $1, $2, ... に置き換え、パラメータ数とともに返す"""
+        count = 0
+
+        def replace(match):
+            nonlocal count
+            if match.group(0) == "%%":
+                return "%"
+            count += 1
+            return f"${count}"
+
+        return PLACEHOLDER_PATTERN.sub(replace, query), count
+
+    def is_unpreparable(self, name: str) -> bool:
+        return name in self._unpreparable
+
+    def needs_planning_sample(self, name: str) -> bool:
+        with self._lock:
+            shape = self._shapes.get(name)
+            return shape is None or shape["planning_ms"] is None
+
+    def record_prepare(self, name: str, query: str, prepare_ms: float, planning_ms: Optional[float]):
+        with self._lock:
+            shape = self._shapes.setdefault(name, {
+                "query": " ".join(query.split())[:200],
+                "prepares": 0,
+                "executions": 0,
+                "reuses": 0,
+                "total_execute_ms": 0.0,
+                "prepare_ms": 0.0,
+                "planning_ms": None,
+                "generic_plans": 0,
+                "custom_plans": 0,
+            })
+            shape["prepares"] += 1
+            shape["prepare_ms"] += prepare_ms
+            if planning_ms is not None and shape["planning_ms"] is None:
+                shape["planning_ms"] = planning_ms
+
+    def record_execution(self, name: str, execute_ms: float, reused: bool):
+        with self._lock:
+            shape = self._shapes.get(name)
+            if shape is None:
+                return
+            shape["executions"] += 1
+            shape["total_execute_ms"] += execute_ms
+            if reused:
+                shape["reuses"] += 1
+
+    def record_plans(self, name: str, generic_plans: int, custom_plans: int):
+        with self._lock:
+            shape = self._shapes.get(name)
+            if shape is None:
+                return
+            shape["generic_plans"] += generic_plans
+            shape["custom_plans"] += custom_plans
+
+    def record_unpreparable(self, name: str, error: Exception):
+        with self._lock:
+            self._unpreparable[name] = str(error).strip()
+        print(f"準備済みステートメント作成エラー（通常の実行に切り替えます）: {error}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """形ごとの実行回数・再利用回数・計画の作成回数と、計画時間の削減量の目安
+
+        削減量は汎用計画で実行した回数×計画時間から PREPARE の所要時間を引いた値
+        （計画の作成回数を取得できない場合は、すべての再利用を汎用計画とみなした上限値）。
+        """
+        with self._lock:
+            plan_counts_available = self.plan_counts_available
+            shapes = []
+            for name, shape in self._shapes.items():
+                planning_ms = shape["planning_ms"] or 0.0
+                skipped_plans = shape["generic_plans"] if plan_counts_available else shape["reuses"]
+                shapes.append({
+                    "name": name,
+                    "query": shape["query"],
+                    "prepares": shape["prepares"],
+                    "executions": shape["executions"],
+                    "reuses": shape["reuses"],
+                    "generic_plans": shape["generic_plans"],
+                    "custom_plans": shape["custom_plans"],
+                    "planning_ms": round(planning_ms, 3),
+                    "avg_execute_ms": round(shape["total_execute_ms"] / shape["executions"], 3)
+                    if shape["executions"] else 0.0,
+                    "estimated_saved_ms": round(planning_ms * skipped_plans - shape["prepare_ms"], 3),
+                })
+            unpreparable = len(self._unpreparable)
+
+        shapes.sort(key=lambda item: item["executions"], reverse=True)
+        return {
+            "enabled": DatabaseConfig.is_prepared_statements_enabled(),
+            "plan_cache_mode": DatabaseConfig.get_plan_cache_mode() or "server default",
+            "shapes": len(shapes),
+            "unpreparable_shapes": unpreparable,
+            "executions": sum(item["executions"] for item in shapes),
+            "reuses": sum(item["reuses"] for item in shapes),
+            "generic_plans": sum(item["generic_plans"] for item in shapes),
+            "custom_plans": sum(item["custom_plans"] for item in shapes),
+            "estimated_saved_ms": round(sum(item["estimated_saved_ms"] for item in shapes), 3),
+            # generic_plans: 汎用計画の実行回数から算出、reuses_upper_bound: 再利用回数から算出した上限値
+            "estimate_basis": "generic_plans" if plan_counts_available else "reuses_upper_bound",
+            "top_shapes": shapes[:10],
+        }
+
+class ConnectionPool:
+    """スレッドセーフなPostgreSQL接続プール
+
+    - 最小/最大接続数
+    - アイドルタイムアウトによる余剰接続の破棄
+    - 貸出時のヘルスチェック
+    - 枯渇時はタイムアウト付きで返却を待機
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], extensions.connection],
+        min_size: int = 1,
+        max_size: int = 10,
+        idle_timeout: float = 300.0,
+        timeout: float = 30.0,
+        health_check: bool = True
+    ):
+        self._connect = connect
+        self.min_size = min(min_size, max_size)
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.health_check = health_check
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (connection, 返却時刻)
+        self._size = 0        # 生成済み（貸出中＋アイドル＋生成中）の接続数
+        self._closed = False
+
+        # 統計情報
+        self._stats = {
+            "connections_created": 0,
+            "connections_closed": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "health_check_failures": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
+
+    def open(self):
+        """最小接続数まで接続を確立"""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                conn = self._new_connection()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+
+    def getconn(self, timeout: Optional[float] = None) -> extensions.connection:
+        """接続を貸し出す（枯渇時は返却を待機）"""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        waited = False
+
+        while True:
+            conn = None
+            create = False
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolTimeoutError("接続プールはクローズされています")
+                    self._prune_idle_locked()
+                    if self._idle:
+                        conn, _ = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        create = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeoutError(
+                            f"接続プールが枯渇しています（最大{self.max_size}接続、{timeout}秒待機）"
+                        )
+                    if not waited:
+                        self._stats["waits"] += 1
+                        waited = True
+                    self._cond.wait(remaining)
+
+            if create:
+                try:
+                    conn = self._new_connection()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_healthy(conn):
+                with self._cond:
+                    self._stats["health_check_failures"] += 1
+                self._discard(conn)
+                continue
+
+            wait_seconds = time.monotonic() - started
+            with self._cond:
+                self._stats["checkouts"] += 1
+                if waited:
+                    self._stats["total_wait_seconds"] += wait_seconds
+                    self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], wait_seconds)
+            return conn
+
+    def putconn(self, conn: extensions.connection, discard: bool = False):
+        """接続をプールへ返却"""
+        if not discard and not conn.closed:
+            try:
+                # 読み取りクエリでも暗黙のトランザクションが開始されるため、状態をリセット
+                if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+
+        if discard or conn.closed or self._closed:
+            self._discard(conn)
+            return
+
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def close(self):
+        """全てのアイドル接続をクローズ"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def get_stats(self) -> Dict[str, float]:
+        """プール統計情報を取得"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+            })
+        stats["avg_wait_seconds"] = (
+            stats["total_wait_seconds"] / stats["waits"] if stats["waits"] else 0.0
+        )
+        return stats
+
+    def _new_connection(self) -> extensions.connection:
+        conn = self._connect()
+        with self._cond:
+            self._stats["connections_created"] += 1
+        return conn
+
+    def _discard(self, conn: extensions.connection):
+        try:
+            if not conn.closed:
+                conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._stats["connections_closed"] += 1
+            self._cond.notify()
+
+    def _prune_idle_locked(self):
+        """アイドルタイムアウトを超えた接続を破棄（最小接続数は維持）"""
+        if self.idle_timeout <= 0:
+            return
+        now = time.monotonic()
+        while self._idle and self._size > self.min_size:
+            conn, returned_at = self._idle[0]
+            if now - returned_at < self.idle_timeout:
+                break
+            self._idle.popleft()
+            self._size -= 1
+            self._stats["connections_closed"] += 1
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _is_healthy(self, conn: extensions.connection) -> bool:
+        if conn.closed:
+            return False
+        if not self.health_check:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
 class DatabaseManager:
     def __init__(self):
         self.host = os.getenv("DB_HOST", "192.168.225.91")
@@ -15,44 +466,303 @@ class DatabaseManager:
         self.user = os.getenv("DB_USER", "mcqc")
         self.password = os.getenv("DB_PASSWORD", "qc5143720")
         self.port = os.getenv("DB_PORT", "5432")
+        self.pool = ConnectionPool(
+            self._connect,
+            min_size=DatabaseConfig.get_pool_min_size(),
+            max_size=DatabaseConfig.get_pool_max_size(),
+            idle_timeout=DatabaseConfig.get_pool_idle_timeout(),
+            timeout=DatabaseConfig.get_pool_timeout(),
+            health_check=DatabaseConfig.is_health_check_enabled()
+        )
+        self.prepared = PreparedStatementRegistry()
+        self.executor_workers = DatabaseConfig.get_executor_workers()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _connect(self) -> extensions.connection:
+        """新規接続を確立"""
+        options = {}
+        plan_cache_mode = DatabaseConfig.get_plan_cache_mode()
+        if plan_cache_mode:
+            options["options"] = f"-c plan_cache_mode={plan_cache_mode}"
+        return psycopg2.connect(
+            host=self.host,
+            database=self.database,
+            user=self.user,
+            password=self.password,
+            port=self.port,
+            cursor_factory=RealDictCursor,
+            connection_factory=PreparedConnection,
+            **options
+        )
 
     @contextmanager
-    def get_connection(self) -> Generator[psycopg2.extensions.connection, None, None]:
-        """データベース接続のコンテキストマネージャー"""
-        conn = None
+    def get_connection(self) -> Generator[extensions.connection, None, None]:
+        """データベース接続のコンテキストマネージャー（プールから貸出）"""
+        with metrics.track_query("connect"):
+            conn = self.pool.getconn()
+        discard = False
         try:
-            conn = psycopg2.connect(
-                host=self.host,
-                database=self.database,
-                user=self.user,
-                password=self.password,
-                port=self.port,
-                cursor_factory=RealDictCursor
-            )
             yield conn
         except Exception as e:
-            if conn:
-                conn.rollback()
+            if not conn.closed:
+                try:
+                    conn.rollback()
+                except Exception:
+                    discard = True
+            if isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError)):
+                discard = True
             raise e
         finally:
-            if conn:
-                conn.close()
+            self.pool.putconn(conn, discard=discard)
 
     def execute_query(self, query: str, params: tuple = None):
         """クエリ実行"""
         with self.get_connection() as conn:
-            with conn.cursor() as cursor:
+            with metrics.track_query("query") as tracker, conn.cursor() as cursor:
+                started = time.perf_counter()
                 cursor.execute(query, params)
-                return cursor.fetchall()
+                rows = cursor.fetchall()
+                tracker.rows = len(rows)
+                slow_query_log.observe("query", query, params, time.perf_counter() - started, len(rows))
+                return rows
+
+    def execute_prepared(self, query: str, params: tuple = None):
+        """準備済みステートメントとしてクエリ実行（検索系の定型クエリ用）
+
+        同じ SQL 文（クエリの形）は接続ごとに初回のみ PREPARE し、以降は EXECUTE でパラメータのみ送る。
+        PREPARE できない形（パラメータの型を推定できない等）は通常の実行に切り替える。
+        """
+        if not DatabaseConfig.is_prepared_statements_enabled():
+            return self.execute_query(query, params)
+        name = PreparedStatementRegistry.statement_name(query)
+        if self.prepared.is_unpreparable(name):
+            return self.execute_query(query, params)
+
+        with self.get_connection() as conn:
+            with metrics.track_query("prepared") as tracker, conn.cursor() as cursor:
+                statements = conn.prepared_statements
+                reused = name in statements
+                if reused:
+                    statements.move_to_end(name)
+                else:
+                    server_sql, param_count = PreparedStatementRegistry.to_server_sql(query)
+                    try:
+                        started = time.perf_counter()
+                        cursor.execute(f"PREPARE {name} AS {server_sql}")
+                        prepare_ms = (time.perf_counter() - started) * 1000
+                    except psycopg2.Error as e:
+                        conn.rollback()
+                        self.prepared.record_unpreparable(name, e)
+                        started = time.perf_counter()
+                        cursor.execute(query, params)
+                        rows = cursor.fetchall()
+                        tracker.rows = len(rows)
+                        slow_query_log.observe("query", query, params, time.perf_counter() - started, len(rows))
+                        return rows
+                    # PREPARE したステートメントはロールバックしても接続に残るため、計画時間の測定より先に登録する
+                    statements[name] = None
+                    planning_ms = None
+                    if self.prepared.needs_planning_sample(name):
+                        try:
+                            cursor.execute(f"EXPLAIN (SUMMARY ON, FORMAT JSON) {query}", params)
+                            planning_ms = cursor.fetchone()["QUERY PLAN"][0]["Planning Time"]
+                        except psycopg2.Error as e:
+                            conn.rollback()
+                            print(f"準備済みステートメントの計画時間測定エラー: {e}")
+                    self.prepared.record_prepare(name, query, prepare_ms, planning_ms)
+                    if len(statements) > DatabaseConfig.get_prepared_statements_per_connection():
+                        # 解放する前に計画の作成回数を反映する
+                        self._collect_plan_counts(conn, cursor, force=True)
+                    while len(statements) > DatabaseConfig.get_prepared_statements_per_connection():
+                        oldest = next(iter(statements))
+                        conn.forget_statement(oldest)
+                        cursor.execute(f"DEALLOCATE {oldest}")
+
+                placeholders = ", ".join(["%s"] * len(params or ()))
+                started = time.perf_counter()
+                try:
+                    cursor.execute(f"EXECUTE {name}" + (f" ({placeholders})" if placeholders else ""), params)
+                    rows = cursor.fetchall()
+                except psycopg2.Error:
+                    # テーブル定義の変更などで使えなくなった場合に備え、次回は作り直す
+                    conn.forget_statement(name)
+                    conn.rollback()
+                    try:
+                        cursor.execute(f"DEALLOCATE {name}")
+                    except psycopg2.Error:
+                        conn.rollback()
+                    raise
+                elapsed = time.perf_counter() - started
+                self.prepared.record_execution(name, elapsed * 1000, reused)
+                tracker.rows = len(rows)
+                slow_query_log.observe("prepared", query, params, elapsed, len(rows))
+                self._collect_plan_counts(conn, cursor)
+                return rows
+
+    def _collect_plan_counts(self, conn: PreparedConnection, cursor, force: bool = False):
+        """接続の汎用計画・個別計画の作成回数を取得し、前回からの増分を統計に反映"""
+        if not self.prepared.plan_counts_available:
+            return
+        now = time.monotonic()
+        if not force and now - conn.plan_counts_polled_at < PLAN_COUNT_POLL_SECONDS:
+            return
+        conn.plan_counts_polled_at = now
+        try:
+            cursor.execute("SELECT name, generic_plans, custom_plans FROM pg_prepared_statements")
+            rows = cursor.fetchall()
+        except psycopg2.Error as e:
+            conn.rollback()
+            self.prepared.plan_counts_available = False
+            print(f"計画の作成回数を取得できません（削減量は上限値を表示します）: {e}")
+            return
+        for row in rows:
+            name = row['name']
+            if name not in conn.prepared_statements:
+                continue
+            previous_generic, previous_custom = conn.plan_counts.get(name, (0, 0))
+            conn.plan_counts[name] = (row['generic_plans'], row['custom_plans'])
+            self.prepared.record_plans(
+                name, row['generic_plans'] - previous_generic, row['custom_plans'] - previous_custom
+            )
+
+    def iter_query(
+        self,
+        query: str,
+        params: tuple = None,
+        name: str = "stream_cursor",
+        itersize: Optional[int] = None
+    ) -> Generator[dict, None, None]:
+        """サーバーサイド（名前付き）カーソルで結果を逐次取得
+
+        結果全体をクライアント側に保持せず、itersize 行ずつ取得しながら1行ずつ返す。
+        反復を途中で打ち切った場合もカーソルを閉じて接続をプールへ返却する。
+        """
+        with self.get_connection() as conn:
+            # 処理時間は受け取り側の処理を含む（段階は stream）
+            with metrics.track_query("stream") as tracker, conn.cursor(name=name) as cursor:
+                cursor.itersize = itersize or DatabaseConfig.get_stream_itersize()
+                cursor.execute(query, params)
+                tracker.rows = 0
+                for row in cursor:
+                    tracker.rows += 1
+                    yield row
+
+    def iter_copy(
+        self,
+        query: str,
+        params: tuple = None,
+        options: str = "FORMAT csv, HEADER",
+        chunk_bytes: int = 65536,
+        queue_chunks: int = 8
+    ) -> Generator[bytes, None, None]:
+        """COPY (query) TO STDOUT の出力をチャンク単位で逐次返す
+
+        copy_expert は出力をすべて書き終えるまで戻らないため専用スレッドで実行し、上限付きのキューで
+        受け渡す（受け取りが遅い場合は COPY の読み出しも待たされるため、メモリは queue_chunks 分で一定）。
+        反復を途中で打ち切った場合は COPY を中断して接続をプールへ返却する。
+        """
+        chunks: queue.Queue = queue.Queue(maxsize=queue_chunks)
+        cancelled = threading.Event()
+        buffer = CopyOutBuffer(chunks, cancelled, chunk_bytes)
+        # 取り消し対象の接続（プールへ返却する前に外し、返却後の接続を取り消さないようにする）
+        active = {}
+        active_lock = threading.Lock()
+
+        def produce():
+            try:
+                with self.get_connection() as conn:
+                    with active_lock:
+                        active["conn"] = conn
+                    try:
+                        with metrics.track_query("copy") as tracker, conn.cursor() as cursor:
+                            # COPY はパラメータを受け付けないため、クライアント側で値を埋め込む
+                            sql = cursor.mogrify(query, params)
+                            cursor.copy_expert(b"COPY (" + sql + f") TO STDOUT WITH ({options})".encode(), buffer)
+                            tracker.rows = cursor.rowcount
+                    finally:
+                        with active_lock:
+                            active.pop("conn", None)
+                buffer.flush()
+                buffer.put(None)
+            except CopyCancelledError:
+                pass
+            except Exception as e:
+                try:
+                    buffer.put(e)
+                except CopyCancelledError:
+                    pass
+
+        # 呼び出し元のエンドポイントをメトリクスのラベルに引き継ぐ
+        producer = threading.Thread(
+            target=contextvars.copy_context().run, args=(produce,), name="copy-export", daemon=True
+        )
+        producer.start()
+        try:
+            while True:
+                item = chunks.get()
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            cancelled.set()
+            # サーバー側で出力を続けないよう、実行中の COPY を取り消す
+            with active_lock:
+                conn = active.get("conn")
+                if conn is not None:
+                    try:
+                        conn.cancel()
+                    except Exception:
+                        pass
 
     def execute_update(self, query: str, params: tuple = None) -> int:
         """更新クエリ実行"""
         with self.get_connection() as conn:
-            with conn.cursor() as cursor:
+            with metrics.track_query("update") as tracker, conn.cursor() as cursor:
+                started = time.perf_counter()
                 cursor.execute(query, params)
                 conn.commit()
+                tracker.rows = cursor.rowcount
+                slow_query_log.observe("update", query, params, time.perf_counter() - started, cursor.rowcount)
                 return cursor.rowcount
 
+    def execute_returning(self, query: str, params: tuple = None) -> Optional[dict]:
+        """更新を伴うクエリを実行して先頭行を返す（RETURNINGや書き込みCTEの集計結果用）"""
+        with self.get_connection() as conn:
+            with metrics.track_query("returning") as tracker, conn.cursor() as cursor:
+                started = time.perf_counter()
+                cursor.execute(query, params)
+                row = cursor.fetchone()
+                conn.commit()
+                tracker.rows = cursor.rowcount
+                slow_query_log.observe("returning", query, params, time.perf_counter() - started, cursor.rowcount)
+                return row
+
+    def explain_query(
+        self,
+        query: str,
+        params: tuple = None,
+        analyze: bool = True,
+        timeout_ms: Optional[int] = None
+    ) -> list:
+        """クエリの実行計画（EXPLAIN (FORMAT JSON) の結果）
+
+        analyze の場合は EXPLAIN (ANALYZE, BUFFERS) でクエリを実際に実行する。
+        トランザクションは常にロールバックし、timeout_ms を statement_timeout として設定する。
+        """
+        options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+        with self.get_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    if timeout_ms:
+                        cursor.execute("SET LOCAL statement_timeout = %s", (int(timeout_ms),))
+                    cursor.execute(f"EXPLAIN ({options}) {query}", params)
+                    return cursor.fetchone()["QUERY PLAN"]
+            finally:
+                conn.rollback()
+
     def test_connection(self) -> bool:
         """データベース接続テスト"""
         try:
@@ -64,5 +774,74 @@ class DatabaseManager:
             print(f"データベース接続エラー: {e}")
             return False
 
+    def get_executor(self) -> ThreadPoolExecutor:
+        """DBアクセス専用のスレッドプールを取得（遅延生成）"""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.executor_workers,
+                        thread_name_prefix="db-worker"
+                    )
+        return self._executor
+
+    async def run_blocking(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """ブロッキングなDB処理をスレッドプールへ退避して実行
+
+        イベントループを止めずに、同一ワーカー内の並行リクエストがDB待ちを重ねられるようにする。
+        ワーカー数は接続プールの最大接続数に合わせて上限を設ける。
+        呼び出し元のコンテキスト（メトリクスのエンドポイントなど）を引き継いで実行する。
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self.get_executor(), functools.partial(context.run, func, *args, **kwargs)
+        )
+
+    def blocking_iterator(self, iterator: Iterator[Any]) -> BlockingIterator:
+        """同期イテレーターを run_blocking で読み出すラッパー（ストリーミング応答用）"""
+        return BlockingIterator(self, iterator)
+
+    def open_pool(self):
+        """最小接続数までプールを初期化"""
+        self.pool.open()
+
+    def close_pool(self):
+        """プールの接続をすべてクローズ"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.pool.close()
+
+    def get_pool_stats(self) -> Dict[str, float]:
+        """接続プールの統計情報"""
+        return self.pool.get_stats()
+
+    def get_prepared_stats(self) -> Dict[str, Any]:
+        """準備済みステートメントの統計情報"""
+        return self.prepared.get_stats()
+
+    def collect_pool_metrics(self) -> list:
+        """接続プールの状態（/metrics の出力用）"""
+        stats = self.pool.get_stats()
+        lines = format_metric("db_pool_connections", "接続プールの接続数", "gauge", {
+            (("state", "in_use"),): stats["in_use"],
+            (("state", "idle"),): stats["idle"],
+        })
+        lines += format_metric("db_pool_max_connections", "接続プールの最大接続数", "gauge", {(): stats["max_size"]})
+        for key, name, documentation in (
+            ("checkouts", "db_pool_checkouts_total", "接続の貸出回数"),
+            ("waits", "db_pool_waits_total", "接続の返却を待った回数"),
+            ("timeouts", "db_pool_timeouts_total", "接続待ちのタイムアウト回数"),
+            ("health_check_failures", "db_pool_health_check_failures_total", "ヘルスチェックで破棄した接続数"),
+            ("connections_created", "db_pool_connections_created_total", "確立した接続数"),
+            ("connections_closed", "db_pool_connections_closed_total", "クローズした接続数"),
+            ("total_wait_seconds", "db_pool_wait_seconds_total", "接続の返却を待った合計秒数"),
+        ):
+            lines += format_metric(name, documentation, "counter", {(): stats[key]})
+        return lines
+
 # シングルトンインスタンス
-db_manager = DatabaseManager()
\ No newline at end of file
+db_manager = DatabaseManager()
+metrics.add_collector(db_manager.collect_pool_metrics)
+slow_query_log.set_explainer(db_manager.explain_query)
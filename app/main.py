@@ -1,15 +1,19 @@
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 import sys
 import os
 sys.path.append(os.path.dirname(__file__))
 
-from api import reception_data, duplicates, operations
+from api import reception_data, duplicates, operations, jobs, export, snapshots, admin
 from database import db_manager
+from utils.result_cache import result_cache
+from utils.metrics import metrics, MetricsMiddleware, CONTENT_TYPE
 from utils.operation_logger import OperationLogger
+from utils.slow_query_log import slow_query_log
+from services.job_service import JobService
 import os
 from dotenv import load_dotenv
 
@@ -32,6 +36,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# エンドポイント別の処理時間の計測（/metrics で出力）
+app.add_middleware(MetricsMiddleware)
+
 # 静的ファイル設定
 static_dir = os.path.join(os.path.dirname(__file__), "static")
 app.mount("/static", StaticFiles(directory=static_dir), name="static")
@@ -44,6 +51,10 @@ templates = Jinja2Templates(directory=templates_dir)
 app.include_router(reception_data.router, prefix="/api", tags=["データ取得"])
 app.include_router(duplicates.router, prefix="/api", tags=["重複検出"])
 app.include_router(operations.router, prefix="/api", tags=["操作"])
+app.include_router(jobs.router, prefix="/api", tags=["ジョブ"])
+app.include_router(export.router, prefix="/api", tags=["エクスポート"])
+app.include_router(snapshots.router, prefix="/api", tags=["スナップショット"])
+app.include_router(admin.router, prefix="/api", tags=["管理"])
 
 @app.get("/", response_class=HTMLResponse)
 async def read_root(request: Request):
@@ -66,9 +77,17 @@ async def health_check():
     db_status = db_manager.test_connection()
     return {
         "status": "healthy" if db_status else "unhealthy",
-        "database": "connected" if db_status else "disconnected"
+        "database": "connected" if db_status else "disconnected",
+        "pool": db_manager.get_pool_stats(),
+        "prepared_statements": db_manager.get_prepared_stats(),
+        "result_cache": result_cache.get_stats()
     }
 
+@app.get("/metrics")
+async def get_metrics():
+    """メトリクス（Prometheus のテキスト形式）"""
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
+
 @app.on_event("startup")
 async def startup_event():
     """アプリケーション起動時の処理"""
@@ -81,12 +100,26 @@ async def startup_event():
     except Exception as e:
         print(f"NG ログシステム初期化失敗: {e}")
     
+    # 接続プール初期化
+    try:
+        db_manager.open_pool()
+        print("OK 接続プール初期化成功")
+    except Exception as e:
+        print(f"NG 接続プール初期化失敗: {e}")
+    
     # データベース接続テスト
     if db_manager.test_connection():
         print("OK データベース接続成功")
     else:
         print("NG データベース接続失敗")
     
+    # バックグラウンドジョブ初期化
+    try:
+        JobService.start()
+        print("OK ジョブキュー初期化成功")
+    except Exception as e:
+        print(f"NG ジョブキュー初期化失敗: {e}")
+    
     print(f"アプリケーションが起動しました")
     print(f"URL: http://{os.getenv('APP_HOST', '0.0.0.0')}:{os.getenv('APP_PORT', '8000')}")
 
@@ -94,6 +127,9 @@ async def startup_event():
 async def shutdown_event():
     """アプリケーション終了時の処理"""
     print("アプリケーションを終了しています...")
+    JobService.shutdown()
+    slow_query_log.shutdown()
+    db_manager.close_pool()
 
 if __name__ == "__main__":
     import uvicorn
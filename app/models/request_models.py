@@ -19,5 +19,21 @@ class DeleteRequest(BaseModel):
     delete_scope: str = "selected"  # "selected" or "filtered"
     filter_conditions: Optional[FilterRequest] = None
 
+class BulkDeleteRequest(BaseModel):
+    filter_conditions: FilterRequest
+    chunk_size: Optional[int] = None       # 1チャンクの行数（省略時は BULK_CHUNK_SIZE）
+    resume_after_id: Optional[int] = None  # 前回の last_id（中断した処理の再開用）
+
 class RestoreRequest(BaseModel):
-    target_ids: List[int]  # 復元対象ID一覧
\ No newline at end of file
+    target_ids: List[int]  # 復元対象ID一覧
+    restore_scope: str = "selected"  # "selected" or "filtered"
+    filter_conditions: Optional[FilterRequest] = None
+
+class DuplicateScanRequest(BaseModel):
+    duplicate_type: str  # exact / content / status / similar
+    filter_conditions: Optional[FilterRequest] = None
+    sort_by: Optional[str] = None
+    sort_order: Optional[str] = None
+    similarity_threshold: float = 0.8
+    min_group_size: int = 2
+    group_order: str = "first_id"  # first_id / size
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Dict, List, Literal, Optional
 from datetime import datetime
 
 class ReceptionDataRecord(BaseModel):
@@ -30,6 +30,9 @@ class ReceptionDataResponse(BaseModel):
     limit: int
     has_more: bool
     statistics: Optional["StatisticsResponse"] = None
+    next_cursor: Optional[str] = None  # キーセット方式の継続トークン
+    count_mode: str = "exact"          # total の算出方式（exact/estimate/none）
+    total_error: Optional[int] = None  # estimate の場合の誤差の目安（95%信頼区間の幅の半分）
 
 class DuplicateGroup(BaseModel):
     group_id: str
@@ -41,6 +44,52 @@ class DuplicatesResponse(BaseModel):
     duplicates: List[DuplicateGroup]
     total_groups: int
     total_duplicates: int
+    group_offset: int = 0
+    group_limit: Optional[int] = None
+    has_more: bool = False
+
+class CompactDuplicateGroup(BaseModel):
+    """重複グループのコンパクト形式（format=compact、utils.compact_format.compact_group）"""
+    group_id: str
+    duplicate_count: int
+    duplicate_key: Optional[str] = None  # shared から復元できる場合（exact/content/status）は省略
+    shared: Dict[str, Any]               # グループ内で全レコードが同じ値の項目
+    columns: List[str]                   # rows の各値に対応する項目
+    rows: List[List[Any]]
+
+class CompactDuplicatesResponse(BaseModel):
+    format: Literal["compact"] = "compact"
+    duplicates: List[CompactDuplicateGroup]
+    total_groups: int
+    total_duplicates: int
+    group_offset: int = 0
+    group_limit: Optional[int] = None
+    has_more: bool = False
+
+class DuplicateSnapshotResponse(BaseModel):
+    path: str
+    file_bytes: int
+    format_version: int
+    created_at: datetime             # 走査の完了日時（UTC）
+    since: Optional[datetime] = None # 走査対象の受付日時の下限
+    scanned_rows: int
+    scanned_bytes: int
+    workers: int
+    types: Dict[str, dict]           # 重複タイプごとのグループ数（groups）・レコード数（rows）
+
+class DuplicateGroupSummary(BaseModel):
+    group_id: str
+    first_id: int           # グループ内の最小ID（メンバー取得APIのキー）
+    duplicate_count: int
+    duplicate_key: str
+
+class DuplicateGroupsResponse(BaseModel):
+    groups: List[DuplicateGroupSummary]
+    total_groups: int
+    total_duplicates: int
+    group_offset: int
+    group_limit: int
+    has_more: bool
 
 class DeleteResponse(BaseModel):
     success: bool
@@ -48,6 +97,22 @@ class DeleteResponse(BaseModel):
     failed_ids: List[int]
     timestamp: datetime
 
+class BulkDeleteResponse(BaseModel):
+    success: bool
+    completed: bool                  # 対象をすべて削除できたか（ロック中で残った行がない）
+    cancelled: bool = False          # キャンセルにより途中で終了した
+    deleted_count: int
+    target_count: int                # 開始時点の削除対象件数
+    remaining_count: int             # 走査範囲で未削除のまま残った件数
+    chunks: int
+    passes: int                      # 走査回数（ロック中で飛ばした行の再走査を含む）
+    first_id: Optional[int] = None
+    last_id: Optional[int] = None    # 走査済みの最大ID（resume_after_id に指定して再開）
+    elapsed_seconds: float
+    rows_per_second: float
+    error: Optional[str] = None
+    timestamp: datetime
+
 class MetadataResponse(BaseModel):
     progress_options: List[str]
     system_type_options: List[str]
@@ -60,8 +125,67 @@ class RestoreResponse(BaseModel):
     failed_ids: List[int]
     timestamp: datetime
 
+class JobResponse(BaseModel):
+    job_id: str
+    job_type: str
+    status: str                      # queued / running / succeeded / failed / cancelled / interrupted
+    params: dict
+    progress: Optional[dict] = None
+    error: Optional[str] = None
+    cancel_requested: bool = False
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    owner_host: Optional[str] = None       # ジョブを受け付けたプロセスのホスト名
+    owner_pid: Optional[int] = None        # 〃 プロセスID
+    heartbeat_at: Optional[datetime] = None  # 所有プロセスの最終生存時刻
+
+class JobResultResponse(BaseModel):
+    job_id: str
+    status: str
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+class JobResultItemsResponse(BaseModel):
+    job_id: str
+    status: str
+    offset: int
+    limit: int
+    total_items: int                 # 保存した結果の件数
+    items: List[dict]
+
 class ErrorResponse(BaseModel):
     error: bool = True
     error_code: str
     message: str
-    details: Optional[dict] = None
\ No newline at end of file
+    details: Optional[dict] = None
+
+class SlowQueryShape(BaseModel):
+    shape_id: str
+    operation: str                   # query / prepared / update / returning
+    query: str                       # リテラル・パラメータを ? に置き換えたSQL
+    count: int
+    total_ms: float
+    avg_ms: float
+    max_ms: float
+    last_ms: float
+    max_rows: Optional[int] = None
+    first_seen: datetime
+    last_seen: datetime
+    endpoints: Dict[str, int]
+    plan_summary: Optional[dict] = None
+    explained_at: Optional[datetime] = None
+    explain_error: Optional[str] = None
+
+class SlowQueryDetail(SlowQueryShape):
+    recent: List[dict]
+    plan: Optional[list] = None
+
+class SlowQueriesResponse(BaseModel):
+    enabled: bool
+    threshold_ms: Optional[float] = None
+    explain_sample_rate: float
+    recorded: int
+    explains: int
+    shape_count: int
+    shapes: List[SlowQueryShape]
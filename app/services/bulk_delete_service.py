@@ -0,0 +1,224 @@
+from datetime import datetime
+from typing import Callable, Dict, Optional
+import time
+from psycopg2 import errors
+from models.request_models import FilterRequest
+from services.data_service import DataService
+from services.result_cache_service import ResultCacheService
+from database import db_manager
+from config.bulk_operation_config import BulkOperationConfig
+from utils.operation_logger import OperationLogger
+from utils.metrics import metrics
+
+# ロック競合として同じチャンクを再試行する例外
+RETRYABLE_ERRORS = (errors.LockNotAvailable, errors.DeadlockDetected, errors.SerializationFailure)
+
+class BulkDeleteService:
+    """フィルター条件に合致するデータのチャンク単位の論理削除
+
+    - extentid の昇順にキーセットで走査し、チャンクごとにコミットする（長時間のロック保持を避ける）
+    - 他のトランザクションがロック中の行は FOR UPDATE SKIP LOCKED で飛ばし、走査後に再試行する
+    - ロック競合のエラーは同じチャンクを待機時間を倍増させながら再試行する
+    - 途中で失敗しても処理済みのチャンクはコミット済みで、last_id から再開できる
+    """
+
+    @staticmethod
+    def build_target_query(filters: FilterRequest) -> tuple:
+        """未削除の対象行を extentid の範囲で絞り込むサブクエリ（範囲の下限は2回、上限は2回バインドする）"""
+        id_query, filter_params = DataService.build_filtered_id_query(filters)
+        target_query = f"""
+        {id_query}
+        AND recepthead.receptmoddt IS NULL
+        AND (%s::integer IS NULL OR recepthead.extentid > %s)
+        AND (%s::integer IS NULL OR recepthead.extentid <= %s)
+        """
+        return target_query, filter_params
+
+    @staticmethod
+    def count_targets(filters: FilterRequest, after_id: Optional[int] = None, until_id: Optional[int] = None) -> int:
+        """削除対象（未削除）の件数"""
+        target_query, filter_params = BulkDeleteService.build_target_query(filters)
+        query = f"SELECT COUNT(DISTINCT extentid) AS target_count FROM ({target_query}) AS targets"
+        params = filter_params + [after_id, after_id, until_id, until_id]
+        return db_manager.execute_query(query, tuple(params))[0]['target_count']
+
+    @staticmethod
+    @metrics.instrumented
+    def delete_in_chunks(
+        filters: FilterRequest,
+        chunk_size: Optional[int] = None,
+        resume_after_id: Optional[int] = None,
+        progress_callback: Optional[Callable[[Dict], None]] = None,
+        should_stop: Optional[Callable[[], bool]] = None
+    ) -> Dict:
+        """チャンク単位で論理削除を実行し、件数・スループット・再開位置を返す
+
+        Args:
+            filters: 削除対象のフィルター条件
+            chunk_size: 1チャンクの行数（省略時は BULK_CHUNK_SIZE）
+            resume_after_id: 前回の last_id。この extentid より大きい行から再開する
+            progress_callback: チャンクのコミットごとに進捗（辞書）を受け取る関数
+            should_stop: Trueを返すと次のチャンクに進まずに終了する（キャンセル用）
+
+        Returns:
+            deleted_count, target_count, remaining_count, chunks, passes, last_id,
+            elapsed_seconds, rows_per_second, completed, cancelled, success, error
+        """
+        chunk_size = max(1, chunk_size) if chunk_size else BulkOperationConfig.get_chunk_size()
+        max_retries = BulkOperationConfig.get_max_retries()
+        retry_delay = BulkOperationConfig.get_retry_delay()
+        lock_timeout_ms = BulkOperationConfig.get_lock_timeout_ms()
+
+        target_query, filter_params = BulkDeleteService.build_target_query(filters)
+        chunk_query = f"""
+        WITH batch AS (
+            SELECT extentid
+            FROM recepthead
+            WHERE extentid IN ({target_query})
+            AND receptmoddt IS NULL
+            ORDER BY extentid
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        ),
+        deleted AS (
+            UPDATE recepthead
+            SET receptmoddt = CURRENT_TIMESTAMP AT TIME ZONE 'Asia/Tokyo'
+            FROM batch
+            WHERE recepthead.extentid = batch.extentid
+            RETURNING recepthead.extentid
+        )
+        SELECT
+            COUNT(*) AS deleted_count,
+            MIN(extentid) AS first_id,
+            MAX(extentid) AS last_id,
+            (SELECT COUNT(*) FROM batch) AS batch_size,
+            (SELECT MAX(extentid) FROM batch) AS scanned_to
+        FROM deleted
+        """
+
+        operation_logger = OperationLogger.get_logger()
+        filter_description = DataService.describe_filters(filters)
+        started = time.perf_counter()
+        progress = {
+            "deleted_count": 0,
+            "target_count": 0,
+            "remaining_count": 0,
+            "chunks": 0,
+            "passes": 0,
+            "first_id": None,
+            "last_id": resume_after_id,
+            "elapsed_seconds": 0.0,
+            "rows_per_second": 0.0,
+            "completed": False,
+            "cancelled": False,
+            "success": True,
+            "error": None,
+        }
+
+        def update_elapsed():
+            elapsed = time.perf_counter() - started
+            progress["elapsed_seconds"] = round(elapsed, 3)
+            progress["rows_per_second"] = round(progress["deleted_count"] / elapsed, 1) if elapsed > 0 else 0.0
+
+        try:
+            progress["target_count"] = BulkDeleteService.count_targets(filters, after_id=resume_after_id)
+            progress["remaining_count"] = progress["target_count"]
+
+            with db_manager.get_connection() as conn:
+                # 1回目の走査でロック中のため飛ばした行は、再走査（最大 max_retries 回）で削除する
+                for pass_no in range(max_retries + 1):
+                    if pass_no > 0:
+                        time.sleep(retry_delay * (2 ** (pass_no - 1)))
+                    progress["passes"] = pass_no + 1
+                    cursor_id = resume_after_id
+
+                    while True:
+                        if should_stop and should_stop():
+                            progress["cancelled"] = True
+                            break
+                        params = tuple(filter_params + [cursor_id, cursor_id, None, None, chunk_size])
+                        chunk_started = time.perf_counter()
+                        result = BulkDeleteService._execute_chunk(
+                            conn, chunk_query, params, lock_timeout_ms, max_retries, retry_delay
+                        )
+                        if not result['batch_size']:
+                            break
+
+                        cursor_id = result['scanned_to']
+                        progress["chunks"] += 1
+                        progress["deleted_count"] += result['deleted_count']
+                        if progress["first_id"] is None or result['first_id'] < progress["first_id"]:
+                            progress["first_id"] = result['first_id']
+                        if pass_no == 0:
+                            progress["last_id"] = cursor_id
+                        progress["remaining_count"] = max(0, progress["target_count"] - progress["deleted_count"])
+                        update_elapsed()
+
+                        operation_logger.log_delete_chunk(
+                            progress["chunks"],
+                            result['deleted_count'],
+                            result['first_id'],
+                            result['last_id'],
+                            round(time.perf_counter() - chunk_started, 3)
+                        )
+                        if result['deleted_count']:
+                            ResultCacheService.invalidate_filtered(filters, result['first_id'], result['last_id'])
+                        if progress_callback:
+                            progress_callback(dict(progress))
+
+                        if result['batch_size'] < chunk_size:
+                            break
+
+                    if progress["cancelled"]:
+                        break
+
+                    # 走査範囲に残った未削除の行（ロック中で飛ばした行）を確認
+                    progress["remaining_count"] = BulkDeleteService.count_targets(
+                        filters, after_id=resume_after_id, until_id=progress["last_id"]
+                    )
+                    if progress["remaining_count"] == 0:
+                        break
+
+            progress["completed"] = not progress["cancelled"] and progress["remaining_count"] == 0
+            update_elapsed()
+            operation_logger.log_filtered_delete_operation(
+                filter_description,
+                True,
+                matched_count=progress["target_count"],
+                deleted_count=progress["deleted_count"],
+                first_id=progress["first_id"],
+                last_id=progress["last_id"]
+            )
+        except Exception as e:
+            print(f"一括削除エラー: {e}")
+            update_elapsed()
+            progress["success"] = False
+            progress["error"] = str(e)
+            operation_logger.log_filtered_delete_operation(
+                filter_description,
+                False,
+                error=f"{e} (resume after extentid {progress['last_id']}, {progress['deleted_count']} records deleted)"
+            )
+
+        progress["timestamp"] = datetime.now()
+        return progress
+
+    @staticmethod
+    def _execute_chunk(conn, chunk_query: str, params: tuple, lock_timeout_ms: int,
+                       max_retries: int, retry_delay: float) -> dict:
+        """1チャンクを独立したトランザクションで実行（ロック競合時は待機して再試行）"""
+        for attempt in range(max_retries + 1):
+            try:
+                with conn.cursor() as cursor:
+                    if lock_timeout_ms:
+                        cursor.execute("SET LOCAL lock_timeout = %s", (f"{lock_timeout_ms}ms",))
+                    cursor.execute(chunk_query, params)
+                    result = cursor.fetchone()
+                conn.commit()
+                return result
+            except RETRYABLE_ERRORS as e:
+                conn.rollback()
+                if attempt >= max_retries:
+                    raise
+                print(f"一括削除のロック競合（再試行 {attempt + 1}/{max_retries}）: {e}")
+                time.sleep(retry_delay * (2 ** attempt))
@@ -1,32 +1,67 @@
+from datetime import datetime
 from typing import List, Optional, Tuple
+import math
 from models.response_models import ReceptionDataRecord
 from models.request_models import FilterRequest
 from database import db_manager
+from config.search_config import SearchConfig
+from services.keyword_search_service import KeywordSearchService
+from services.query_builder import QueryBuilder
+from utils.cursor import decode_cursor, encode_cursor
+from utils.result_cache import result_cache, normalize_sort
+from utils.metrics import metrics
+
+# データ行の列定義
+RECEPTION_SELECT_COLUMNS = """
+            recepthead.extentid AS id,
+            receptbody.rdata AS content,
+            COALESCE(execbody.execstate, '') AS status,
+            COALESCE(execbody.execresult, '') AS result,
+            COALESCE(execbody.execinfo, '') AS report,
+            cond_item.itemname AS progress,
+            stype_item.itemname AS system_type,
+            prod_item.itemname AS product,
+            recepthead.receptmoddt AT TIME ZONE 'Asia/Tokyo' AS reception_moddt,
+            recepthead.calldt AT TIME ZONE 'Asia/Tokyo' AS reception_datetime,
+            COALESCE(receptbody.moddt, recepthead.calldt) AT TIME ZONE 'Asia/Tokyo' AS update_datetime
+"""
+
+# キーセットページング用に付加するソートキー列の接頭辞
+SORT_KEY_PREFIX = 'sort_key_'
+
+# 件数推定の誤差に用いる95%信頼区間の係数
+COUNT_ESTIMATE_Z = 1.96
 
 class DataService:
     @staticmethod
-    def build_filter_conditions(filters: FilterRequest) -> Tuple[str, list]:
-        """フィルター条件を構築"""
+    def build_filter_conditions(filters: FilterRequest, apply_deleted_filter: bool = True) -> Tuple[str, list]:
+        """フィルター条件を構築
+
+        apply_deleted_filter=False の場合は削除状態の条件を付与しない（統計の条件付き集計用）
+        """
         conditions = []
         params = []
 
-        # 新しい分離型キーワード検索
+        # 新しい分離型キーワード検索（部分一致、バイグラムインデックスがあれば利用）
         if filters.content_keyword:
-            conditions.append("receptbody.rdata ILIKE %s")
-            params.append(f"%{filters.content_keyword}%")
+            condition, condition_params = KeywordSearchService.build_condition("content", filters.content_keyword)
+            conditions.append(condition)
+            params.extend(condition_params)
 
         if filters.status_keyword:
-            conditions.append("COALESCE(execbody.execstate, '') ILIKE %s")
-            params.append(f"%{filters.status_keyword}%")
+            condition, condition_params = KeywordSearchService.build_condition("status", filters.status_keyword)
+            conditions.append(condition)
+            params.extend(condition_params)
 
         # 後方互換性：既存keywordが使用されている場合
         if filters.keyword and not filters.content_keyword and not filters.status_keyword:
-            conditions.append("""
-                (receptbody.rdata ILIKE %s
-                 OR COALESCE(execbody.execstate, '') ILIKE %s)
+            content_condition, content_params = KeywordSearchService.build_condition("content", filters.keyword)
+            status_condition, status_params = KeywordSearchService.build_condition("status", filters.keyword)
+            conditions.append(f"""
+                ({content_condition}
+                 OR {status_condition})
             """)
-            keyword_param = f"%{filters.keyword}%"
-            params.extend([keyword_param, keyword_param])
+            params.extend(content_params + status_params)
 
         if filters.progress:
             conditions.append("cond_item.itemname = %s")
@@ -50,7 +85,7 @@ class DataService:
             params.extend([filters.date_from, filters.date_to])
 
         # 削除済みデータ制御
-        if not filters.include_deleted:
+        if apply_deleted_filter and not filters.include_deleted:
             conditions.append("recepthead.receptmoddt IS NULL")
 
         where_clause = ""
@@ -60,8 +95,28 @@ class DataService:
         return where_clause, params
 
     @staticmethod
-    def build_order_by_clause(sort_by: str, sort_order: str) -> str:
-        """ORDER BY句を構築（複数列ソート対応）"""
+    def build_filtered_id_query(filters: FilterRequest, apply_deleted_filter: bool = True) -> Tuple[str, list]:
+        """フィルター条件に合致するextentidを返すサブクエリを構築（一括更新のIN句用）"""
+        filter_where, filter_params = DataService.build_filter_conditions(filters, apply_deleted_filter)
+        id_query = f"""
+        SELECT recepthead.extentid
+        {QueryBuilder.build_from_clause(filter_where)}
+        {filter_where}
+        """
+        return id_query, filter_params
+
+    @staticmethod
+    def describe_filters(filters: FilterRequest) -> dict:
+        """操作ログ用に指定されたフィルター条件のみを取り出す"""
+        return {
+            key: value.isoformat() if isinstance(value, datetime) else value
+            for key, value in filters
+            if value not in (None, "", False)
+        }
+
+    @staticmethod
+    def build_sort_spec(sort_by: str, sort_order: str) -> List[Tuple[str, str, str]]:
+        """ソート指定を (列ID, SQL式, 方向) のリストへ変換（複数列ソート対応）"""
         # カラム名のマッピング（SQLインジェクション対策）
         column_map = {
             "id": "recepthead.extentid",
@@ -78,160 +133,464 @@ class DataService:
         sort_columns = sort_by.split(',') if ',' in sort_by else [sort_by]
         sort_orders = sort_order.split(',') if ',' in sort_order else [sort_order]
         
-        order_by_parts = []
+        sort_spec = []
         for i, column in enumerate(sort_columns):
             column = column.strip()
             if column in column_map:
                 direction = sort_orders[i].strip().upper() if i < len(sort_orders) else "ASC"
                 if direction not in ("ASC", "DESC"):
                     direction = "ASC"
-                order_by_parts.append(f"{column_map[column]} {direction}")
+                sort_spec.append((column, column_map[column], direction))
         
         # デフォルトソート
-        if not order_by_parts:
-            order_by_parts.append("recepthead.calldt DESC")
+        if not sort_spec:
+            sort_spec.append(("reception_datetime", "recepthead.calldt", "DESC"))
         
-        return " ORDER BY " + ", ".join(order_by_parts)
-    
+        return sort_spec
+
     @staticmethod
-    def get_reception_data(
+    def build_order_by_clause(sort_by: str, sort_order: str) -> str:
+        """ORDER BY句を構築（複数列ソート対応）"""
+        sort_spec = DataService.build_sort_spec(sort_by, sort_order)
+        return " ORDER BY " + ", ".join(f"{expr} {direction}" for _, expr, direction in sort_spec)
+
+    @staticmethod
+    def build_keyset_sort_spec(sort_by: str, sort_order: str) -> List[Tuple[str, str, str]]:
+        """キーセットページング用のソート指定（extentidをタイブレークとして付与）"""
+        sort_spec = DataService.build_sort_spec(sort_by, sort_order)
+        if not any(column == "id" for column, _, _ in sort_spec):
+            sort_spec.append(("id", "recepthead.extentid", "ASC"))
+        return sort_spec
+
+    @staticmethod
+    def build_keyset_condition(sort_spec: List[Tuple[str, str, str]], last_values: list) -> Tuple[str, list]:
+        """最終行のソートキーより後ろの行を選ぶ条件を構築
+
+        列ごとに昇順/降順が混在するため行値比較は使わず、
+        (c1 > v1) OR (c1 = v1 AND c2 < v2) OR ... の形に展開する。
+        NULLはPostgreSQLの既定（ASCは末尾、DESCは先頭）に合わせて扱う。
+        """
+        disjuncts = []
+        params = []
+        equal_parts, equal_params = [], []
+
+        for (_, expr, direction), value in zip(sort_spec, last_values):
+            # この列で最終行より後ろになる条件
+            if value is None:
+                after = None if direction == "ASC" else f"{expr} IS NOT NULL"
+                after_params = []
+            elif direction == "ASC":
+                after = f"({expr} > %s OR {expr} IS NULL)"
+                after_params = [value]
+            else:
+                after = f"{expr} < %s"
+                after_params = [value]
+
+            if after is not None:
+                disjuncts.append(" AND ".join(equal_parts + [after]))
+                params.extend(equal_params + after_params)
+
+            # 以降の列の比較のため、この列が最終行と等しい条件を追加
+            if value is None:
+                equal_parts.append(f"{expr} IS NULL")
+            else:
+                equal_parts.append(f"{expr} = %s")
+                equal_params.append(value)
+
+        if not disjuncts:
+            return "AND FALSE", []
+        return "AND (" + " OR ".join(f"({part})" for part in disjuncts) + ")", params
+
+    @staticmethod
+    def _fetch_page(
+        filters: Optional[FilterRequest],
+        order_by: str,
+        limit: int,
         offset: int = 0,
-        limit: int = 100,
-        sort_by: str = "reception_datetime",
-        sort_order: str = "desc",
-        filters: Optional[FilterRequest] = None
-    ) -> Tuple[List[ReceptionDataRecord], int]:
-        """受信データ取得"""
+        extra_where: str = "",
+        extra_params: Optional[list] = None,
+        extra_columns: str = "",
+        with_stats: bool = True
+    ) -> Tuple[list, Optional[int], Optional[dict]]:
+        """ページデータと総件数・統計情報を1回のクエリで取得
+
+        総件数と統計（全体/有効/削除済み）は条件付き集計による1回の走査で求め、
+        ページデータの各行の列（1回だけ評価されるスカラー副問い合わせ）として同じラウンドトリップで返す。
+        ページデータは最上位の ORDER BY で並べるため、行の順序は副問い合わせの並びに依存しない。
+        ページが空の場合のみ、統計情報を別のクエリで取得する。
+        with_stats=False の場合はページデータのみを取得する（総件数・統計は None）。
+        """
 
-        # フィルター条件構築
+        # ページデータ用のフィルター条件（削除状態の条件を含む）
         filter_where, filter_params = "", []
         if filters:
             filter_where, filter_params = DataService.build_filter_conditions(filters)
 
-        # 総件数取得
-        count_query = f"""
-        SELECT COUNT(*)
-        FROM recepthead
-        LEFT JOIN m_emp ON recepthead.receptempcd = m_emp.empcd
-        LEFT JOIN exechead ON recepthead.receptno = exechead.receptno
-        LEFT JOIN m_ctitem AS cond_item ON exechead.condition = cond_item.itemcd
-        LEFT JOIN receptbody ON recepthead.receptno = receptbody.receptno
-        LEFT JOIN execbody ON recepthead.receptno = execbody.receptno
-        LEFT JOIN m_ctitem AS stype_item ON exechead.stype = stype_item.itemcd
-        LEFT JOIN m_ctitem AS prod_item ON exechead.producttype = prod_item.itemcd
-        WHERE recepthead.extentid IS NOT NULL
-        AND extentid != 0
-        AND (
-            recepthead.calldt >= '2015-01-01 00:00:00'
-            OR receptbody.moddt >= '2015-01-01 00:00:00'
+        # 統計用のフィルター条件（削除状態は条件付き集計で区別）
+        stats_where, stats_params = "", []
+        if filters:
+            stats_where, stats_params = DataService.build_filter_conditions(filters, apply_deleted_filter=False)
+
+        # 件数の集計は条件が参照する結合のみ、ページデータは表示列・並び順の結合を含める
+        stats_from = QueryBuilder.build_from_clause(stats_where)
+        page_from = QueryBuilder.build_from_clause(
+            RECEPTION_SELECT_COLUMNS, extra_columns, filter_where, extra_where, order_by
         )
-        {filter_where}
-        """
 
-        total_result = db_manager.execute_query(count_query, tuple(filter_params))
-        total = total_result[0]['count']
+        if not with_stats:
+            page_query = f"""
+            SELECT {RECEPTION_SELECT_COLUMNS}{extra_columns}
+            {page_from}
+            {filter_where}
+            {extra_where}
+            {order_by}
+            LIMIT %s OFFSET %s
+            """
+            page_params = filter_params + (extra_params or []) + [limit, offset]
+            return db_manager.execute_prepared(page_query, tuple(page_params)), None, None
 
-        # データ取得
-        data_query = f"""
-        SELECT
-            recepthead.extentid AS id,
-            receptbody.rdata AS content,
-            COALESCE(execbody.execstate, '') AS status,
-            COALESCE(execbody.execresult, '') AS result,
-            COALESCE(execbody.execinfo, '') AS report,
-            cond_item.itemname AS progress,
-            stype_item.itemname AS system_type,
-            prod_item.itemname AS product,
-            recepthead.receptmoddt AT TIME ZONE 'Asia/Tokyo' AS reception_moddt,
-            recepthead.calldt AT TIME ZONE 'Asia/Tokyo' AS reception_datetime,
-            COALESCE(receptbody.moddt, recepthead.calldt) AT TIME ZONE 'Asia/Tokyo' AS update_datetime
-        FROM recepthead
-        LEFT JOIN m_emp ON recepthead.receptempcd = m_emp.empcd
-        LEFT JOIN exechead ON recepthead.receptno = exechead.receptno
-        LEFT JOIN m_ctitem AS cond_item ON exechead.condition = cond_item.itemcd
-        LEFT JOIN receptbody ON recepthead.receptno = receptbody.receptno
-        LEFT JOIN execbody ON recepthead.receptno = execbody.receptno
-        LEFT JOIN m_ctitem AS stype_item ON exechead.stype = stype_item.itemcd
-        LEFT JOIN m_ctitem AS prod_item ON exechead.producttype = prod_item.itemcd
-        WHERE recepthead.extentid IS NOT NULL
-        AND extentid != 0
-        AND (
-            recepthead.calldt >= '2015-01-01 00:00:00'
-            OR receptbody.moddt >= '2015-01-01 00:00:00'
+        query = f"""
+        WITH stats AS (
+            SELECT
+                COUNT(*) AS total_records,
+                COUNT(*) FILTER (WHERE recepthead.receptmoddt IS NULL) AS active_records
+            {stats_from}
+            {stats_where}
         )
+        SELECT {RECEPTION_SELECT_COLUMNS}{extra_columns},
+            (SELECT total_records FROM stats) AS total_records,
+            (SELECT active_records FROM stats) AS active_records
+        {page_from}
         {filter_where}
-        {DataService.build_order_by_clause(sort_by, sort_order)}
+        {extra_where}
+        {order_by}
         LIMIT %s OFFSET %s
         """
 
-        data_params = filter_params + [limit, offset]
-        data_result = db_manager.execute_query(data_query, tuple(data_params))
+        params = stats_params + filter_params + (extra_params or []) + [limit, offset]
+        rows = db_manager.execute_prepared(query, tuple(params))
+
+        if rows:
+            total_count = rows[0]['total_records']
+            active_count = rows[0]['active_records']
+            stats = {
+                "total_records": total_count,
+                "active_records": active_count,
+                "deleted_records": total_count - active_count
+            }
+        else:
+            stats = DataService._load_statistics(filters)
+
+        # 削除済み除外時は有効件数がページングの総件数
+        total = stats["active_records"] if filters and not filters.include_deleted else stats["total_records"]
+        return rows, total, stats
+
+    @staticmethod
+    def _row_to_record(row: dict) -> ReceptionDataRecord:
+        """ページクエリの行からレコードを生成
+
+        ページクエリへ付加した集計・並び順・ソートキーの列はモデルの項目にないため
+        検証時に無視される。行を辞書に詰め直さずにそのまま検証する。
+        """
+        return ReceptionDataRecord.model_validate(row)
+
+    @staticmethod
+    @metrics.instrumented
+    def get_reception_page(
+        offset: int = 0,
+        limit: int = 100,
+        sort_by: str = "reception_datetime",
+        sort_order: str = "desc",
+        filters: Optional[FilterRequest] = None,
+        count_mode: str = "exact"
+    ) -> Tuple[List[ReceptionDataRecord], int, Optional[dict], dict]:
+        """受信データ・総件数・統計情報を1回のクエリで取得（オフセット方式、結果キャッシュ対象）
+
+        count_mode が estimate / none の場合は全件の集計を行わず、1件多く取得して次ページの有無を判定する
+        （総件数の扱いは resolve_count を参照）。
 
-        records = [ReceptionDataRecord(**row) for row in data_result]
+        Returns:
+            (レコードリスト, 総件数, 統計情報, 件数情報)のタプル
+            件数情報は count_mode（総件数の算出方式）・total_error（推定誤差）・has_more
+        """
+        def load():
+            order_by = DataService.build_order_by_clause(sort_by, sort_order)
+            if count_mode == "exact":
+                rows, total, stats = DataService._fetch_page(filters, order_by, limit, offset)
+                count_info = {"count_mode": "exact", "total_error": None, "has_more": offset + limit < total}
+            else:
+                rows, _, _ = DataService._fetch_page(filters, order_by, limit + 1, offset, with_stats=False)
+                has_more = len(rows) > limit
+                rows = rows[:limit]
+                total, stats, count_info = DataService.resolve_count(
+                    filters, count_mode, offset, len(rows), has_more
+                )
+            with metrics.stage("materialize"):
+                records = [DataService._row_to_record(row) for row in rows]
+            return records, total, stats, count_info
+
+        params = {
+            "offset": offset,
+            "limit": limit,
+            "sort_by": normalize_sort(sort_by),
+            "sort_order": normalize_sort(sort_order),
+            "count_mode": count_mode,
+        }
+        return result_cache.get_or_load("reception_page", filters, params, load)
+
+    @staticmethod
+    @metrics.instrumented
+    def get_reception_page_by_cursor(
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        sort_by: str = "reception_datetime",
+        sort_order: str = "desc",
+        filters: Optional[FilterRequest] = None,
+        count_mode: str = "exact"
+    ) -> Tuple[List[ReceptionDataRecord], int, Optional[dict], Optional[str], dict]:
+        """受信データをキーセット（シーク）方式で取得
+
+        継続トークンには最終行のソートキーとタイブレーク用のextentidを格納し、
+        OFFSETで読み飛ばす代わりに「最終行より後ろ」の条件で次ページを取得する。
+        最終行のソートキーが長いテキストの場合（utils.cursor.CURSOR_MAX_TEXT_BYTES）は、
+        トークンに格納した読み進めた件数からOFFSETで次ページを取得する。
+
+        Returns:
+            (レコードリスト, 総件数, 統計情報, 次ページの継続トークン, 件数情報)のタプル
+            次ページがない場合、継続トークンはNone
+        """
+        params = {
+            "cursor": cursor,
+            "limit": limit,
+            "sort_by": normalize_sort(sort_by),
+            "sort_order": normalize_sort(sort_order),
+            "count_mode": count_mode,
+        }
+        return result_cache.get_or_load(
+            "reception_cursor_page", filters, params,
+            lambda: DataService._load_reception_page_by_cursor(
+                cursor, limit, sort_by, sort_order, filters, count_mode
+            )
+        )
+
+    @staticmethod
+    def _load_reception_page_by_cursor(
+        cursor: Optional[str],
+        limit: int,
+        sort_by: str,
+        sort_order: str,
+        filters: Optional[FilterRequest],
+        count_mode: str
+    ) -> Tuple[List[ReceptionDataRecord], int, Optional[dict], Optional[str], dict]:
+        sort_spec = DataService.build_keyset_sort_spec(sort_by, sort_order)
+        signature = [(column, direction) for column, _, direction in sort_spec]
+
+        keyset_where, keyset_params = "", []
+        position, offset = 0, 0
+        if cursor:
+            last_values, position = decode_cursor(cursor, signature)
+            if last_values is None:
+                # 長いテキストのソートキーはトークンに含めないため、読み進めた件数から続きを取得
+                offset = position
+            else:
+                keyset_where, keyset_params = DataService.build_keyset_condition(sort_spec, last_values)
+
+        sort_key_columns = "".join(
+            f",\n            {expr} AS {SORT_KEY_PREFIX}{i}" for i, (_, expr, _) in enumerate(sort_spec)
+        )
+        order_by = " ORDER BY " + ", ".join(f"{expr} {direction}" for _, expr, direction in sort_spec)
+
+        # 次ページの有無を判定するため1件多く取得
+        rows, total, stats = DataService._fetch_page(
+            filters,
+            order_by,
+            limit + 1,
+            offset=offset,
+            extra_where=keyset_where,
+            extra_params=keyset_params,
+            extra_columns=sort_key_columns,
+            with_stats=count_mode == "exact"
+        )
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_row = rows[-1]
+            next_cursor = encode_cursor(
+                signature,
+                [last_row[f"{SORT_KEY_PREFIX}{i}"] for i in range(len(sort_spec))],
+                position + limit
+            )
+
+        if count_mode == "exact":
+            count_info = {"count_mode": "exact", "total_error": None, "has_more": next_cursor is not None}
+        else:
+            # 継続トークンからは読み進めた件数が分からないため、最終ページでも推定値のまま返す
+            total, stats, count_info = DataService.resolve_count(
+                filters, count_mode, None, len(rows), next_cursor is not None
+            )
+
+        with metrics.stage("materialize"):
+            records = [DataService._row_to_record(row) for row in rows]
+        return records, total, stats, next_cursor, count_info
+
+    @staticmethod
+    def get_reception_data(
+        offset: int = 0,
+        limit: int = 100,
+        sort_by: str = "reception_datetime",
+        sort_order: str = "desc",
+        filters: Optional[FilterRequest] = None
+    ) -> Tuple[List[ReceptionDataRecord], int]:
+        """受信データ取得"""
+        records, total, _, _ = DataService.get_reception_page(
+            offset=offset,
+            limit=limit,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            filters=filters
+        )
         return records, total
     
     @staticmethod
-    def get_statistics(filters: Optional[FilterRequest] = None) -> dict:
-        """統計情報取得"""
-        
-        # 基本的なフィルター条件（削除状態制御を除外）
-        base_filters = filters.__dict__.copy() if filters else {}
-        
-        # 有効データ数（削除済み除外）
-        active_filters = FilterRequest(**{**base_filters, "include_deleted": False})
-        active_filter_where, active_filter_params = DataService.build_filter_conditions(active_filters)
-        
-        active_count_query = f"""
-        SELECT COUNT(*)
-        FROM recepthead
-        LEFT JOIN m_emp ON recepthead.receptempcd = m_emp.empcd
-        LEFT JOIN exechead ON recepthead.receptno = exechead.receptno
-        LEFT JOIN m_ctitem AS cond_item ON exechead.condition = cond_item.itemcd
-        LEFT JOIN receptbody ON recepthead.receptno = receptbody.receptno
-        LEFT JOIN execbody ON recepthead.receptno = execbody.receptno
-        LEFT JOIN m_ctitem AS stype_item ON exechead.stype = stype_item.itemcd
-        LEFT JOIN m_ctitem AS prod_item ON exechead.producttype = prod_item.itemcd
-        WHERE recepthead.extentid IS NOT NULL
-        AND extentid != 0
-        AND (
-            recepthead.calldt >= '2015-01-01 00:00:00'
-            OR receptbody.moddt >= '2015-01-01 00:00:00'
+    def resolve_count(
+        filters: Optional[FilterRequest],
+        count_mode: str,
+        offset: Optional[int],
+        row_count: int,
+        has_more: bool
+    ) -> Tuple[int, Optional[dict], dict]:
+        """全件を数えない場合の総件数・統計情報・件数情報を決定
+
+        - none: 総件数はこのページまでの件数（offset + 取得件数）、統計情報は返さない
+        - estimate: 標本からの推定値（get_count_estimate）。読み進めた件数を下限とし、
+          オフセット方式で最終ページに達した場合は確定した件数（count_mode=exact）を返す
+        """
+        seen = (offset or 0) + row_count
+        if count_mode == "none":
+            return seen, None, {"count_mode": "none", "total_error": None, "has_more": has_more}
+
+        estimate = DataService.get_count_estimate(filters)
+        stats = {key: estimate[key] for key in ("total_records", "active_records", "deleted_records")}
+        # 削除済み除外時は有効件数がページングの総件数
+        active_only = filters is not None and not filters.include_deleted
+        total = estimate["active_records" if active_only else "total_records"]
+        total_error = estimate["active_error" if active_only else "total_error"]
+
+        if offset is not None:
+            if not has_more and (row_count or offset == 0):
+                return seen, stats, {"count_mode": "exact", "total_error": None, "has_more": False}
+            total = max(total, seen + (1 if has_more else 0))
+
+        if estimate["count_mode"] == "exact":
+            total_error = None
+        return total, stats, {"count_mode": estimate["count_mode"], "total_error": total_error, "has_more": has_more}
+
+    @staticmethod
+    def get_count_estimate(filters: Optional[FilterRequest] = None) -> dict:
+        """条件に合う件数の推定値（結果キャッシュ対象）"""
+        return result_cache.get_or_load(
+            "count_estimate", filters, {}, lambda: DataService._load_count_estimate(filters)
         )
-        {active_filter_where}
+
+    @staticmethod
+    def _load_count_estimate(filters: Optional[FilterRequest]) -> dict:
+        """recepthead の標本（TABLESAMPLE SYSTEM）から条件に合う件数を推定
+
+        BERNOULLI は行ごとに抽出するため表全体を読むが、SYSTEM はブロック（ページ）単位で
+        確率 f で抽出し、標本のブロックのみを読む。標本中の該当件数 m から m / f で推定できる。
+        同じブロックの行はまとめて抽出されるため（受付日時の近い行が同じブロックに集まる）、
+        行単位の二項分布ではなくブロックごとの該当件数 m_b から標準誤差を sqrt((1 - f) * Σ m_b²) / f とする
+        （誤差は95%信頼区間の幅の半分、m = 0 の場合は 3 / f）。
+        標本の行数は COUNT_ESTIMATE_SAMPLE_ROWS を目安とし、表がその2倍以下の規模なら全件を数える。
+        標本は固定のシードで選ぶため、同じ条件なら毎回同じ推定値になる。
         """
-        
-        # 全データ数（削除済み含む）
-        all_filters = FilterRequest(**{**base_filters, "include_deleted": True})
-        all_filter_where, all_filter_params = DataService.build_filter_conditions(all_filters)
-        
-        all_count_query = f"""
-        SELECT COUNT(*)
-        FROM recepthead
-        LEFT JOIN m_emp ON recepthead.receptempcd = m_emp.empcd
-        LEFT JOIN exechead ON recepthead.receptno = exechead.receptno
-        LEFT JOIN m_ctitem AS cond_item ON exechead.condition = cond_item.itemcd
-        LEFT JOIN receptbody ON recepthead.receptno = receptbody.receptno
-        LEFT JOIN execbody ON recepthead.receptno = execbody.receptno
-        LEFT JOIN m_ctitem AS stype_item ON exechead.stype = stype_item.itemcd
-        LEFT JOIN m_ctitem AS prod_item ON exechead.producttype = prod_item.itemcd
-        WHERE recepthead.extentid IS NOT NULL
-        AND extentid != 0
-        AND (
-            recepthead.calldt >= '2015-01-01 00:00:00'
-            OR receptbody.moddt >= '2015-01-01 00:00:00'
+        # reltuples は ANALYZE 前は -1（0）になるため、その場合も全件を数える
+        table_rows = db_manager.execute_query(
+            "SELECT reltuples::bigint AS table_rows FROM pg_class WHERE oid = 'recepthead'::regclass"
+        )[0]['table_rows']
+        sample_rows = SearchConfig.get_count_estimate_sample_rows()
+        if table_rows <= sample_rows * 2:
+            stats = DataService._load_statistics(filters)
+            return {**stats, "total_error": 0, "active_error": 0, "count_mode": "exact"}
+
+        fraction = sample_rows / table_rows
+        filter_where, filter_params = "", []
+        if filters:
+            filter_where, filter_params = DataService.build_filter_conditions(filters, apply_deleted_filter=False)
+
+        sample_from = QueryBuilder.build_from_clause(
+            filter_where, table_sample="TABLESAMPLE SYSTEM (%s) REPEATABLE (0)"
+        )
+        # ブロック番号（ctid の前半）ごとに集計し、件数とその二乗和を求める
+        sample_query = f"""
+        WITH blocks AS (
+            SELECT
+                COUNT(*) AS total_records,
+                COUNT(*) FILTER (WHERE recepthead.receptmoddt IS NULL) AS active_records
+            {sample_from}
+            {filter_where}
+            GROUP BY (recepthead.ctid::text::point)[0]
         )
-        {all_filter_where}
+        SELECT
+            COALESCE(SUM(total_records), 0)::bigint AS total_records,
+            COALESCE(SUM(active_records), 0)::bigint AS active_records,
+            COALESCE(SUM(total_records * total_records), 0)::bigint AS total_squares,
+            COALESCE(SUM(active_records * active_records), 0)::bigint AS active_squares
+        FROM blocks
         """
-        
-        active_result = db_manager.execute_query(active_count_query, tuple(active_filter_params))
-        all_result = db_manager.execute_query(all_count_query, tuple(all_filter_params))
-        
-        active_count = active_result[0]['count']
-        total_count = all_result[0]['count']
+        result = db_manager.execute_query(sample_query, tuple([fraction * 100] + filter_params))
+
+        def scale(count: int) -> int:
+            return round(count / fraction)
+
+        def error(count: int, squares: int) -> int:
+            if count == 0:
+                return math.ceil(3 / fraction)
+            return math.ceil(COUNT_ESTIMATE_Z * math.sqrt(squares * (1 - fraction)) / fraction)
+
+        row = result[0]
+        total_count = scale(row['total_records'])
+        active_count = scale(row['active_records'])
+        return {
+            "total_records": total_count,
+            "active_records": active_count,
+            "deleted_records": total_count - active_count,
+            "total_error": error(row['total_records'], row['total_squares']),
+            "active_error": error(row['active_records'], row['active_squares']),
+            "count_mode": "estimate",
+        }
+
+    @staticmethod
+    def get_statistics(filters: Optional[FilterRequest] = None) -> dict:
+        """統計情報取得（結果キャッシュ対象）"""
+        return result_cache.get_or_load("statistics", filters, {}, lambda: DataService._load_statistics(filters))
+
+    @staticmethod
+    def _load_statistics(filters: Optional[FilterRequest]) -> dict:
+        """統計情報を集計（条件付き集計で全体件数と有効件数を1回の走査で算出）"""
+
+        # 削除状態の条件は付与せず、FILTER句で有効件数を区別する
+        filter_where, filter_params = "", []
+        if filters:
+            filter_where, filter_params = DataService.build_filter_conditions(filters, apply_deleted_filter=False)
+
+        stats_query = f"""
+        SELECT
+            COUNT(*) AS total_records,
+            COUNT(*) FILTER (WHERE recepthead.receptmoddt IS NULL) AS active_records
+        {QueryBuilder.build_from_clause(filter_where)}
+        {filter_where}
+        """
+
+        result = db_manager.execute_prepared(stats_query, tuple(filter_params))
+
+        total_count = result[0]['total_records']
+        active_count = result[0]['active_records']
         deleted_count = total_count - active_count
-        
+
         return {
             "total_records": total_count,
             "active_records": active_count,
             "deleted_records": deleted_count
-        }
\ No newline at end of file
+        }
@@ -1,13 +1,16 @@
 from typing import List
 from models.response_models import DeleteResponse
-from models.request_models import DeleteRequest
+from models.request_models import DeleteRequest, FilterRequest
 from services.data_service import DataService
+from services.result_cache_service import ResultCacheService
 from database import db_manager
 from datetime import datetime
 from utils.operation_logger import OperationLogger
+from utils.metrics import metrics
 
 class DeleteService:
     @staticmethod
+    @metrics.instrumented
     def delete_duplicates(request: DeleteRequest) -> DeleteResponse:
         """重複データ削除"""
 
@@ -15,31 +18,10 @@ class DeleteService:
             # 選択されたIDのみ削除
             target_ids = request.target_ids
         elif request.delete_scope == "filtered":
-            # フィルター条件に合致するすべてのデータを削除
-            # まずフィルター条件でIDを取得
+            # フィルター条件に合致するすべてのデータを削除（IDを取得せずサーバー側で一括更新）
             if request.filter_conditions:
-                filter_where, filter_params = DataService.build_filter_conditions(request.filter_conditions)
-                id_query = f"""
-                SELECT recepthead.extentid AS id
-                FROM recepthead
-                LEFT JOIN exechead ON recepthead.receptno = exechead.receptno
-                LEFT JOIN m_ctitem AS cond_item ON exechead.condition = cond_item.itemcd
-                LEFT JOIN receptbody ON recepthead.receptno = receptbody.receptno
-                LEFT JOIN execbody ON recepthead.receptno = execbody.receptno
-                LEFT JOIN m_ctitem AS stype_item ON exechead.stype = stype_item.itemcd
-                LEFT JOIN m_ctitem AS prod_item ON exechead.producttype = prod_item.itemcd
-                WHERE recepthead.extentid IS NOT NULL
-                AND extentid != 0
-                AND (
-                    recepthead.calldt >= '2015-01-01 00:00:00'
-                    OR receptbody.moddt >= '2015-01-01 00:00:00'
-                )
-                {filter_where}
-                """
-                id_result = db_manager.execute_query(id_query, tuple(filter_params))
-                target_ids = [row['id'] for row in id_result]
-            else:
-                target_ids = request.target_ids
+                return DeleteService.delete_filtered(request.filter_conditions)
+            target_ids = request.target_ids
         else:
             raise ValueError(f"Invalid delete_scope: {request.delete_scope}")
 
@@ -63,11 +45,13 @@ class DeleteService:
         """
 
         operation_logger = OperationLogger.get_logger()
-        
+
         try:
             deleted_count = db_manager.execute_update(delete_query, (target_ids,))
             # 削除成功ログ出力
             operation_logger.log_delete_operation(target_ids, True, deleted_count)
+            if deleted_count:
+                ResultCacheService.invalidate_ids(target_ids)
             return DeleteResponse(
                 success=True,
                 deleted_count=deleted_count,
@@ -83,4 +67,64 @@ class DeleteService:
                 deleted_count=0,
                 failed_ids=target_ids,
                 timestamp=datetime.now()
-            )
\ No newline at end of file
+            )
+
+    @staticmethod
+    def delete_filtered(filters: FilterRequest) -> DeleteResponse:
+        """フィルター条件に合致するデータを1つのUPDATE文で論理削除
+
+        対象IDをアプリケーションへ取得せず、サブクエリで直接更新する。
+        該当件数・削除件数・削除IDの範囲は同じステートメントのRETURNINGから集計する。
+        失敗時は対象IDを保持しないため failed_ids は空となる。
+        """
+        id_query, filter_params = DataService.build_filtered_id_query(filters)
+        delete_query = f"""
+        WITH targets AS (
+            {id_query}
+        ),
+        deleted AS (
+            UPDATE recepthead
+            SET receptmoddt = CURRENT_TIMESTAMP AT TIME ZONE 'Asia/Tokyo'
+            WHERE extentid IN (SELECT extentid FROM targets)
+            AND receptmoddt IS NULL
+            RETURNING extentid
+        )
+        SELECT
+            (SELECT COUNT(DISTINCT extentid) FROM targets) AS matched_count,
+            COUNT(*) AS affected_count,
+            MIN(extentid) AS first_id,
+            MAX(extentid) AS last_id
+        FROM deleted
+        """
+
+        operation_logger = OperationLogger.get_logger()
+        filter_description = DataService.describe_filters(filters)
+
+        try:
+            result = db_manager.execute_returning(delete_query, tuple(filter_params))
+            # 削除成功ログ出力
+            operation_logger.log_filtered_delete_operation(
+                filter_description,
+                True,
+                matched_count=result['matched_count'],
+                deleted_count=result['affected_count'],
+                first_id=result['first_id'],
+                last_id=result['last_id']
+            )
+            ResultCacheService.invalidate_filtered(filters, result['first_id'], result['last_id'])
+            return DeleteResponse(
+                success=True,
+                deleted_count=result['affected_count'],
+                failed_ids=[],
+                timestamp=datetime.now()
+            )
+        except Exception as e:
+            print(f"削除処理エラー: {e}")
+            # 削除失敗ログ出力
+            operation_logger.log_filtered_delete_operation(filter_description, False, error=str(e))
+            return DeleteResponse(
+                success=False,
+                deleted_count=0,
+                failed_ids=[],
+                timestamp=datetime.now()
+            )
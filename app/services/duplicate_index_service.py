@@ -0,0 +1,424 @@
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+import time
+import psycopg2
+from database import db_manager
+from config.duplicate_index_config import DuplicateIndexConfig
+
+# 重複グループインデックスの状態を識別する名前
+INDEX_NAME = "duplicates"
+
+# 差分同期の排他用アドバイザリロックのキー
+SYNC_LOCK_KEY = 7320150
+
+# 重複タイプごとの指紋列と対象条件
+DUPLICATE_TYPE_COLUMNS = {
+    "exact": ("exact_fp", "TRUE"),
+    "content": ("content_fp", "has_content"),
+    "status": ("status_fp", "has_status"),
+}
+
+SCHEMA_STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS dup_fingerprint (
+        extentid integer NOT NULL,
+        content_fp uuid,
+        status_fp uuid NOT NULL,
+        exact_fp uuid NOT NULL,
+        has_content boolean NOT NULL,
+        has_status boolean NOT NULL,
+        refreshed_at timestamp NOT NULL DEFAULT LOCALTIMESTAMP
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_dup_fingerprint_extentid ON dup_fingerprint (extentid)",
+    "CREATE INDEX IF NOT EXISTS idx_dup_fingerprint_content_fp ON dup_fingerprint (content_fp) WHERE has_content",
+    "CREATE INDEX IF NOT EXISTS idx_dup_fingerprint_status_fp ON dup_fingerprint (status_fp) WHERE has_status",
+    "CREATE INDEX IF NOT EXISTS idx_dup_fingerprint_exact_fp ON dup_fingerprint (exact_fp)",
+    """
+    CREATE TABLE IF NOT EXISTS dup_group (
+        dup_type varchar(16) NOT NULL,
+        group_fp uuid NOT NULL,
+        member_count integer NOT NULL,
+        first_id integer NOT NULL,
+        PRIMARY KEY (dup_type, group_fp)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS dup_pending (
+        extentid integer PRIMARY KEY,
+        queued_at timestamp NOT NULL DEFAULT LOCALTIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS dup_index_state (
+        index_name varchar(32) PRIMARY KEY,
+        watermark timestamp,
+        last_full_rebuild_at timestamp,
+        last_sync_at timestamp,
+        last_sync_rows integer NOT NULL DEFAULT 0
+    )
+    """,
+]
+
+# 未削除の有効レコードについて指紋を算出するSELECT（{extra_where}で対象行を限定）
+FINGERPRINT_SOURCE_SQL = """
+    SELECT
+        recepthead.extentid,
+        md5(receptbody.rdata)::uuid AS content_fp,
+        md5(COALESCE(execbody.execstate, ''))::uuid AS status_fp,
+        md5(
+            COALESCE(md5(receptbody.rdata), '-') || ':' || md5(COALESCE(execbody.execstate, ''))
+        )::uuid AS exact_fp,
+        (receptbody.rdata IS NOT NULL AND receptbody.rdata != '') AS has_content,
+        (COALESCE(execbody.execstate, '') != '') AS has_status
+    FROM recepthead
+    LEFT JOIN receptbody ON recepthead.receptno = receptbody.receptno
+    LEFT JOIN execbody ON recepthead.receptno = execbody.receptno
+    WHERE recepthead.extentid IS NOT NULL
+    AND recepthead.extentid != 0
+    AND (
+        recepthead.calldt >= '2015-01-01 00:00:00'
+        OR receptbody.moddt >= '2015-01-01 00:00:00'
+    )
+    AND recepthead.receptmoddt IS NULL
+    {extra_where}
+"""
+
+FINGERPRINT_COLUMNS = "extentid, content_fp, status_fp, exact_fp, has_content, has_status"
+
+# 変更行の最終更新時刻（ウォーターマーク判定に用いる列）
+CHANGE_TIMESTAMP_SQL = "GREATEST(recepthead.calldt, receptbody.moddt, recepthead.receptmoddt)"
+
+# ウォーターマーク以降に変化した行の抽出（列ごとに分け、各列のインデックスで該当行のみを読む。
+# インデックスは index_service.INDEX_DEFINITIONS で作成する）
+CHANGED_SINCE_QUERIES = [
+    "SELECT extentid FROM recepthead WHERE calldt > %(since)s",
+    "SELECT extentid FROM recepthead WHERE receptmoddt > %(since)s",
+    """SELECT recepthead.extentid
+                        FROM receptbody
+                        JOIN recepthead ON recepthead.receptno = receptbody.receptno
+                        WHERE receptbody.moddt > %(since)s""",
+]
+
+# タイムスタンプが変化しない更新（復元など）で再計算が必要な行
+PENDING_QUERIES = [
+    "SELECT extentid FROM recepthead WHERE extentid = ANY(%(extra_ids)s)",
+    "SELECT extentid FROM dup_pending",
+]
+
+class DuplicateIndexService:
+    """重複グループの永続インデックス
+
+    - dup_fingerprint: 有効レコードごとの指紋（content/status/exact）
+    - dup_group: 2件以上のメンバーを持つグループ（重複タイプ×指紋）
+    - dup_pending: タイムスタンプが変化しない更新（復元など）で再計算待ちのextentid
+    - dup_index_state: ウォーターマークと同期履歴
+
+    calldt / receptbody.moddt / receptmoddt がウォーターマーク以降に変化した行だけを
+    再計算し、影響を受けたグループのみを集計し直す。
+    """
+
+    # 検出時の同期要否判定用（プロセス内）
+    _last_sync_check = 0.0
+
+    @staticmethod
+    def ensure_schema():
+        """インデックス用テーブルを作成"""
+        with db_manager.get_connection() as conn:
+            with conn.cursor() as cursor:
+                for statement in SCHEMA_STATEMENTS:
+                    cursor.execute(statement)
+            conn.commit()
+
+    @staticmethod
+    def get_state() -> Optional[dict]:
+        """インデックスの状態を取得（未構築の場合はNone）"""
+        try:
+            rows = db_manager.execute_query(
+                """
+                SELECT *, to_regclass('dup_pending') IS NOT NULL AS has_pending_table
+                FROM dup_index_state
+                WHERE index_name = %s
+                """,
+                (INDEX_NAME,)
+            )
+        except psycopg2.errors.UndefinedTable:
+            return None
+        # 再計算待ちテーブルのない旧スキーマは再構築されるまで未構築として扱う
+        if not rows or rows[0]['last_full_rebuild_at'] is None or not rows[0]['has_pending_table']:
+            return None
+        state = dict(rows[0])
+        del state['has_pending_table']
+        return state
+
+    @staticmethod
+    def rebuild() -> dict:
+        """インデックスを全件再構築"""
+        DuplicateIndexService.ensure_schema()
+        started = time.perf_counter()
+
+        with db_manager.get_connection() as conn:
+            with conn.cursor() as cursor:
+                # 指紋とウォーターマークを同一スナップショットから求める
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", (SYNC_LOCK_KEY,))
+                cursor.execute(f"""
+                    SELECT MAX({CHANGE_TIMESTAMP_SQL}) AS watermark
+                    FROM recepthead
+                    LEFT JOIN receptbody ON recepthead.receptno = receptbody.receptno
+                """)
+                watermark = cursor.fetchone()['watermark']
+
+                cursor.execute("TRUNCATE dup_fingerprint, dup_group")
+                # スナップショット取得後に登録された再計算待ちは次回の同期で処理するため残す
+                cursor.execute("DELETE FROM dup_pending")
+                cursor.execute(
+                    f"INSERT INTO dup_fingerprint ({FINGERPRINT_COLUMNS}) "
+                    + FINGERPRINT_SOURCE_SQL.format(extra_where="")
+                )
+                fingerprint_rows = cursor.rowcount
+
+                for dup_type, (column, condition) in DUPLICATE_TYPE_COLUMNS.items():
+                    cursor.execute(f"""
+                        INSERT INTO dup_group (dup_type, group_fp, member_count, first_id)
+                        SELECT %s, {column}, COUNT(*), MIN(extentid)
+                        FROM dup_fingerprint
+                        WHERE {condition}
+                        GROUP BY {column}
+                        HAVING COUNT(*) > 1
+                    """, (dup_type,))
+
+                cursor.execute("""
+                    INSERT INTO dup_index_state (index_name, watermark, last_full_rebuild_at, last_sync_at, last_sync_rows)
+                    VALUES (%s, %s, LOCALTIMESTAMP, LOCALTIMESTAMP, %s)
+                    ON CONFLICT (index_name) DO UPDATE SET
+                        watermark = EXCLUDED.watermark,
+                        last_full_rebuild_at = EXCLUDED.last_full_rebuild_at,
+                        last_sync_at = EXCLUDED.last_sync_at,
+                        last_sync_rows = EXCLUDED.last_sync_rows
+                """, (INDEX_NAME, watermark, fingerprint_rows))
+            conn.commit()
+
+        return {
+            "fingerprint_rows": fingerprint_rows,
+            "watermark": watermark,
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+        }
+
+    @staticmethod
+    def sync(extra_ids: Optional[List[int]] = None, wait: bool = False) -> Optional[dict]:
+        """ウォーターマーク以降に変化した行を差分反映
+
+        Args:
+            extra_ids: タイムスタンプが変化しない更新（復元など）で再計算が必要なextentid
+                （dup_pending に登録された行も併せて再計算する）
+            wait: 他の同期が実行中の場合に待機するか（Falseならスキップ）
+
+        Returns:
+            同期結果。インデックス未構築、または他の同期と競合してスキップした場合はNone
+        """
+        state = DuplicateIndexService.get_state()
+        if state is None:
+            return None
+
+        started = time.perf_counter()
+        since = state['watermark']
+        if since is not None:
+            since = since - timedelta(seconds=DuplicateIndexConfig.get_overlap_seconds())
+
+        with db_manager.get_connection() as conn:
+            with conn.cursor() as cursor:
+                if wait:
+                    cursor.execute("SELECT pg_advisory_xact_lock(%s)", (SYNC_LOCK_KEY,))
+                else:
+                    cursor.execute("SELECT pg_try_advisory_xact_lock(%s) AS locked", (SYNC_LOCK_KEY,))
+                    if not cursor.fetchone()['locked']:
+                        conn.rollback()
+                        return None
+
+                # 変更行の抽出（ウォーターマークがない場合は全件）
+                # 抽出したIDは件数を統計に反映してから結合し、少数の変更で recepthead を全件読まないようにする
+                if since is None:
+                    changed_ids = "SELECT extentid FROM recepthead"
+                else:
+                    changed_ids = "\n                    UNION ".join(CHANGED_SINCE_QUERIES + PENDING_QUERIES)
+                cursor.execute(f"""
+                    CREATE TEMP TABLE dup_changed_ids ON COMMIT DROP AS
+                    {changed_ids}
+                """, {"since": since, "extra_ids": list(extra_ids or [])})
+                cursor.execute("ANALYZE dup_changed_ids")
+                cursor.execute(f"""
+                    CREATE TEMP TABLE dup_changed ON COMMIT DROP AS
+                    SELECT DISTINCT recepthead.extentid, {CHANGE_TIMESTAMP_SQL} AS changed_at
+                    FROM recepthead
+                    LEFT JOIN receptbody ON recepthead.receptno = receptbody.receptno
+                    WHERE recepthead.extentid IS NOT NULL
+                    AND recepthead.extentid IN (SELECT extentid FROM dup_changed_ids)
+                """)
+                changed_rows = cursor.rowcount
+                cursor.execute("ANALYZE dup_changed")
+                cursor.execute("DELETE FROM dup_pending WHERE extentid IN (SELECT extentid FROM dup_changed)")
+
+                cursor.execute("SELECT MAX(changed_at) AS watermark FROM dup_changed")
+                new_watermark = cursor.fetchone()['watermark']
+                if state['watermark'] is not None and (new_watermark is None or new_watermark < state['watermark']):
+                    new_watermark = state['watermark']
+
+                # 変更前の指紋を影響グループとして記録し、指紋を入れ替える
+                cursor.execute("""
+                    CREATE TEMP TABLE dup_affected ON COMMIT DROP AS
+                    SELECT content_fp, status_fp, exact_fp, has_content, has_status
+                    FROM dup_fingerprint
+                    WHERE extentid IN (SELECT extentid FROM dup_changed)
+                """)
+                cursor.execute("DELETE FROM dup_fingerprint WHERE extentid IN (SELECT extentid FROM dup_changed)")
+                cursor.execute(
+                    f"INSERT INTO dup_fingerprint ({FINGERPRINT_COLUMNS}) "
+                    + FINGERPRINT_SOURCE_SQL.format(
+                        extra_where="AND recepthead.extentid IN (SELECT extentid FROM dup_changed)"
+                    )
+                )
+                cursor.execute("""
+                    INSERT INTO dup_affected
+                    SELECT content_fp, status_fp, exact_fp, has_content, has_status
+                    FROM dup_fingerprint
+                    WHERE extentid IN (SELECT extentid FROM dup_changed)
+                """)
+
+                # 影響を受けたグループのみ再集計
+                affected_groups = 0
+                for dup_type, (column, condition) in DUPLICATE_TYPE_COLUMNS.items():
+                    affected = f"SELECT {column} FROM dup_affected WHERE {condition}"
+                    cursor.execute(
+                        f"DELETE FROM dup_group WHERE dup_type = %s AND group_fp IN ({affected})",
+                        (dup_type,)
+                    )
+                    cursor.execute(f"""
+                        INSERT INTO dup_group (dup_type, group_fp, member_count, first_id)
+                        SELECT %s, {column}, COUNT(*), MIN(extentid)
+                        FROM dup_fingerprint
+                        WHERE {condition}
+                        AND {column} IN ({affected})
+                        GROUP BY {column}
+                        HAVING COUNT(*) > 1
+                    """, (dup_type,))
+                    affected_groups += cursor.rowcount
+
+                cursor.execute("""
+                    UPDATE dup_index_state
+                    SET watermark = %s, last_sync_at = LOCALTIMESTAMP, last_sync_rows = %s
+                    WHERE index_name = %s
+                """, (new_watermark, changed_rows, INDEX_NAME))
+            conn.commit()
+
+        return {
+            "changed_rows": changed_rows,
+            "affected_groups": affected_groups,
+            "watermark": new_watermark,
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+        }
+
+    @staticmethod
+    def build_pending_insert(source: str) -> str:
+        """書き込みCTEの結果（extentid列）を再計算待ちに登録するCTE本体
+
+        更新と同一ステートメントで登録できるため、IDをアプリケーションへ取得せずに済む。
+        """
+        return f"""
+            INSERT INTO dup_pending (extentid)
+            SELECT DISTINCT extentid FROM {source}
+            ON CONFLICT (extentid) DO NOTHING
+        """
+
+    @staticmethod
+    def sync_pending() -> Optional[dict]:
+        """再計算待ち（dup_pending）に登録した行を反映
+
+        他の同期の実行中は待たずに戻り、次回の検出時の同期（ensure_fresh）で反映する。
+        """
+        try:
+            result = DuplicateIndexService.sync()
+        except Exception as e:
+            print(f"重複インデックス反映エラー: {e}")
+            result = None
+        if result is None:
+            DuplicateIndexService._last_sync_check = 0.0
+        return result
+
+    @staticmethod
+    def ensure_fresh() -> bool:
+        """重複検出前に必要なら差分同期を行い、インデックスが利用可能かを返す"""
+        if not DuplicateIndexConfig.is_enabled():
+            return False
+
+        interval = DuplicateIndexConfig.get_sync_interval()
+        now = time.monotonic()
+        if now - DuplicateIndexService._last_sync_check >= interval:
+            DuplicateIndexService._last_sync_check = now
+            try:
+                DuplicateIndexService.sync()
+            except Exception as e:
+                print(f"重複インデックス差分同期エラー: {e}")
+                return False
+
+        return DuplicateIndexService.get_state() is not None
+
+    @staticmethod
+    def build_candidate_condition(duplicate_type: str) -> Tuple[str, list]:
+        """インデックス上で2件以上のグループに属する行へ検出対象を絞り込む条件"""
+        column, condition = DUPLICATE_TYPE_COLUMNS[duplicate_type]
+        candidate_where = f"""
+            AND recepthead.extentid IN (
+                SELECT dup_fingerprint.extentid
+                FROM dup_group
+                JOIN dup_fingerprint ON dup_fingerprint.{column} = dup_group.group_fp
+                WHERE dup_group.dup_type = %s
+                AND {condition}
+            )
+        """
+        return candidate_where, [duplicate_type]
+
+    @staticmethod
+    def check_consistency() -> Dict:
+        """インデックスと現在のデータを突き合わせて整合性を検証"""
+        source = FINGERPRINT_SOURCE_SQL.format(extra_where="")
+        fingerprint_query = f"""
+        WITH live AS ({source}),
+        indexed AS (SELECT {FINGERPRINT_COLUMNS} FROM dup_fingerprint)
+        SELECT
+            (SELECT COUNT(*) FROM (SELECT * FROM live EXCEPT ALL SELECT * FROM indexed) AS missing) AS missing_rows,
+            (SELECT COUNT(*) FROM (SELECT * FROM indexed EXCEPT ALL SELECT * FROM live) AS stale) AS stale_rows
+        """
+        fingerprint_result = db_manager.execute_query(fingerprint_query)[0]
+
+        group_checks = []
+        for dup_type, (column, condition) in DUPLICATE_TYPE_COLUMNS.items():
+            group_checks.append(f"""
+                SELECT %s AS dup_type, {column} AS group_fp, COUNT(*)::integer AS member_count,
+                       MIN(extentid) AS first_id
+                FROM dup_fingerprint
+                WHERE {condition}
+                GROUP BY {column}
+                HAVING COUNT(*) > 1
+            """)
+        expected = " UNION ALL ".join(group_checks)
+        group_query = f"""
+        WITH expected AS ({expected}),
+        indexed AS (SELECT dup_type::text, group_fp, member_count, first_id FROM dup_group)
+        SELECT
+            (SELECT COUNT(*) FROM (SELECT * FROM expected EXCEPT ALL SELECT * FROM indexed) AS missing) AS missing_groups,
+            (SELECT COUNT(*) FROM (SELECT * FROM indexed EXCEPT ALL SELECT * FROM expected) AS stale) AS stale_groups
+        """
+        group_result = db_manager.execute_query(group_query, tuple(DUPLICATE_TYPE_COLUMNS.keys()))[0]
+
+        result = {
+            "missing_rows": fingerprint_result['missing_rows'],
+            "stale_rows": fingerprint_result['stale_rows'],
+            "missing_groups": group_result['missing_groups'],
+            "stale_groups": group_result['stale_groups'],
+            "state": DuplicateIndexService.get_state(),
+        }
+        result["consistent"] = all(
+            result[key] == 0 for key in ("missing_rows", "stale_rows", "missing_groups", "stale_groups")
+        )
+        return result
@@ -0,0 +1,289 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+import numpy as np
+from services.query_builder import QueryBuilder
+from services.snapshot_service import SNAPSHOT_FORMAT_VERSION, SNAPSHOT_METADATA_KEY, pyarrow
+from database import db_manager
+from config.snapshot_config import SnapshotConfig
+
+# RSS の計測は任意（Windows では resource モジュールがない）
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# 走査対象の重複タイプ（similar は MinHash/LSH の別経路のため対象外）
+SCAN_TYPES = ("exact", "content", "status")
+
+# COPY（text形式）の NULL の表現。値の中のバックスラッシュはエスケープされるため、通常の値とは区別される
+COPY_NULL = b"\\N"
+
+# ワーカーへ同時に渡しておくバッチ数（ワーカー数に対する倍率、超えると COPY の読み出しを待たせる）
+SCAN_INFLIGHT_PER_WORKER = 2
+
+# 走査クエリ（受付内容・対応状況を生のまま取得し、指紋はワーカーで計算する）
+SCAN_SELECT_COLUMNS = "recepthead.extentid, receptbody.rdata, COALESCE(execbody.execstate, '')"
+
+def fingerprint(value: bytes) -> int:
+    """64ビットの指紋（md5 の先頭8バイト）"""
+    return int.from_bytes(hashlib.md5(value).digest()[:8], "little")
+
+def hash_chunk(chunk: bytes, types: Tuple[str, ...], partitions: int) -> Dict[str, List[Tuple[np.ndarray, np.ndarray]]]:
+    """COPY（text形式）の出力を指紋に変換し、重複タイプ・パーティションごとの (ID, 指紋) を返す（ワーカーで実行）
+
+    text 形式では1行が1レコード（改行・タブはエスケープされる）のため、行を分割するだけでよい。
+    値はエスケープされたまま比較・ハッシュする（エスケープは可逆なので一致判定は元の値と同じ）。
+    重複タイプごとの対象条件は重複検出クエリと同じ（content は受付内容が空でない行、status は対応状況が空でない行）。
+    exact は重複検出クエリの GROUP BY・指紋テーブルと同じく、受付内容が NULL の行どうしも1つのグループとする
+    （NULL は \\N、空文字は空のまま区別される）。
+    """
+    ids = {duplicate_type: [] for duplicate_type in types}
+    fingerprints = {duplicate_type: [] for duplicate_type in types}
+    for line in chunk.split(b"\n"):
+        if not line:
+            continue
+        extentid, content, status = line.split(b"\t")
+        extentid = int(extentid)
+        if "exact" in ids:
+            ids["exact"].append(extentid)
+            fingerprints["exact"].append(fingerprint(content + b"\t" + status))
+        if "content" in ids and content not in (COPY_NULL, b""):
+            ids["content"].append(extentid)
+            fingerprints["content"].append(fingerprint(content))
+        if "status" in ids and status:
+            ids["status"].append(extentid)
+            fingerprints["status"].append(fingerprint(status))
+
+    result = {}
+    for duplicate_type in types:
+        type_ids = np.array(ids[duplicate_type], dtype=np.int64)
+        type_fingerprints = np.array(fingerprints[duplicate_type], dtype=np.uint64)
+        # 指紋でパーティションに分け、同じ指紋の行が同じワーカーでグループ化されるようにする
+        parts = (type_fingerprints % np.uint64(partitions)).astype(np.int64)
+        order = np.argsort(parts, kind="stable")
+        bounds = np.searchsorted(parts[order], np.arange(partitions + 1))
+        result[duplicate_type] = [
+            (type_ids[order[bounds[p]:bounds[p + 1]]], type_fingerprints[order[bounds[p]:bounds[p + 1]]])
+            for p in range(partitions)
+        ]
+    return result
+
+def group_partition(ids: np.ndarray, fingerprints: np.ndarray, min_group_size: int) -> Tuple[np.ndarray, ...]:
+    """1パーティションの (ID, 指紋) をグループ化する（ワーカーで実行）
+
+    指紋・IDの順に並べ、同じ指紋が min_group_size 件以上続く範囲を1グループとする。
+    戻り値はグループごとの最小ID・件数・指紋と、グループ順に連続するメンバーのID。
+    """
+    order = np.lexsort((ids, fingerprints))
+    ids = ids[order]
+    fingerprints = fingerprints[order]
+    if len(ids) == 0:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, np.array([], dtype=np.uint64), empty
+
+    starts = np.flatnonzero(np.r_[True, fingerprints[1:] != fingerprints[:-1]])
+    counts = np.diff(np.r_[starts, len(ids)])
+    keep = counts >= min_group_size
+    return ids[starts[keep]], counts[keep], fingerprints[starts[keep]], ids[np.repeat(keep, counts)]
+
+def peak_rss_mb(who: int) -> Optional[float]:
+    """最大常駐メモリ（MB、who: resource.RUSAGE_SELF / RUSAGE_CHILDREN）"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux は KB、macOS はバイト単位
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+class DuplicateScanService:
+    """重複グループのオフライン全件走査（scan.py から実行）
+
+    1. recepthead/receptbody/execbody の必要な列を COPY ... TO STDOUT（text形式）で一括読み出し
+    2. 出力のバッチをワーカープロセスへ渡し、重複タイプごとの指紋を計算・パーティション分割
+    3. パーティションごとにワーカーでグループ化し、最小IDの順にグループ番号を振る
+    4. グループのメンバーを Arrow IPC ファイル（スナップショット）へ書き出す（APIが読み込んで提供）
+    メインプロセスが保持するのは対象行の (ID, 指紋) のみ（1行・1タイプあたり16バイト）。
+    """
+
+    @staticmethod
+    def build_scan_query(since: Optional[datetime] = None) -> Tuple[str, tuple]:
+        """走査クエリ（削除済みを除く。since を指定すると受付日時がそれ以降の行のみ）"""
+        conditions = "AND recepthead.receptmoddt IS NULL"
+        params = []
+        if since is not None:
+            conditions += " AND recepthead.calldt >= %s"
+            params.append(since)
+        query = f"""
+        SELECT {SCAN_SELECT_COLUMNS}
+        {QueryBuilder.build_from_clause(SCAN_SELECT_COLUMNS, conditions)}
+        {conditions}
+        """
+        return query, tuple(params)
+
+    @staticmethod
+    def scan(
+        output_path: Optional[str] = None,
+        types: Tuple[str, ...] = SCAN_TYPES,
+        since: Optional[datetime] = None,
+        workers: Optional[int] = None,
+        batch_bytes: Optional[int] = None,
+        min_group_size: int = 2,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """全件を走査してスナップショットを作成し、件数・所要時間・行数/秒・最大RSSを返す"""
+        if pyarrow is None:
+            raise RuntimeError("スナップショットの作成には pyarrow が必要です")
+        for duplicate_type in types:
+            if duplicate_type not in SCAN_TYPES:
+                raise ValueError(f"Invalid duplicate_type: {duplicate_type}")
+
+        output_path = output_path or SnapshotConfig.get_snapshot_path()
+        workers = workers or SnapshotConfig.get_scan_workers()
+        batch_bytes = batch_bytes or SnapshotConfig.get_scan_batch_bytes()
+        partitions = workers
+        started = time.perf_counter()
+
+        query, params = DuplicateScanService.build_scan_query(since)
+        buckets = {duplicate_type: [[] for _ in range(partitions)] for duplicate_type in types}
+        scanned_rows = 0
+        scanned_bytes = 0
+
+        def collect(future):
+            for duplicate_type, parts in future.result().items():
+                for p, (ids, fingerprints) in enumerate(parts):
+                    buckets[duplicate_type][p].append((ids, fingerprints))
+            if progress:
+                progress({"rows": scanned_rows, "bytes": scanned_bytes,
+                          "elapsed_seconds": time.perf_counter() - started})
+
+        # COPY の読み出しスレッドの実行中に fork しないよう、ワーカーは spawn で起動する（Windows と同じ方式）
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            # 読み出し・指紋計算（バッチの受け渡し数に上限を設け、メモリを一定に保つ）
+            pending = set()
+            for chunk in db_manager.iter_copy(
+                query, params, options="FORMAT text", chunk_bytes=batch_bytes, queue_chunks=2
+            ):
+                scanned_rows += chunk.count(b"\n")
+                scanned_bytes += len(chunk)
+                pending.add(executor.submit(hash_chunk, chunk, types, partitions))
+                if len(pending) >= workers * SCAN_INFLIGHT_PER_WORKER:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future)
+            for future in pending:
+                collect(future)
+            read_seconds = time.perf_counter() - started
+
+            # パーティションごとのグループ化
+            grouping_started = time.perf_counter()
+            futures = {}
+            for duplicate_type in types:
+                futures[duplicate_type] = []
+                for p in range(partitions):
+                    parts = buckets[duplicate_type][p]
+                    buckets[duplicate_type][p] = None
+                    ids = np.concatenate([part[0] for part in parts]) if parts else np.array([], dtype=np.int64)
+                    fingerprints = (np.concatenate([part[1] for part in parts]) if parts
+                                    else np.array([], dtype=np.uint64))
+                    futures[duplicate_type].append(executor.submit(group_partition, ids, fingerprints, min_group_size))
+            grouped = {
+                duplicate_type: [future.result() for future in type_futures]
+                for duplicate_type, type_futures in futures.items()
+            }
+            group_seconds = time.perf_counter() - grouping_started
+
+        write_started = time.perf_counter()
+        batches = []
+        type_entries = {}
+        for duplicate_type in types:
+            batch = DuplicateScanService.build_snapshot_batch(duplicate_type, types, grouped.pop(duplicate_type))
+            type_entries[duplicate_type] = {
+                "batch": len(batches),
+                "groups": int(batch.column("group_pos")[-1].as_py()) if batch.num_rows else 0,
+                "rows": batch.num_rows,
+            }
+            batches.append(batch)
+
+        info = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "since": since.isoformat() if since else None,
+            "scanned_rows": scanned_rows,
+            "scanned_bytes": scanned_bytes,
+            "workers": workers,
+            "types": type_entries,
+        }
+        DuplicateScanService.write_snapshot(output_path, batches, info)
+        write_seconds = time.perf_counter() - write_started
+        elapsed = time.perf_counter() - started
+
+        return {
+            "output": output_path,
+            "file_bytes": os.path.getsize(output_path),
+            "scanned_rows": scanned_rows,
+            "scanned_mb": round(scanned_bytes / 1024 / 1024, 2),
+            "workers": workers,
+            "types": type_entries,
+            "elapsed_seconds": round(elapsed, 3),
+            "stage_seconds": {
+                "read_and_hash": round(read_seconds, 3),
+                "group": round(group_seconds, 3),
+                "write": round(write_seconds, 3),
+            },
+            "rows_per_second": round(scanned_rows / elapsed, 1) if elapsed else None,
+            "peak_rss_mb": {
+                "main": peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+                "workers": peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None,
+            },
+        }
+
+    @staticmethod
+    def build_snapshot_batch(duplicate_type: str, types: Tuple[str, ...], partitions: List[Tuple[np.ndarray, ...]]):
+        """パーティションごとのグループを最小IDの順に並べ、メンバー1件につき1行のレコードバッチにする
+
+        duplicate_type 列は全バッチ共通の辞書（types）による辞書型（IPC ファイルは辞書の置き換えに対応しないため）。
+        """
+        first_ids = np.concatenate([part[0] for part in partitions])
+        counts = np.concatenate([part[1] for part in partitions])
+        group_fingerprints = np.concatenate([part[2] for part in partitions])
+        members = np.concatenate([part[3] for part in partitions])
+
+        # 各グループのメンバーの開始位置（パーティションを連結した順）
+        member_starts = np.cumsum(counts) - counts
+        order = np.argsort(first_ids, kind="stable")
+        counts = counts[order]
+        total = int(counts.sum())
+        # 並べ替え後のグループ順にメンバーの位置を展開
+        new_starts = np.cumsum(counts) - counts
+        offsets = np.arange(total, dtype=np.int64) - np.repeat(new_starts, counts)
+        member_index = np.repeat(member_starts[order], counts) + offsets
+
+        return pyarrow.record_batch({
+            "duplicate_type": pyarrow.DictionaryArray.from_arrays(
+                pyarrow.array(np.full(total, types.index(duplicate_type), dtype=np.int8)), pyarrow.array(list(types))
+            ),
+            "group_pos": pyarrow.array(np.repeat(np.arange(1, len(counts) + 1, dtype=np.int64), counts)),
+            "group_first_id": pyarrow.array(np.repeat(first_ids[order], counts)),
+            "duplicate_count": pyarrow.array(np.repeat(counts.astype(np.int64), counts)),
+            "id": pyarrow.array(members[member_index]),
+            "fingerprint": pyarrow.array(np.repeat(group_fingerprints[order], counts)),
+        })
+
+    @staticmethod
+    def write_snapshot(output_path: str, batches: list, info: Dict[str, Any]):
+        """Arrow IPC ファイルとして書き出す（一時ファイルに書いてから置き換え、読み込み中のAPIに途中の状態を見せない）"""
+        directory = os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(directory, exist_ok=True)
+        schema = batches[0].schema.with_metadata({SNAPSHOT_METADATA_KEY: json.dumps(info).encode()})
+        temp_path = f"{output_path}.tmp"
+        with pyarrow.OSFile(temp_path, "wb") as sink:
+            with pyarrow.ipc.new_file(sink, schema) as writer:
+                for batch in batches:
+                    writer.write_batch(batch)
+        os.replace(temp_path, output_path)
@@ -1,8 +1,48 @@
-from typing import List, Optional
-from models.response_models import ReceptionDataRecord, DuplicateGroup
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from models.response_models import ReceptionDataRecord, DuplicateGroup, DuplicateGroupSummary
 from models.request_models import FilterRequest
-from services.data_service import DataService
+from services.data_service import DataService, RECEPTION_SELECT_COLUMNS
+from services.query_builder import QueryBuilder
+from services.duplicate_index_service import DuplicateIndexService
 from database import db_manager
+from utils.result_cache import result_cache, normalize_sort
+from utils.metrics import metrics
+
+# 重複判定に用いるコンパクトな指紋（全文の代わりに16バイトのuuidでパーティション・ソートする）
+# 式インデックス（services/index_service.py）と同一の式であること
+CONTENT_FINGERPRINT_SQL = "md5(receptbody.rdata)::uuid"
+STATUS_FINGERPRINT_SQL = "md5(COALESCE(execbody.execstate, ''))::uuid"
+# exact では受付内容が NULL の行どうしも1つのグループとする（指紋テーブル・スナップショットと同じ）。
+# NULL のままではメンバーの結合（=）で一致しないため固定値に置き換える（md5 の値と衝突した場合は全文の比較で分割される）
+EXACT_CONTENT_FINGERPRINT_SQL = f"COALESCE({CONTENT_FINGERPRINT_SQL}, '00000000-0000-0000-0000-000000000000'::uuid)"
+
+# 指紋列ごとの式インデックスの式（グループメンバーの個別取得で指定レコードの指紋と比較する）
+FINGERPRINT_INDEX_EXPRESSIONS = {
+    "content_fp": CONTENT_FINGERPRINT_SQL,
+    "status_fp": STATUS_FINGERPRINT_SQL,
+}
+
+# 重複タイプごとの指紋列と対象条件
+DUPLICATE_TYPE_DEFINITIONS = {
+    "exact": (
+        {"content_fp": EXACT_CONTENT_FINGERPRINT_SQL, "status_fp": STATUS_FINGERPRINT_SQL},
+        "AND recepthead.receptmoddt IS NULL"
+    ),
+    "content": (
+        {"content_fp": CONTENT_FINGERPRINT_SQL},
+        "AND receptbody.rdata IS NOT NULL AND receptbody.rdata != '' AND recepthead.receptmoddt IS NULL"
+    ),
+    "status": (
+        {"status_fp": STATUS_FINGERPRINT_SQL},
+        "AND COALESCE(execbody.execstate, '') != '' AND recepthead.receptmoddt IS NULL"
+    ),
+}
+
+# グループの並び順（first_id: 最小IDの昇順、size: 件数の多い順）
+GROUP_ORDER_BY = {
+    "first_id": "group_first_id",
+    "size": "duplicate_count DESC, group_first_id",
+}
 
 class DuplicateService:
     @staticmethod
@@ -21,7 +61,7 @@ class DuplicateService:
         }
         
         if not sort_by:
-            return "duplicate_key, id"
+            return "group_pos, id"
         
         # 複数列ソートの解析
         sort_columns = sort_by.split(',') if ',' in sort_by else [sort_by]
@@ -36,117 +76,601 @@ class DuplicateService:
                     direction = "ASC"
                 order_by_parts.append(f"{column_map[column]} {direction}")
         
-        # duplicate_keyを最優先にする
+        # グループの並び順を最優先にする
         if order_by_parts:
-            return f"duplicate_key, {', '.join(order_by_parts)}"
+            return f"group_pos, {', '.join(order_by_parts)}"
         else:
-            return "duplicate_key, id"
+            return "group_pos, id"
     
     @staticmethod
     def detect_duplicates(
         duplicate_type: str,
         filters: Optional[FilterRequest] = None,
         sort_by: str = None,
-        sort_order: str = None
+        sort_order: str = None,
+        use_index: bool = True,
+        similarity_threshold: float = 0.8,
+        min_group_size: int = 2,
+        group_order: str = "first_id",
+        group_offset: int = 0,
+        group_limit: Optional[int] = None
     ) -> List[DuplicateGroup]:
-        """重複データ検出"""
+        """重複データ検出
+
+        重複グループインデックスが構築済みなら、インデックス上で2件以上のグループに属する
+        候補行だけを対象に現在のデータで判定し直す（未構築時は全件走査）。
+        similar は受付内容の近似重複（MinHash/LSH、類似度が similarity_threshold 以上）。
+        """
+        groups, _, _ = DuplicateService.get_duplicate_page(
+            duplicate_type,
+            filters,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            use_index=use_index,
+            similarity_threshold=similarity_threshold,
+            min_group_size=min_group_size,
+            group_order=group_order,
+            group_offset=group_offset,
+            group_limit=group_limit
+        )
+        return groups
+
+    @staticmethod
+    @metrics.instrumented
+    def get_duplicate_page(
+        duplicate_type: str,
+        filters: Optional[FilterRequest] = None,
+        sort_by: str = None,
+        sort_order: str = None,
+        use_index: bool = True,
+        similarity_threshold: float = 0.8,
+        min_group_size: int = 2,
+        group_order: str = "first_id",
+        group_offset: int = 0,
+        group_limit: Optional[int] = None
+    ) -> Tuple[List[DuplicateGroup], int, int]:
+        """グループ単位のページと、条件に合う全グループの件数・レコード数を取得（結果キャッシュ対象）"""
+        params = {
+            "duplicate_type": duplicate_type,
+            "sort_by": normalize_sort(sort_by),
+            "sort_order": normalize_sort(sort_order),
+            "use_index": use_index,
+            "similarity_threshold": similarity_threshold if duplicate_type == "similar" else None,
+            "min_group_size": min_group_size,
+            "group_order": group_order,
+            "group_offset": group_offset,
+            "group_limit": group_limit,
+        }
+        return result_cache.get_or_load(
+            "duplicate_page", filters, params,
+            lambda: DuplicateService._load_duplicate_page(
+                duplicate_type, filters, sort_by, sort_order, use_index, similarity_threshold,
+                min_group_size, group_order, group_offset, group_limit
+            )
+        )
+
+    @staticmethod
+    def _load_duplicate_page(
+        duplicate_type: str,
+        filters: Optional[FilterRequest],
+        sort_by: Optional[str],
+        sort_order: Optional[str],
+        use_index: bool,
+        similarity_threshold: float,
+        min_group_size: int,
+        group_order: str,
+        group_offset: int,
+        group_limit: Optional[int]
+    ) -> Tuple[List[DuplicateGroup], int, int]:
+        totals = {}
+        groups = list(DuplicateService.iter_duplicate_groups(
+            duplicate_type,
+            filters,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            use_index=use_index,
+            similarity_threshold=similarity_threshold,
+            min_group_size=min_group_size,
+            group_order=group_order,
+            group_offset=group_offset,
+            group_limit=group_limit,
+            totals=totals
+        ))
+        return groups, totals.get('total_groups', 0), totals.get('total_duplicates', 0)
+
+    @staticmethod
+    def iter_duplicate_groups(
+        duplicate_type: str,
+        filters: Optional[FilterRequest] = None,
+        sort_by: str = None,
+        sort_order: str = None,
+        use_index: bool = True,
+        similarity_threshold: float = 0.8,
+        min_group_size: int = 2,
+        group_order: str = "first_id",
+        group_offset: int = 0,
+        group_limit: Optional[int] = None,
+        totals: Optional[Dict[str, int]] = None
+    ) -> Iterator[DuplicateGroup]:
+        """重複グループを1件ずつ返すジェネレーター
+
+        グループの絞り込み（min_group_size）・並び順・ページングはSQLで行い、ページ内の
+        グループのメンバーだけを取得する。結果はグループ順に連続するため、サーバーサイドカーソルで
+        読み進めながらグループが変わった時点で直前のグループを確定して返す（メモリは1グループ分）。
+        group_limit を指定した場合はページ分のみを準備済みステートメントでまとめて取得する。
+        totals を渡すと全グループの件数（total_groups）とレコード数（total_duplicates）を格納する。
+        similar は全署名の比較が必要なため、検出完了後にまとめて返す。
+        """
+        if totals is None:
+            totals = {}
+
+        if duplicate_type == "similar":
+            # NumPyを要するため必要時のみ読み込む
+            from services.similarity_service import SimilarityService
+            member_groups = SimilarityService.find_similar_groups(filters, similarity_threshold)
+            page, totals['total_groups'], totals['total_duplicates'] = DuplicateService.page_member_groups(
+                member_groups, min_group_size, group_order, group_offset, group_limit
+            )
+            yield from SimilarityService.build_groups(page, sort_by, sort_order, group_offset)
+            return
+
+        query, params = DuplicateService.build_duplicate_query(
+            duplicate_type,
+            filters,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            use_index=use_index,
+            min_group_size=min_group_size,
+            group_order=group_order,
+            group_offset=group_offset,
+            group_limit=group_limit
+        )
+
+        # ページ指定時は結果がページ分に限られるため準備済みステートメントで取得し、
+        # 全件の場合はサーバーサイドカーソルで読み進める
+        if group_limit is not None:
+            rows = db_manager.execute_prepared(query, params)
+        else:
+            rows = db_manager.iter_query(query, params, name="duplicate_scan")
+
+        def member_rows():
+            for row in rows:
+                if not totals:
+                    totals['total_groups'] = row['total_groups']
+                    totals['total_duplicates'] = row['total_duplicates']
+                # 条件に合うグループがない場合は集計行のみが返る
+                if row['id'] is not None:
+                    yield row
+
+        yield from DuplicateService.group_rows(member_rows(), duplicate_type, group_offset, min_group_size)
+
+    @staticmethod
+    def group_rows(
+        rows: Iterable[dict],
+        duplicate_type: str,
+        group_count: int = 0,
+        min_group_size: int = 2
+    ) -> Iterator[DuplicateGroup]:
+        """グループ順に連続する行（group_pos 付き）を重複グループにまとめて1件ずつ返す
+
+        グループが変わった時点で直前のグループを確定する（指紋衝突の分割・件数条件を適用）。
+        group_count は最初のグループの group_id の番号。
+        """
+        current_pos = None
+        candidates = []
+        for row in rows:
+            if row['group_pos'] != current_pos:
+                for group in DuplicateService._build_groups(candidates, group_count, min_group_size):
+                    group_count += 1
+                    yield group
+                current_pos = row['group_pos']
+                candidates = []
+
+            DuplicateService._add_candidate_row(candidates, duplicate_type, row)
+
+        for group in DuplicateService._build_groups(candidates, group_count, min_group_size):
+            yield group
+
+    @staticmethod
+    @metrics.instrumented
+    def get_group_summaries(
+        duplicate_type: str,
+        filters: Optional[FilterRequest] = None,
+        use_index: bool = True,
+        similarity_threshold: float = 0.8,
+        min_group_size: int = 2,
+        group_order: str = "first_id",
+        group_offset: int = 0,
+        group_limit: Optional[int] = None
+    ) -> Tuple[List[DuplicateGroupSummary], int, int]:
+        """グループの概要（件数・重複キー・最小ID）のみをページ単位で取得
+
+        メンバーのレコードは取得しないため、一覧の初期表示を軽量にできる。
+        メンバーは get_group_members でグループごとに取得する。
+        """
+        params = {
+            "duplicate_type": duplicate_type,
+            "use_index": use_index,
+            "similarity_threshold": similarity_threshold if duplicate_type == "similar" else None,
+            "min_group_size": min_group_size,
+            "group_order": group_order,
+            "group_offset": group_offset,
+            "group_limit": group_limit,
+        }
+        return result_cache.get_or_load(
+            "duplicate_groups", filters, params,
+            lambda: DuplicateService._load_group_summaries(
+                duplicate_type, filters, use_index, similarity_threshold,
+                min_group_size, group_order, group_offset, group_limit
+            )
+        )
+
+    @staticmethod
+    def _load_group_summaries(
+        duplicate_type: str,
+        filters: Optional[FilterRequest],
+        use_index: bool,
+        similarity_threshold: float,
+        min_group_size: int,
+        group_order: str,
+        group_offset: int,
+        group_limit: Optional[int]
+    ) -> Tuple[List[DuplicateGroupSummary], int, int]:
+        if duplicate_type == "similar":
+            groups, total_groups, total_duplicates = DuplicateService.get_duplicate_page(
+                duplicate_type,
+                filters,
+                similarity_threshold=similarity_threshold,
+                min_group_size=min_group_size,
+                group_order=group_order,
+                group_offset=group_offset,
+                group_limit=group_limit
+            )
+            summaries = [
+                DuplicateGroupSummary(
+                    group_id=group.group_id,
+                    first_id=min(record.id for record in group.records),
+                    duplicate_count=group.duplicate_count,
+                    duplicate_key=group.duplicate_key
+                )
+                for group in groups
+            ]
+            return summaries, total_groups, total_duplicates
+
+        query, params = DuplicateService.build_duplicate_query(
+            duplicate_type,
+            filters,
+            use_index=use_index,
+            min_group_size=min_group_size,
+            group_order=group_order,
+            group_offset=group_offset,
+            group_limit=group_limit,
+            summary=True
+        )
+        result = db_manager.execute_prepared(query, params)
+
+        summaries = []
+        for row in result:
+            if row['id'] is None:
+                continue
+            summaries.append(DuplicateGroupSummary(
+                group_id=f"group_{group_offset + len(summaries)}",
+                first_id=row['group_first_id'],
+                duplicate_count=row['duplicate_count'],
+                duplicate_key=DuplicateService.build_duplicate_key(duplicate_type, row)
+            ))
+        total_groups = result[0]['total_groups'] if result else 0
+        total_duplicates = result[0]['total_duplicates'] if result else 0
+        return summaries, total_groups, total_duplicates
+
+    @staticmethod
+    @metrics.instrumented
+    def get_group_members(
+        duplicate_type: str,
+        record_id: int,
+        filters: Optional[FilterRequest] = None,
+        sort_by: str = None,
+        sort_order: str = None,
+        use_index: bool = True,
+        similarity_threshold: float = 0.8
+    ) -> Optional[DuplicateGroup]:
+        """指定レコードが属する重複グループのメンバーを取得（該当なしはNone）
+
+        指紋が指定レコードと一致する行だけを対象にするため、式インデックスで直接引ける。
+        """
+        if duplicate_type == "similar":
+            from services.similarity_service import SimilarityService
+            member_groups = SimilarityService.find_similar_groups(filters, similarity_threshold)
+            members = next((g for g in member_groups if record_id in g), None)
+            if members is None:
+                return None
+            groups = SimilarityService.build_groups([members], sort_by, sort_order)
+            return groups[0] if groups else None
+
+        target_fingerprints = DuplicateService.get_target_fingerprints(duplicate_type, record_id)
+        if target_fingerprints is None:
+            return None
+        query, params = DuplicateService.build_duplicate_query(
+            duplicate_type,
+            filters,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            use_index=use_index,
+            target_fingerprints=target_fingerprints
+        )
+        groups = []
+        for row in db_manager.execute_prepared(query, params):
+            if row['id'] is not None:
+                DuplicateService._add_candidate_row(groups, duplicate_type, row)
+
+        # 指紋衝突で分割された場合は指定レコードを含む側を返す
+        for group in DuplicateService._build_groups(groups, 0, 2):
+            if any(record.id == record_id for record in group.records):
+                return group
+        return None
+
+    @staticmethod
+    def get_target_fingerprints(duplicate_type: str, record_id: int) -> Optional[Dict[str, Optional[str]]]:
+        """指定レコードの指紋（指紋列 → 値、受付内容が NULL の場合は None、レコードがない場合は None）"""
+        if duplicate_type not in DUPLICATE_TYPE_DEFINITIONS:
+            raise ValueError(f"Invalid duplicate_type: {duplicate_type}")
+        fingerprint_columns, _ = DUPLICATE_TYPE_DEFINITIONS[duplicate_type]
+        fingerprint_select = ", ".join(
+            f"{FINGERPRINT_INDEX_EXPRESSIONS[alias]} AS {alias}" for alias in fingerprint_columns
+        )
+        rows = db_manager.execute_query(
+            f"SELECT {fingerprint_select} FROM recepthead"
+            f"{QueryBuilder.build_join_clause(fingerprint_select)} WHERE recepthead.extentid = %s",
+            (record_id,)
+        )
+        return {alias: rows[0][alias] for alias in fingerprint_columns} if rows else None
+
+    @staticmethod
+    def page_member_groups(
+        member_groups: List[List[int]],
+        min_group_size: int = 2,
+        group_order: str = "first_id",
+        group_offset: int = 0,
+        group_limit: Optional[int] = None
+    ) -> Tuple[List[List[int]], int, int]:
+        """メンバーIDのグループ（最小IDの昇順）に件数条件・並び順・ページングを適用"""
+        groups = [members for members in member_groups if len(members) >= min_group_size]
+        if group_order == "size":
+            # 安定ソートのため同件数内は最小IDの昇順が保たれる
+            groups.sort(key=len, reverse=True)
+        total_duplicates = sum(len(members) for members in groups)
+        end = None if group_limit is None else group_offset + group_limit
+        return groups[group_offset:end], len(groups), total_duplicates
+
+    @staticmethod
+    def _add_candidate_row(candidates: list, duplicate_type: str, row: dict):
+        """同一グループの候補に行を追加
+
+        指紋の一致したグループ内で全文を比較し、衝突時は別の候補に分割する。
+        行は重複情報を書き込んだうえでそのままレコードの検証に使う（集計列は無視される）。
+        """
+        compare_value = DuplicateService.get_compare_value(duplicate_type, row)
+        group = next((g for g in candidates if g['compare_value'] == compare_value), None)
+        if group is None:
+            group = {
+                'compare_value': compare_value,
+                'duplicate_key': DuplicateService.build_duplicate_key(duplicate_type, row),
+                'records': []
+            }
+            candidates.append(group)
+
+        # レコード作成（duplicate_count はグループの件数のためレコードには含めない）
+        row['duplicate_count'] = None
+        row['duplicate_type'] = duplicate_type
+        row['duplicate_key'] = group['duplicate_key']
+        group['records'].append(ReceptionDataRecord.model_validate(row))
+
+    @staticmethod
+    def _build_groups(candidates: list, group_count: int, min_group_size: int = 2) -> List[DuplicateGroup]:
+        """同一グループに属する候補からDuplicateGroupを生成"""
+        duplicate_groups = []
+        for group in candidates:
+            # 指紋衝突で分割された結果、件数が条件を下回ったものは除外する
+            if len(group['records']) < max(2, min_group_size):
+                continue
+            duplicate_groups.append(DuplicateGroup(
+                group_id=f"group_{group_count + len(duplicate_groups)}",
+                duplicate_count=len(group['records']),
+                duplicate_key=group['duplicate_key'],
+                records=group['records']
+            ))
+        return duplicate_groups
+
+    @staticmethod
+    def build_duplicate_query(
+        duplicate_type: str,
+        filters: Optional[FilterRequest] = None,
+        sort_by: str = None,
+        sort_order: str = None,
+        use_index: bool = True,
+        min_group_size: int = 2,
+        group_order: str = "first_id",
+        group_offset: int = 0,
+        group_limit: Optional[int] = None,
+        target_fingerprints: Optional[Dict[str, Optional[str]]] = None,
+        summary: bool = False,
+        with_totals: bool = True
+    ) -> Tuple[str, tuple]:
+        """重複検出クエリとパラメータを構築
+
+        1. fingerprints: 対象行のIDと指紋のみ（全文は保持しない）
+        2. groups: 指紋ごとの件数・最小ID（min_group_size 未満は除外）
+        3. page: グループの並び順で番号付けし、group_offset/group_limit で切り出す
+        4. ページ内のグループのメンバーだけを結合し直して表示列を取得する
+           （summary=True の場合は各グループの最小IDの行のみ）
+        全グループの件数は集計行（stats）から LEFT JOIN ... ON TRUE で全行に付加される。
+        target_fingerprints（get_target_fingerprints の結果）を指定すると、指紋が一致する行に限定する。
+        with_totals=False の場合は集計行を付けずメンバーの行のみを返す（エクスポート用）。
+        """
+        if duplicate_type not in DUPLICATE_TYPE_DEFINITIONS:
+            raise ValueError(f"Invalid duplicate_type: {duplicate_type}")
+        if group_order not in GROUP_ORDER_BY:
+            raise ValueError(f"Invalid group_order: {group_order}")
+        fingerprint_columns, additional_where = DUPLICATE_TYPE_DEFINITIONS[duplicate_type]
 
         # フィルター条件構築
         filter_where, filter_params = "", []
         if filters:
             filter_where, filter_params = DataService.build_filter_conditions(filters)
 
-        if duplicate_type == "exact":
-            partition_by = "receptbody.rdata, COALESCE(execbody.execstate, '')"
-            duplicate_key = "CONCAT(COALESCE(receptbody.rdata, ''), '|', COALESCE(execbody.execstate, ''))"
-            additional_where = "AND recepthead.receptmoddt IS NULL"
-        elif duplicate_type == "content":
-            partition_by = "receptbody.rdata"
-            duplicate_key = "COALESCE(receptbody.rdata, '')"
-            additional_where = "AND receptbody.rdata IS NOT NULL AND receptbody.rdata != '' AND recepthead.receptmoddt IS NULL"
-        elif duplicate_type == "status":
-            partition_by = "COALESCE(execbody.execstate, '')"
-            duplicate_key = "COALESCE(execbody.execstate, '')"
-            additional_where = "AND COALESCE(execbody.execstate, '') != '' AND recepthead.receptmoddt IS NULL"
+        # 重複グループインデックスによる候補行の絞り込み
+        candidate_where, candidate_params = "", []
+        if use_index and DuplicateIndexService.ensure_fresh():
+            candidate_where, candidate_params = DuplicateIndexService.build_candidate_condition(duplicate_type)
+
+        fingerprint_aliases = ", ".join(fingerprint_columns.keys())
+        fingerprint_select = ", ".join(f"{expr} AS {alias}" for alias, expr in fingerprint_columns.items())
+
+        # 指定レコードと同じ指紋の行に限定（グループメンバーの個別取得用）
+        # 式インデックスで引けるよう、NULL 以外は式インデックスの式との等号で比較する
+        target_where, target_params = "", []
+        if target_fingerprints is not None:
+            for alias, value in target_fingerprints.items():
+                if value is None:
+                    target_where += f"\n            AND {FINGERPRINT_INDEX_EXPRESSIONS[alias]} IS NULL"
+                else:
+                    target_where += f"\n            AND {FINGERPRINT_INDEX_EXPRESSIONS[alias]} = %s"
+                    target_params.append(value)
+
+        if summary:
+            detail_query = f"""
+            SELECT
+                {RECEPTION_SELECT_COLUMNS},
+                page.group_first_id,
+                page.group_pos,
+                page.duplicate_count
+            FROM page
+            JOIN recepthead ON recepthead.extentid = page.group_first_id{QueryBuilder.build_join_clause(RECEPTION_SELECT_COLUMNS)}"""
+            order_by = "group_pos"
         else:
-            raise ValueError(f"Invalid duplicate_type: {duplicate_type}")
+            detail_query = f"""
+            SELECT
+                {RECEPTION_SELECT_COLUMNS},
+                members.group_first_id,
+                members.group_pos,
+                members.duplicate_count
+            FROM members
+            JOIN recepthead ON recepthead.extentid = members.id{QueryBuilder.build_join_clause(RECEPTION_SELECT_COLUMNS)}"""
+            order_by = DuplicateService.build_duplicate_order_by(sort_by, sort_order)
+
+        if with_totals:
+            result_select = f"""SELECT stats.total_groups, stats.total_duplicates, detail.*
+        FROM stats
+        LEFT JOIN ({detail_query}
+        ) AS detail ON TRUE"""
+        else:
+            result_select = f"""SELECT detail.*
+        FROM ({detail_query}
+        ) AS detail"""
+
+        fingerprints_from = QueryBuilder.build_from_clause(
+            fingerprint_select, additional_where, candidate_where, target_where, filter_where
+        )
 
         query = f"""
-        WITH duplicates AS (
+        WITH fingerprints AS (
             SELECT
                 recepthead.extentid AS id,
-                receptbody.rdata AS content,
-                COALESCE(execbody.execstate, '') AS status,
-                COALESCE(execbody.execresult, '') AS result,
-                COALESCE(execbody.execinfo, '') AS report,
-                cond_item.itemname AS progress,
-                stype_item.itemname AS system_type,
-                prod_item.itemname AS product,
-                recepthead.receptmoddt AT TIME ZONE 'Asia/Tokyo' AS reception_moddt,
-                recepthead.calldt AT TIME ZONE 'Asia/Tokyo' AS reception_datetime,
-                COALESCE(receptbody.moddt, recepthead.calldt) AT TIME ZONE 'Asia/Tokyo' AS update_datetime,
-                ROW_NUMBER() OVER (
-                    PARTITION BY {partition_by}
-                    ORDER BY recepthead.extentid
-                ) as row_num,
-                COUNT(*) OVER (
-                    PARTITION BY {partition_by}
-                ) as duplicate_count,
-                {duplicate_key} as duplicate_key
-            FROM recepthead
-            LEFT JOIN m_emp ON recepthead.receptempcd = m_emp.empcd
-            LEFT JOIN exechead ON recepthead.receptno = exechead.receptno
-            LEFT JOIN m_ctitem AS cond_item ON exechead.condition = cond_item.itemcd
-            LEFT JOIN receptbody ON recepthead.receptno = receptbody.receptno
-            LEFT JOIN execbody ON recepthead.receptno = execbody.receptno
-            LEFT JOIN m_ctitem AS stype_item ON exechead.stype = stype_item.itemcd
-            LEFT JOIN m_ctitem AS prod_item ON exechead.producttype = prod_item.itemcd
-            WHERE recepthead.extentid IS NOT NULL
-            AND recepthead.extentid != 0
-            AND (
-                recepthead.calldt >= '2015-01-01 00:00:00'
-                OR receptbody.moddt >= '2015-01-01 00:00:00'
-            )
+                {fingerprint_select}
+            {fingerprints_from}
             {additional_where}
+            {candidate_where}
+            {target_where}
             {filter_where}
+        ),
+        groups AS (
+            SELECT
+                {fingerprint_aliases},
+                COUNT(*) AS duplicate_count,
+                MIN(id) AS group_first_id
+            FROM fingerprints
+            GROUP BY {fingerprint_aliases}
+            HAVING COUNT(*) >= %s
+        ),
+        stats AS (
+            SELECT
+                COUNT(*) AS total_groups,
+                COALESCE(SUM(duplicate_count), 0)::bigint AS total_duplicates
+            FROM groups
+        ),
+        page AS (
+            SELECT
+                groups.*,
+                ROW_NUMBER() OVER (ORDER BY {GROUP_ORDER_BY[group_order]}) AS group_pos
+            FROM groups
+            ORDER BY group_pos
+            LIMIT %s OFFSET %s
+        ),
+        members AS (
+            SELECT fingerprints.id, page.group_first_id, page.group_pos, page.duplicate_count
+            FROM page
+            JOIN fingerprints USING ({fingerprint_aliases})
+        )
+        {result_select}
+        ORDER BY {order_by}
+        """
+
+        params = candidate_params + target_params + filter_params + [max(2, min_group_size), group_limit, group_offset]
+        return query, tuple(params)
+
+    @staticmethod
+    def build_member_groups_query(
+        groups: List[List[int]],
+        sort_by: str = None,
+        sort_order: str = None
+    ) -> Tuple[str, tuple]:
+        """メンバーIDのグループ（グループ順）から重複検出クエリと同じ列の行を返すクエリを構築
+
+        グループ番号（group_pos）は groups の順に1から振る。類似グループのエクスポートや
+        スナップショットのグループのように、グループ分けを済ませたメンバーの表示列を取得する。
+        """
+        member_ids, first_ids, positions, counts = [], [], [], []
+        for position, members in enumerate(groups, start=1):
+            for member_id in members:
+                member_ids.append(member_id)
+                first_ids.append(members[0])
+                positions.append(position)
+                counts.append(len(members))
+
+        query = f"""
+        WITH members AS (
+            SELECT *
+            FROM unnest(%s::bigint[], %s::bigint[], %s::bigint[], %s::bigint[])
+                AS members(id, group_first_id, group_pos, duplicate_count)
         )
-        SELECT
-            id,
-            content,
-            status,
-            result,
-            report,
-            progress,
-            system_type,
-            product,
-            reception_moddt,
-            reception_datetime,
-            update_datetime,
-            duplicate_count,
-            duplicate_key
-        FROM duplicates
-        WHERE duplicate_count > 1
+        SELECT detail.*
+        FROM (
+            SELECT
+                {RECEPTION_SELECT_COLUMNS},
+                members.group_first_id,
+                members.group_pos,
+                members.duplicate_count
+            FROM members
+            JOIN recepthead ON recepthead.extentid = members.id{QueryBuilder.build_join_clause(RECEPTION_SELECT_COLUMNS)}
+        ) AS detail
         ORDER BY {DuplicateService.build_duplicate_order_by(sort_by, sort_order)}
         """
+        return query, (member_ids, first_ids, positions, counts)
 
-        result = db_manager.execute_query(query, tuple(filter_params))
+    @staticmethod
+    def get_compare_value(duplicate_type: str, row: dict):
+        """指紋衝突の確認に用いる全文の比較値"""
+        if duplicate_type == "exact":
+            return (row['content'], row['status'])
+        if duplicate_type == "content":
+            return row['content']
+        return row['status']
 
-        # グループ化
-        groups = {}
-        for row in result:
-            key = row['duplicate_key']
-            if key not in groups:
-                groups[key] = {
-                    'group_id': f"group_{len(groups)}",
-                    'duplicate_key': key,
-                    'duplicate_count': row['duplicate_count'],
-                    'records': []
-                }
-            
-            # レコード作成（duplicate_count除外）
-            record_data = {k: v for k, v in row.items() if k not in ['duplicate_count']}
-            record_data['duplicate_type'] = duplicate_type
-            
-            groups[key]['records'].append(ReceptionDataRecord(**record_data))
-
-        return [DuplicateGroup(**group) for group in groups.values()]
\ No newline at end of file
+    @staticmethod
+    def build_duplicate_key(duplicate_type: str, row: dict) -> str:
+        """表示用の重複キー（グループにつき1回だけ生成）"""
+        if duplicate_type == "exact":
+            return f"{row['content'] or ''}|{row['status']}"
+        if duplicate_type == "content":
+            return row['content'] or ''
+        return row['status']
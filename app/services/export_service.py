@@ -0,0 +1,196 @@
+from typing import Iterator, Optional, Tuple
+import csv
+import io
+import itertools
+from models.request_models import FilterRequest
+from services.data_service import DataService, RECEPTION_SELECT_COLUMNS
+from services.duplicate_service import DuplicateService
+from services.query_builder import QueryBuilder
+from database import db_manager
+from config.export_config import ExportConfig
+
+# Parquet は任意（pyarrow 未インストール時は CSV のみ）
+try:
+    import pyarrow
+    import pyarrow.csv
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# CSV から Parquet へ変換する際の列の型（その他の列は文字列、推定はしない）
+EXPORT_INTEGER_COLUMNS = ("id", "group_first_id", "group_pos", "duplicate_count")
+EXPORT_TIMESTAMP_COLUMNS = ("reception_moddt", "reception_datetime", "update_datetime")
+
+class ChunkReader(io.RawIOBase):
+    """バイト列のイテレーターを読み取り用のファイルとして扱う（pyarrow の CSV リーダー用）"""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            self._pending = next(self._chunks, b"")
+            if not self._pending:
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+class ChunkSink(io.RawIOBase):
+    """書き込まれたバイト列を溜め、drain で取り出す書き込み先（Parquet の逐次送信用）"""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+class ExportService:
+    """検索結果・重複グループの一括出力（COPY ... TO STDOUT による CSV / Parquet）
+
+    一覧・重複検出と同じ条件のクエリを COPY で実行し、出力をチャンク単位で逐次返す。
+    結果全体を保持しないため、件数によらずメモリ使用量は一定。
+    """
+
+    @staticmethod
+    def is_parquet_available() -> bool:
+        """pyarrow を利用できるかどうか"""
+        return pyarrow is not None
+
+    @staticmethod
+    def build_reception_query(
+        filters: Optional[FilterRequest] = None,
+        sort_by: str = "reception_datetime",
+        sort_order: str = "desc"
+    ) -> Tuple[str, tuple]:
+        """受信データのエクスポート用クエリ（一覧と同じ条件・並び順、同順位はID順）"""
+        filter_where, filter_params = "", []
+        if filters:
+            filter_where, filter_params = DataService.build_filter_conditions(filters)
+
+        sort_spec = DataService.build_keyset_sort_spec(sort_by, sort_order)
+        order_by = " ORDER BY " + ", ".join(f"{expr} {direction}" for _, expr, direction in sort_spec)
+        query = f"""
+        SELECT {RECEPTION_SELECT_COLUMNS}
+        {QueryBuilder.build_from_clause(RECEPTION_SELECT_COLUMNS, filter_where, order_by)}
+        {filter_where}
+        {order_by}
+        """
+        return query, tuple(filter_params)
+
+    @staticmethod
+    def build_duplicate_query(
+        duplicate_type: str,
+        filters: Optional[FilterRequest] = None,
+        sort_by: str = None,
+        sort_order: str = None,
+        similarity_threshold: float = 0.8,
+        min_group_size: int = 2,
+        group_order: str = "first_id"
+    ) -> Tuple[str, tuple]:
+        """重複グループのエクスポート用クエリ（全グループのメンバーをグループ順に1行ずつ）
+
+        各行にグループの最小ID（group_first_id）・グループ番号（group_pos）・件数（duplicate_count）を付加する。
+        exact/content/status は重複検出と同じクエリ（指紋によるグループ化）をそのまま COPY で実行する。
+        similar は類似グループの検出後、メンバーIDとグループ番号を配列で渡して COPY で取得する。
+        """
+        if duplicate_type != "similar":
+            return DuplicateService.build_duplicate_query(
+                duplicate_type,
+                filters,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                min_group_size=min_group_size,
+                group_order=group_order,
+                with_totals=False
+            )
+
+        # NumPyを要するため必要時のみ読み込む
+        from services.similarity_service import SimilarityService
+        member_groups = SimilarityService.find_similar_groups(filters, similarity_threshold)
+        groups, _, _ = DuplicateService.page_member_groups(member_groups, min_group_size, group_order)
+        return DuplicateService.build_member_groups_query(groups, sort_by, sort_order)
+
+    @staticmethod
+    def iter_csv(query: str, params: tuple) -> Iterator[bytes]:
+        """クエリの結果をヘッダー付きの CSV（UTF-8）としてチャンク単位で返す"""
+        return db_manager.iter_copy(
+            query,
+            params,
+            options="FORMAT csv, HEADER, ENCODING 'UTF8'",
+            chunk_bytes=ExportConfig.get_chunk_bytes(),
+            queue_chunks=ExportConfig.get_queue_chunks()
+        )
+
+    @staticmethod
+    def iter_parquet(query: str, params: tuple) -> Iterator[bytes]:
+        """クエリの結果を Parquet としてチャンク単位で返す
+
+        COPY の CSV 出力を pyarrow でブロックごとに読み取り、行グループ
+        （EXPORT_PARQUET_ROW_GROUP_ROWS 行）ごとに書き出して送信する（メモリは1行グループ分）。
+        """
+        if pyarrow is None:
+            raise RuntimeError("Parquet の出力には pyarrow が必要です")
+
+        chunks = ExportService.iter_csv(query, params)
+        try:
+            # 先頭のチャンクのヘッダー行から列の型を決める（ブロックごとの型推定で型が揺れないように）
+            first = next(chunks, b"")
+            header = next(csv.reader([first.split(b"\n", 1)[0].decode("utf-8")]), [])
+            column_types = {}
+            for column in header:
+                if column in EXPORT_INTEGER_COLUMNS:
+                    column_types[column] = pyarrow.int64()
+                elif column in EXPORT_TIMESTAMP_COLUMNS:
+                    column_types[column] = pyarrow.timestamp("us", tz="UTC")
+                else:
+                    column_types[column] = pyarrow.string()
+
+            reader = pyarrow.csv.open_csv(
+                io.BufferedReader(ChunkReader(itertools.chain([first], chunks)), buffer_size=ExportConfig.get_chunk_bytes()),
+                read_options=pyarrow.csv.ReadOptions(block_size=ExportConfig.get_chunk_bytes() * 4),
+                convert_options=pyarrow.csv.ConvertOptions(
+                    column_types=column_types,
+                    # COPY の CSV では NULL は空欄、空文字は "" で出力される
+                    strings_can_be_null=True,
+                    quoted_strings_can_be_null=False
+                )
+            )
+            schema = reader.schema
+            sink = ChunkSink()
+            writer = pyarrow.parquet.ParquetWriter(sink, schema, compression=ExportConfig.get_parquet_compression())
+            row_group_rows = ExportConfig.get_parquet_row_group_rows()
+            batches, rows = [], 0
+            for batch in reader:
+                batches.append(batch)
+                rows += batch.num_rows
+                if rows >= row_group_rows:
+                    writer.write_table(pyarrow.Table.from_batches(batches, schema), row_group_size=rows)
+                    batches, rows = [], 0
+                    yield sink.drain()
+            if batches:
+                writer.write_table(pyarrow.Table.from_batches(batches, schema), row_group_size=rows)
+            writer.close()
+            yield sink.drain()
+        finally:
+            chunks.close()
@@ -0,0 +1,122 @@
+from typing import Dict, List, Optional
+from database import db_manager
+
+# 本システムが利用する補助インデックスの定義
+# expression は検索側のSQL式と一致させること（一致しないとプランナが使用しない）
+INDEX_DEFINITIONS = [
+    {
+        "name": "idx_receptbody_rdata_fp",
+        "table": "receptbody",
+        "expression": "(md5(rdata)::uuid)",
+        "method": "btree",
+        "description": "受付内容の指紋（重複検出 content/exact）",
+    },
+    {
+        "name": "idx_execbody_execstate_fp",
+        "table": "execbody",
+        "expression": "(md5(COALESCE(execstate, ''))::uuid)",
+        "method": "btree",
+        "description": "対応状況の指紋（重複検出 status/exact）",
+    },
+    {
+        "name": "idx_recepthead_calldt",
+        "table": "recepthead",
+        "expression": "calldt",
+        "method": "btree",
+        "description": "受信日時（重複グループインデックスの差分同期）",
+    },
+    {
+        "name": "idx_recepthead_receptmoddt",
+        "table": "recepthead",
+        "expression": "receptmoddt",
+        "method": "btree",
+        "description": "削除日時（重複グループインデックスの差分同期）",
+    },
+    {
+        "name": "idx_receptbody_moddt",
+        "table": "receptbody",
+        "expression": "moddt",
+        "method": "btree",
+        "description": "受付内容の更新日時（重複グループインデックスの差分同期）",
+    },
+]
+
+class IndexService:
+    @staticmethod
+    def get_index_definitions() -> List[dict]:
+        """管理対象インデックスの定義一覧"""
+        return list(INDEX_DEFINITIONS)
+
+    @staticmethod
+    def build_create_statement(definition: dict, concurrently: bool = True) -> str:
+        """CREATE INDEX文を構築"""
+        concurrent = "CONCURRENTLY " if concurrently else ""
+        return (
+            f"CREATE INDEX {concurrent}IF NOT EXISTS {definition['name']} "
+            f"ON {definition['table']} USING {definition['method']} ({definition['expression']})"
+        )
+
+    @staticmethod
+    def get_index_status(definitions: Optional[List[dict]] = None) -> List[Dict]:
+        """管理対象インデックスの存在・有効状態を取得（definitions 省略時は INDEX_DEFINITIONS）"""
+        definitions = INDEX_DEFINITIONS if definitions is None else definitions
+        names = [definition["name"] for definition in definitions]
+        status_query = """
+        SELECT
+            index_class.relname AS name,
+            pg_index.indisvalid AS is_valid,
+            pg_index.indisready AS is_ready,
+            pg_get_indexdef(pg_index.indexrelid) AS indexdef,
+            pg_relation_size(pg_index.indexrelid) AS size_bytes
+        FROM pg_index
+        JOIN pg_class AS index_class ON index_class.oid = pg_index.indexrelid
+        WHERE index_class.relname = ANY(%s)
+        """
+        rows = {row['name']: row for row in db_manager.execute_query(status_query, (names,))}
+
+        status = []
+        for definition in definitions:
+            row = rows.get(definition["name"])
+            status.append({
+                "name": definition["name"],
+                "table": definition["table"],
+                "description": definition["description"],
+                "exists": row is not None,
+                "valid": bool(row and row['is_valid'] and row['is_ready']),
+                "indexdef": row['indexdef'] if row else None,
+                "size_bytes": row['size_bytes'] if row else None,
+            })
+        return status
+
+    @staticmethod
+    def create_indexes(concurrently: bool = True, definitions: Optional[List[dict]] = None) -> List[Dict]:
+        """管理対象インデックスを作成（無効なインデックスは再作成）
+
+        CONCURRENTLY はトランザクション内で実行できないため、自動コミットの接続で実行する。
+        """
+        definitions = INDEX_DEFINITIONS if definitions is None else definitions
+        invalid = {
+            item["name"] for item in IndexService.get_index_status(definitions)
+            if item["exists"] and not item["valid"]
+        }
+
+        with db_manager.get_connection() as conn:
+            conn.autocommit = True
+            try:
+                with conn.cursor() as cursor:
+                    for definition in definitions:
+                        if definition["name"] in invalid:
+                            # 中断されたCONCURRENTLY作成の残骸を削除
+                            drop = "DROP INDEX CONCURRENTLY IF EXISTS" if concurrently else "DROP INDEX IF EXISTS"
+                            cursor.execute(f"{drop} {definition['name']}")
+                        print(f"作成中: {definition['name']} ({definition['description']})")
+                        cursor.execute(IndexService.build_create_statement(definition, concurrently))
+            finally:
+                conn.autocommit = False
+
+        return IndexService.get_index_status(definitions)
+
+    @staticmethod
+    def validate_indexes(definitions: Optional[List[dict]] = None) -> bool:
+        """管理対象インデックスがすべて存在し有効かを検証"""
+        return all(item["valid"] for item in IndexService.get_index_status(definitions))
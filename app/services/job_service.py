@@ -0,0 +1,554 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from fastapi.encoders import jsonable_encoder
+from psycopg2.extras import Json, execute_values
+from models.request_models import DeleteRequest, RestoreRequest, FilterRequest
+from services.delete_service import DeleteService
+from services.restore_service import RestoreService
+from services.bulk_delete_service import BulkDeleteService
+from services.duplicate_service import DuplicateService
+from database import db_manager
+from config.job_config import JobConfig
+
+# ジョブの状態
+JOB_STATUS_QUEUED = "queued"
+JOB_STATUS_RUNNING = "running"
+JOB_STATUS_SUCCEEDED = "succeeded"
+JOB_STATUS_FAILED = "failed"
+JOB_STATUS_CANCELLED = "cancelled"
+JOB_STATUS_INTERRUPTED = "interrupted"   # プロセスの停止により中断
+FINISHED_STATUSES = (JOB_STATUS_SUCCEEDED, JOB_STATUS_FAILED, JOB_STATUS_CANCELLED, JOB_STATUS_INTERRUPTED)
+
+SCHEMA_STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS background_job (
+        job_id varchar(32) PRIMARY KEY,
+        job_type varchar(32) NOT NULL,
+        status varchar(16) NOT NULL,
+        params jsonb NOT NULL,
+        progress jsonb,
+        result jsonb,
+        error text,
+        cancel_requested boolean NOT NULL DEFAULT FALSE,
+        created_at timestamp NOT NULL DEFAULT LOCALTIMESTAMP,
+        started_at timestamp,
+        finished_at timestamp,
+        owner_host varchar(255),
+        owner_pid integer,
+        heartbeat_at timestamp
+    )
+    """,
+    # 所有プロセスの列がない以前のテーブルへの追加
+    "ALTER TABLE background_job ADD COLUMN IF NOT EXISTS owner_host varchar(255)",
+    "ALTER TABLE background_job ADD COLUMN IF NOT EXISTS owner_pid integer",
+    "ALTER TABLE background_job ADD COLUMN IF NOT EXISTS heartbeat_at timestamp",
+    "CREATE INDEX IF NOT EXISTS idx_background_job_created_at ON background_job (created_at)",
+    # 件数が多い結果（重複検出のグループなど）は1件ずつ保存し、ページ単位で取得する
+    """
+    CREATE TABLE IF NOT EXISTS background_job_result (
+        job_id varchar(32) NOT NULL REFERENCES background_job (job_id) ON DELETE CASCADE,
+        position integer NOT NULL,
+        item jsonb NOT NULL,
+        PRIMARY KEY (job_id, position)
+    )
+    """,
+]
+
+# ジョブを所有するプロセスのホスト名（プロセスIDと組み合わせて識別する）
+OWNER_HOST = socket.gethostname()[:255]
+
+# 一覧・状態取得で返す列（結果本体は別途取得する）
+JOB_STATUS_COLUMNS = """
+    job_id, job_type, status, params, progress, error, cancel_requested,
+    created_at, started_at, finished_at, owner_host, owner_pid, heartbeat_at
+"""
+
+class JobCancelledError(Exception):
+    """ジョブのキャンセル要求を検知した場合の例外"""
+    pass
+
+class JobQueueFullError(Exception):
+    """未完了ジョブ数が上限に達している場合の例外"""
+    pass
+
+class JobContext:
+    """実行中のジョブから進捗の保存とキャンセルの確認を行うためのハンドル"""
+
+    def __init__(self, job_id: str, cancel_event: threading.Event):
+        self.job_id = job_id
+        self.cancel_event = cancel_event
+        self.progress: Dict[str, Any] = {}
+        self._last_saved = 0.0
+        self.result_count = 0          # background_job_result に保存した（保存待ちを含む）件数
+        self.result_truncated = False  # 合計サイズの上限に達し、以降の結果を保存しなかったか
+        self._result_bytes = 0
+        self._pending_results: List[tuple] = []
+
+    def report_progress(self, progress: Dict[str, Any], force: bool = False):
+        """進捗を記録（保存は JOB_PROGRESS_INTERVAL 秒ごと、保存時に他プロセスからのキャンセル要求も確認）"""
+        self.progress = progress
+        now = time.monotonic()
+        if not force and now - self._last_saved < JobConfig.get_progress_interval():
+            return
+        self._last_saved = now
+        row = db_manager.execute_returning(
+            """
+            UPDATE background_job SET progress = %s, heartbeat_at = LOCALTIMESTAMP
+            WHERE job_id = %s
+            RETURNING cancel_requested
+            """,
+            (Json(jsonable_encoder(progress)), self.job_id)
+        )
+        if row and row['cancel_requested']:
+            self.cancel_event.set()
+
+    def append_result(self, item: Any) -> bool:
+        """結果を1件追加（JOB_RESULT_PAGE_SIZE 件ごとに保存、上限を超えた場合は保存せず False）"""
+        if self.result_truncated:
+            return False
+        data = json.dumps(jsonable_encoder(item), ensure_ascii=False)
+        size = len(data.encode())
+        if self._result_bytes + size > JobConfig.get_result_max_bytes():
+            self.result_truncated = True
+            return False
+        self._result_bytes += size
+        self._pending_results.append((self.job_id, self.result_count, data))
+        self.result_count += 1
+        if len(self._pending_results) >= JobConfig.get_result_page_size():
+            self.flush_results()
+        return True
+
+    def flush_results(self):
+        """保存待ちの結果を background_job_result へ保存"""
+        if not self._pending_results:
+            return
+        with db_manager.get_connection() as conn:
+            with conn.cursor() as cursor:
+                execute_values(
+                    cursor,
+                    "INSERT INTO background_job_result (job_id, position, item) VALUES %s",
+                    self._pending_results,
+                    template="(%s, %s, %s::jsonb)"
+                )
+            conn.commit()
+        self._pending_results = []
+
+    def is_cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise JobCancelledError("キャンセルされました")
+
+class JobService:
+    """プロセス内のバックグラウンドジョブ
+
+    - ジョブは上限付きのスレッドプール（JOB_WORKERS）で実行し、状態・進捗・結果を background_job に保存する
+    - キャンセルは協調的で、ハンドラーがチャンクやグループの区切りで確認する
+      （キャンセル要求はテーブルにも記録するため、別プロセスで受け付けた要求も反映される）
+    - ジョブには登録したプロセス（ホスト名・プロセスID）を記録し、未完了の間は生存時刻（heartbeat_at）を
+      JOB_HEARTBEAT_INTERVAL 秒ごとに更新する。所有プロセスが停止している、または生存時刻が
+      JOB_HEARTBEAT_TIMEOUT 秒より古い未完了ジョブは、起動時・生存時刻の更新時に interrupted とする
+      （同じデータベースを使う他のプロセスで実行中のジョブは中断扱いにしない）
+    """
+
+    _executor: Optional[ThreadPoolExecutor] = None
+    _lock = threading.Lock()
+    _cancel_events: Dict[str, threading.Event] = {}
+    _schema_ready = False
+    _heartbeat_thread: Optional[threading.Thread] = None
+    _heartbeat_stop = threading.Event()
+
+    @staticmethod
+    def ensure_schema():
+        """ジョブ用テーブルを作成"""
+        if JobService._schema_ready:
+            return
+        with db_manager.get_connection() as conn:
+            with conn.cursor() as cursor:
+                for statement in SCHEMA_STATEMENTS:
+                    cursor.execute(statement)
+            conn.commit()
+        JobService._schema_ready = True
+
+    @staticmethod
+    def start():
+        """起動時の初期化（停止したプロセスの未完了ジョブを中断扱いにし、保持期間を過ぎたジョブを削除）"""
+        JobService.ensure_schema()
+        JobService.recover_abandoned_jobs()
+        with JobService._lock:
+            if JobService._heartbeat_thread is None:
+                JobService._heartbeat_stop.clear()
+                JobService._heartbeat_thread = threading.Thread(
+                    target=JobService._heartbeat_loop, name="job-heartbeat", daemon=True
+                )
+                JobService._heartbeat_thread.start()
+        retention_days = JobConfig.get_retention_days()
+        if retention_days > 0:
+            db_manager.execute_update(
+                """
+                DELETE FROM background_job
+                WHERE status IN %s
+                AND finished_at < LOCALTIMESTAMP - make_interval(days => %s)
+                """,
+                (FINISHED_STATUSES, retention_days)
+            )
+
+    @staticmethod
+    def shutdown():
+        """実行中のジョブにキャンセルを通知し、待機中のジョブを破棄して終了を待つ"""
+        with JobService._lock:
+            executor = JobService._executor
+            JobService._executor = None
+            heartbeat_thread = JobService._heartbeat_thread
+            JobService._heartbeat_thread = None
+            for event in JobService._cancel_events.values():
+                event.set()
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        if heartbeat_thread is not None:
+            JobService._heartbeat_stop.set()
+            heartbeat_thread.join()
+
+    @staticmethod
+    def _heartbeat_loop():
+        """このプロセスの未完了ジョブの生存時刻を更新し、停止したプロセスのジョブを中断扱いにする"""
+        while not JobService._heartbeat_stop.wait(JobConfig.get_heartbeat_interval()):
+            try:
+                JobService.heartbeat()
+                JobService.recover_abandoned_jobs()
+            except Exception as e:
+                print(f"ジョブ生存時刻更新エラー: {e}")
+
+    @staticmethod
+    def heartbeat() -> int:
+        """このプロセスで待機中・実行中のジョブの生存時刻を更新"""
+        with JobService._lock:
+            job_ids = list(JobService._cancel_events)
+        if not job_ids:
+            return 0
+        return db_manager.execute_update(
+            """
+            UPDATE background_job SET heartbeat_at = LOCALTIMESTAMP
+            WHERE job_id = ANY(%s) AND status IN (%s, %s)
+            """,
+            (job_ids, JOB_STATUS_QUEUED, JOB_STATUS_RUNNING)
+        )
+
+    @staticmethod
+    def recover_abandoned_jobs() -> int:
+        """所有プロセスが停止した未完了ジョブを中断扱いにし、件数を返す
+
+        生存時刻が JOB_HEARTBEAT_TIMEOUT 秒より古い（または記録がない）ジョブに加え、
+        同じホストでは所有プロセスの有無も確認する（再起動でプロセスIDが再利用された場合は、
+        このプロセスで受け付けていないジョブを前回のプロセスのものとみなす）。
+        """
+        rows = db_manager.execute_query(
+            """
+            SELECT job_id, owner_host, owner_pid,
+                   (heartbeat_at IS NULL OR heartbeat_at < LOCALTIMESTAMP - make_interval(secs => %s)) AS stale
+            FROM background_job
+            WHERE status IN (%s, %s)
+            """,
+            (JobConfig.get_heartbeat_timeout(), JOB_STATUS_QUEUED, JOB_STATUS_RUNNING)
+        )
+        with JobService._lock:
+            own_jobs = set(JobService._cancel_events)
+        abandoned = [
+            row['job_id'] for row in rows
+            if row['job_id'] not in own_jobs and (
+                row['stale'] or (
+                    row['owner_host'] == OWNER_HOST and not JobService._is_owner_alive(row['owner_pid'])
+                )
+            )
+        ]
+        if not abandoned:
+            return 0
+        return db_manager.execute_update(
+            """
+            UPDATE background_job
+            SET status = %s, finished_at = LOCALTIMESTAMP,
+                error = COALESCE(error, 'プロセスの停止により中断されました')
+            WHERE job_id = ANY(%s) AND status IN (%s, %s)
+            """,
+            (JOB_STATUS_INTERRUPTED, abandoned, JOB_STATUS_QUEUED, JOB_STATUS_RUNNING)
+        )
+
+    @staticmethod
+    def _is_owner_alive(pid: Optional[int]) -> bool:
+        """同じホストの所有プロセスが動作中か（確認できない場合は生存時刻のみで判断するため True）"""
+        if pid is None:
+            return True
+        if pid == os.getpid():
+            # このプロセスが受け付けていない自プロセスIDのジョブは、IDを再利用した前回のプロセスのもの
+            return False
+        if os.name == "nt":
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            return True
+        return True
+
+    @staticmethod
+    def get_executor() -> ThreadPoolExecutor:
+        """ジョブ実行用のスレッドプールを取得（遅延生成）"""
+        with JobService._lock:
+            if JobService._executor is None:
+                JobService._executor = ThreadPoolExecutor(
+                    max_workers=JobConfig.get_workers(),
+                    thread_name_prefix="job-worker"
+                )
+            return JobService._executor
+
+    @staticmethod
+    def submit(job_type: str, params: Dict[str, Any]) -> dict:
+        """ジョブを登録して実行キューに投入し、登録直後の状態を返す"""
+        if job_type not in JOB_HANDLERS:
+            raise ValueError(f"Invalid job_type: {job_type}")
+        JobService.ensure_schema()
+
+        job_id = uuid.uuid4().hex
+        with JobService._lock:
+            if len(JobService._cancel_events) >= JobConfig.get_max_pending():
+                raise JobQueueFullError("未完了のジョブが上限に達しています")
+            JobService._cancel_events[job_id] = threading.Event()
+
+        try:
+            db_manager.execute_update(
+                """
+                INSERT INTO background_job (job_id, job_type, status, params, owner_host, owner_pid, heartbeat_at)
+                VALUES (%s, %s, %s, %s, %s, %s, LOCALTIMESTAMP)
+                """,
+                (job_id, job_type, JOB_STATUS_QUEUED, Json(jsonable_encoder(params)), OWNER_HOST, os.getpid())
+            )
+            JobService.get_executor().submit(JobService._run, job_id, job_type, params)
+        except Exception:
+            with JobService._lock:
+                JobService._cancel_events.pop(job_id, None)
+            raise
+        return JobService.get_job(job_id)
+
+    @staticmethod
+    def get_job(job_id: str) -> Optional[dict]:
+        """ジョブの状態・進捗を取得（結果本体は含まない）"""
+        JobService.ensure_schema()
+        rows = db_manager.execute_query(
+            f"SELECT {JOB_STATUS_COLUMNS} FROM background_job WHERE job_id = %s", (job_id,)
+        )
+        return dict(rows[0]) if rows else None
+
+    @staticmethod
+    def get_result(job_id: str) -> Optional[dict]:
+        """ジョブの状態と結果本体を取得"""
+        JobService.ensure_schema()
+        rows = db_manager.execute_query(
+            "SELECT job_id, status, result, error FROM background_job WHERE job_id = %s", (job_id,)
+        )
+        return dict(rows[0]) if rows else None
+
+    @staticmethod
+    def get_result_items(job_id: str, offset: int = 0, limit: int = 100) -> Optional[dict]:
+        """ジョブの状態と、background_job_result に保存した結果の offset 件目から limit 件"""
+        JobService.ensure_schema()
+        rows = db_manager.execute_query(
+            "SELECT job_id, status FROM background_job WHERE job_id = %s", (job_id,)
+        )
+        if not rows:
+            return None
+        job = dict(rows[0])
+        if job['status'] not in FINISHED_STATUSES:
+            return job
+        items = db_manager.execute_query(
+            """
+            SELECT item FROM background_job_result
+            WHERE job_id = %s AND position >= %s
+            ORDER BY position
+            LIMIT %s
+            """,
+            (job_id, offset, limit)
+        )
+        total = db_manager.execute_query(
+            "SELECT COUNT(*) AS total_items FROM background_job_result WHERE job_id = %s", (job_id,)
+        )[0]['total_items']
+        job.update(offset=offset, limit=limit, total_items=total, items=[row['item'] for row in items])
+        return job
+
+    @staticmethod
+    def list_jobs(status: Optional[str] = None, job_type: Optional[str] = None, limit: int = 50) -> List[dict]:
+        """ジョブ一覧（新しい順）"""
+        JobService.ensure_schema()
+        conditions = []
+        params = []
+        if status:
+            conditions.append("status = %s")
+            params.append(status)
+        if job_type:
+            conditions.append("job_type = %s")
+            params.append(job_type)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = db_manager.execute_query(
+            f"""
+            SELECT {JOB_STATUS_COLUMNS}
+            FROM background_job
+            {where}
+            ORDER BY created_at DESC
+            LIMIT %s
+            """,
+            tuple(params + [limit])
+        )
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def cancel(job_id: str) -> Optional[dict]:
+        """キャンセルを要求（待機中のジョブは即座にキャンセル、実行中は次の区切りで停止）"""
+        JobService.ensure_schema()
+        db_manager.execute_update(
+            """
+            UPDATE background_job
+            SET cancel_requested = TRUE,
+                status = CASE WHEN status = %s THEN %s ELSE status END,
+                finished_at = CASE WHEN status = %s THEN LOCALTIMESTAMP ELSE finished_at END
+            WHERE job_id = %s
+            AND status IN (%s, %s)
+            """,
+            (JOB_STATUS_QUEUED, JOB_STATUS_CANCELLED, JOB_STATUS_QUEUED, job_id, JOB_STATUS_QUEUED, JOB_STATUS_RUNNING)
+        )
+        with JobService._lock:
+            event = JobService._cancel_events.get(job_id)
+        if event is not None:
+            event.set()
+        return JobService.get_job(job_id)
+
+    @staticmethod
+    def _run(job_id: str, job_type: str, params: Dict[str, Any]):
+        """ワーカースレッドでジョブを実行し、最終状態を保存"""
+        with JobService._lock:
+            cancel_event = JobService._cancel_events.get(job_id) or threading.Event()
+        context = JobContext(job_id, cancel_event)
+
+        try:
+            # 待機中にキャンセルされたジョブは実行しない
+            started = db_manager.execute_update(
+                """
+                UPDATE background_job SET status = %s, started_at = LOCALTIMESTAMP, heartbeat_at = LOCALTIMESTAMP
+                WHERE job_id = %s AND status = %s AND NOT cancel_requested
+                """,
+                (JOB_STATUS_RUNNING, job_id, JOB_STATUS_QUEUED)
+            )
+            if not started:
+                return
+
+            status, result, error = JOB_STATUS_SUCCEEDED, None, None
+            try:
+                result = JOB_HANDLERS[job_type](params, context)
+                if context.is_cancelled():
+                    status = JOB_STATUS_CANCELLED
+                elif isinstance(result, dict) and result.get("success") is False:
+                    status, error = JOB_STATUS_FAILED, result.get("error") or "処理に失敗しました"
+            except JobCancelledError:
+                status = JOB_STATUS_CANCELLED
+            except Exception as e:
+                print(f"ジョブ実行エラー ({job_type} {job_id}): {e}")
+                status, error = JOB_STATUS_FAILED, str(e)
+
+            db_manager.execute_update(
+                """
+                UPDATE background_job
+                SET status = %s, progress = %s, result = %s, error = %s, finished_at = LOCALTIMESTAMP
+                WHERE job_id = %s
+                """,
+                (
+                    status,
+                    Json(jsonable_encoder(context.progress)),
+                    Json(jsonable_encoder(result)) if result is not None else None,
+                    error,
+                    job_id
+                )
+            )
+        except Exception as e:
+            print(f"ジョブ状態保存エラー ({job_type} {job_id}): {e}")
+        finally:
+            with JobService._lock:
+                JobService._cancel_events.pop(job_id, None)
+
+def run_delete_job(params: Dict[str, Any], context: JobContext) -> dict:
+    """重複データ削除（DeleteService）"""
+    context.check_cancelled()
+    return jsonable_encoder(DeleteService.delete_duplicates(DeleteRequest(**params)))
+
+def run_restore_job(params: Dict[str, Any], context: JobContext) -> dict:
+    """データ復元（RestoreService）"""
+    context.check_cancelled()
+    return jsonable_encoder(RestoreService.restore_records(RestoreRequest(**params)))
+
+def run_bulk_delete_job(params: Dict[str, Any], context: JobContext) -> dict:
+    """チャンク単位の一括削除（チャンクの区切りでキャンセル可能）"""
+    result = BulkDeleteService.delete_in_chunks(
+        FilterRequest(**params["filter_conditions"]),
+        chunk_size=params.get("chunk_size"),
+        resume_after_id=params.get("resume_after_id"),
+        progress_callback=context.report_progress,
+        should_stop=context.is_cancelled
+    )
+    context.report_progress(result, force=True)
+    return jsonable_encoder(result)
+
+def run_duplicate_scan_job(params: Dict[str, Any], context: JobContext) -> dict:
+    """重複検出の全件走査（グループの区切りでキャンセル可能）
+
+    グループは background_job_result に1件ずつ保存し（/jobs/{job_id}/result/items でページ単位に取得）、
+    ジョブの結果には件数のみを保存する。保存する結果が JOB_RESULT_MAX_MB を超えた場合は以降の
+    グループを保存せず、件数のみ最後まで数える（truncated）。
+    """
+    filters = FilterRequest(**params["filter_conditions"]) if params.get("filter_conditions") else None
+    total_groups = 0
+    total_duplicates = 0
+    started = time.perf_counter()
+    for group in DuplicateService.iter_duplicate_groups(
+        params["duplicate_type"],
+        filters,
+        sort_by=params.get("sort_by"),
+        sort_order=params.get("sort_order"),
+        similarity_threshold=params.get("similarity_threshold", 0.8),
+        min_group_size=params.get("min_group_size", 2),
+        group_order=params.get("group_order", "first_id")
+    ):
+        context.check_cancelled()
+        total_groups += 1
+        total_duplicates += len(group.records)
+        context.append_result(group)
+        context.report_progress({
+            "groups": total_groups,
+            "records": total_duplicates,
+            "elapsed_seconds": round(time.perf_counter() - started, 3)
+        })
+
+    context.flush_results()
+    context.report_progress({
+        "groups": total_groups,
+        "records": total_duplicates,
+        "elapsed_seconds": round(time.perf_counter() - started, 3)
+    }, force=True)
+    return {
+        "total_groups": total_groups,
+        "total_duplicates": total_duplicates,
+        "stored_groups": context.result_count,
+        "truncated": context.result_truncated
+    }
+
+# ジョブ種別とハンドラー
+JOB_HANDLERS: Dict[str, Callable[[Dict[str, Any], JobContext], Any]] = {
+    "delete": run_delete_job,
+    "restore": run_restore_job,
+    "bulk_delete": run_bulk_delete_job,
+    "duplicate_scan": run_duplicate_scan_job,
+}
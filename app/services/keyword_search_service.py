@@ -0,0 +1,190 @@
+from typing import Dict, List, Optional, Tuple
+import json
+import time
+from database import db_manager
+from config.search_config import SearchConfig
+from services.index_service import IndexService
+
+# 文字バイグラム（2文字のN-gram）配列を返す関数
+# 小文字化してから分割するため ILIKE と同じ大文字小文字の扱いになる。日本語を含め、ロケールや拡張機能に依存しない
+NGRAM_FUNCTION = "search_bigrams"
+NGRAM_FUNCTION_STATEMENT = f"""
+CREATE OR REPLACE FUNCTION {NGRAM_FUNCTION}(value text) RETURNS text[]
+LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE COST 1000 AS $$
+    SELECT COALESCE(array_agg(DISTINCT bigram), '{{}}')
+    FROM (
+        SELECT ch || lead(ch) OVER (ORDER BY pos) AS bigram
+        FROM unnest(regexp_split_to_array(lower(value), '')) WITH ORDINALITY AS chars(ch, pos)
+    ) AS bigrams
+    WHERE bigram IS NOT NULL
+$$
+"""
+
+# キーワード検索の対象列（検索側のSQL式、式インデックスの定義）
+SEARCH_FIELDS = {
+    "content": {
+        "column": "receptbody.rdata",
+        "table": "receptbody",
+        "alias_free_column": "rdata",
+        "index_name": "idx_receptbody_rdata_bigram",
+        "description": "受付内容のバイグラム（キーワード検索）",
+    },
+    "status": {
+        "column": "COALESCE(execbody.execstate, '')",
+        "table": "execbody",
+        "alias_free_column": "COALESCE(execstate, '')",
+        "index_name": "idx_execbody_execstate_bigram",
+        "description": "対応状況のバイグラム（キーワード検索）",
+    },
+}
+
+# IndexService で作成・検証するインデックス定義
+SEARCH_INDEX_DEFINITIONS = [
+    {
+        "name": field["index_name"],
+        "table": field["table"],
+        "expression": f"({NGRAM_FUNCTION}({field['alias_free_column']}))",
+        "method": "gin",
+        "description": field["description"],
+    }
+    for field in SEARCH_FIELDS.values()
+]
+
+# ILIKE パターンで特別な意味を持つ文字（含む場合はバイグラムで絞り込めない）
+LIKE_SPECIAL_CHARS = ("%", "_", "\\")
+
+class KeywordSearchService:
+    """バイグラムのGINインデックスを利用した部分一致検索
+
+    - キーワードのバイグラムをすべて含む行をインデックスで絞り込み、ILIKE で再確認するため
+      一致する行は従来の ILIKE '%キーワード%' と同じになる
+    - 2文字のキーワードはバイグラム1つで絞り込める（トライグラムでは索引を利用できない長さ）
+    - 1文字のキーワード、ワイルドカード文字を含むキーワード、インデックス未作成時は ILIKE のみで検索する
+    """
+
+    _available_fields: frozenset = frozenset()
+    _checked_at: Optional[float] = None
+
+    @staticmethod
+    def build_condition(field: str, keyword: str, use_index: Optional[bool] = None) -> Tuple[str, list]:
+        """キーワードの部分一致条件を構築（use_index 省略時はインデックスの有効状態で判断）"""
+        column = SEARCH_FIELDS[field]["column"]
+        pattern = f"%{keyword}%"
+        if use_index is None:
+            use_index = KeywordSearchService.can_use_index(field, keyword)
+        if use_index and KeywordSearchService.is_indexable_keyword(keyword):
+            return (
+                f"({NGRAM_FUNCTION}({column}) @> {NGRAM_FUNCTION}(%s) AND {column} ILIKE %s)",
+                [keyword, pattern]
+            )
+        return f"{column} ILIKE %s", [pattern]
+
+    @staticmethod
+    def is_indexable_keyword(keyword: str) -> bool:
+        """バイグラムで絞り込めるキーワードか（2文字以上でワイルドカード文字を含まない）"""
+        return len(keyword) >= 2 and not any(char in keyword for char in LIKE_SPECIAL_CHARS)
+
+    @staticmethod
+    def can_use_index(field: str, keyword: str) -> bool:
+        """検索にバイグラムインデックスを利用するか"""
+        if SearchConfig.get_mode() == "ilike" or not KeywordSearchService.is_indexable_keyword(keyword):
+            return False
+        return field in KeywordSearchService.get_available_fields()
+
+    @staticmethod
+    def get_available_fields() -> frozenset:
+        """インデックスが有効な検索対象列（KEYWORD_SEARCH_CHECK_INTERVAL 秒ごとに再確認）"""
+        now = time.monotonic()
+        checked_at = KeywordSearchService._checked_at
+        if checked_at is not None and now - checked_at < SearchConfig.get_check_interval():
+            return KeywordSearchService._available_fields
+
+        try:
+            available = set()
+            if KeywordSearchService.function_exists():
+                valid_indexes = {
+                    item["name"] for item in IndexService.get_index_status(SEARCH_INDEX_DEFINITIONS) if item["valid"]
+                }
+                available = {key for key, field in SEARCH_FIELDS.items() if field["index_name"] in valid_indexes}
+            KeywordSearchService._available_fields = frozenset(available)
+        except Exception as e:
+            print(f"検索インデックス確認エラー: {e}")
+            KeywordSearchService._available_fields = frozenset()
+        KeywordSearchService._checked_at = now
+        return KeywordSearchService._available_fields
+
+    @staticmethod
+    def reset_cache():
+        """インデックスの有効状態を次回の検索時に再確認させる"""
+        KeywordSearchService._checked_at = None
+
+    @staticmethod
+    def function_exists() -> bool:
+        """バイグラム関数が作成済みか"""
+        rows = db_manager.execute_query(
+            "SELECT to_regprocedure(%s) IS NOT NULL AS function_exists", (f"{NGRAM_FUNCTION}(text)",)
+        )
+        return rows[0]['function_exists']
+
+    @staticmethod
+    def get_index_status() -> List[Dict]:
+        """検索用インデックスの存在・有効状態"""
+        return IndexService.get_index_status(SEARCH_INDEX_DEFINITIONS)
+
+    @staticmethod
+    def create_indexes(concurrently: bool = True) -> List[Dict]:
+        """バイグラム関数と検索用インデックスを作成し、式の統計情報を収集"""
+        print(f"作成中: {NGRAM_FUNCTION}(text)")
+        db_manager.execute_update(NGRAM_FUNCTION_STATEMENT)
+        status = IndexService.create_indexes(concurrently=concurrently, definitions=SEARCH_INDEX_DEFINITIONS)
+
+        # 式インデックスの統計がないと @> の選択率を推定できないため ANALYZE する
+        with db_manager.get_connection() as conn:
+            conn.autocommit = True
+            try:
+                with conn.cursor() as cursor:
+                    for table in sorted({definition["table"] for definition in SEARCH_INDEX_DEFINITIONS}):
+                        print(f"統計情報を収集中: {table}")
+                        cursor.execute(f"ANALYZE {table}")
+            finally:
+                conn.autocommit = False
+
+        KeywordSearchService.reset_cache()
+        return status
+
+    @staticmethod
+    def verify_keyword(keyword: str) -> List[Dict]:
+        """キーワードごとに ILIKE のみの検索とインデックス検索の件数・所要時間・実行計画を比較
+
+        インデックス検索は ILIKE で再確認した結果の部分集合のため、件数が一致すれば結果も一致する。
+        """
+        results = []
+        for key, field in SEARCH_FIELDS.items():
+            base_query = f"SELECT COUNT(*) AS match_count FROM {field['table']} WHERE "
+            ilike_condition, ilike_params = KeywordSearchService.build_condition(key, keyword, use_index=False)
+            index_condition, index_params = KeywordSearchService.build_condition(key, keyword, use_index=True)
+
+            started = time.perf_counter()
+            ilike_count = db_manager.execute_query(base_query + ilike_condition, tuple(ilike_params))[0]['match_count']
+            ilike_ms = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            index_count = db_manager.execute_query(base_query + index_condition, tuple(index_params))[0]['match_count']
+            index_ms = (time.perf_counter() - started) * 1000
+
+            plan_rows = db_manager.execute_query(
+                "EXPLAIN (FORMAT JSON) " + base_query + index_condition, tuple(index_params)
+            )
+            plan = json.dumps(plan_rows[0]['QUERY PLAN'])
+
+            results.append({
+                "field": key,
+                "indexable": KeywordSearchService.is_indexable_keyword(keyword),
+                "ilike_count": ilike_count,
+                "index_count": index_count,
+                "matched": ilike_count == index_count,
+                "ilike_ms": round(ilike_ms, 1),
+                "index_ms": round(index_ms, 1),
+                "plan_uses_index": field["index_name"] in plan,
+            })
+        return results
@@ -0,0 +1,130 @@
+from typing import Dict, Optional, Tuple
+import hashlib
+import json
+import threading
+import time
+from database import db_manager
+from config.cache_config import CacheConfig
+from utils.metrics import metrics
+
+# 実行データで使用されているマスタ項目名を区分ごとに取得（1回の問い合わせ）
+# 区分ごとに exechead を準結合で確認するだけにし、全行の結合・DISTINCT を避ける
+METADATA_OPTIONS_QUERY = """
+SELECT 'progress' AS category, itemname
+FROM m_ctitem
+WHERE itemname IS NOT NULL
+AND EXISTS (SELECT 1 FROM exechead WHERE exechead.condition = m_ctitem.itemcd)
+UNION
+SELECT 'system_type' AS category, itemname
+FROM m_ctitem
+WHERE itemname IS NOT NULL
+AND EXISTS (SELECT 1 FROM exechead WHERE exechead.stype = m_ctitem.itemcd)
+UNION
+SELECT 'product' AS category, itemname
+FROM m_ctitem
+WHERE itemname IS NOT NULL
+AND EXISTS (SELECT 1 FROM exechead WHERE exechead.producttype = m_ctitem.itemcd)
+ORDER BY category, itemname
+"""
+
+# 区分とレスポンスの項目名
+OPTION_FIELDS = {
+    "progress": "progress_options",
+    "system_type": "system_type_options",
+    "product": "product_options",
+}
+
+# 列定義
+COLUMN_DEFINITIONS = [
+    {"id": "id", "name": "ID", "type": "number", "filterable": True, "sortable": True},
+    {"id": "content", "name": "受付内容", "type": "text", "filterable": True, "sortable": True},
+    {"id": "status", "name": "対応状況", "type": "text", "filterable": True, "sortable": True},
+    {"id": "result", "name": "結果", "type": "text", "filterable": False, "sortable": True},
+    {"id": "report", "name": "レポート", "type": "text", "filterable": False, "sortable": True},
+    {"id": "progress", "name": "進捗", "type": "text", "filterable": True, "sortable": True},
+    {"id": "system_type", "name": "システム種別", "type": "text", "filterable": True, "sortable": True},
+    {"id": "product", "name": "製品", "type": "text", "filterable": True, "sortable": True},
+    {"id": "reception_moddt", "name": "削除フラグ日時", "type": "datetime", "filterable": True, "sortable": True},
+    {"id": "reception_datetime", "name": "受付日時", "type": "datetime", "filterable": True, "sortable": True},
+    {"id": "update_datetime", "name": "更新日時", "type": "datetime", "filterable": True, "sortable": True}
+]
+
+class MetadataService:
+    """マスタデータ（フィルターの選択肢・列定義）のキャッシュ
+
+    - 取得結果をプロセス内に METADATA_CACHE_TTL 秒保持し、期限内は DB に問い合わせない
+    - 内容のハッシュを ETag とし、内容が変わらない限り同じ値を返す（ブラウザの再検証用）
+    - 期限切れ時の再取得に失敗した場合は、保持している内容を返し続ける
+    """
+
+    _metadata: Optional[Dict] = None
+    _etag: Optional[str] = None
+    _loaded_at = 0.0
+    _lock = threading.Lock()
+
+    @staticmethod
+    @metrics.instrumented
+    def get_metadata() -> Tuple[Dict, str]:
+        """マスタデータとETagを取得（有効期間内はキャッシュを返す）"""
+        if MetadataService._is_fresh():
+            return MetadataService._metadata, MetadataService._etag
+
+        with MetadataService._lock:
+            # 待機中に他のスレッドが再取得していればそれを返す
+            if MetadataService._is_fresh():
+                return MetadataService._metadata, MetadataService._etag
+            try:
+                return MetadataService._load()
+            except Exception as e:
+                if MetadataService._metadata is None:
+                    raise
+                print(f"メタデータ再取得エラー（キャッシュを継続使用）: {e}")
+                return MetadataService._metadata, MetadataService._etag
+
+    @staticmethod
+    @metrics.instrumented
+    def refresh() -> Tuple[Dict, str]:
+        """キャッシュを破棄してDBから再取得"""
+        with MetadataService._lock:
+            return MetadataService._load()
+
+    @staticmethod
+    def invalidate():
+        """キャッシュを破棄（次回の取得時に再取得）"""
+        with MetadataService._lock:
+            MetadataService._loaded_at = 0.0
+
+    @staticmethod
+    def _is_fresh() -> bool:
+        ttl = CacheConfig.get_metadata_ttl()
+        return (
+            MetadataService._metadata is not None
+            and ttl > 0
+            and time.monotonic() - MetadataService._loaded_at < ttl
+        )
+
+    @staticmethod
+    def _load() -> Tuple[Dict, str]:
+        """DBから取得してキャッシュを更新（ロック取得済みで呼び出す）"""
+        metadata = {field: [] for field in OPTION_FIELDS.values()}
+        for row in db_manager.execute_query(METADATA_OPTIONS_QUERY):
+            metadata[OPTION_FIELDS[row['category']]].append(row['itemname'])
+        metadata["column_definitions"] = COLUMN_DEFINITIONS
+
+        content = json.dumps(metadata, ensure_ascii=False, sort_keys=True)
+        etag = '"' + hashlib.md5(content.encode("utf-8")).hexdigest() + '"'
+
+        MetadataService._metadata = metadata
+        MetadataService._etag = etag
+        MetadataService._loaded_at = time.monotonic()
+        return metadata, etag
+
+    @staticmethod
+    def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+        """If-None-Match ヘッダーがETagに一致するか（弱いETag・複数指定に対応）"""
+        if not if_none_match:
+            return False
+        candidates = [value.strip() for value in if_none_match.split(",")]
+        return "*" in candidates or any(
+            (value[2:] if value.startswith("W/") else value) == etag for value in candidates
+        )
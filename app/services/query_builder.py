@@ -0,0 +1,118 @@
+from typing import Dict, List, Optional, Tuple
+import re
+import time
+from database import db_manager
+
+# recepthead に結合する関連テーブル（別名, 結合句, 前提となる別名）。結合はこの順に出力する
+# いずれも recepthead の1行に対して高々1行が対応する結合のため、参照しない結合を省いても行数は変わらない
+# （m_emp・m_ctitem は主キー、exechead・receptbody・execbody は receptno が一意であることが前提。
+#   manage.py check-query-joins で検証できる）
+JOIN_DEFINITIONS: List[Tuple[str, str, Tuple[str, ...]]] = [
+    ("m_emp", "LEFT JOIN m_emp ON recepthead.receptempcd = m_emp.empcd", ()),
+    ("exechead", "LEFT JOIN exechead ON recepthead.receptno = exechead.receptno", ()),
+    ("cond_item", "LEFT JOIN m_ctitem AS cond_item ON exechead.condition = cond_item.itemcd", ("exechead",)),
+    ("receptbody", "LEFT JOIN receptbody ON recepthead.receptno = receptbody.receptno", ()),
+    ("execbody", "LEFT JOIN execbody ON recepthead.receptno = execbody.receptno", ()),
+    ("stype_item", "LEFT JOIN m_ctitem AS stype_item ON exechead.stype = stype_item.itemcd", ("exechead",)),
+    ("prod_item", "LEFT JOIN m_ctitem AS prod_item ON exechead.producttype = prod_item.itemcd", ("exechead",)),
+]
+
+# 受信データ取得の基本条件
+RECEPTION_BASE_WHERE = """        WHERE recepthead.extentid IS NOT NULL
+        AND extentid != 0
+        AND (
+            recepthead.calldt >= '2015-01-01 00:00:00'
+            OR receptbody.moddt >= '2015-01-01 00:00:00'
+        )
+"""
+
+# 結合を省略できる前提（結合キーが一意であること）の検証対象（表示名, テーブル, 列）
+JOIN_KEY_CHECKS: List[Tuple[str, str, str]] = [
+    ("m_emp", "m_emp", "empcd"),
+    ("exechead", "exechead", "receptno"),
+    ("m_ctitem", "m_ctitem", "itemcd"),
+    ("receptbody", "receptbody", "receptno"),
+    ("execbody", "execbody", "receptno"),
+]
+
+# 「別名.」の形の参照を検出（文字列リテラル内の一致は結合が余分に残るだけで結果は変わらない）
+ALIAS_PATTERNS = {alias: re.compile(rf"\b{alias}\.") for alias, _, _ in JOIN_DEFINITIONS}
+
+class QueryBuilder:
+    """受信データ系クエリの FROM 句を、参照している別名の結合だけで組み立てる
+
+    選択列・条件・並び順などクエリに含めるSQL断片を渡すと、断片中で参照している別名と
+    その前提となる別名の結合のみを出力する（例: 件数の集計でマスタ項目の条件がなければ m_ctitem を結合しない）。
+    """
+
+    @staticmethod
+    def required_aliases(*fragments: str) -> List[str]:
+        """SQL断片が参照する結合の別名（前提の別名を含み、JOIN_DEFINITIONS の順）"""
+        text = "\n".join(fragments)
+        required = {alias for alias, pattern in ALIAS_PATTERNS.items() if pattern.search(text)}
+        for alias, _, requires in reversed(JOIN_DEFINITIONS):
+            if alias in required:
+                required.update(requires)
+        return [alias for alias, _, _ in JOIN_DEFINITIONS if alias in required]
+
+    @staticmethod
+    def build_join_clause(*fragments: str) -> str:
+        """SQL断片が参照する結合句のみを連結（recepthead を結合済みのクエリ用）"""
+        required = set(QueryBuilder.required_aliases(*fragments))
+        joins = "".join(f"\n        {join}" for alias, join, _ in JOIN_DEFINITIONS if alias in required)
+        return joins + "\n"
+
+    @staticmethod
+    def build_from_clause(*fragments: str, table_sample: str = "") -> str:
+        """FROM recepthead・必要な結合・基本条件（WHERE）を構築
+
+        基本条件の後ろに続ける条件（"AND ..."）もすべて fragments に含めること。
+        table_sample に TABLESAMPLE 句を渡すと recepthead の標本のみを対象にする。
+        """
+        joins = QueryBuilder.build_join_clause(RECEPTION_BASE_WHERE, *fragments)
+        sample = f" {table_sample}" if table_sample else ""
+        return f"\n        FROM recepthead{sample}{joins}{RECEPTION_BASE_WHERE}"
+
+    @staticmethod
+    def build_full_from_clause() -> str:
+        """すべての結合を含む FROM 句（結合の省略による結果の差異の検証用）"""
+        return QueryBuilder.build_from_clause(*(f"{alias}." for alias, _, _ in JOIN_DEFINITIONS))
+
+    @staticmethod
+    def check_join_keys() -> List[Dict]:
+        """結合キーに重複がないかを確認（重複があると結合の省略で件数が変わる）"""
+        results = []
+        for name, table, column in JOIN_KEY_CHECKS:
+            row = db_manager.execute_query(f"""
+                SELECT COUNT(*) AS duplicate_keys
+                FROM (
+                    SELECT {column} FROM {table}
+                    WHERE {column} IS NOT NULL
+                    GROUP BY {column}
+                    HAVING COUNT(*) > 1
+                ) AS duplicated
+            """)[0]
+            results.append({
+                "name": name,
+                "table": table,
+                "column": column,
+                "duplicate_keys": row['duplicate_keys'],
+                "unique": row['duplicate_keys'] == 0,
+            })
+        return results
+
+    @staticmethod
+    def verify_condition(where: str, params: Optional[list] = None) -> Dict:
+        """条件（"AND ..."）について、結合を省略した件数とすべて結合した件数・所要時間を比較"""
+        params = tuple(params or [])
+        results = {"aliases": QueryBuilder.required_aliases(RECEPTION_BASE_WHERE, where)}
+        for label, from_clause in (
+            ("pruned", QueryBuilder.build_from_clause(where)),
+            ("full", QueryBuilder.build_full_from_clause()),
+        ):
+            start = time.perf_counter()
+            row = db_manager.execute_query(f"SELECT COUNT(*) AS count {from_clause} {where}", params)[0]
+            results[f"{label}_count"] = row['count']
+            results[f"{label}_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        results["matched"] = results["pruned_count"] == results["full_count"]
+        return results
@@ -1,15 +1,27 @@
 from typing import List
 from models.response_models import RestoreResponse
-from models.request_models import RestoreRequest
+from models.request_models import RestoreRequest, FilterRequest
+from services.data_service import DataService
+from services.result_cache_service import ResultCacheService
 from database import db_manager
 from datetime import datetime
 from utils.operation_logger import OperationLogger
+from services.duplicate_index_service import DuplicateIndexService
+from utils.metrics import metrics
 
 class RestoreService:
     @staticmethod
+    @metrics.instrumented
     def restore_records(request: RestoreRequest) -> RestoreResponse:
         """削除済みデータの復元"""
-        
+
+        if request.restore_scope == "filtered":
+            # フィルター条件に合致する削除済みデータを復元（IDを取得せずサーバー側で一括更新）
+            if request.filter_conditions:
+                return RestoreService.restore_filtered(request.filter_conditions)
+        elif request.restore_scope != "selected":
+            raise ValueError(f"Invalid restore_scope: {request.restore_scope}")
+
         if not request.target_ids:
             # 復元対象がない場合のログ出力
             operation_logger = OperationLogger.get_logger()
@@ -21,23 +33,40 @@ class RestoreService:
                 timestamp=datetime.now()
             )
 
+        # 重複グループインデックスが構築済みなら、復元した行を同じステートメントで再計算待ちに登録
+        pending_cte = ""
+        if DuplicateIndexService.get_state() is not None:
+            pending_cte = f""",
+        pending AS ({DuplicateIndexService.build_pending_insert("restored")}
+        )"""
+
         # 復元クエリ（削除済みデータのみ対象）
-        restore_query = """
-        UPDATE recepthead
-        SET receptmoddt = NULL
-        WHERE extentid = ANY(%s)
-        AND receptmoddt IS NOT NULL
+        restore_query = f"""
+        WITH restored AS (
+            UPDATE recepthead
+            SET receptmoddt = NULL
+            WHERE extentid = ANY(%s)
+            AND receptmoddt IS NOT NULL
+            RETURNING extentid
+        ){pending_cte}
+        SELECT COUNT(*) AS affected_count FROM restored
         """
 
         operation_logger = OperationLogger.get_logger()
-        
+
         try:
-            restored_count = db_manager.execute_update(
+            restored_count = db_manager.execute_returning(
                 restore_query, (request.target_ids,)
-            )
+            )['affected_count']
             # 復元成功ログ出力
             operation_logger.log_restore_operation(request.target_ids, True, restored_count)
-            
+            if restored_count:
+                ResultCacheService.invalidate_ids(request.target_ids)
+
+            # 復元はタイムスタンプが変化しないため、再計算待ちに登録した行を重複グループインデックスへ反映
+            if pending_cte and restored_count:
+                DuplicateIndexService.sync_pending()
+
             return RestoreResponse(
                 success=True,
                 restored_count=restored_count,
@@ -53,4 +82,75 @@ class RestoreService:
                 restored_count=0,
                 failed_ids=request.target_ids,
                 timestamp=datetime.now()
-            )
\ No newline at end of file
+            )
+
+    @staticmethod
+    def restore_filtered(filters: FilterRequest) -> RestoreResponse:
+        """フィルター条件に合致する削除済みデータを1つのUPDATE文で復元
+
+        削除状態の条件（include_deleted）は適用せず、削除済みの行のみを更新する。
+        重複グループインデックスが構築済みなら、復元した行を同じステートメントで
+        再計算待ち（dup_pending）に登録し、IDをアプリケーションへ取得せずに反映する。
+        """
+        id_query, filter_params = DataService.build_filtered_id_query(filters, apply_deleted_filter=False)
+
+        pending_cte = ""
+        if DuplicateIndexService.get_state() is not None:
+            pending_cte = f""",
+        pending AS ({DuplicateIndexService.build_pending_insert("restored")}
+        )"""
+
+        restore_query = f"""
+        WITH targets AS (
+            {id_query}
+        ),
+        restored AS (
+            UPDATE recepthead
+            SET receptmoddt = NULL
+            WHERE extentid IN (SELECT extentid FROM targets)
+            AND receptmoddt IS NOT NULL
+            RETURNING extentid
+        ){pending_cte}
+        SELECT
+            (SELECT COUNT(DISTINCT extentid) FROM targets) AS matched_count,
+            COUNT(*) AS affected_count,
+            MIN(extentid) AS first_id,
+            MAX(extentid) AS last_id
+        FROM restored
+        """
+
+        operation_logger = OperationLogger.get_logger()
+        filter_description = DataService.describe_filters(filters)
+
+        try:
+            result = db_manager.execute_returning(restore_query, tuple(filter_params))
+            # 復元成功ログ出力
+            operation_logger.log_filtered_restore_operation(
+                filter_description,
+                True,
+                matched_count=result['matched_count'],
+                restored_count=result['affected_count'],
+                first_id=result['first_id'],
+                last_id=result['last_id']
+            )
+            ResultCacheService.invalidate_filtered(filters, result['first_id'], result['last_id'])
+
+            if pending_cte and result['affected_count']:
+                DuplicateIndexService.sync_pending()
+
+            return RestoreResponse(
+                success=True,
+                restored_count=result['affected_count'],
+                failed_ids=[],
+                timestamp=datetime.now()
+            )
+        except Exception as e:
+            print(f"復元処理エラー: {e}")
+            # 復元失敗ログ出力
+            operation_logger.log_filtered_restore_operation(filter_description, False, error=str(e))
+            return RestoreResponse(
+                success=False,
+                restored_count=0,
+                failed_ids=[],
+                timestamp=datetime.now()
+            )
@@ -0,0 +1,82 @@
+from typing import List, Optional
+from models.request_models import FilterRequest
+from services.data_service import DataService
+from services.query_builder import QueryBuilder
+from database import db_manager
+from utils.result_cache import result_cache
+
+# 1回の判定クエリで確認するフィルター条件の数
+INVALIDATION_BATCH_SIZE = 50
+
+class ResultCacheService:
+    """削除・復元に合わせた検索結果キャッシュの無効化
+
+    削除・復元した行を（削除状態を除いた）フィルター条件に含むキャッシュだけを破棄する。
+    統計は削除状態を問わず全件を数えるため、削除済みを含まない検索結果も対象になる。
+    削除日時（reception_moddt）の期間条件は更新によって値が変わるため、判定では
+    更新前後のどちらにも合致しうるものとして扱う（条件から外して判定する）。
+    判定に失敗した場合は、古い結果を返さないようすべて破棄する。
+    """
+
+    @staticmethod
+    def invalidate_ids(ids: List[int]) -> int:
+        """指定IDの削除状態を変更した後に呼び出す"""
+        if not ids:
+            return 0
+        return ResultCacheService._invalidate("AND recepthead.extentid = ANY(%s)", [list(ids)])
+
+    @staticmethod
+    def invalidate_filtered(filters: FilterRequest, first_id: Optional[int], last_id: Optional[int]) -> int:
+        """フィルター条件による削除・復元の後に呼び出す（更新したIDの範囲で対象を絞り込む）"""
+        if first_id is None or last_id is None:
+            return 0
+        filter_where, filter_params = DataService.build_filter_conditions(
+            ResultCacheService._without_moddt_range(filters), apply_deleted_filter=False
+        )
+        return ResultCacheService._invalidate(
+            f"{filter_where} AND recepthead.extentid BETWEEN %s AND %s",
+            filter_params + [first_id, last_id]
+        )
+
+    @staticmethod
+    def _without_moddt_range(filters: FilterRequest) -> FilterRequest:
+        """削除日時の期間条件を外したフィルター条件（更新前の削除日時は判定できないため）"""
+        if filters.date_field == "reception_moddt" and (filters.date_from or filters.date_to):
+            return filters.model_copy(update={"date_from": None, "date_to": None})
+        return filters
+
+    @staticmethod
+    def _invalidate(changed_where: str, changed_params: list) -> int:
+        """更新した行を含みうるフィルター条件のキャッシュを破棄し、破棄した件数を返す"""
+        cached_filters = result_cache.begin_invalidation()
+        if not cached_filters:
+            return 0
+
+        try:
+            matched = []
+            for start in range(0, len(cached_filters), INVALIDATION_BATCH_SIZE):
+                batch = cached_filters[start:start + INVALIDATION_BATCH_SIZE]
+                selects = []
+                params = []
+                for index, (_, filters) in enumerate(batch):
+                    filter_where, filter_params = "", []
+                    if filters:
+                        filter_where, filter_params = DataService.build_filter_conditions(
+                            ResultCacheService._without_moddt_range(filters), apply_deleted_filter=False
+                        )
+                    selects.append(f"""
+                    SELECT {index} AS filter_index
+                    WHERE EXISTS (
+                        SELECT 1
+                        {QueryBuilder.build_from_clause(filter_where, changed_where)}
+                        {filter_where}
+                        {changed_where}
+                    )""")
+                    params.extend(filter_params + changed_params)
+
+                rows = db_manager.execute_query(" UNION ALL ".join(selects), tuple(params))
+                matched.extend(batch[row['filter_index']][0] for row in rows)
+            return result_cache.invalidate_filters(matched)
+        except Exception as e:
+            print(f"結果キャッシュ無効化エラー（すべて破棄します）: {e}")
+            return result_cache.clear()
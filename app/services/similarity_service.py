@@ -0,0 +1,398 @@
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from psycopg2.extras import execute_values
+from models.response_models import ReceptionDataRecord, DuplicateGroup
+from models.request_models import FilterRequest
+from services.data_service import DataService, RECEPTION_SELECT_COLUMNS
+from services.query_builder import QueryBuilder
+from database import db_manager
+from config.similarity_config import SimilarityConfig
+
+# MinHashの置換に用いるメルセンヌ素数と32bitマスク
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+# シングルのローリングハッシュ用の乗数
+SHINGLE_MULTIPLIER = np.uint64(1000003)
+
+# 署名キャッシュ（extentidごと、受付内容の指紋が変わると再計算）
+CACHE_SCHEMA_STATEMENT = """
+CREATE TABLE IF NOT EXISTS dup_minhash (
+    extentid integer PRIMARY KEY,
+    content_fp uuid NOT NULL,
+    sig_params varchar(32) NOT NULL,
+    signature bytea NOT NULL
+)
+"""
+
+# ストリーミング取得の1回あたりの行数
+SCAN_ITERSIZE = 5000
+
+# 署名キャッシュの書き込み単位
+CACHE_WRITE_BATCH = 1000
+
+class MinHasher:
+    """文字シングルのMinHash署名をNumPyでバッチ計算する"""
+
+    def __init__(self, num_perm: int, shingle_size: int, seed: int):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+        generator = np.random.RandomState(seed)
+        self.a = generator.randint(1, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self.b = generator.randint(0, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+
+    @property
+    def params_key(self) -> str:
+        """署名の計算条件（キャッシュの有効性判定に使用）"""
+        return f"k{self.shingle_size}-p{self.num_perm}-s{self.seed}"
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """全角/半角・大文字/小文字・空白の揺れを吸収"""
+        text = unicodedata.normalize('NFKC', text).lower()
+        return "".join(text.split())
+
+    def shingle_hashes(self, text: str) -> np.ndarray:
+        """文字kグラムの32bitハッシュ集合"""
+        codes = np.frombuffer(self.normalize(text).encode('utf-32-le'), dtype='<u4').astype(np.uint64)
+        if codes.size == 0:
+            return codes
+        k = min(self.shingle_size, codes.size)
+        count = codes.size - k + 1
+        hashes = np.zeros(count, dtype=np.uint64)
+        with np.errstate(over='ignore'):
+            for offset in range(k):
+                hashes = hashes * SHINGLE_MULTIPLIER + codes[offset:offset + count]
+        return np.unique(hashes & MAX_HASH)
+
+    def signatures(self, texts: List[str], batch_shingles: int) -> np.ndarray:
+        """テキスト群のMinHash署名（件数×num_perm のuint32配列）"""
+        result = np.full((len(texts), self.num_perm), MAX_HASH, dtype=np.uint64)
+        batch_hashes, batch_rows, batch_size = [], [], 0
+
+        def flush():
+            if not batch_hashes:
+                return
+            lengths = np.array([h.size for h in batch_hashes])
+            offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            hashes = np.concatenate(batch_hashes)
+            with np.errstate(over='ignore'):
+                permuted = (np.outer(hashes, self.a) + self.b) % MERSENNE_PRIME & MAX_HASH
+            result[batch_rows] = np.minimum.reduceat(permuted, offsets, axis=0)
+            batch_hashes.clear()
+            batch_rows.clear()
+
+        for row, text in enumerate(texts):
+            hashes = self.shingle_hashes(text or "")
+            if hashes.size == 0:
+                continue
+            if batch_size + hashes.size > batch_shingles:
+                flush()
+                batch_size = 0
+            batch_hashes.append(hashes)
+            batch_rows.append(row)
+            batch_size += hashes.size
+        flush()
+
+        return result.astype(np.uint32)
+
+def optimal_lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """偽陽性・偽陰性の確率の和が最小となるバンド数・行数を求める"""
+    grid = np.linspace(0.0, 1.0, 201)
+    best, best_error = (1, num_perm), float('inf')
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        if rows == 0:
+            break
+        probability = 1.0 - (1.0 - grid ** rows) ** bands
+        # 一様格子のため平均値で積分を近似
+        false_positive = np.where(grid < threshold, probability, 0.0).mean()
+        false_negative = np.where(grid >= threshold, 1.0 - probability, 0.0).mean()
+        error = false_positive + false_negative
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+def lsh_candidate_pairs(signatures: np.ndarray, bands: int, rows: int, max_bucket_size: int) -> np.ndarray:
+    """LSHバンディングで候補ペア（インデックスの組、重複なし）を列挙"""
+    pairs = []
+    for band in range(bands):
+        block = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        keys = block.view(np.dtype((np.void, block.dtype.itemsize * rows))).ravel()
+        _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        shared = counts[inverse] > 1
+        if not shared.any():
+            continue
+        members = np.nonzero(shared)[0]
+        order = np.argsort(inverse[members], kind='stable')
+        members = members[order]
+        bucket_ids = inverse[members]
+        boundaries = np.nonzero(np.diff(bucket_ids))[0] + 1
+        for bucket in np.split(members, boundaries):
+            if bucket.size <= max_bucket_size:
+                left, right = np.triu_indices(bucket.size, k=1)
+                pairs.append(np.stack((bucket[left], bucket[right]), axis=1))
+            else:
+                # 巨大バケットは代表（先頭）との比較のみ
+                pairs.append(np.stack((np.full(bucket.size - 1, bucket[0]), bucket[1:]), axis=1))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.unique(np.concatenate(pairs).astype(np.int64), axis=0)
+
+def connected_groups(size: int, pairs: np.ndarray) -> List[List[int]]:
+    """類似ペアを連結成分（グループ）へまとめる"""
+    parent = list(range(size))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for left, right in pairs.tolist():
+        root_left, root_right = find(left), find(right)
+        if root_left != root_right:
+            parent[max(root_left, root_right)] = min(root_left, root_right)
+
+    groups: Dict[int, List[int]] = {}
+    for index in np.unique(pairs).tolist():
+        groups.setdefault(find(index), []).append(index)
+    return [members for members in groups.values() if len(members) > 1]
+
+class SimilarityService:
+    _cache_available: Optional[bool] = None
+
+    @staticmethod
+    def get_hasher() -> MinHasher:
+        return MinHasher(
+            SimilarityConfig.get_num_perm(),
+            SimilarityConfig.get_shingle_size(),
+            SimilarityConfig.get_seed()
+        )
+
+    @staticmethod
+    def ensure_cache() -> bool:
+        """署名キャッシュテーブルを用意（作成できない場合はキャッシュなしで動作）"""
+        if SimilarityService._cache_available is None:
+            try:
+                db_manager.execute_update(CACHE_SCHEMA_STATEMENT)
+                SimilarityService._cache_available = True
+            except Exception as e:
+                print(f"MinHash署名キャッシュ利用不可: {e}")
+                SimilarityService._cache_available = False
+        return SimilarityService._cache_available
+
+    @staticmethod
+    def load_signatures(
+        hasher: MinHasher,
+        filters: Optional[FilterRequest] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """対象行のID配列と署名配列を取得（キャッシュにない行のみ本文を取得して計算）
+
+        SCAN_ITERSIZE 行ごとに署名の計算とキャッシュへの保存を行い、本文はバッチ内でのみ保持する。
+        """
+        filter_where, filter_params = "", []
+        if filters:
+            filter_where, filter_params = DataService.build_filter_conditions(filters)
+
+        use_cache = SimilarityService.ensure_cache()
+        base_query = f"""
+            SELECT recepthead.extentid AS id, receptbody.rdata, md5(receptbody.rdata)::uuid AS content_fp
+            {QueryBuilder.build_from_clause("receptbody.rdata", filter_where)}
+            AND receptbody.rdata IS NOT NULL AND receptbody.rdata != ''
+            AND recepthead.receptmoddt IS NULL
+            {filter_where}
+        """
+        if use_cache:
+            query = f"""
+            WITH base AS ({base_query})
+            SELECT
+                base.id,
+                base.content_fp,
+                dup_minhash.signature,
+                CASE WHEN dup_minhash.signature IS NULL THEN base.rdata END AS content
+            FROM base
+            LEFT JOIN dup_minhash
+                ON dup_minhash.extentid = base.id
+                AND dup_minhash.content_fp = base.content_fp
+                AND dup_minhash.sig_params = %s
+            """
+            params = tuple(filter_params) + (hasher.params_key,)
+        else:
+            query = f"""
+            WITH base AS ({base_query})
+            SELECT base.id, base.content_fp, NULL::bytea AS signature, base.rdata AS content
+            FROM base
+            """
+            params = tuple(filter_params)
+
+        id_batches: List[np.ndarray] = []
+        signature_batches: List[np.ndarray] = []
+
+        # 大量行でもメモリを抑えるため名前付き（サーバーサイド）カーソルで逐次取得
+        with db_manager.get_connection() as conn:
+            with conn.cursor(name="similar_signature_scan") as cursor:
+                cursor.itersize = SCAN_ITERSIZE
+                cursor.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(SCAN_ITERSIZE)
+                    if not rows:
+                        break
+                    batch_ids, batch_signatures = SimilarityService.build_signature_batch(hasher, rows, use_cache)
+                    id_batches.append(batch_ids)
+                    signature_batches.append(batch_signatures)
+
+        if not id_batches:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, hasher.num_perm), dtype=np.uint32)
+        return np.concatenate(id_batches), np.concatenate(signature_batches)
+
+    @staticmethod
+    def build_signature_batch(hasher: MinHasher, rows: list, use_cache: bool) -> Tuple[np.ndarray, np.ndarray]:
+        """取得した行のID配列と署名配列（キャッシュにない行は計算し、キャッシュへ保存）"""
+        cached_rows: List[int] = []
+        cached_signatures: List[bytes] = []
+        missing_rows: List[int] = []
+        missing_texts: List[str] = []
+        missing_keys: List[Tuple[int, str]] = []
+        for index, row in enumerate(rows):
+            if row['signature'] is not None:
+                cached_rows.append(index)
+                cached_signatures.append(bytes(row['signature']))
+            else:
+                missing_rows.append(index)
+                missing_texts.append(row['content'])
+                missing_keys.append((row['id'], row['content_fp']))
+
+        signatures = np.zeros((len(rows), hasher.num_perm), dtype=np.uint32)
+        if cached_rows:
+            signatures[cached_rows] = np.frombuffer(
+                b"".join(cached_signatures), dtype='<u4'
+            ).reshape(len(cached_rows), hasher.num_perm)
+        if missing_rows:
+            computed = hasher.signatures(missing_texts, SimilarityConfig.get_batch_shingles())
+            signatures[missing_rows] = computed
+            if use_cache:
+                SimilarityService.store_signatures(hasher, missing_keys, computed)
+
+        return np.array([row['id'] for row in rows], dtype=np.int64), signatures
+
+    @staticmethod
+    def store_signatures(hasher: MinHasher, keys: List[Tuple[int, str]], signatures: np.ndarray):
+        """計算した署名をキャッシュへ保存"""
+        upsert_query = """
+        INSERT INTO dup_minhash (extentid, content_fp, sig_params, signature) VALUES %s
+        ON CONFLICT (extentid) DO UPDATE SET
+            content_fp = EXCLUDED.content_fp,
+            sig_params = EXCLUDED.sig_params,
+            signature = EXCLUDED.signature
+        """
+        try:
+            with db_manager.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    for start in range(0, len(keys), CACHE_WRITE_BATCH):
+                        values = [
+                            (extentid, content_fp, hasher.params_key,
+                             signatures[start + i].astype('<u4').tobytes())
+                            for i, (extentid, content_fp) in enumerate(keys[start:start + CACHE_WRITE_BATCH])
+                        ]
+                        execute_values(cursor, upsert_query, values)
+                conn.commit()
+        except Exception as e:
+            print(f"MinHash署名キャッシュ保存エラー: {e}")
+
+    @staticmethod
+    def detect_similar(
+        filters: Optional[FilterRequest] = None,
+        sort_by: str = None,
+        sort_order: str = None,
+        threshold: float = 0.8
+    ) -> List[DuplicateGroup]:
+        """受付内容の類似重複（近似重複）を検出"""
+        member_groups = SimilarityService.find_similar_groups(filters, threshold)
+        return SimilarityService.build_groups(member_groups, sort_by, sort_order)
+
+    @staticmethod
+    def find_similar_groups(
+        filters: Optional[FilterRequest] = None,
+        threshold: float = 0.8
+    ) -> List[List[int]]:
+        """類似グループのメンバーIDを最小IDの昇順で返す
+
+        文字シングルのMinHash署名をLSHバンディングでバケット化し、同じバケットに入った
+        候補ペアのみ署名から推定したJaccard類似度を閾値と比較する（全ペア比較は行わない）。
+        類似ペアの連結成分を1グループとする。
+        """
+        hasher = SimilarityService.get_hasher()
+        ids, signatures = SimilarityService.load_signatures(hasher, filters)
+        if ids.size < 2:
+            return []
+
+        bands, rows = optimal_lsh_params(threshold, hasher.num_perm)
+        pairs = lsh_candidate_pairs(signatures, bands, rows, SimilarityConfig.get_max_bucket_size())
+        if pairs.size == 0:
+            return []
+
+        # 署名の一致率（Jaccard類似度の推定値）で候補ペアを検証
+        similar = np.zeros(len(pairs), dtype=bool)
+        chunk = 100000
+        for start in range(0, len(pairs), chunk):
+            block = pairs[start:start + chunk]
+            estimates = (signatures[block[:, 0]] == signatures[block[:, 1]]).mean(axis=1)
+            similar[start:start + chunk] = estimates >= threshold
+        pairs = pairs[similar]
+        if pairs.size == 0:
+            return []
+
+        member_groups = [sorted(ids[members].tolist()) for members in connected_groups(len(ids), pairs)]
+        member_groups.sort(key=lambda members: members[0])
+        return member_groups
+
+    @staticmethod
+    def build_groups(
+        member_groups: List[List[int]],
+        sort_by: str = None,
+        sort_order: str = None,
+        group_offset: int = 0
+    ) -> List[DuplicateGroup]:
+        """メンバーIDのグループから表示用のDuplicateGroupを生成（グループ内はリクエストのソート順）"""
+        if not member_groups:
+            return []
+
+        group_of = {extentid: index for index, members in enumerate(member_groups) for extentid in members}
+        member_ids = list(group_of.keys())
+        order_by = DataService.build_order_by_clause(sort_by or "id", sort_order or "asc")
+        records_query = f"""
+        SELECT {RECEPTION_SELECT_COLUMNS}
+        {QueryBuilder.build_from_clause(RECEPTION_SELECT_COLUMNS, order_by)}
+        AND recepthead.extentid = ANY(%s)
+        {order_by}
+        """
+        rows = db_manager.execute_query(records_query, (member_ids,))
+
+        grouped_records: List[List[ReceptionDataRecord]] = [[] for _ in member_groups]
+        representative: Dict[int, str] = {}
+        for row in rows:
+            index = group_of[row['id']]
+            if row['id'] == member_groups[index][0]:
+                representative[index] = row['content'] or ''
+            grouped_records[index].append(row)
+
+        duplicate_groups = []
+        for index, group_rows in enumerate(grouped_records):
+            if len(group_rows) < 2:
+                continue
+            duplicate_key = representative.get(index, group_rows[0]['content'] or '')
+            records = []
+            for row in group_rows:
+                row['duplicate_type'] = "similar"
+                row['duplicate_key'] = duplicate_key
+                records.append(ReceptionDataRecord.model_validate(row))
+            duplicate_groups.append(DuplicateGroup(
+                group_id=f"group_{group_offset + len(duplicate_groups)}",
+                duplicate_count=len(records),
+                duplicate_key=duplicate_key,
+                records=records
+            ))
+        return duplicate_groups
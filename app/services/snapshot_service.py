@@ -0,0 +1,124 @@
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import os
+import threading
+import numpy as np
+from models.response_models import DuplicateGroup
+from services.duplicate_service import DuplicateService
+from database import db_manager
+from config.snapshot_config import SnapshotConfig
+from utils.metrics import metrics
+
+# スナップショットは Arrow IPC ファイル（pyarrow は任意、未インストール時は利用不可）
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
+
+# スキーマのメタデータに格納する走査情報のキー
+SNAPSHOT_METADATA_KEY = b"duplicate_snapshot"
+
+# スナップショットの形式のバージョン（列構成を変更した場合に上げる）
+SNAPSHOT_FORMAT_VERSION = 1
+
+class SnapshotNotFoundError(Exception):
+    """スナップショットがない（未作成・対象外の重複タイプ・pyarrow 未インストール）場合の例外"""
+    pass
+
+class SnapshotService:
+    """オフライン全件走査（scan.py）で作成した重複グループのスナップショットの読み込みと提供
+
+    スナップショットは重複タイプごとに1つのレコードバッチで、メンバー1件につき1行
+    （duplicate_type, group_pos, group_first_id, duplicate_count, id, fingerprint）をグループ順・ID順に格納する。
+    ファイルはメモリマップで読み込み、更新（mtime の変化）を検出するまで再利用する。
+    グループのページはメンバーの表示列を現在のデータから取得して返すため、走査後に削除された行は含まれず、
+    内容が変わった行は全文の比較でグループから外れる。
+    """
+
+    _lock = threading.Lock()
+    _cache: Dict[str, Any] = {"key": None, "snapshot": None}
+
+    @staticmethod
+    def is_available() -> bool:
+        """pyarrow を利用できるかどうか"""
+        return pyarrow is not None
+
+    @staticmethod
+    def load() -> Dict[str, Any]:
+        """スナップショットを読み込む（ファイルが更新されるまでキャッシュ）"""
+        if pyarrow is None:
+            raise SnapshotNotFoundError("スナップショットの読み込みには pyarrow が必要です")
+
+        path = SnapshotConfig.get_snapshot_path()
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            raise SnapshotNotFoundError(f"スナップショットがありません: {path}（python scan.py で作成してください）")
+
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        with SnapshotService._lock:
+            if SnapshotService._cache["key"] == key:
+                return SnapshotService._cache["snapshot"]
+
+            reader = pyarrow.ipc.open_file(pyarrow.memory_map(path))
+            info = json.loads(reader.schema.metadata[SNAPSHOT_METADATA_KEY])
+            types = {}
+            for duplicate_type, entry in info["types"].items():
+                batch = reader.get_batch(entry["batch"])
+                group_pos = batch.column("group_pos").to_numpy()
+                # グループ k（0始まり）のメンバーは group_starts[k]:group_starts[k + 1]
+                group_starts = np.searchsorted(group_pos, np.arange(1, entry["groups"] + 2))
+                counts = np.diff(group_starts)
+                types[duplicate_type] = {
+                    "ids": batch.column("id").to_numpy(),
+                    "group_starts": group_starts,
+                    # 件数の多い順（同件数内は最小IDの昇順、安定ソート）
+                    "size_order": np.argsort(-counts, kind="stable"),
+                    "total_groups": entry["groups"],
+                    "total_duplicates": entry["rows"],
+                }
+
+            snapshot = {"info": info, "path": path, "file_bytes": stat.st_size, "types": types}
+            SnapshotService._cache.update(key=key, snapshot=snapshot)
+            return snapshot
+
+    @staticmethod
+    def get_info() -> Dict[str, Any]:
+        """スナップショットの作成日時・走査件数・重複タイプごとのグループ数"""
+        snapshot = SnapshotService.load()
+        info = dict(snapshot["info"])
+        info.update(path=snapshot["path"], file_bytes=snapshot["file_bytes"])
+        return info
+
+    @staticmethod
+    @metrics.instrumented
+    def get_duplicate_page(
+        duplicate_type: str,
+        sort_by: str = None,
+        sort_order: str = None,
+        group_order: str = "first_id",
+        group_offset: int = 0,
+        group_limit: int = 100
+    ) -> Tuple[List[DuplicateGroup], int, int, Optional[str]]:
+        """スナップショットのグループ単位のページと、全グループの件数・レコード数・作成日時を取得"""
+        snapshot = SnapshotService.load()
+        entry = snapshot["types"].get(duplicate_type)
+        if entry is None:
+            raise SnapshotNotFoundError(f"スナップショットに {duplicate_type} は含まれていません")
+
+        end = min(group_offset + group_limit, entry["total_groups"])
+        if group_order == "size":
+            indices = entry["size_order"][group_offset:end]
+        else:
+            indices = range(group_offset, end)
+        ids, starts = entry["ids"], entry["group_starts"]
+        groups = [ids[starts[index]:starts[index + 1]].tolist() for index in indices]
+
+        duplicate_groups = []
+        if groups:
+            query, params = DuplicateService.build_member_groups_query(groups, sort_by, sort_order)
+            # 走査後に削除された行は除く（件数が2件未満になったグループは返さない）
+            rows = (row for row in db_manager.execute_query(query, params) if row['reception_moddt'] is None)
+            duplicate_groups = list(DuplicateService.group_rows(rows, duplicate_type, group_offset))
+        return duplicate_groups, entry["total_groups"], entry["total_duplicates"], snapshot["info"]["created_at"]
@@ -4,6 +4,7 @@ class DuplicateManagementApp {
         this.currentFilters = {};
         this.selectedIds = new Set();
         this.totalCount = 0;
+        this.countMode = "exact";      // 総件数の算出方式（exact/estimate/none）
         this.currentOffset = 0;
         this.hasMore = false;
         this.isLoading = false;
@@ -135,6 +136,7 @@ class DuplicateManagementApp {
             }
 
             this.totalCount = data.total;
+            this.countMode = data.count_mode || "exact";
             this.currentOffset = data.offset;
             this.hasMore = data.has_more;
             this.statistics = data.statistics;
@@ -322,8 +324,15 @@ class DuplicateManagementApp {
         if (this.totalCount === 0) {
             paginationText.textContent = "データがありません";
         } else {
+            // 推定値・未集計の場合はその旨を件数に添える
+            let totalLabel = `全${this.totalCount.toLocaleString()}件`;
+            if (this.displayMode === 'normal' && this.countMode === 'estimate') {
+                totalLabel = `全約${this.totalCount.toLocaleString()}件`;
+            } else if (this.displayMode === 'normal' && this.countMode === 'none' && this.hasMore) {
+                totalLabel = `${this.totalCount.toLocaleString()}件以上`;
+            }
             paginationText.textContent = 
-                `全${this.totalCount.toLocaleString()}件中 ${this.pagination.startIndex.toLocaleString()}-${this.pagination.endIndex.toLocaleString()}件を表示`;
+                `${totalLabel}中 ${this.pagination.startIndex.toLocaleString()}-${this.pagination.endIndex.toLocaleString()}件を表示`;
         }
         
         currentPageSpan.textContent = this.pagination.currentPage;
@@ -398,7 +407,8 @@ class DuplicateManagementApp {
             const typeLabels = {
                 'exact': '完全一致',
                 'content': '受付内容',
-                'status': '対応状況'
+                'status': '対応状況',
+                'similar': '類似（受付内容）'
             };
             modeIndicator.className = "mode-indicator duplicate-mode";
             modeLabel.textContent = `🔍 重複データ表示 - ${typeLabels[this.currentDuplicateType] || this.currentDuplicateType}`;
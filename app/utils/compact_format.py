@@ -0,0 +1,55 @@
+from typing import Any, Dict, Optional
+from models.response_models import DuplicateGroup, DuplicatesResponse, ReceptionDataRecord
+
+# レコードの項目（rows の列順の基準）
+RECORD_FIELDS = tuple(ReceptionDataRecord.model_fields)
+
+def derive_duplicate_key(shared: Dict[str, Any]) -> Optional[str]:
+    """グループ共通の値から重複キーを復元（DuplicateService.build_duplicate_key と同じ規則、復元できない場合は None）"""
+    duplicate_type = shared.get("duplicate_type")
+    if duplicate_type == "exact" and "content" in shared and "status" in shared:
+        return f"{shared['content'] or ''}|{shared['status']}"
+    if duplicate_type == "content" and "content" in shared:
+        return shared["content"] or ''
+    if duplicate_type == "status" and "status" in shared:
+        return shared["status"]
+    return None
+
+def compact_group(group: DuplicateGroup) -> Dict[str, Any]:
+    """重複グループをコンパクト形式に変換
+
+    グループ内で全レコードが同じ値の項目は shared に1回だけ、異なる項目のみ columns の順で
+    rows（レコードごとの値の配列）に格納する。レコードの duplicate_key はグループの duplicate_key と
+    同じ場合は省略し、グループの duplicate_key も shared から復元できる場合（exact/content/status）は省略する。
+    """
+    records = group.records
+    shared = {}
+    columns = []
+    for field in RECORD_FIELDS:
+        if field == "duplicate_key" and all(record.duplicate_key == group.duplicate_key for record in records):
+            continue
+        first = getattr(records[0], field)
+        if field != "id" and all(getattr(record, field) == first for record in records[1:]):
+            shared[field] = first
+        else:
+            columns.append(field)
+
+    compact = {"group_id": group.group_id, "duplicate_count": group.duplicate_count}
+    if derive_duplicate_key(shared) != group.duplicate_key:
+        compact["duplicate_key"] = group.duplicate_key
+    compact["shared"] = shared
+    compact["columns"] = columns
+    compact["rows"] = [[getattr(record, field) for field in columns] for record in records]
+    return compact
+
+def compact_duplicates_response(response: DuplicatesResponse) -> Dict[str, Any]:
+    """重複検出APIのレスポンスをコンパクト形式に変換（グループ以外の項目はそのまま）"""
+    return {
+        "format": "compact",
+        "duplicates": [compact_group(group) for group in response.duplicates],
+        "total_groups": response.total_groups,
+        "total_duplicates": response.total_duplicates,
+        "group_offset": response.group_offset,
+        "group_limit": response.group_limit,
+        "has_more": response.has_more,
+    }
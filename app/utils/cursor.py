@@ -0,0 +1,92 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence, Tuple
+
+CURSOR_VERSION = 2
+
+# 継続トークンへ埋め込む文字列のソートキーの上限（UTF-8のバイト数）
+# 受付内容など長いテキストでソートした場合、最終行の値をそのまま埋め込むとURLが長くなりすぎるため、
+# 上限を超えたページでは読み進めた件数（OFFSET）を継続位置として返す
+CURSOR_MAX_TEXT_BYTES = 256
+
+class InvalidCursorError(ValueError):
+    """継続トークンが不正、またはソート条件と一致しない場合の例外"""
+    pass
+
+def _encode_value(value: Any) -> Any:
+    """ソートキー値をJSON化可能な形へ変換（型情報を保持）"""
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"$dec": str(value)}
+    return value
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "$dt" in value:
+            return datetime.fromisoformat(value["$dt"])
+        if "$d" in value:
+            return date.fromisoformat(value["$d"])
+        if "$dec" in value:
+            return Decimal(value["$dec"])
+        raise InvalidCursorError("不明なカーソル値の型です")
+    return value
+
+def _is_long_text(value: Any) -> bool:
+    return isinstance(value, str) and len(value.encode('utf-8')) > CURSOR_MAX_TEXT_BYTES
+
+def encode_cursor(sort_signature: Sequence[Tuple[str, str]], values: Sequence[Any], position: int) -> str:
+    """最終行のソートキーを不透明な継続トークンへエンコード
+
+    文字列のソートキーが CURSOR_MAX_TEXT_BYTES を超える場合はソートキーを埋め込まず、
+    読み進めた件数のみを格納する（次ページはOFFSETで取得）。
+
+    Args:
+        sort_signature: (列ID, 方向) のリスト（タイブレーク列を含む）
+        values: 最終行の各ソートキーの値
+        position: 最終行までに読み進めた件数
+    """
+    payload = {
+        "v": CURSOR_VERSION,
+        "s": [[column, direction] for column, direction in sort_signature],
+        "n": position,
+    }
+    if not any(_is_long_text(value) for value in values):
+        payload["k"] = [_encode_value(value) for value in values]
+    raw = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(token: str, sort_signature: Sequence[Tuple[str, str]]) -> Tuple[Optional[List[Any]], int]:
+    """継続トークンをデコードし、(ソートキー値のリスト, 読み進めた件数) を返す
+
+    ソートキーを埋め込んでいないトークン（長いテキストのソートキー）では、ソートキー値はNone
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except Exception:
+        raise InvalidCursorError("カーソルの形式が不正です")
+
+    if not isinstance(payload, dict) or payload.get("v") != CURSOR_VERSION:
+        raise InvalidCursorError("カーソルのバージョンが一致しません")
+
+    expected = [[column, direction] for column, direction in sort_signature]
+    if payload.get("s") != expected:
+        raise InvalidCursorError("カーソルのソート条件がリクエストと一致しません")
+
+    position = payload.get("n")
+    if not isinstance(position, int) or isinstance(position, bool) or position < 0:
+        raise InvalidCursorError("カーソルの位置が不正です")
+
+    if "k" not in payload:
+        return None, position
+
+    values = payload["k"]
+    if not isinstance(values, list) or len(values) != len(expected):
+        raise InvalidCursorError("カーソルのソートキーが不正です")
+
+    return [_decode_value(value) for value in values], position
@@ -0,0 +1,105 @@
+from typing import Any, Optional
+import gzip
+import zlib
+import pydantic_core
+from fastapi.responses import Response
+from pydantic import BaseModel
+from config.response_config import ResponseConfig
+from database import db_manager
+from utils.metrics import metrics
+
+# orjson は任意（未インストール時は pydantic のJSONシリアライザを使う）
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 日時は pydantic と同じ形式で出力する（UTCは "Z"）
+ORJSON_OPTIONS = orjson.OPT_UTC_Z if orjson is not None else 0
+
+def dumps(content: Any) -> bytes:
+    """JSON（UTF-8）に変換
+
+    モデルは組み立て時に検証済みのため再検証せずに出力する。
+    出力は FastAPI の既定の JSONResponse と同じ（非ASCII文字をエスケープせず、空白なし）。
+    """
+    if orjson is not None:
+        if isinstance(content, BaseModel):
+            content = content.model_dump()
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+    return pydantic_core.to_json(content)
+
+def is_fast_json_available() -> bool:
+    """orjson を利用できるかどうか"""
+    return orjson is not None
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Accept-Encoding が gzip を受け付けるか（q=0 による拒否・"*" に対応）"""
+    if not accept_encoding or not ResponseConfig.is_compression_enabled():
+        return False
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding.strip().lower()] = quality
+    if "gzip" in qualities:
+        return qualities["gzip"] > 0
+    return qualities.get("*", 0) > 0
+
+class GzipStream:
+    """ストリーミング送信用の gzip 圧縮（チャンクごとにフラッシュし、受信側で逐次展開できるようにする）"""
+
+    def __init__(self):
+        # wbits=31: gzip 形式（ヘッダー・CRC付き）
+        self._compressor = zlib.compressobj(ResponseConfig.get_compression_level(), zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+class FastJSONResponse(Response):
+    """response_model による再検証を省いて送信するJSONレスポンス
+
+    エンドポイントが Response を返すと FastAPI は response_model での検証・変換を行わないため、
+    サービスで組み立てたレスポンスモデルをそのまま dumps で出力する
+    （response_model はAPIドキュメントのスキーマとして残す）。
+    accept_encoding（リクエストの Accept-Encoding）に gzip が含まれ、本文が
+    RESPONSE_COMPRESSION_MIN_BYTES 以上の場合は gzip で圧縮する。
+    圧縮は送信時に db_manager.run_blocking で行い、大きな本文の圧縮でイベントループを止めない。
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, content: Any, accept_encoding: Optional[str] = None, **kwargs):
+        super().__init__(content, **kwargs)
+        self.compress_pending = False
+        if not ResponseConfig.is_compression_enabled():
+            return
+        self.headers["vary"] = "Accept-Encoding"
+        if accepts_gzip(accept_encoding) and len(self.body) >= ResponseConfig.get_compression_min_bytes():
+            self.compress_pending = True
+
+    def compress(self) -> None:
+        """本文を gzip で圧縮し、ヘッダーを更新"""
+        with metrics.stage("compress"):
+            self.body = gzip.compress(self.body, compresslevel=ResponseConfig.get_compression_level())
+        self.headers["content-encoding"] = "gzip"
+        self.headers["content-length"] = str(len(self.body))
+        self.compress_pending = False
+
+    async def __call__(self, scope, receive, send) -> None:
+        if self.compress_pending:
+            await db_manager.run_blocking(self.compress)
+        await super().__call__(scope, receive, send)
+
+    def render(self, content: Any) -> bytes:
+        with metrics.stage("serialize"):
+            return dumps(content)
@@ -0,0 +1,331 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import functools
+import threading
+import time
+from config.metrics_config import MetricsConfig
+
+# 処理中のリクエストの scope（ルーティングで scope["route"] が設定された後にエンドポイントを決める）
+current_endpoint: ContextVar[Optional[dict]] = ContextVar("current_endpoint", default=None)
+
+# id(ルート) → エンドポイント（include_router の prefix を含むパスのテンプレート、ルートはアプリと同じ期間保持される）
+_route_labels: Dict[int, str] = {}
+
+# 取得行数のヒストグラムの境界
+ROW_BUCKETS = [0, 1, 10, 100, 1000, 10000, 100000, 1000000]
+
+# Prometheus のテキスト形式（バージョン 0.0.4）
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def format_metric(name: str, documentation: str, metric_type: str, samples: Dict[tuple, float]) -> List[str]:
+    """出力時に値を取得するメトリクスの行（samples: ((ラベル名, 値), ...) → 値）"""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {metric_type}"]
+    for labels, value in samples.items():
+        label_text = _format_labels([key for key, _ in labels], [item for _, item in labels])
+        lines.append(f"{name}{label_text} {_format_number(value)}")
+    return lines
+
+def _route_label(route, path: str) -> str:
+    """ルートのパスのテンプレートに、リクエストのパスから求めた include_router の prefix を付ける"""
+    template = getattr(route, "path", None) or "unmatched"
+    path_regex = getattr(route, "path_regex", None)
+    if path_regex is not None and not path_regex.match(path):
+        for index in range(1, len(path)):
+            if path[index] == "/" and path_regex.match(path[index:]):
+                return path[:index] + template
+    return template
+
+def endpoint_label(scope: Optional[dict] = None) -> str:
+    """エンドポイントのラベル（リクエスト外の処理は background、一致するルートがない場合は unmatched）"""
+    if scope is None:
+        scope = current_endpoint.get()
+        if scope is None:
+            return "background"
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    label = _route_labels.get(id(route))
+    if label is None:
+        label = _route_labels[id(route)] = _route_label(route, scope.get("path", ""))
+    return label
+
+class Counter:
+    """ラベルごとの累計値"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...], amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_number(value)}")
+        return lines
+
+class Histogram:
+    """ラベルごとの度数分布（境界ごとの件数・合計・件数）"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = list(buckets)
+        self._lock = threading.Lock()
+        # ラベル → [境界ごとの件数（末尾は +Inf）, 合計]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._series.items())
+        bounds = self.buckets + [float("inf")]
+        for labels, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                le = f'le="{_format_number(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_number(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+class _Timer:
+    """with ブロックの処理時間を記録（例外時は errors にも加算）"""
+
+    __slots__ = ("histogram", "labels", "errors", "error_labels", "started")
+
+    def __init__(self, histogram: Histogram, labels: Tuple[str, ...],
+                 errors: Optional[Counter] = None, error_labels: Tuple[str, ...] = ()):
+        self.histogram = histogram
+        self.labels = labels
+        self.errors = errors
+        self.error_labels = error_labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(self.labels, time.perf_counter() - self.started)
+        if exc_type is not None and issubclass(exc_type, Exception) and self.errors is not None:
+            self.errors.inc(self.error_labels + (exc_type.__name__,))
+        return False
+
+class _QueryTracker:
+    """DB操作の処理時間・取得行数・エラーを記録（rows は with ブロック内で設定）"""
+
+    __slots__ = ("registry", "operation", "endpoint", "rows", "started")
+
+    def __init__(self, registry: "MetricsRegistry", operation: str):
+        self.registry = registry
+        self.operation = operation
+        self.endpoint = endpoint_label()
+        self.rows = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        registry = self.registry
+        labels = (self.endpoint, self.operation)
+        registry.db_duration.observe(labels, elapsed)
+        registry.stage_duration.observe((self.endpoint, registry.QUERY_STAGES.get(self.operation, "sql")), elapsed)
+        if self.rows is not None:
+            registry.db_rows.observe(labels, self.rows)
+        # 逐次取得を途中で打ち切った場合（GeneratorExit）はエラーに含めない
+        if exc_type is not None and issubclass(exc_type, Exception):
+            registry.db_errors.inc(labels + (exc_type.__name__,))
+        return False
+
+class _NullContext:
+    """計測しない場合の with ブロック（rows の設定は無視）"""
+
+    __slots__ = ("rows",)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+class MetricsRegistry:
+    """処理時間・行数・エラー件数のプロセス内の集計と Prometheus のテキスト形式での出力
+
+    - http_request_duration_seconds: リクエスト全体（エンドポイント・メソッド・ステータス別）
+    - app_stage_duration_seconds: 段階別（接続待ち・SQL・逐次取得・レコード生成・JSON変換・圧縮）
+    - app_service_duration_seconds: サービスのメソッド別
+    - db_query_duration_seconds / db_rows_returned / db_errors_total: DB操作の種類別（接続待ちは operation=connect）
+    - http_request_exceptions_total: 処理されなかった例外
+    - db_pool_*: 接続プールの状態（出力時に取得）
+    ラベルのエンドポイントはルートのパスのテンプレート（/api/duplicates/{duplicate_type} など）で、
+    値の種類が増え続けないようにする。
+    """
+
+    # DB操作の種類と段階（connect は接続プールからの取得待ち、逐次取得は受け取り側の処理時間を含むため SQL と分ける）
+    QUERY_STAGES = {"connect": "connection_wait", "stream": "stream", "copy": "stream"}
+
+    def __init__(self):
+        self.enabled = MetricsConfig.is_enabled()
+        latency_buckets = MetricsConfig.get_latency_buckets()
+        self.request_duration = Histogram(
+            "http_request_duration_seconds", "HTTPリクエストの処理時間",
+            ("endpoint", "method", "status"), latency_buckets
+        )
+        self.request_exceptions = Counter(
+            "http_request_exceptions_total", "処理されなかった例外の件数", ("endpoint", "exception")
+        )
+        self.stage_duration = Histogram(
+            "app_stage_duration_seconds", "段階別の処理時間", ("endpoint", "stage"), latency_buckets
+        )
+        self.service_duration = Histogram(
+            "app_service_duration_seconds", "サービスのメソッド別の処理時間", ("endpoint", "service"), latency_buckets
+        )
+        self.service_errors = Counter(
+            "app_service_errors_total", "サービスのメソッドで発生した例外の件数", ("endpoint", "service", "exception")
+        )
+        self.db_duration = Histogram(
+            "db_query_duration_seconds", "DB操作の処理時間（operation=connect は接続プールからの取得待ち）",
+            ("endpoint", "operation"), latency_buckets
+        )
+        self.db_rows = Histogram(
+            "db_rows_returned", "DB操作の取得・更新行数", ("endpoint", "operation"), ROW_BUCKETS
+        )
+        self.db_errors = Counter(
+            "db_errors_total", "DB操作のエラー件数", ("endpoint", "operation", "exception")
+        )
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def stage(self, name: str):
+        """with ブロックの処理時間を段階 name として記録"""
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return _Timer(self.stage_duration, (endpoint_label(), name))
+
+    def observe_stage(self, name: str, seconds: float):
+        if self.enabled:
+            self.stage_duration.observe((endpoint_label(), name), seconds)
+
+    def track_query(self, operation: str):
+        """DB操作の処理時間・行数（tracker.rows）・エラーを記録する with ブロック"""
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return _QueryTracker(self, operation)
+
+    def instrumented(self, func: Callable) -> Callable:
+        """サービスのメソッドの処理時間・例外を記録するデコレーター（@staticmethod の内側に付ける）"""
+        service = func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+            endpoint = endpoint_label()
+            with _Timer(self.service_duration, (endpoint, service), self.service_errors, (endpoint, service)):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def observe_request(self, endpoint: str, method: str, status: int, seconds: float,
+                        exception: Optional[BaseException] = None):
+        self.request_duration.observe((endpoint, method, str(status)), seconds)
+        if exception is not None:
+            self.request_exceptions.inc((endpoint, type(exception).__name__))
+
+    def add_collector(self, collector: Callable[[], List[str]]):
+        """出力時に呼び出して行を追加する関数を登録（接続プールの状態など）"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Prometheus のテキスト形式で出力"""
+        lines: List[str] = []
+        if self.enabled:
+            for metric in (self.request_duration, self.request_exceptions, self.stage_duration,
+                           self.service_duration, self.service_errors, self.db_duration,
+                           self.db_rows, self.db_errors):
+                lines.extend(metric.render())
+            for collector in self._collectors:
+                try:
+                    lines.extend(collector())
+                except Exception as e:
+                    print(f"メトリクス収集エラー: {e}")
+        return "\n".join(lines) + "\n"
+
+_NULL_CONTEXT = _NullContext()
+
+class MetricsMiddleware:
+    """リクエストの処理時間をエンドポイント別に記録するASGIミドルウェア
+
+    current_endpoint に scope を設定し、ルーティングで決まったルート（scope["route"]）から
+    エンドポイント（パスのテンプレート）を求める（DB操作・サービスの記録にも使う。
+    スレッドプールへ退避した処理には db_manager.run_blocking が引き継ぐ）。
+    一致するルートがない場合は unmatched とする。ストリーミングのレスポンスは送信完了までを計測する。
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = None):
+        self.app = app
+        self.registry = registry or metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        token = current_endpoint.set(scope)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            self.registry.observe_request(endpoint_label(scope), scope["method"], 500,
+                                          time.perf_counter() - started, e)
+            raise
+        else:
+            self.registry.observe_request(endpoint_label(scope), scope["method"], status,
+                                          time.perf_counter() - started)
+        finally:
+            current_endpoint.reset(token)
+
+# シングルトンインスタンス
+metrics = MetricsRegistry()
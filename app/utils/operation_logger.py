@@ -1,7 +1,7 @@
 import logging
 import os
 from logging.handlers import RotatingFileHandler
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 class OperationLogger:
@@ -102,6 +102,79 @@ class OperationLogger:
         except Exception as e:
             print(f"復元ログ出力エラー: {e}")
 
+    def log_filtered_delete_operation(
+        self,
+        filter_conditions: Dict,
+        success: bool,
+        matched_count: int = 0,
+        deleted_count: int = 0,
+        first_id: Optional[int] = None,
+        last_id: Optional[int] = None,
+        error: str = None
+    ):
+        """フィルター条件による一括削除のログ出力"""
+        if not self._logger:
+            return
+
+        try:
+            if success:
+                id_range = f", extentids: {first_id}...{last_id}" if deleted_count else ""
+                message = (f"SUCCESS: Deleted by filter: {filter_conditions} "
+                           f"({deleted_count} records, {matched_count} matched{id_range})")
+                self._logger.info(f"[DELETE] {message}")
+            else:
+                error_msg = error if error else "Unknown error"
+                message = f"ERROR: Failed to delete by filter: {filter_conditions} - {error_msg}"
+                self._logger.error(f"[DELETE] {message}")
+        except Exception as e:
+            print(f"削除ログ出力エラー: {e}")
+
+    def log_delete_chunk(
+        self,
+        chunk_no: int,
+        deleted_count: int,
+        first_id: Optional[int],
+        last_id: Optional[int],
+        elapsed_seconds: float
+    ):
+        """チャンク単位の一括削除のログ出力（中断時の再開位置の確認にも用いる）"""
+        if not self._logger:
+            return
+
+        try:
+            message = (f"CHUNK {chunk_no}: Deleted extentids: {first_id}...{last_id} "
+                       f"({deleted_count} records, {elapsed_seconds}s)")
+            self._logger.info(f"[DELETE] {message}")
+        except Exception as e:
+            print(f"削除ログ出力エラー: {e}")
+
+    def log_filtered_restore_operation(
+        self,
+        filter_conditions: Dict,
+        success: bool,
+        matched_count: int = 0,
+        restored_count: int = 0,
+        first_id: Optional[int] = None,
+        last_id: Optional[int] = None,
+        error: str = None
+    ):
+        """フィルター条件による一括復元のログ出力"""
+        if not self._logger:
+            return
+
+        try:
+            if success:
+                id_range = f", extentids: {first_id}...{last_id}" if restored_count else ""
+                message = (f"SUCCESS: Restored by filter: {filter_conditions} "
+                           f"({restored_count} records, {matched_count} matched{id_range})")
+                self._logger.info(f"[RESTORE] {message}")
+            else:
+                error_msg = error if error else "Unknown error"
+                message = f"ERROR: Failed to restore by filter: {filter_conditions} - {error_msg}"
+                self._logger.error(f"[RESTORE] {message}")
+        except Exception as e:
+            print(f"復元ログ出力エラー: {e}")
+
     @staticmethod
     def get_logger() -> 'OperationLogger':
         """シングルトンパターンでロガーを取得"""
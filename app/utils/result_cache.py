@@ -0,0 +1,186 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import json
+import pickle
+import threading
+import time
+from models.request_models import FilterRequest
+from config.cache_config import CacheConfig
+
+def normalize_filters(filters: Optional[FilterRequest]) -> dict:
+    """キャッシュキー用にフィルター条件を正規化（未指定の項目を除外）"""
+    if filters is None:
+        return {}
+    normalized = {}
+    for key, value in filters:
+        if value in (None, "", False):
+            continue
+        normalized[key] = value.isoformat() if isinstance(value, datetime) else value
+    # 日付範囲が片方だけの場合は検索条件に使われないため、対象列の指定ごと除外
+    if not (filters.date_from and filters.date_to):
+        for key in ("date_from", "date_to", "date_field"):
+            normalized.pop(key, None)
+    return normalized
+
+def normalize_sort(value: Optional[str]) -> Optional[str]:
+    """キャッシュキー用にソート指定（カンマ区切り）を正規化"""
+    if not value:
+        return None
+    return ",".join(part.strip().lower() for part in value.split(","))
+
+class ResultCache:
+    """検索結果のプロセス内キャッシュ（LRU・メモリ上限・有効期間付き）
+
+    エントリはフィルター条件（削除状態を除く）ごとに索引し、削除・復元の対象行を含みうる
+    フィルター条件のエントリだけを破棄できるようにする。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[Any, int, float, str]]" = OrderedDict()  # キー → (値, サイズ, 期限, フィルターキー)
+        self._filter_keys: Dict[str, set] = {}           # フィルターキー → エントリのキー
+        self._filters: Dict[str, Optional[FilterRequest]] = {}  # フィルターキー → フィルター条件
+        self._bytes = 0
+        self._generation = 0  # 無効化の開始ごとに増加（読み込み中に無効化された結果は保存しない）
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+            "oversized": 0,
+        }
+        self._namespace_stats: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def build_filter_key(filters: Optional[FilterRequest]) -> str:
+        """削除状態の条件を除いたフィルター条件のキー（無効化の単位）"""
+        normalized = normalize_filters(filters)
+        normalized.pop("include_deleted", None)
+        return json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+
+    @staticmethod
+    def build_key(namespace: str, filters: Optional[FilterRequest], params: dict) -> str:
+        """結果のキー（フィルターなしは削除済みも含めて返すため、空のフィルター条件とは区別する）"""
+        normalized = None if filters is None else normalize_filters(filters)
+        return json.dumps([namespace, normalized, params], sort_keys=True, ensure_ascii=False, default=str)
+
+    def get_or_load(self, namespace: str, filters: Optional[FilterRequest], params: dict, loader: Callable[[], Any]) -> Any:
+        """キャッシュ済みの結果を返し、なければ loader の結果を保存して返す"""
+        if not CacheConfig.is_result_cache_enabled():
+            return loader()
+
+        key = ResultCache.build_key(namespace, filters, params)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= now:
+                self._remove_locked(key)
+                self._stats["expirations"] += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._count_locked(namespace, "hits")
+                return entry[0]
+            self._count_locked(namespace, "misses")
+            generation = self._generation
+
+        value = loader()
+        self._store(key, namespace, filters, value, generation)
+        return value
+
+    def _store(self, key: str, namespace: str, filters: Optional[FilterRequest], value: Any, generation: int):
+        try:
+            size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception as e:
+            print(f"結果キャッシュのサイズ計算エラー（{namespace}）: {e}")
+            return
+
+        max_bytes = CacheConfig.get_result_cache_max_bytes()
+        max_entries = CacheConfig.get_result_cache_max_entries()
+        filter_key = ResultCache.build_filter_key(filters)
+        with self._lock:
+            if generation != self._generation:
+                return
+            if size > max_bytes:
+                self._stats["oversized"] += 1
+                return
+            if key in self._entries:
+                self._remove_locked(key)
+            self._entries[key] = (value, size, time.monotonic() + CacheConfig.get_result_cache_ttl(), filter_key)
+            self._filter_keys.setdefault(filter_key, set()).add(key)
+            self._filters.setdefault(filter_key, filters)
+            self._bytes += size
+            self._stats["stores"] += 1
+            # 上限を超えた分を最も長く参照されていないエントリから破棄
+            while self._entries and (len(self._entries) > max_entries or self._bytes > max_bytes):
+                oldest_key = next(iter(self._entries))
+                self._remove_locked(oldest_key)
+                self._stats["evictions"] += 1
+
+    def _remove_locked(self, key: str):
+        _, size, _, filter_key = self._entries.pop(key)
+        self._bytes -= size
+        keys = self._filter_keys.get(filter_key)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._filter_keys[filter_key]
+                self._filters.pop(filter_key, None)
+
+    def _count_locked(self, namespace: str, counter: str):
+        self._stats[counter] += 1
+        namespace_stats = self._namespace_stats.setdefault(namespace, {"hits": 0, "misses": 0})
+        namespace_stats[counter] += 1
+
+    def begin_invalidation(self) -> List[Tuple[str, Optional[FilterRequest]]]:
+        """無効化を開始し、判定対象となるキャッシュ中のフィルター条件を返す
+
+        これ以降に完了した読み込みは、無効化の前のデータを読んだ可能性があるため保存しない。
+        """
+        with self._lock:
+            self._generation += 1
+            return list(self._filters.items())
+
+    def invalidate_filters(self, filter_keys: List[str]) -> int:
+        """指定したフィルター条件のエントリを破棄し、破棄した件数を返す"""
+        removed = 0
+        with self._lock:
+            for filter_key in filter_keys:
+                for key in list(self._filter_keys.get(filter_key, ())):
+                    self._remove_locked(key)
+                    removed += 1
+            self._stats["invalidations"] += removed
+        return removed
+
+    def clear(self) -> int:
+        """すべてのエントリを破棄"""
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+            self._filter_keys.clear()
+            self._filters.clear()
+            self._bytes = 0
+            self._generation += 1
+            self._stats["invalidations"] += removed
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """ヒット率などの統計情報"""
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+            stats["entries"] = len(self._entries)
+            stats["filters"] = len(self._filters)
+            stats["bytes"] = self._bytes
+            stats["max_bytes"] = CacheConfig.get_result_cache_max_bytes()
+            stats["max_entries"] = CacheConfig.get_result_cache_max_entries()
+            stats["enabled"] = CacheConfig.is_result_cache_enabled()
+            stats["namespaces"] = {name: dict(counts) for name, counts in self._namespace_stats.items()}
+        return stats
+
+# グローバルキャッシュインスタンス
+result_cache = ResultCache()
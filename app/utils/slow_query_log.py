@@ -0,0 +1,312 @@
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Any, Callable, Dict, Optional
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from config.logging_config import LoggingConfig
+from config.slow_query_config import SlowQueryConfig
+from utils.metrics import endpoint_label
+
+# クエリの形ごとに保持する直近の記録の件数
+RECENT_ENTRIES = 10
+
+_COMMENT_PATTERN = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING_PATTERN = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_PATTERN = re.compile(r"(?<![\w.$])\d+(?:\.\d+)?\b")
+_PLACEHOLDER_PATTERN = re.compile(r"%\(\w+\)s|%s")
+_VALUE_LIST_PATTERN = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_READ_PATTERN = re.compile(r"(SELECT|WITH)\b", re.I)
+_WRITE_PATTERN = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|TRUNCATE)\b", re.I)
+
+def normalize_query(query: str) -> str:
+    """クエリの形（リテラル・パラメータを ? に置き換え、空白を1つにまとめたSQL）"""
+    normalized = _COMMENT_PATTERN.sub(" ", query)
+    normalized = _STRING_PATTERN.sub("?", normalized)
+    normalized = _PLACEHOLDER_PATTERN.sub("?", normalized)
+    normalized = _NUMBER_PATTERN.sub("?", normalized)
+    normalized = _VALUE_LIST_PATTERN.sub("(?...)", normalized)
+    return _WHITESPACE_PATTERN.sub(" ", normalized).strip().replace("%%", "%")
+
+def shape_id(normalized_query: str) -> str:
+    return hashlib.md5(normalized_query.encode()).hexdigest()[:16]
+
+def redact_params(params: Optional[Any]) -> Optional[list]:
+    """パラメータの値を型と長さだけにする（検索キーワードなどをログに残さない）"""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return [f"{key}={_redact_value(value)}" for key, value in params.items()]
+    return [_redact_value(value) for value in params]
+
+def _redact_value(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}({len(value)})"
+    if isinstance(value, (list, tuple, set)):
+        return f"list[{len(value)}]"
+    return type(value).__name__
+
+def is_read_only(normalized_query: str) -> bool:
+    """再実行（EXPLAIN ANALYZE）しても更新を伴わないクエリかどうか（SELECT ... FOR UPDATE も除外）"""
+    return _READ_PATTERN.match(normalized_query) is not None \
+        and _WRITE_PATTERN.search(normalized_query) is None
+
+def summarize_plan(plan: list) -> Dict[str, Any]:
+    """EXPLAIN (FORMAT JSON) の結果の要約（最上位ノードの種類・コスト・実行時間・バッファー）"""
+    root = plan[0] if plan else {}
+    node = root.get("Plan", {})
+    return {
+        "node_type": node.get("Node Type"),
+        "total_cost": node.get("Total Cost"),
+        "plan_rows": node.get("Plan Rows"),
+        "actual_rows": node.get("Actual Rows"),
+        "planning_ms": root.get("Planning Time"),
+        "execution_ms": root.get("Execution Time"),
+        "shared_hit_blocks": node.get("Shared Hit Blocks"),
+        "shared_read_blocks": node.get("Shared Read Blocks"),
+        "temp_written_blocks": node.get("Temp Written Blocks"),
+    }
+
+class SlowQueryLog:
+    """しきい値を超えたクエリのクエリの形ごとの集計・ローテーションするログへの記録・実行計画の取得
+
+    クエリの形はリテラル・パラメータを除いたSQLで、フィルター条件の組み合わせごとに別の形になる。
+    実行計画は記録のうち SLOW_QUERY_EXPLAIN_SAMPLE_RATE の割合について、同じ形では
+    SLOW_QUERY_EXPLAIN_INTERVAL 秒に1回まで、専用のスレッドで同じクエリを再実行して取得する
+    （同時に取得するのは1件のみ）。更新を伴うクエリは ANALYZE せず、推定の実行計画のみ取得する。
+    """
+
+    def __init__(self):
+        self.enabled = SlowQueryConfig.is_enabled()
+        self.threshold_ms = SlowQueryConfig.get_threshold_ms() if self.enabled else float("inf")
+        self._lock = threading.Lock()
+        self._shapes: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._recorded = 0
+        self._explains = 0
+        self._explain_pending = False
+        self._explainer: Optional[Callable[..., list]] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._logger: Optional[logging.Logger] = None
+        self._logger_ready = False
+
+    def set_explainer(self, explainer: Callable[..., list]):
+        """実行計画を取得する関数（query, params, analyze, timeout_ms → EXPLAIN (FORMAT JSON) の結果）を登録"""
+        self._explainer = explainer
+
+    def observe(self, operation: str, query: str, params: Optional[Any], seconds: float, rows: Optional[int] = None):
+        """クエリの処理時間を受け取り、しきい値を超えた場合に記録"""
+        duration_ms = seconds * 1000
+        if duration_ms < self.threshold_ms:
+            return
+        try:
+            self._record(operation, query, params, duration_ms, rows)
+        except Exception as e:
+            print(f"スロークエリ記録エラー: {e}")
+
+    def _record(self, operation: str, query: str, params: Optional[Any], duration_ms: float, rows: Optional[int]):
+        normalized = normalize_query(query)
+        shape = shape_id(normalized)
+        now = datetime.now()
+        endpoint = endpoint_label()
+        entry = {
+            "shape_id": shape,
+            "operation": operation,
+            "duration_ms": round(duration_ms, 3),
+            "rows": rows,
+            "endpoint": endpoint,
+            "params": redact_params(params),
+        }
+
+        explain = False
+        with self._lock:
+            self._recorded += 1
+            summary = self._shapes.get(shape)
+            if summary is None:
+                summary = self._shapes[shape] = {
+                    "shape_id": shape,
+                    "operation": operation,
+                    "query": normalized,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "max_rows": None,
+                    "first_seen": now,
+                    "endpoints": {},
+                    "recent": deque(maxlen=RECENT_ENTRIES),
+                    "plan": None,
+                    "plan_summary": None,
+                    "explained_at": None,
+                    "explain_error": None,
+                }
+                while len(self._shapes) > SlowQueryConfig.get_max_shapes():
+                    self._shapes.popitem(last=False)
+            else:
+                self._shapes.move_to_end(shape)
+            summary["count"] += 1
+            summary["total_ms"] += duration_ms
+            summary["max_ms"] = max(summary["max_ms"], duration_ms)
+            summary["last_ms"] = duration_ms
+            summary["last_seen"] = now
+            if rows is not None:
+                summary["max_rows"] = max(summary["max_rows"] or 0, rows)
+            summary["endpoints"][endpoint] = summary["endpoints"].get(endpoint, 0) + 1
+            summary["recent"].append(dict(entry, time=now))
+
+            if self._should_explain(summary):
+                self._explain_pending = True
+                summary["explained_at"] = now
+                explain = True
+
+        self._write("SLOW", dict(entry, query=normalized))
+        if explain:
+            self._get_executor().submit(self._explain, shape, query, params, is_read_only(normalized))
+
+    def _should_explain(self, summary: Dict[str, Any]) -> bool:
+        if self._explainer is None or self._explain_pending:
+            return False
+        sample_rate = SlowQueryConfig.get_explain_sample_rate()
+        if sample_rate <= 0 or random.random() >= sample_rate:
+            return False
+        explained_at = summary["explained_at"]
+        return explained_at is None or \
+            (datetime.now() - explained_at).total_seconds() >= SlowQueryConfig.get_explain_interval()
+
+    def _explain(self, shape: str, query: str, params: Optional[Any], analyze: bool):
+        """同じクエリを EXPLAIN で再実行して実行計画を保存（専用スレッドで実行）"""
+        plan = None
+        error = None
+        started = time.perf_counter()
+        try:
+            plan = self._explainer(query, params, analyze=analyze, timeout_ms=SlowQueryConfig.get_explain_timeout_ms())
+        except Exception as e:
+            error = str(e).strip()
+            print(f"スロークエリの実行計画取得エラー: {error}")
+        finally:
+            with self._lock:
+                self._explain_pending = False
+                self._explains += 1
+                summary = self._shapes.get(shape)
+                if summary is not None:
+                    summary["plan"] = plan
+                    summary["plan_summary"] = dict(summarize_plan(plan), analyze=analyze) if plan else None
+                    summary["explain_error"] = error
+        self._write("EXPLAIN", {
+            "shape_id": shape,
+            "analyze": analyze,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+            "plan": plan,
+            "error": error,
+        })
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+            return self._executor
+
+    def _get_logger(self) -> Optional[logging.Logger]:
+        """ローテーションするファイルへのロガー（初回の記録時に作成）"""
+        if self._logger_ready:
+            return self._logger
+        with self._lock:
+            if not self._logger_ready:
+                self._logger = self._setup_logger()
+                self._logger_ready = True
+        return self._logger
+
+    @staticmethod
+    def _setup_logger() -> Optional[logging.Logger]:
+        log_dir = LoggingConfig.get_log_dir()
+        try:
+            os.makedirs(log_dir, exist_ok=True)
+            handler = RotatingFileHandler(
+                os.path.join(log_dir, SlowQueryConfig.get_log_file()),
+                maxBytes=LoggingConfig.get_max_bytes(),
+                backupCount=LoggingConfig.get_backup_count(),
+                encoding='utf-8'
+            )
+        except OSError as e:
+            print(f"スロークエリログ設定エラー: {e}")
+            return None
+        handler.setFormatter(logging.Formatter(LoggingConfig.get_log_format(), datefmt=LoggingConfig.get_date_format()))
+        logger = logging.getLogger('slow_query_logger')
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.handlers.clear()
+        logger.addHandler(handler)
+        return logger
+
+    def _write(self, kind: str, record: Dict[str, Any]):
+        logger = self._get_logger()
+        if logger is None:
+            return
+        try:
+            logger.warning(f"[{kind}] " + json.dumps(record, ensure_ascii=False, default=str))
+        except Exception as e:
+            print(f"スロークエリログ出力エラー: {e}")
+
+    @staticmethod
+    def _public(summary: Dict[str, Any], detail: bool) -> Dict[str, Any]:
+        result = {
+            key: value for key, value in summary.items()
+            if key not in ("recent", "plan", "total_ms", "max_ms", "last_ms")
+        }
+        result.update(
+            total_ms=round(summary["total_ms"], 3),
+            avg_ms=round(summary["total_ms"] / summary["count"], 3),
+            max_ms=round(summary["max_ms"], 3),
+            last_ms=round(summary["last_ms"], 3),
+            endpoints=dict(summary["endpoints"]),
+        )
+        if detail:
+            result.update(recent=list(summary["recent"]), plan=summary["plan"])
+        return result
+
+    def get_summary(self, sort_by: str = "total_ms", limit: int = 50) -> Dict[str, Any]:
+        """クエリの形ごとの集計（sort_by の降順）"""
+        with self._lock:
+            shapes = [self._public(summary, detail=False) for summary in self._shapes.values()]
+            recorded, explains = self._recorded, self._explains
+        shapes.sort(key=lambda shape: shape[sort_by], reverse=True)
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": self.threshold_ms if self.enabled else None,
+            "explain_sample_rate": SlowQueryConfig.get_explain_sample_rate(),
+            "recorded": recorded,
+            "explains": explains,
+            "shape_count": len(shapes),
+            "shapes": shapes[:limit],
+        }
+
+    def get_shape(self, shape: str) -> Optional[Dict[str, Any]]:
+        """クエリの形の集計・直近の記録・実行計画（記録がない場合は None）"""
+        with self._lock:
+            summary = self._shapes.get(shape)
+            return self._public(summary, detail=True) if summary is not None else None
+
+    def reset(self):
+        """集計を破棄（ログファイルはそのまま）"""
+        with self._lock:
+            self._shapes.clear()
+            self._recorded = 0
+            self._explains = 0
+
+    def shutdown(self):
+        """実行計画の取得を打ち切る（アプリケーション終了時）"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+# シングルトンインスタンス
+slow_query_log = SlowQueryLog()
@@ -0,0 +1,116 @@
+"""
+APIベンチマークのシナリオ定義（bench_api.py / load_driver.py 共通）
+
+シナリオは1回の実行で順に送るリクエストの並びで、リクエストごとにラベルを付けて集計する。
+深いページ（offset / cursor）の位置は準備処理で総件数から決める。
+削除・復元（delete_restore）は generate_dataset.py の「ベンチマーク用製品」の行を絞り込みで論理削除してから
+同じ条件で復元するため、実行後のデータは元の状態に戻る（write=True のシナリオは負荷試験の既定には含めない）。
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, NamedTuple, Optional
+from urllib.parse import urlencode
+
+from bench_common import HttpClient
+
+# generate_dataset.py の削除・復元の計測対象
+BENCH_PRODUCT_NAME = "ベンチマーク用製品"
+
+# 受付日時は日本時間で格納され、APIはUTCで返す（継続トークンには格納された値が入る）
+JST = timezone(timedelta(hours=9))
+
+class BenchRequest(NamedTuple):
+    label: str
+    method: str
+    path: str
+    body: Optional[dict] = None
+
+class Scenario(NamedTuple):
+    name: str
+    requests: List[BenchRequest]
+    write: bool = False
+
+def reception_path(**params) -> str:
+    return "/api/reception-data?" + urlencode(params)
+
+def resolve_deep_page(client: HttpClient, deep_offset: int, limit: int) -> Dict[str, object]:
+    """深いページの offset と、同じ位置から読み進める継続トークン（既定の並び順: 受付日時の降順）"""
+    from services.data_service import DataService
+    from utils.cursor import encode_cursor
+
+    total = client.get_json(reception_path(limit=1, count_mode="exact"))["total"]
+    offset = max(0, min(deep_offset, total - limit))
+    cursor = None
+    if offset > 0:
+        # offset の直前の行を最終行とするトークン（キーセットのソート指定は DataService と同じ）
+        row = client.get_json(reception_path(offset=offset - 1, limit=1, count_mode="none"))["data"][0]
+        sort_spec = DataService.build_keyset_sort_spec("reception_datetime", "desc")
+        reception_datetime = datetime.fromisoformat(row["reception_datetime"].replace("Z", "+00:00"))
+        values = {"reception_datetime": reception_datetime.astimezone(JST).replace(tzinfo=None), "id": row["id"]}
+        cursor = encode_cursor(
+            [(column, direction) for column, _, direction in sort_spec],
+            [values[column] for column, _, _ in sort_spec],
+            offset
+        )
+    return {"total": total, "offset": offset, "cursor": cursor}
+
+def build_scenarios(
+    client: HttpClient,
+    keyword: str = "障害",
+    deep_offset: int = 100000,
+    page_limit: int = 100,
+    group_limit: int = 100
+) -> Dict[str, Scenario]:
+    """シナリオの一覧（名前 → シナリオ）"""
+    deep = resolve_deep_page(client, deep_offset, page_limit)
+    scenarios = [
+        Scenario("reception_first_page", [
+            BenchRequest("reception_first_page", "GET", reception_path(limit=page_limit)),
+        ]),
+        Scenario("reception_deep_offset", [
+            BenchRequest("reception_deep_offset", "GET", reception_path(offset=deep["offset"], limit=page_limit)),
+        ]),
+        Scenario("reception_keyword", [
+            BenchRequest("reception_keyword", "GET", reception_path(keyword=keyword, limit=page_limit)),
+        ]),
+        Scenario("reception_filtered", [
+            BenchRequest("reception_filtered", "GET", reception_path(
+                content_keyword=keyword, progress="対応中", date_from="2020-01-01T00:00:00",
+                date_to="2022-12-31T23:59:59", limit=page_limit
+            )),
+        ]),
+        Scenario("metadata", [
+            BenchRequest("metadata", "GET", "/api/metadata"),
+        ]),
+    ]
+    if deep["cursor"]:
+        scenarios.append(Scenario("reception_deep_cursor", [
+            BenchRequest("reception_deep_cursor", "GET", reception_path(
+                pagination="cursor", cursor=deep["cursor"], limit=page_limit
+            )),
+        ]))
+    for duplicate_type in ("exact", "content", "status"):
+        scenarios.append(Scenario(f"duplicates_{duplicate_type}", [
+            BenchRequest(f"duplicates_{duplicate_type}", "GET",
+                         f"/api/duplicates/{duplicate_type}?" + urlencode({"group_limit": group_limit})),
+        ]))
+
+    filters = {"product": BENCH_PRODUCT_NAME}
+    scenarios.append(Scenario("delete_restore", [
+        BenchRequest("delete_filtered", "POST", "/api/delete-duplicates",
+                     {"target_ids": [], "delete_scope": "filtered", "filter_conditions": filters}),
+        BenchRequest("restore_filtered", "POST", "/api/restore-records",
+                     {"target_ids": [], "restore_scope": "filtered", "filter_conditions": filters}),
+    ], write=True))
+    return {scenario.name: scenario for scenario in scenarios}
+
+def select_scenarios(available: Dict[str, Scenario], names: Optional[str], include_writes: bool) -> List[Scenario]:
+    """カンマ区切りの名前で選択（省略時は書き込みを除く全シナリオ、include_writes で書き込みも含める）"""
+    if not names:
+        return [scenario for scenario in available.values() if include_writes or not scenario.write]
+    selected = []
+    for name in (name.strip() for name in names.split(",")):
+        if name not in available:
+            raise ValueError(f"不明なシナリオです: {name}（{', '.join(available)}）")
+        selected.append(available[name])
+    return selected
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+APIのシナリオ別ベンチマーク（1クライアントで順に実行）
+
+起動中のサーバー（python run.py）へシナリオ（benchmarks/api_scenarios.py）ごとにリクエストを送り、
+ラベルごとの p50/p95/p99・平均・最大レイテンシを結果JSONに保存する。
+合成データ（benchmarks/generate_dataset.py）のデータベースに接続したサーバーで実行する想定で、
+コミット間の比較は benchmarks/compare_results.py で行う。
+結果キャッシュの効果を除いて計測する場合は、サーバーを RESULT_CACHE_ENABLED=false で起動する。
+
+シナリオ:
+- reception_first_page / reception_deep_offset / reception_deep_cursor: 一覧の先頭ページ・深いページ
+- reception_keyword / reception_filtered: キーワード検索・キーワードと進捗・日付の絞り込み
+- duplicates_exact / duplicates_content / duplicates_status: 重複検出（先頭 --group-limit グループ）
+- metadata: マスタデータ
+- delete_restore: 絞り込みによる一括削除と復元（--include-writes または --scenarios で指定した場合のみ）
+
+使い方:
+    python benchmarks/bench_api.py --iterations 30
+    python benchmarks/bench_api.py --scenarios reception_deep_offset,reception_deep_cursor --deep-offset 500000
+    python benchmarks/bench_api.py --include-writes --output api.json
+"""
+
+import argparse
+import sys
+import time
+
+from bench_common import HttpClient, collect_environment, summarize, write_result
+from api_scenarios import build_scenarios, select_scenarios
+
+
+def run_scenario(client: HttpClient, scenario, iterations: int, warmup: int) -> list:
+    """シナリオを warmup 回実行してから iterations 回計測し、リクエストのラベルごとに集計"""
+    for _ in range(warmup):
+        for request in scenario.requests:
+            client.request(request.method, request.path, request.body)
+
+    samples = {request.label: {"latencies": [], "errors": 0, "bytes": 0} for request in scenario.requests}
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for request in scenario.requests:
+            status, content, latency = client.request(request.method, request.path, request.body)
+            sample = samples[request.label]
+            if 200 <= status < 300:
+                sample["latencies"].append(latency)
+                sample["bytes"] += len(content)
+            else:
+                sample["errors"] += 1
+    elapsed = time.perf_counter() - started
+
+    return [
+        dict(label=label, scenario=scenario.name,
+             **summarize(sample["latencies"], sample["errors"], sample["bytes"], elapsed))
+        for label, sample in samples.items()
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="APIのシナリオ別ベンチマーク")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="サーバーのURL")
+    parser.add_argument("--scenarios", help="実行するシナリオ（カンマ区切り、省略時は書き込み以外のすべて）")
+    parser.add_argument("--include-writes", action="store_true", help="削除・復元のシナリオも実行")
+    parser.add_argument("--iterations", type=int, default=20, help="シナリオごとの計測回数")
+    parser.add_argument("--warmup", type=int, default=3, help="計測前の実行回数")
+    parser.add_argument("--keyword", default="障害", help="キーワード検索のキーワード")
+    parser.add_argument("--deep-offset", type=int, default=100000, help="深いページの位置（総件数を超える場合は末尾）")
+    parser.add_argument("--group-limit", type=int, default=100, help="重複検出で取得するグループ数")
+    parser.add_argument("--accept-encoding", default="gzip", help="Accept-Encoding ヘッダー（identity で非圧縮）")
+    parser.add_argument("--output", help="結果JSONの出力先（省略時は benchmarks/results/）")
+    args = parser.parse_args()
+
+    client = HttpClient(args.base_url, accept_encoding=args.accept_encoding)
+    try:
+        environment = collect_environment(client)
+        available = build_scenarios(client, keyword=args.keyword, deep_offset=args.deep_offset,
+                                    group_limit=args.group_limit)
+        scenarios = select_scenarios(available, args.scenarios, args.include_writes)
+    except Exception as e:
+        print(f"準備に失敗しました: {e}")
+        return 1
+
+    results = []
+    for scenario in scenarios:
+        for result in run_scenario(client, scenario, args.iterations, args.warmup):
+            results.append(result)
+            print(f"{result['label']:<24} p50 {result['p50_ms']}ms  p95 {result['p95_ms']}ms  "
+                  f"p99 {result['p99_ms']}ms  エラー {result['errors']}")
+    client.close()
+
+    report = {
+        "benchmark": "api",
+        "environment": environment,
+        "settings": {key: value for key, value in vars(args).items() if key != "output"},
+        "results": results,
+    }
+    print(f"結果: {write_result(report, args.output, 'api')}")
+    return 1 if any(result["errors"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
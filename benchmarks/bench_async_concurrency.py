@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+非同期エンドポイントの同時実行ベンチマーク
+
+同一イベントループ上で N 件のリクエストを同時に処理したときの
+- 全体の所要時間
+- リクエスト毎のレイテンシ
+- イベントループの最大遅延（ハートビートの遅れ）
+を、ブロッキング呼び出し（従来）とDBスレッドプールへの退避（db_manager.run_blocking）で比較する。
+
+使い方:
+    python benchmarks/bench_async_concurrency.py --concurrency 20 --query-seconds 0.2
+    python benchmarks/bench_async_concurrency.py --simulate   # DBなしで time.sleep による模擬
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+from database import db_manager
+
+
+def make_workload(query_seconds: float, simulate: bool):
+    """1リクエスト分のブロッキングDB処理"""
+    if simulate:
+        def workload():
+            time.sleep(query_seconds)
+    else:
+        def workload():
+            db_manager.execute_query("SELECT pg_sleep(%s)", (query_seconds,))
+    return workload
+
+
+async def heartbeat(stop: asyncio.Event, interval: float, lags: list):
+    """イベントループの応答性を計測"""
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+
+async def run_mode(mode: str, workload, concurrency: int) -> dict:
+    # レイテンシは一斉送信時刻からの経過時間（待ち行列の時間を含む）
+    async def blocking_handler(started: float):
+        workload()
+        return time.perf_counter() - started
+
+    async def offload_handler(started: float):
+        await db_manager.run_blocking(workload)
+        return time.perf_counter() - started
+
+    handler = blocking_handler if mode == "blocking" else offload_handler
+
+    stop = asyncio.Event()
+    lags = []
+    beat = asyncio.create_task(heartbeat(stop, 0.01, lags))
+    await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(handler(started) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await beat
+
+    latencies = sorted(latencies)
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "elapsed_seconds": round(elapsed, 4),
+        "throughput_rps": round(concurrency / elapsed, 2) if elapsed else None,
+        "latency_p50": round(statistics.median(latencies), 4),
+        "latency_max": round(latencies[-1], 4),
+        "max_loop_lag_seconds": round(max(lags), 4) if lags else round(elapsed, 4),
+    }
+
+
+async def main_async(args) -> dict:
+    workload = make_workload(args.query_seconds, args.simulate)
+    # ウォームアップ（接続確立・スレッド生成のコストを除外）
+    await db_manager.run_blocking(workload)
+
+    results = []
+    for mode in ("blocking", "offload"):
+        results.append(await run_mode(mode, workload, args.concurrency))
+
+    blocking, offload = results
+    return {
+        "benchmark": "async_concurrency",
+        "query_seconds": args.query_seconds,
+        "simulate": args.simulate,
+        "executor_workers": db_manager.executor_workers,
+        "pool_max_size": db_manager.pool.max_size,
+        "results": results,
+        "speedup": round(blocking["elapsed_seconds"] / offload["elapsed_seconds"], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="非同期DBアクセスの同時実行ベンチマーク")
+    parser.add_argument("--concurrency", type=int, default=20, help="同時リクエスト数")
+    parser.add_argument("--query-seconds", type=float, default=0.2, help="1クエリあたりの待ち時間（秒）")
+    parser.add_argument("--simulate", action="store_true", help="DBを使わず time.sleep で模擬する")
+    parser.add_argument("--output", help="結果JSONの出力先（省略時は標準出力）")
+    args = parser.parse_args()
+
+    try:
+        report = asyncio.run(main_async(args))
+    finally:
+        db_manager.close_pool()
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
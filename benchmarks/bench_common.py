@@ -0,0 +1,176 @@
+"""
+APIベンチマーク（bench_api.py / load_driver.py）の共通処理
+
+- HttpClient: 接続を再利用する HTTP クライアント（標準ライブラリの http.client、スレッドごとに1つ）
+- summarize: レイテンシの p50/p95/p99 などの集計
+- collect_environment: 結果ファイルに記録する計測条件（コミット・サーバーの状態・合成データの引数）
+- write_result: 結果JSONの保存（既定は benchmarks/results/<名前>-<日時>-<コミット>.json）
+"""
+
+import gzip
+import http.client
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPOSITORY_DIR = os.path.dirname(BENCHMARKS_DIR)
+RESULTS_DIR = os.path.join(BENCHMARKS_DIR, "results")
+
+sys.path.insert(0, os.path.join(REPOSITORY_DIR, 'app'))
+
+
+class HttpClient:
+    """1本の接続を使い回す HTTP クライアント（スレッド間で共有しない）"""
+
+    def __init__(self, base_url: str, timeout: float = 60.0, accept_encoding: str = "gzip"):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.https = parts.scheme == "https"
+        self.timeout = timeout
+        self.accept_encoding = accept_encoding
+        self.connection = None
+
+    def _connect(self):
+        connection_class = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        self.connection = connection_class(self.host, self.port, timeout=self.timeout)
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def request(self, method: str, path: str, body: Optional[dict] = None) -> Tuple[int, bytes, float]:
+        """リクエストを送信し、(ステータス, 本文, 秒数) を返す（本文の受信完了までを計測）
+
+        接続が切れていた場合は1回だけ接続し直す。応答がない場合のステータスは0。
+        """
+        headers = {"Accept-Encoding": self.accept_encoding}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+
+        for attempt in range(2):
+            if self.connection is None:
+                self._connect()
+            started = time.perf_counter()
+            try:
+                self.connection.request(method, path, body=payload, headers=headers)
+                response = self.connection.getresponse()
+                content = response.read()
+                return response.status, content, time.perf_counter() - started
+            except (http.client.HTTPException, ConnectionError, OSError):
+                self.close()
+                if attempt == 1:
+                    return 0, b"", time.perf_counter() - started
+        return 0, b"", 0.0
+
+    def get_json(self, path: str) -> Any:
+        """GET して JSON を返す（準備処理用、失敗時は例外）"""
+        status, content, _ = self.request("GET", path)
+        if status != 200:
+            raise RuntimeError(f"GET {path} が {status} を返しました: {content[:200]!r}")
+        if content[:2] == b"\x1f\x8b":
+            content = gzip.decompress(content)
+        return json.loads(content)
+
+
+def percentile(sorted_values: List[float], p: float) -> Optional[float]:
+    """昇順のリストの p パーセンタイル（線形補間）"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(latencies: List[float], errors: int, response_bytes: int, elapsed: float) -> Dict[str, Any]:
+    """レイテンシ（秒）のリストを集計（ミリ秒、スループットは elapsed 秒あたりの成功件数）"""
+    values = sorted(latencies)
+
+    def ms(value: Optional[float]) -> Optional[float]:
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "p50_ms": ms(percentile(values, 50)),
+        "p95_ms": ms(percentile(values, 95)),
+        "p99_ms": ms(percentile(values, 99)),
+        "mean_ms": ms(sum(values) / len(values)) if values else None,
+        "min_ms": ms(values[0]) if values else None,
+        "max_ms": ms(values[-1]) if values else None,
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed else None,
+        "mean_response_bytes": round(response_bytes / len(values)) if values else None,
+    }
+
+
+def git_revision() -> Dict[str, Any]:
+    """計測したコミット（未コミットの変更があるかどうかを含む）"""
+    def run(*args) -> Optional[str]:
+        try:
+            return subprocess.run(
+                ["git", *args], cwd=REPOSITORY_DIR, capture_output=True, text=True, timeout=10
+            ).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+    status = run("status", "--porcelain", "--untracked-files=no")
+    return {
+        "commit": run("rev-parse", "HEAD"),
+        "subject": run("log", "-1", "--format=%s"),
+        "dirty": bool(status),
+    }
+
+
+def load_dataset_info() -> Optional[Dict[str, Any]]:
+    """generate_dataset.py が記録した合成データの引数（.env のデータベースから、取得できなければ None）"""
+    try:
+        from database import db_manager
+        rows = db_manager.execute_query(
+            "SELECT generated_at, params FROM bench_dataset ORDER BY generated_at DESC LIMIT 1"
+        )
+        db_manager.close_pool()
+    except Exception:
+        return None
+    if not rows:
+        return None
+    return {"generated_at": rows[0]['generated_at'].isoformat(), "params": rows[0]['params']}
+
+
+def collect_environment(client: HttpClient) -> Dict[str, Any]:
+    """結果ファイルに記録する計測条件"""
+    try:
+        health = client.get_json("/health")
+    except Exception as e:
+        health = {"error": str(e)}
+    return {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "server": f"{'https' if client.https else 'http'}://{client.host}:{client.port}",
+        "accept_encoding": client.accept_encoding,
+        "health": health,
+        "dataset": load_dataset_info(),
+    }
+
+
+def write_result(report: Dict[str, Any], output: Optional[str], name: str) -> str:
+    """結果JSONを保存してパスを返す（output 省略時は benchmarks/results/ に日時・コミット付きの名前で保存）"""
+    if not output:
+        commit = (report.get("environment", {}).get("revision", {}).get("commit") or "unknown")[:8]
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{commit}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(report, ensure_ascii=False, indent=2))
+    return output
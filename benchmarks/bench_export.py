@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+エクスポート（COPY ... TO STDOUT）のスループットベンチマーク
+
+条件に合う全件の取得を、以下の方式で比較する（接続先は .env のデータベース）。
+- paging: 一覧APIと同じ処理で limit 件ずつキーセット方式でページングし、JSONに変換（従来の取得方法）
+- csv: ExportService.iter_csv（COPY の CSV 出力をチャンク単位で受け取る）
+- parquet: ExportService.iter_parquet（pyarrow がある場合のみ）
+- duplicates_csv: 重複グループのエクスポート（--duplicate-type）
+行数/秒・MB/秒と、別途 tracemalloc で計測したPythonのメモリ使用量のピークを出力する
+（ピークが件数に比例しないことでメモリが一定であることを確認する）。
+
+使い方:
+    python benchmarks/bench_export.py --keyword 障害
+    python benchmarks/bench_export.py --duplicate-type content --output export.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+from database import db_manager
+from models.request_models import FilterRequest
+from models.response_models import ReceptionDataResponse
+from services.data_service import DataService
+from services.export_service import ExportService
+from utils.json_response import dumps
+
+
+def count_rows(query: str, params: tuple) -> int:
+    return db_manager.execute_query(f"SELECT COUNT(*) AS n FROM ({query}) AS export", params)[0]['n']
+
+
+def consume_chunks(make_chunks) -> int:
+    """チャンクをすべて受け取り、合計バイト数を返す"""
+    total = 0
+    for chunk in make_chunks():
+        total += len(chunk)
+    return total
+
+
+def consume_pages(filters, limit: int) -> int:
+    """一覧APIと同じ処理でページングしてJSONに変換し、合計バイト数を返す"""
+    total = 0
+    cursor = None
+    while True:
+        records, _, _, cursor, _ = DataService.get_reception_page_by_cursor(
+            cursor=cursor, limit=limit, sort_by="reception_datetime", sort_order="desc",
+            filters=filters, count_mode="none"
+        )
+        total += len(dumps(ReceptionDataResponse(
+            data=records, total=len(records), offset=0, limit=limit, has_more=cursor is not None, count_mode="none"
+        )))
+        if not cursor:
+            return total
+
+
+def run_scenario(name: str, rows: int, func) -> dict:
+    started = time.perf_counter()
+    size = func()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "scenario": name,
+        "rows": rows,
+        "bytes": size,
+        "elapsed_seconds": round(elapsed, 4),
+        "rows_per_second": round(rows / elapsed, 1) if elapsed else None,
+        "mb_per_second": round(size / elapsed / 1024 / 1024, 2) if elapsed else None,
+        "python_peak_mb": round(peak / 1024 / 1024, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="エクスポート（COPY）のスループットベンチマーク")
+    parser.add_argument("--keyword", help="キーワード（省略時は全件）")
+    parser.add_argument("--include-deleted", action="store_true", help="削除済みデータを含む")
+    parser.add_argument("--page-limit", type=int, default=500, help="paging の1ページの件数")
+    parser.add_argument("--duplicate-type", default="content", choices=["exact", "content", "status", "similar"],
+                        help="重複グループのエクスポートの重複タイプ")
+    parser.add_argument("--skip-paging", action="store_true", help="従来のページングを計測しない（件数が多い場合）")
+    parser.add_argument("--output", help="結果JSONの出力先（省略時は標準出力）")
+    args = parser.parse_args()
+
+    filters = None
+    if args.keyword or args.include_deleted:
+        filters = FilterRequest(keyword=args.keyword, include_deleted=args.include_deleted)
+
+    query, params = ExportService.build_reception_query(filters)
+    rows = count_rows(query, params)
+    duplicate_query, duplicate_params = ExportService.build_duplicate_query(args.duplicate_type, filters)
+    duplicate_rows = count_rows(duplicate_query, duplicate_params)
+
+    results = []
+    if not args.skip_paging:
+        results.append(run_scenario("paging", rows, lambda: consume_pages(filters, args.page_limit)))
+    results.append(run_scenario("csv", rows, lambda: consume_chunks(lambda: ExportService.iter_csv(query, params))))
+    if ExportService.is_parquet_available():
+        results.append(run_scenario(
+            "parquet", rows, lambda: consume_chunks(lambda: ExportService.iter_parquet(query, params))
+        ))
+    results.append(run_scenario(
+        "duplicates_csv", duplicate_rows,
+        lambda: consume_chunks(lambda: ExportService.iter_csv(duplicate_query, duplicate_params))
+    ))
+
+    report = {
+        "benchmark": "export",
+        "filters": {"keyword": args.keyword, "include_deleted": args.include_deleted},
+        "duplicate_type": args.duplicate_type,
+        "parquet": ExportService.is_parquet_available(),
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+    db_manager.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+メトリクス（/metrics）の計測処理のオーバーヘッドのベンチマーク
+
+計測を有効にしたレジストリと無効にしたレジストリで、次の1回あたりの所要時間（マイクロ秒）を比較する。
+- 個々の記録: ヒストグラムへの記録・段階（stage）・DB操作（track_query）・サービスのデコレーター
+- リクエスト全体: MetricsMiddleware を通した FastAPI アプリの呼び出し（ハンドラーは一般的な一覧取得と同じ回数
+  （接続待ち2回・SQL 2回・段階3回・サービス1回）の記録だけを行う）
+DBやHTTPは使わず、ASGIアプリを直接呼び出して計測処理の分だけを測る。実際のリクエストの処理時間
+（bench_api.py の p50 など）と比べてオーバーヘッドの割合を見積もる。
+
+使い方:
+    python benchmarks/bench_metrics.py --iterations 20000
+    python benchmarks/bench_metrics.py --output metrics.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+from fastapi import FastAPI
+from utils.metrics import MetricsMiddleware, MetricsRegistry, current_endpoint
+
+# 1リクエストあたりの記録回数（一般的な一覧取得と同じ）
+QUERIES_PER_REQUEST = 2
+STAGES_PER_REQUEST = 3
+
+
+def measure(func, iterations: int, repeat: int = 5) -> float:
+    """1回あたりの所要時間（マイクロ秒、repeat 回の中央値）"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        timings.append((time.perf_counter() - started) / iterations * 1_000_000)
+    return round(statistics.median(timings), 3)
+
+
+def make_registry(enabled: bool) -> MetricsRegistry:
+    registry = MetricsRegistry()
+    registry.enabled = enabled
+    return registry
+
+
+def bench_operations(registry: MetricsRegistry, iterations: int) -> dict:
+    """個々の記録の所要時間（リクエストの処理中と同じく current_endpoint にルートを設定した状態）"""
+    app = FastAPI()
+
+    @app.get("/api/items/{item_id}")
+    def get_item(item_id: int):
+        return {}
+
+    route = app.router.routes[-1]
+    token = current_endpoint.set({"type": "http", "path": "/api/items/1", "route": route})
+
+    @registry.instrumented
+    def service_call():
+        return None
+
+    def stage():
+        with registry.stage("serialize"):
+            pass
+
+    def track_query():
+        with registry.track_query("query") as tracker:
+            tracker.rows = 100
+
+    try:
+        return {
+            "histogram_observe_us": measure(lambda: registry.db_duration.observe(("/api/items/{item_id}", "query"), 0.01),
+                                            iterations),
+            "stage_us": measure(stage, iterations),
+            "track_query_us": measure(track_query, iterations),
+            "instrumented_us": measure(service_call, iterations),
+        }
+    finally:
+        current_endpoint.reset(token)
+
+
+def build_app(registry: MetricsRegistry) -> FastAPI:
+    """計測の記録だけを行うハンドラーを MetricsMiddleware で包んだアプリ"""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, registry=registry)
+
+    @registry.instrumented
+    def load_page():
+        for _ in range(QUERIES_PER_REQUEST):
+            with registry.track_query("connect"):
+                pass
+            with registry.track_query("prepared") as tracker:
+                tracker.rows = 100
+        for name in ("materialize", "serialize", "compress")[:STAGES_PER_REQUEST]:
+            with registry.stage(name):
+                pass
+
+    @app.get("/api/items/{item_id}")
+    async def get_item(item_id: int):
+        load_page()
+        return {"id": item_id}
+
+    return app
+
+
+def bench_requests(registry: MetricsRegistry, iterations: int) -> float:
+    """ASGIアプリの呼び出し1回あたりの所要時間（マイクロ秒）"""
+    app = build_app(registry)
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/api/items/1", "raw_path": b"/api/items/1", "root_path": "", "query_string": b"",
+        "headers": [], "client": ("127.0.0.1", 50000), "server": ("127.0.0.1", 8000),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    async def run(count: int):
+        for _ in range(count):
+            await app(dict(scope), receive, send)
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(run(100))  # ミドルウェアの構築・ルートの照合の初回分
+        timings = []
+        for _ in range(5):
+            started = time.perf_counter()
+            loop.run_until_complete(run(iterations))
+            timings.append((time.perf_counter() - started) / iterations * 1_000_000)
+        return round(statistics.median(timings), 3)
+    finally:
+        loop.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="メトリクスの計測処理のオーバーヘッドのベンチマーク")
+    parser.add_argument("--iterations", type=int, default=20000, help="個々の記録の計測回数")
+    parser.add_argument("--requests", type=int, default=2000, help="リクエスト全体の計測回数")
+    parser.add_argument("--output", help="結果JSONの出力先（省略時は標準出力）")
+    args = parser.parse_args()
+
+    enabled, disabled = make_registry(True), make_registry(False)
+    operations = {
+        "enabled": bench_operations(enabled, args.iterations),
+        "disabled": bench_operations(disabled, args.iterations),
+    }
+    request_us = {
+        "enabled": bench_requests(make_registry(True), args.requests),
+        "disabled": bench_requests(make_registry(False), args.requests),
+    }
+    overhead_us = round(request_us["enabled"] - request_us["disabled"], 3)
+
+    report = {
+        "benchmark": "metrics",
+        "iterations": args.iterations,
+        "requests": args.requests,
+        "operations_us": operations,
+        "request_us": request_us,
+        "request_overhead_us": overhead_us,
+        # 実際のリクエストの処理時間に対する割合（1ms / 10ms の場合）
+        "overhead_percent_of": {
+            "1ms": round(overhead_us / 1000 * 100, 2),
+            "10ms": round(overhead_us / 10000 * 100, 2),
+        },
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
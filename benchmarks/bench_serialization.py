@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+レコード生成・JSONシリアライズのマイクロベンチマーク
+
+DBから取得した行をレスポンスのJSONにするまでの処理を、従来の経路と高速化した経路で比較する。
+- 従来: 行を辞書に詰め直して ReceptionDataRecord(**row) → FastAPI が response_model で再検証・変換して
+  json.dumps（NDJSONは jsonable_encoder + json.dumps）
+- 高速: 行をそのまま ReceptionDataRecord.model_validate → 再検証せずに utils.json_response.dumps
+  （orjson があれば利用）
+出力が同一であることも確認する。重複検出ではコンパクト形式・gzip圧縮時の送信サイズも比較する。
+DBは使わず、合成した行で計測する。
+
+使い方:
+    python benchmarks/bench_serialization.py --rows 500 --groups 200 --group-size 5
+    python benchmarks/bench_serialization.py --output serialization.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import gzip
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from models.response_models import DuplicateGroup, DuplicatesResponse, ReceptionDataRecord, ReceptionDataResponse
+from config.response_config import ResponseConfig
+from utils.compact_format import compact_duplicates_response
+from utils.json_response import FastJSONResponse, dumps, is_fast_json_available
+
+# 従来の経路で除外していた集計列
+PAGE_META_COLUMNS = ('total_records', 'active_records', 'page_pos')
+GROUP_META_COLUMNS = ('total_groups', 'total_duplicates', 'group_first_id', 'group_pos', 'duplicate_count')
+
+
+def make_row(i: int) -> dict:
+    """ページクエリの1行に相当する辞書（表示列＋集計列）"""
+    called = datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=i)
+    return {
+        "id": i + 1,
+        "content": f"受付内容 {i % 97} プリンターが印刷できない。再起動しても改善しない。" * 3,
+        "status": f"対応状況 {i % 13} ドライバーを再インストールして解決",
+        "result": "解決",
+        "report": "",
+        "progress": "完了",
+        "system_type": "システムA",
+        "product": "製品X",
+        "reception_moddt": None,
+        "reception_datetime": called,
+        "update_datetime": called + timedelta(seconds=30, microseconds=123456),
+        "total_records": 100000,
+        "active_records": 99000,
+        "page_pos": i + 1,
+    }
+
+
+def make_duplicate_rows(groups: int, group_size: int) -> list:
+    """重複検出クエリの行に相当する辞書（グループ順に連続）"""
+    rows = []
+    for g in range(groups):
+        for m in range(group_size):
+            row = make_row(g * group_size + m)
+            for key in PAGE_META_COLUMNS:
+                row.pop(key)
+            row.update(total_groups=groups, total_duplicates=groups * group_size,
+                       group_first_id=g * group_size + 1, group_pos=g + 1, duplicate_count=group_size)
+            rows.append(row)
+    return rows
+
+
+def measure(func, iterations: int) -> float:
+    """1回あたりの所要時間（ミリ秒、中央値）"""
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(timings), 3)
+
+
+def fastapi_serialize(field, response, loop) -> bytes:
+    """インストール済みの FastAPI が response_model を指定したルートで行う検証・変換"""
+    try:
+        content = loop.run_until_complete(serialize_response(field=field, response_content=response, dump_json=True))
+    except TypeError:  # dump_json に未対応のバージョン
+        content = loop.run_until_complete(serialize_response(field=field, response_content=response))
+    return content if isinstance(content, bytes) else JSONResponse(content).body
+
+
+def legacy_serialize(model_class, response) -> bytes:
+    """従来の FastAPI の変換（辞書化 → response_model で再検証 → jsonable_encoder → json.dumps）"""
+    revalidated = model_class.model_validate(response.model_dump())
+    return JSONResponse(jsonable_encoder(revalidated)).body
+
+
+def bench_reception(rows: list, iterations: int, loop) -> dict:
+    field = create_model_field(name="Response", type_=ReceptionDataResponse, mode="serialization")
+
+    def current_records():
+        return [ReceptionDataRecord(**{k: v for k, v in row.items() if k not in PAGE_META_COLUMNS}) for row in rows]
+
+    def fast_records():
+        return [ReceptionDataRecord.model_validate(row) for row in rows]
+
+    def build(records):
+        return ReceptionDataResponse(data=records, total=len(records), offset=0, limit=len(records), has_more=False)
+
+    response = build(fast_records())
+    outputs = {
+        "legacy": legacy_serialize(ReceptionDataResponse, response),
+        "fastapi": fastapi_serialize(field, response, loop),
+        "fast": FastJSONResponse(response).body,
+    }
+    return {
+        "scenario": "reception_page",
+        "records": len(rows),
+        "materialize_ms": {"current": measure(current_records, iterations), "fast": measure(fast_records, iterations)},
+        "serialize_ms": {
+            "legacy_fastapi": measure(lambda: legacy_serialize(ReceptionDataResponse, response), iterations),
+            "installed_fastapi": measure(lambda: fastapi_serialize(field, response, loop), iterations),
+            "fast": measure(lambda: FastJSONResponse(response).body, iterations),
+        },
+        "identical_output": len(set(outputs.values())) == 1,
+        "bytes": len(outputs["fast"]),
+    }
+
+
+def bench_duplicates(rows: list, iterations: int, loop) -> dict:
+    field = create_model_field(name="Response", type_=DuplicatesResponse, mode="serialization")
+
+    def group_records(records):
+        groups = []
+        for start in range(0, len(records), records_per_group):
+            members = records[start:start + records_per_group]
+            groups.append(DuplicateGroup(group_id=f"group_{len(groups)}", duplicate_count=len(members),
+                                         duplicate_key=members[0].content or '', records=members))
+        return groups
+
+    def current_records():
+        records = []
+        for row in rows:
+            record_data = {k: v for k, v in row.items() if k not in GROUP_META_COLUMNS}
+            record_data['duplicate_type'] = "content"
+            record_data['duplicate_key'] = row['content']
+            records.append(ReceptionDataRecord(**record_data))
+        return records
+
+    def fast_records():
+        records = []
+        for row in [dict(row) for row in rows]:  # 行の書き換えが次回の計測に影響しないよう複製（計測に含む）
+            row['duplicate_count'] = None
+            row['duplicate_type'] = "content"
+            row['duplicate_key'] = row['content']
+            records.append(ReceptionDataRecord.model_validate(row))
+        return records
+
+    records_per_group = rows[0]['duplicate_count']
+    groups = group_records(fast_records())
+    response = DuplicatesResponse(duplicates=groups, total_groups=len(groups), total_duplicates=len(rows))
+    outputs = {
+        "legacy": legacy_serialize(DuplicatesResponse, response),
+        "fastapi": fastapi_serialize(field, response, loop),
+        "fast": FastJSONResponse(response).body,
+    }
+    compact = dumps(compact_duplicates_response(response))
+    level = ResponseConfig.get_compression_level()
+    ndjson_outputs = {
+        "current": [json.loads(json.dumps(jsonable_encoder(group), ensure_ascii=False)) for group in groups],
+        "fast": [json.loads(dumps(group)) for group in groups],
+    }
+    return {
+        "scenario": "duplicates",
+        "groups": len(groups),
+        "records": len(rows),
+        "materialize_ms": {"current": measure(current_records, iterations), "fast": measure(fast_records, iterations)},
+        "serialize_ms": {
+            "legacy_fastapi": measure(lambda: legacy_serialize(DuplicatesResponse, response), iterations),
+            "installed_fastapi": measure(lambda: fastapi_serialize(field, response, loop), iterations),
+            "fast": measure(lambda: FastJSONResponse(response).body, iterations),
+        },
+        "ndjson_stream_ms": {
+            "current": measure(lambda: [json.dumps(jsonable_encoder(g), ensure_ascii=False) for g in groups], iterations),
+            "fast": measure(lambda: [dumps(g) for g in groups], iterations),
+        },
+        "compact_ms": measure(lambda: dumps(compact_duplicates_response(response)), iterations),
+        "identical_output": len(set(outputs.values())) == 1 and ndjson_outputs["current"] == ndjson_outputs["fast"],
+        "bytes": len(outputs["fast"]),
+        "wire_bytes": {
+            "verbose": len(outputs["fast"]),
+            "compact": len(compact),
+            "verbose_gzip": len(gzip.compress(outputs["fast"], compresslevel=level)),
+            "compact_gzip": len(gzip.compress(compact, compresslevel=level)),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="レコード生成・JSONシリアライズのマイクロベンチマーク")
+    parser.add_argument("--rows", type=int, default=500, help="受信データ1ページの行数")
+    parser.add_argument("--groups", type=int, default=200, help="重複グループ数")
+    parser.add_argument("--group-size", type=int, default=5, help="1グループの件数")
+    parser.add_argument("--iterations", type=int, default=30, help="計測回数（中央値を採用）")
+    parser.add_argument("--output", help="結果JSONの出力先（省略時は標準出力）")
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    try:
+        results = [
+            bench_reception([make_row(i) for i in range(args.rows)], args.iterations, loop),
+            bench_duplicates(make_duplicate_rows(args.groups, args.group_size), args.iterations, loop),
+        ]
+    finally:
+        loop.close()
+
+    for result in results:
+        current = result["materialize_ms"]["current"] + result["serialize_ms"]["installed_fastapi"]
+        fast = result["materialize_ms"]["fast"] + result["serialize_ms"]["fast"]
+        result["total_ms"] = {"current": round(current, 3), "fast": round(fast, 3)}
+        result["speedup"] = round(current / fast, 2) if fast else None
+
+    report = {
+        "benchmark": "serialization",
+        "orjson": is_fast_json_available(),
+        "iterations": args.iterations,
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
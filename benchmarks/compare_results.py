@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+ベンチマーク結果（bench_api.py / load_driver.py の結果JSON）のコミット間比較
+
+2つの結果ファイルのラベルごとの p50/p95/p99 とスループットを並べ、比（現在 / 基準）を表示する。
+--fail-above を指定すると、いずれかのラベルの p95 の比がその値を超えた場合に終了コード1を返す
+（CI などで性能の劣化を検出する用途）。
+
+使い方:
+    python benchmarks/compare_results.py benchmarks/results/api-...-abc1234.json benchmarks/results/api-...-def5678.json
+    python benchmarks/compare_results.py base.json current.json --fail-above 1.2 --output compare.json
+"""
+
+import argparse
+import json
+import sys
+
+METRICS = ["p50_ms", "p95_ms", "p99_ms", "throughput_rps"]
+
+
+def load_results(path: str) -> tuple:
+    with open(path, encoding='utf-8') as f:
+        report = json.load(f)
+    results = {result["label"]: result for result in report.get("results", [])}
+    if "overall" in report:
+        results["overall"] = report["overall"]
+    revision = report.get("environment", {}).get("revision", {})
+    return report, results, revision
+
+
+def ratio(current, base):
+    if current is None or not base:
+        return None
+    return round(current / base, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ベンチマーク結果のコミット間比較")
+    parser.add_argument("base", help="基準の結果JSON")
+    parser.add_argument("current", help="比較する結果JSON")
+    parser.add_argument("--fail-above", type=float, help="p95 の比（現在 / 基準）がこの値を超えたら終了コード1")
+    parser.add_argument("--output", help="比較結果JSONの出力先")
+    args = parser.parse_args()
+
+    base_report, base, base_revision = load_results(args.base)
+    current_report, current, current_revision = load_results(args.current)
+    if base_report.get("benchmark") != current_report.get("benchmark"):
+        print(f"注意: 種類の異なる結果です（{base_report.get('benchmark')} / {current_report.get('benchmark')}）")
+
+    def describe(revision: dict) -> str:
+        commit = (revision.get("commit") or "unknown")[:8]
+        return commit + ("（未コミットの変更あり）" if revision.get("dirty") else "") + f" {revision.get('subject') or ''}"
+
+    print(f"基準: {describe(base_revision)}")
+    print(f"現在: {describe(current_revision)}")
+    print(f"{'ラベル':<24}" + "".join(f"{metric:>26}" for metric in METRICS))
+
+    comparisons = []
+    regressions = []
+    for label in [label for label in base if label in current]:
+        entry = {"label": label}
+        cells = []
+        for metric in METRICS:
+            before, after = base[label].get(metric), current[label].get(metric)
+            entry[metric] = {"base": before, "current": after, "ratio": ratio(after, before)}
+            cells.append(f"{before} → {after} (x{entry[metric]['ratio']})")
+        comparisons.append(entry)
+        print(f"{label:<24}" + "".join(f"{cell:>26}" for cell in cells))
+
+        p95_ratio = entry["p95_ms"]["ratio"]
+        if args.fail_above and p95_ratio is not None and p95_ratio > args.fail_above:
+            regressions.append(label)
+
+    missing = sorted(set(base) ^ set(current))
+    if missing:
+        print(f"片方にのみ含まれるラベル: {', '.join(missing)}")
+    if regressions:
+        print(f"p95 が {args.fail_above} 倍を超えたラベル: {', '.join(regressions)}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({
+                "base": {"path": args.base, "revision": base_revision},
+                "current": {"path": args.current, "revision": current_revision},
+                "comparisons": comparisons,
+                "regressions": regressions,
+            }, ensure_ascii=False, indent=2))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+ベンチマーク用の合成データ（コールセンターの受付・対応データ）の生成
+
+ローカルの PostgreSQL（接続先は .env のデータベース）に recepthead / receptbody / exechead / execbody と
+マスタ（m_ctitem / m_emp）を作成し、指定した件数（10万〜1000万件程度）の受付データを投入する。
+- 受付内容は顧客名・問い合わせ・詳細の定型文の組み合わせで、--duplicate-ratio の割合の行は
+  平均 --group-size 件の重複グループ（同一の受付内容）になる
+- 重複行のうち --exact-ratio の割合は対応状況も同一（exact の重複）、--near-duplicate-ratio の割合は
+  末尾だけが異なる（similar の検出対象）
+- 対応状況は --status-template-ratio の割合で定型の文言（status の大きな重複グループ）になる
+- --deleted-ratio の割合の行は論理削除済み
+- --bench-ratio の割合の行は製品「ベンチマーク用製品」とし、論理削除しない
+  （benchmarks/bench_api.py の削除・復元の計測対象。削除→復元で元の状態に戻る）
+値は行番号と --seed のハッシュから決めるため、同じ引数で何度生成しても同一のデータになる。
+投入は --batch-rows 件ずつ1文（INSERT ... SELECT FROM generate_series）で行い、バッチごとにコミットする。
+
+誤って本番環境に投入しないよう、DB_HOST がローカル（localhost・127.0.0.1・ソケットのディレクトリ）以外の場合は
+--allow-remote がなければ実行しない。既存のデータがある場合は --reset がなければ実行しない。
+
+使い方:
+    python benchmarks/generate_dataset.py --rows 100000 --create-schema
+    python benchmarks/generate_dataset.py --rows 10000000 --reset --duplicate-ratio 0.3 --output dataset.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+from database import db_manager
+
+# 生成対象のテーブル（docs/03_database_schema.md と同じ列構成）
+SCHEMA_STATEMENTS = [
+    "CREATE TABLE IF NOT EXISTS m_emp (empcd varchar PRIMARY KEY)",
+    "CREATE TABLE IF NOT EXISTS m_ctitem (itemcd varchar PRIMARY KEY, itemname varchar)",
+    """
+    CREATE TABLE IF NOT EXISTS recepthead (
+        extentid integer PRIMARY KEY,
+        receptno varchar UNIQUE,
+        calldt timestamp,
+        receptmoddt timestamp,
+        receptempcd varchar
+    )
+    """,
+    "CREATE TABLE IF NOT EXISTS receptbody (receptno varchar, rdata text, moddt timestamp)",
+    "CREATE TABLE IF NOT EXISTS exechead (receptno varchar, condition varchar, stype varchar, producttype varchar)",
+    "CREATE TABLE IF NOT EXISTS execbody (receptno varchar, execstate varchar, execresult text, execinfo text)",
+    "CREATE INDEX IF NOT EXISTS idx_receptbody_receptno ON receptbody (receptno)",
+    "CREATE INDEX IF NOT EXISTS idx_exechead_receptno ON exechead (receptno)",
+    "CREATE INDEX IF NOT EXISTS idx_execbody_receptno ON execbody (receptno)",
+]
+
+# 生成時の引数の記録（ベンチマーク結果に含める）
+DATASET_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS bench_dataset (
+    generated_at timestamptz NOT NULL DEFAULT now(),
+    params jsonb NOT NULL
+)
+"""
+
+DATA_TABLES = ["recepthead", "receptbody", "exechead", "execbody", "m_ctitem", "m_emp"]
+
+# マスタ（区分ごとの (コード, 名称)）
+CONDITION_ITEMS = [("C01", "未着手"), ("C02", "対応中"), ("C03", "保留"), ("C04", "完了"), ("C05", "取消")]
+STYPE_ITEMS = [("S01", "販売管理"), ("S02", "会計"), ("S03", "給与"), ("S04", "在庫管理"), ("S05", "ネットワーク"), ("S06", None)]
+PRODUCT_ITEMS = [
+    ("P01", "製品A"), ("P02", "製品B"), ("P03", "製品C"), ("P04", "製品D"), ("P05", "製品E"),
+    ("P06", "製品F"), ("P07", "クラウド版"), ("P08", "旧製品"),
+]
+BENCH_PRODUCT = ("P99", "ベンチマーク用製品")
+EMPLOYEE_COUNT = 50
+
+# 受付内容・対応状況の文言
+CUSTOMERS = [
+    "株式会社サンプル商事", "山田工業株式会社", "東西物流株式会社", "みどり会計事務所", "北央システム株式会社",
+    "有限会社つばさ印刷", "南海フーズ株式会社", "青葉クリニック", "中央建設株式会社", "さくら不動産",
+    "株式会社ミライ電機", "ひかり学園",
+]
+ISSUES = [
+    "ログインできない", "パスワードを忘れた", "画面にエラーが表示される", "システム障害で業務が止まっている",
+    "請求書の金額が合わない", "帳票が印刷できない", "データの取り込みに失敗する", "動作が遅い",
+    "ライセンスの更新方法を知りたい", "バージョンアップの手順を知りたい", "操作方法が分からない",
+    "通信エラーが発生する", "バックアップが取れていない", "月次処理が終わらない", "ユーザーを追加したい",
+    "データが消えた",
+]
+DETAILS = [
+    "昨日から発生しているとのこと。", "再起動しても改善しない。", "エラーコード E-1024 が表示される。",
+    "複数の端末で同じ現象が起きている。", "至急の対応を希望。", "担当者から折り返しの連絡を希望。",
+    "先週の更新後から発生。", "特定の利用者のみ発生する。", "サーバーの容量不足の可能性あり。",
+    "以前にも同様の問い合わせあり。", "マニュアルの該当箇所を案内済み。", "画面の写しをメールで受領。",
+]
+STATUSES = [
+    "対応完了", "折り返し連絡済み", "調査中", "メーカー問い合わせ中", "訪問対応予定", "リモートで対応済み",
+    "手順書を送付", "様子見", "顧客回答待ち", "再発のため調査中", "障害として登録", "次回更新で修正予定",
+    "回避策を案内", "設定変更で解決", "営業担当へ引継ぎ", "見積りを送付", "クローズ", "保守契約の確認中",
+    "再起動で解決", "エスカレーション済み",
+]
+ACTIONS = [
+    "電話で手順を案内した", "リモート接続して設定を修正した", "ログを取得して開発へ送付した",
+    "パスワードを初期化した", "再インストールを依頼した", "修正モジュールを適用した",
+    "データを復旧した", "サーバーを再起動した",
+]
+
+def uniform(key: str, salt: int) -> str:
+    """key と --seed のハッシュから [0, 1) の一様な値を返すSQL式（salt で系列を分ける）"""
+    return f"((hashtextextended(({key})::text, %(seed)s * 64 + {salt}) & 2147483647)::float8 / 2147483648.0)"
+
+def pick(array: str, u: str) -> str:
+    """一様な値 u で配列の要素を選ぶSQL式"""
+    return f"({array})[1 + floor({u} * cardinality({array}))::int]"
+
+# 1バッチ分の投入（base: 行番号ごとの乱数、rows: 受付日時・重複グループなど、以降の CTE で各テーブルへ投入）
+# 重複行の受付内容・対応状況はグループの番号 k のハッシュから決めるため、同じグループでは同一になる
+GENERATE_BATCH_SQL = f"""
+WITH base AS (
+    SELECT
+        i,
+        'R' || lpad(i::text, 10, '0') AS receptno,
+        {uniform('i', 0)} AS u_date,
+        {uniform('i', 1)} AS u_hour,
+        {uniform('i', 2)} AS u_second,
+        {uniform('i', 3)} AS u_deleted,
+        {uniform('i', 4)} AS u_bench,
+        {uniform('i', 5)} AS u_duplicate,
+        {uniform('i', 6)} AS u_group,
+        {uniform('i', 7)} AS u_near,
+        {uniform('i', 8)} AS u_exact,
+        {uniform('i', 9)} AS u_null,
+        {uniform('i', 10)} AS u_status,
+        {uniform('i', 11)} AS u_template,
+        {uniform('i', 12)} AS u_condition,
+        {uniform('i', 13)} AS u_stype,
+        {uniform('i', 14)} AS u_product,
+        {uniform('i', 15)} AS u_emp,
+        {uniform('i', 16)} AS u_body,
+        {uniform('i', 17)} AS u_exec,
+        {uniform('i', 18)} AS u_modified,
+        {uniform('i', 19)} AS u_action
+    FROM generate_series(%(first_id)s, %(last_id)s) AS i
+),
+rows AS (
+    SELECT
+        base.*,
+        TIMESTAMP %(start_date)s
+            + floor(u_date * %(days)s) * INTERVAL '1 day'
+            + (8 + floor(u_hour * 11)) * INTERVAL '1 hour'
+            + floor(u_second * 3600) * INTERVAL '1 second' AS calldt,
+        u_duplicate < %(duplicate_ratio)s AS is_duplicate,
+        u_bench < %(bench_ratio)s AS is_bench,
+        CASE WHEN u_duplicate < %(duplicate_ratio)s THEN floor(u_group * %(group_count)s)::bigint
+             ELSE %(group_count)s + i END AS k
+    FROM base
+),
+contents AS (
+    SELECT
+        rows.*,
+        {pick('%(customers)s', uniform('k', 30))} || '様より、' || {pick('%(issues)s', uniform('k', 31))}
+            || 'との問い合わせ。' || {pick('%(details)s', uniform('k', 32))}
+            || repeat({pick('%(details)s', uniform('k', 33))}, floor({uniform('k', 34)} * 4)::int)
+            || CASE WHEN is_duplicate THEN '' ELSE '（受付番号 ' || receptno || '）' END
+            || CASE WHEN is_duplicate AND u_near < %(near_duplicate_ratio)s THEN '追記' || (i %% 97) || '件目' ELSE '' END
+            AS content,
+        CASE
+            WHEN is_duplicate AND u_exact < %(exact_ratio)s THEN {pick('%(statuses)s', uniform('k', 35))}
+            WHEN u_template < %(status_template_ratio)s THEN {pick('%(statuses)s', 'u_status')}
+            WHEN u_status < 0.1 THEN NULL
+            ELSE {pick('%(actions)s', 'u_action')} || '（' || receptno || '）'
+        END AS status
+    FROM rows
+),
+head AS (
+    INSERT INTO recepthead (extentid, receptno, calldt, receptmoddt, receptempcd)
+    SELECT
+        i, receptno, calldt,
+        CASE WHEN NOT is_bench AND u_deleted < %(deleted_ratio)s
+             THEN calldt + (1 + floor(u_modified * 30)) * INTERVAL '1 day' END,
+        'E' || lpad((1 + floor(u_emp * {EMPLOYEE_COUNT}))::int::text, 3, '0')
+    FROM contents
+),
+body AS (
+    INSERT INTO receptbody (receptno, rdata, moddt)
+    SELECT
+        receptno,
+        CASE WHEN u_null < %(null_content_ratio)s / 2 THEN NULL
+             WHEN u_null < %(null_content_ratio)s THEN ''
+             ELSE content END,
+        CASE WHEN u_modified < 0.3 THEN calldt + (1 + floor(u_modified * 100)) * INTERVAL '1 hour' END
+    FROM contents
+    WHERE u_body < 0.98 OR is_bench
+),
+exec_head AS (
+    INSERT INTO exechead (receptno, condition, stype, producttype)
+    SELECT
+        receptno,
+        {pick('%(conditions)s', 'u_condition')},
+        {pick('%(stypes)s', 'u_stype')},
+        CASE WHEN is_bench THEN %(bench_product)s ELSE {pick('%(products)s', 'u_product')} END
+    FROM contents
+    WHERE u_exec < 0.97 OR is_bench
+),
+exec_body AS (
+    INSERT INTO execbody (receptno, execstate, execresult, execinfo)
+    SELECT receptno, status, {pick('%(actions)s', 'u_action')}, '対応者メモ ' || receptno
+    FROM contents
+    WHERE u_exec < 0.95 OR is_bench
+)
+SELECT COUNT(*) AS n, COUNT(*) FILTER (WHERE is_duplicate) AS duplicates FROM contents
+"""
+
+def is_local_host(host: str) -> bool:
+    """DB_HOST がローカル（TCP のループバック、またはソケットのディレクトリ）かどうか"""
+    return not host or host.startswith('/') or host in ("localhost", "127.0.0.1", "::1")
+
+def prepare_tables(create_schema: bool, reset: bool):
+    """テーブルの作成・既存データの確認と削除、マスタの投入"""
+    with db_manager.get_connection() as conn:
+        with conn.cursor() as cursor:
+            if create_schema:
+                for statement in SCHEMA_STATEMENTS:
+                    cursor.execute(statement)
+            cursor.execute(DATASET_TABLE_SQL)
+
+            cursor.execute("SELECT EXISTS (SELECT 1 FROM recepthead) AS populated")
+            if cursor.fetchone()['populated']:
+                if not reset:
+                    raise RuntimeError("recepthead にデータがあります（削除して生成し直す場合は --reset を指定）")
+                cursor.execute(f"TRUNCATE {', '.join(DATA_TABLES)}")
+
+            cursor.execute("TRUNCATE m_ctitem, m_emp")
+            items = CONDITION_ITEMS + STYPE_ITEMS + PRODUCT_ITEMS + [BENCH_PRODUCT]
+            cursor.executemany("INSERT INTO m_ctitem (itemcd, itemname) VALUES (%s, %s)", items)
+            cursor.executemany(
+                "INSERT INTO m_emp (empcd) VALUES (%s)",
+                [(f"E{n:03d}",) for n in range(1, EMPLOYEE_COUNT + 1)]
+            )
+        conn.commit()
+
+def generate(args) -> dict:
+    """受付データを --batch-rows 件ずつ投入"""
+    start_date = date.fromisoformat(args.start_date)
+    days = max(1, (date.fromisoformat(args.end_date) - start_date).days)
+    params = {
+        "seed": args.seed,
+        "start_date": start_date.isoformat(),
+        "days": days,
+        "duplicate_ratio": args.duplicate_ratio,
+        "group_count": max(1, int(args.rows * args.duplicate_ratio / max(2.0, args.group_size))),
+        "exact_ratio": args.exact_ratio,
+        "near_duplicate_ratio": args.near_duplicate_ratio,
+        "status_template_ratio": args.status_template_ratio,
+        "deleted_ratio": args.deleted_ratio,
+        "null_content_ratio": args.null_content_ratio,
+        "bench_ratio": args.bench_ratio,
+        "bench_product": BENCH_PRODUCT[0],
+        "customers": CUSTOMERS,
+        "issues": ISSUES,
+        "details": DETAILS,
+        "statuses": STATUSES,
+        "actions": ACTIONS,
+        "conditions": [code for code, _ in CONDITION_ITEMS],
+        "stypes": [code for code, _ in STYPE_ITEMS],
+        "products": [code for code, _ in PRODUCT_ITEMS],
+    }
+
+    started = time.perf_counter()
+    inserted = duplicates = 0
+    for first_id in range(1, args.rows + 1, args.batch_rows):
+        last_id = min(first_id + args.batch_rows - 1, args.rows)
+        with db_manager.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(GENERATE_BATCH_SQL, dict(params, first_id=first_id, last_id=last_id))
+                result = cursor.fetchone()
+            conn.commit()
+        inserted += result['n']
+        duplicates += result['duplicates']
+        elapsed = time.perf_counter() - started
+        print(f"\r  {inserted:,} / {args.rows:,}行 ({inserted / elapsed:,.0f}行/秒)", end="", flush=True)
+    print()
+    return {
+        "rows": inserted,
+        "duplicate_rows": duplicates,
+        "group_count": params["group_count"],
+        "elapsed_seconds": round(time.perf_counter() - started, 2),
+    }
+
+def collect_table_stats() -> dict:
+    """テーブルごとの行数とサイズ（インデックスを含む）"""
+    stats = {}
+    for table in DATA_TABLES:
+        row = db_manager.execute_query(
+            f"SELECT COUNT(*) AS n, pg_total_relation_size(%s) AS bytes FROM {table}", (table,)
+        )[0]
+        stats[table] = {"rows": row['n'], "bytes": row['bytes']}
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="ベンチマーク用の合成データの生成")
+    parser.add_argument("--rows", type=int, default=100000, help="受付データの件数")
+    parser.add_argument("--batch-rows", type=int, default=100000, help="1回の投入（コミット）の件数")
+    parser.add_argument("--seed", type=int, default=1, help="生成の種（同じ種・引数なら同一のデータ）")
+    parser.add_argument("--start-date", default="2015-01-01", help="受付日時の開始日")
+    parser.add_argument("--end-date", default="2025-12-31", help="受付日時の終了日")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.2, help="受付内容が重複する行の割合")
+    parser.add_argument("--group-size", type=float, default=4, help="重複グループの平均件数")
+    parser.add_argument("--exact-ratio", type=float, default=0.5, help="重複行のうち対応状況も同一の割合")
+    parser.add_argument("--near-duplicate-ratio", type=float, default=0.05, help="重複行のうち末尾だけが異なる割合")
+    parser.add_argument("--status-template-ratio", type=float, default=0.7, help="対応状況が定型の文言の割合")
+    parser.add_argument("--deleted-ratio", type=float, default=0.05, help="論理削除済みの割合")
+    parser.add_argument("--null-content-ratio", type=float, default=0.01, help="受付内容が NULL・空文字の割合")
+    parser.add_argument("--bench-ratio", type=float, default=0.001, help="削除・復元の計測対象（ベンチマーク用製品）の割合")
+    parser.add_argument("--create-schema", action="store_true", help="テーブルがなければ作成")
+    parser.add_argument("--reset", action="store_true", help="既存のデータを削除して生成し直す")
+    parser.add_argument("--allow-remote", action="store_true", help="ローカル以外のデータベースへの投入を許可")
+    parser.add_argument("--output", help="結果JSONの出力先")
+    args = parser.parse_args()
+
+    if not is_local_host(db_manager.host) and not args.allow_remote:
+        print(f"DB_HOST={db_manager.host} はローカルではありません（投入する場合は --allow-remote を指定）")
+        return 1
+    if args.rows < 1 or args.batch_rows < 1:
+        print("--rows と --batch-rows は1以上を指定してください")
+        return 1
+
+    print(f"=== 合成データの生成（{db_manager.database}: {args.rows:,}行） ===")
+    try:
+        prepare_tables(args.create_schema, args.reset)
+        result = generate(args)
+        print("統計情報を更新中...")
+        db_manager.execute_update(f"ANALYZE {', '.join(DATA_TABLES)}")
+
+        dataset_params = {key: value for key, value in vars(args).items() if key not in ("output", "allow_remote")}
+        db_manager.execute_update(
+            "INSERT INTO bench_dataset (params) VALUES (%s)", (json.dumps(dataset_params),)
+        )
+        report = {
+            "benchmark": "generate_dataset",
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "database": db_manager.database,
+            "params": dataset_params,
+            "result": result,
+            "rows_per_second": round(result["rows"] / result["elapsed_seconds"], 1) if result["elapsed_seconds"] else None,
+            "tables": collect_table_stats(),
+        }
+    except Exception as e:
+        print(f"エラーが発生しました: {e}")
+        return 1
+    finally:
+        db_manager.close_pool()
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+    print("補助インデックスは python manage.py create-indexes / create-search-indexes で作成してください")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
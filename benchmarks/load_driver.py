@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+APIの同時実行負荷試験
+
+--concurrency 本のクライアント（スレッドごとに1本の接続）が、シナリオ（benchmarks/api_scenarios.py）を
+重み付きで無作為に選んで --duration 秒間連続して実行する（応答を受け取ってから次を送るクローズドループ）。
+最初の --warmup 秒は集計しない。ラベルごと・全体の p50/p95/p99 レイテンシ、スループット（成功件数/秒）、
+エラー件数（HTTP のステータス別）を結果JSONに保存する。コミット間の比較は benchmarks/compare_results.py で行う。
+
+使い方:
+    python benchmarks/load_driver.py --concurrency 16 --duration 60
+    python benchmarks/load_driver.py --weights reception_first_page=5,duplicates_content=1,metadata=2
+    python benchmarks/load_driver.py --concurrency 32 --duration 120 --output load.json
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from bench_common import HttpClient, collect_environment, summarize, write_result
+from api_scenarios import build_scenarios, select_scenarios
+
+
+def parse_weights(text: str, available: dict) -> dict:
+    """「名前=重み」のカンマ区切りを解析"""
+    weights = {}
+    for item in (item.strip() for item in text.split(",") if item.strip()):
+        name, _, weight = item.partition("=")
+        if name not in available:
+            raise ValueError(f"不明なシナリオです: {name}（{', '.join(available)}）")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+class LoadWorker(threading.Thread):
+    """シナリオを繰り返し実行し、計測開始後の結果を記録する1クライアント"""
+
+    def __init__(self, base_url: str, accept_encoding: str, scenarios: list, weights: list,
+                 seed: int, measure_from: float, deadline: float):
+        super().__init__(daemon=True)
+        self.client = HttpClient(base_url, accept_encoding=accept_encoding)
+        self.scenarios = scenarios
+        self.weights = weights
+        self.random = random.Random(seed)
+        self.measure_from = measure_from
+        self.deadline = deadline
+        self.samples = {}
+
+    def run(self):
+        try:
+            while time.perf_counter() < self.deadline:
+                scenario = self.random.choices(self.scenarios, weights=self.weights)[0]
+                for request in scenario.requests:
+                    started = time.perf_counter()
+                    status, content, latency = self.client.request(request.method, request.path, request.body)
+                    if started < self.measure_from or time.perf_counter() > self.deadline:
+                        continue
+                    sample = self.samples.setdefault(
+                        request.label, {"latencies": [], "statuses": Counter(), "bytes": 0}
+                    )
+                    sample["statuses"][status] += 1
+                    if 200 <= status < 300:
+                        sample["latencies"].append(latency)
+                        sample["bytes"] += len(content)
+        finally:
+            self.client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="APIの同時実行負荷試験")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="サーバーのURL")
+    parser.add_argument("--concurrency", type=int, default=8, help="同時に実行するクライアント数")
+    parser.add_argument("--duration", type=float, default=30, help="計測する秒数")
+    parser.add_argument("--warmup", type=float, default=5, help="計測前に実行する秒数")
+    parser.add_argument("--scenarios", help="実行するシナリオ（カンマ区切り、省略時は書き込み以外のすべてを同じ重みで）")
+    parser.add_argument("--weights", help="シナリオと重み（例: reception_first_page=5,metadata=1）")
+    parser.add_argument("--include-writes", action="store_true", help="削除・復元のシナリオも含める")
+    parser.add_argument("--seed", type=int, default=1, help="シナリオを選ぶ乱数の種")
+    parser.add_argument("--keyword", default="障害", help="キーワード検索のキーワード")
+    parser.add_argument("--deep-offset", type=int, default=100000, help="深いページの位置")
+    parser.add_argument("--group-limit", type=int, default=100, help="重複検出で取得するグループ数")
+    parser.add_argument("--accept-encoding", default="gzip", help="Accept-Encoding ヘッダー（identity で非圧縮）")
+    parser.add_argument("--output", help="結果JSONの出力先（省略時は benchmarks/results/）")
+    args = parser.parse_args()
+
+    setup_client = HttpClient(args.base_url, accept_encoding=args.accept_encoding)
+    try:
+        environment = collect_environment(setup_client)
+        available = build_scenarios(setup_client, keyword=args.keyword, deep_offset=args.deep_offset,
+                                    group_limit=args.group_limit)
+        if args.weights:
+            weights = parse_weights(args.weights, available)
+            scenarios = [available[name] for name in weights]
+        else:
+            scenarios = select_scenarios(available, args.scenarios, args.include_writes)
+            weights = {scenario.name: 1.0 for scenario in scenarios}
+    except Exception as e:
+        print(f"準備に失敗しました: {e}")
+        return 1
+    finally:
+        setup_client.close()
+
+    print(f"=== 負荷試験: {args.concurrency}クライアント × {args.duration}秒（ウォームアップ {args.warmup}秒） ===")
+    print("シナリオ: " + ", ".join(f"{name}={weight:g}" for name, weight in weights.items()))
+    started = time.perf_counter()
+    measure_from = started + args.warmup
+    deadline = measure_from + args.duration
+    workers = [
+        LoadWorker(args.base_url, args.accept_encoding, scenarios, [weights[s.name] for s in scenarios],
+                   args.seed + index, measure_from, deadline)
+        for index in range(args.concurrency)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = min(time.perf_counter(), deadline) - measure_from
+
+    merged = {}
+    for worker in workers:
+        for label, sample in worker.samples.items():
+            target = merged.setdefault(label, {"latencies": [], "statuses": Counter(), "bytes": 0})
+            target["latencies"].extend(sample["latencies"])
+            target["statuses"].update(sample["statuses"])
+            target["bytes"] += sample["bytes"]
+
+    def result_of(label: str, latencies: list, statuses: Counter, response_bytes: int) -> dict:
+        errors = sum(count for status, count in statuses.items() if not 200 <= status < 300)
+        return dict(label=label, **summarize(latencies, errors, response_bytes, elapsed),
+                    statuses={str(status): count for status, count in sorted(statuses.items())})
+
+    results = [
+        result_of(label, sample["latencies"], sample["statuses"], sample["bytes"])
+        for label, sample in sorted(merged.items())
+    ]
+    overall = result_of(
+        "overall",
+        [latency for sample in merged.values() for latency in sample["latencies"]],
+        sum((sample["statuses"] for sample in merged.values()), Counter()),
+        sum(sample["bytes"] for sample in merged.values())
+    )
+    for result in results + [overall]:
+        print(f"{result['label']:<24} {result['throughput_rps']}件/秒  p50 {result['p50_ms']}ms  "
+              f"p95 {result['p95_ms']}ms  p99 {result['p99_ms']}ms  エラー {result['errors']}")
+
+    report = {
+        "benchmark": "load",
+        "environment": environment,
+        "settings": {key: value for key, value in vars(args).items() if key != "output"},
+        "weights": weights,
+        "elapsed_seconds": round(elapsed, 2),
+        "results": results,
+        "overall": overall,
+    }
+    print(f"結果: {write_result(report, args.output, 'load')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+重複データ管理システム 管理コマンド
+
+使い方:
+    python manage.py create-indexes      # 補助インデックスを作成
+    python manage.py check-indexes       # 補助インデックスの状態を検証
+    python manage.py create-search-indexes     # キーワード検索用のバイグラムインデックスを作成
+    python manage.py check-search-indexes --verify 障害  # 検索用インデックスを検証（ILIKEとの結果一致を確認）
+    python manage.py rebuild-duplicate-index   # 重複グループインデックスを全件再構築
+    python manage.py sync-duplicate-index      # ウォーターマーク以降の変更を差分反映
+    python manage.py check-duplicate-index     # 重複グループインデックスの整合性を検証
+    python manage.py bulk-delete --content-keyword 文字列  # フィルター条件に合致するデータをチャンク単位で論理削除
+    python manage.py check-query-joins --keyword 障害     # 結合の省略で件数が変わらないことを検証
+    python manage.py check-prepared-statements    # 準備済みステートメントの有無で検索系クエリの所要時間を比較
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from dotenv import load_dotenv
+
+# 環境変数を読み込み
+load_dotenv()
+
+# アプリケーションのパスを追加
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app'))
+
+from database import db_manager
+from services.index_service import IndexService
+from services.keyword_search_service import KeywordSearchService
+from services.duplicate_index_service import DuplicateIndexService
+from services.bulk_delete_service import BulkDeleteService
+from services.data_service import DataService
+from services.duplicate_service import DuplicateService
+from services.query_builder import QueryBuilder
+from models.request_models import FilterRequest
+
+
+def print_index_status(status: list) -> bool:
+    """インデックス状態を表示し、すべて有効ならTrueを返す"""
+    all_valid = True
+    for item in status:
+        if item["valid"]:
+            label = "OK"
+        elif item["exists"]:
+            label = "NG（無効）"
+        else:
+            label = "NG（未作成）"
+        all_valid = all_valid and item["valid"]
+        size = f" {item['size_bytes'] / 1024 / 1024:.1f}MB" if item["size_bytes"] is not None else ""
+        print(f"{label} {item['name']} on {item['table']}{size} - {item['description']}")
+    return all_valid
+
+
+def create_indexes(args) -> int:
+    status = IndexService.create_indexes(concurrently=not args.no_concurrently)
+    return 0 if print_index_status(status) else 1
+
+
+def check_indexes(args) -> int:
+    return 0 if print_index_status(IndexService.get_index_status()) else 1
+
+
+def create_search_indexes(args) -> int:
+    status = KeywordSearchService.create_indexes(concurrently=not args.no_concurrently)
+    return 0 if print_index_status(status) else 1
+
+
+def check_search_indexes(args) -> int:
+    function_exists = KeywordSearchService.function_exists()
+    print(f"{'OK' if function_exists else 'NG（未作成）'} search_bigrams(text) - バイグラム関数")
+    all_valid = print_index_status(KeywordSearchService.get_index_status()) and function_exists
+
+    for keyword in args.verify or []:
+        for item in KeywordSearchService.verify_keyword(keyword):
+            if not item["indexable"]:
+                print(f"-- 「{keyword}」{item['field']}: インデックス対象外（1文字またはワイルドカード文字を含む） "
+                      f"ILIKE {item['ilike_count']}件")
+                continue
+            label = "OK" if item["matched"] else "NG（件数不一致）"
+            all_valid = all_valid and item["matched"]
+            plan = "インデックス使用" if item["plan_uses_index"] else "インデックス未使用"
+            print(f"{label} 「{keyword}」{item['field']}: ILIKE {item['ilike_count']}件 {item['ilike_ms']}ms / "
+                  f"バイグラム {item['index_count']}件 {item['index_ms']}ms ({plan})")
+    return 0 if all_valid else 1
+
+
+def rebuild_duplicate_index(args) -> int:
+    result = DuplicateIndexService.rebuild()
+    print(f"OK 再構築完了: {result['fingerprint_rows']}行 "
+          f"ウォーターマーク={result['watermark']} ({result['elapsed_seconds']}秒)")
+    return 0
+
+
+def sync_duplicate_index(args) -> int:
+    result = DuplicateIndexService.sync(wait=True)
+    if result is None:
+        print("NG 重複グループインデックスが未構築です（rebuild-duplicate-index を実行してください）")
+        return 1
+    print(f"OK 差分同期完了: 変更{result['changed_rows']}行 影響グループ{result['affected_groups']}件 "
+          f"ウォーターマーク={result['watermark']} ({result['elapsed_seconds']}秒)")
+    return 0
+
+
+def check_duplicate_index(args) -> int:
+    if DuplicateIndexService.get_state() is None:
+        print("NG 重複グループインデックスが未構築です（rebuild-duplicate-index を実行してください）")
+        return 1
+    result = DuplicateIndexService.check_consistency()
+    state = result["state"]
+    print(f"ウォーターマーク: {state['watermark']} / 最終再構築: {state['last_full_rebuild_at']} "
+          f"/ 最終同期: {state['last_sync_at']}")
+    print(f"指紋: 欠落{result['missing_rows']}行 不一致{result['stale_rows']}行")
+    print(f"グループ: 欠落{result['missing_groups']}件 不一致{result['stale_groups']}件")
+    print("OK 整合性に問題はありません" if result["consistent"] else "NG 不整合があります（sync または rebuild を実行してください）")
+    return 0 if result["consistent"] else 1
+
+
+def check_query_joins(args) -> int:
+    all_valid = True
+    for item in QueryBuilder.check_join_keys():
+        label = "OK" if item["unique"] else "NG（重複あり）"
+        all_valid = all_valid and item["unique"]
+        print(f"{label} {item['table']}.{item['column']} - 重複キー{item['duplicate_keys']}件")
+
+    # 条件なし・削除状態のみ・指定キーワードの各条件で、省略した結合と全結合の件数を比較
+    conditions = [("条件なし", "", []), ("削除済みを除外", "AND recepthead.receptmoddt IS NULL", [])]
+    for keyword in args.keyword or []:
+        where, params = DataService.build_filter_conditions(FilterRequest(keyword=keyword))
+        conditions.append((f"キーワード「{keyword}」", where, params))
+    for name, where, params in conditions:
+        item = QueryBuilder.verify_condition(where, params)
+        label = "OK" if item["matched"] else "NG（件数不一致）"
+        all_valid = all_valid and item["matched"]
+        print(f"{label} {name}: 結合={','.join(item['aliases'])} {item['pruned_count']}件 {item['pruned_ms']}ms / "
+              f"全結合 {item['full_count']}件 {item['full_ms']}ms")
+    return 0 if all_valid else 1
+
+
+def check_prepared_statements(args) -> int:
+    # 結果キャッシュを無効にして、毎回DBに問い合わせる
+    os.environ["RESULT_CACHE_ENABLED"] = "false"
+    filters = FilterRequest(keyword=args.keyword) if args.keyword else None
+    workloads = [
+        ("受信データ（1ページ目）", lambda: DataService.get_reception_data(offset=0, limit=100, filters=filters)),
+        ("統計情報", lambda: DataService.get_statistics(filters)),
+        ("重複グループ概要", lambda: DuplicateService.get_group_summaries("exact", filters, group_limit=50)),
+    ]
+
+    for name, workload in workloads:
+        timings = {}
+        for mode in ("false", "true"):
+            os.environ["DB_PREPARED_STATEMENTS"] = mode
+            workload()  # 初回（PREPARE・計画時間の測定）は計測から除外
+            started = time.perf_counter()
+            for _ in range(args.iterations):
+                workload()
+            timings[mode] = (time.perf_counter() - started) * 1000 / args.iterations
+        print(f"{name}: 通常 {timings['false']:.2f}ms / 準備済み {timings['true']:.2f}ms "
+              f"（差 {timings['false'] - timings['true']:.2f}ms/回、{args.iterations}回平均）")
+
+    stats = db_manager.get_prepared_stats()
+    basis = "汎用計画の回数から算出" if stats["estimate_basis"] == "generic_plans" else "再利用回数による上限値"
+    print(f"クエリの形: {stats['shapes']}件 実行: {stats['executions']}回 再利用: {stats['reuses']}回 "
+          f"汎用計画: {stats['generic_plans']}回 個別計画: {stats['custom_plans']}回 "
+          f"計画時間の削減（目安、{basis}）: {stats['estimated_saved_ms']}ms plan_cache_mode: {stats['plan_cache_mode']}")
+    # 逐次実行のため同じ接続が再利用される（PostgreSQL 14 以降は汎用計画の利用回数も表示）
+    try:
+        plans = {
+            row['name']: row for row in db_manager.execute_query(
+                "SELECT name, generic_plans, custom_plans FROM pg_prepared_statements"
+            )
+        }
+    except Exception:
+        plans = {}
+    for shape in stats["top_shapes"]:
+        plan = plans.get(shape["name"])
+        plan_info = f" 汎用計画{plan['generic_plans']}回/個別計画{plan['custom_plans']}回" if plan else ""
+        print(f"  {shape['name']}: 実行{shape['executions']}回 計画{shape['planning_ms']}ms "
+              f"平均{shape['avg_execute_ms']}ms{plan_info}")
+    return 0 if stats["unpreparable_shapes"] == 0 else 1
+
+
+def print_bulk_progress(progress: dict):
+    """チャンクごとの進捗を表示"""
+    print(f"  チャンク{progress['chunks']}: 削除{progress['deleted_count']}/{progress['target_count']}件 "
+          f"{progress['rows_per_second']}行/秒 last_id={progress['last_id']}")
+
+
+def bulk_delete(args) -> int:
+    filters = FilterRequest(
+        keyword=args.keyword,
+        content_keyword=args.content_keyword,
+        status_keyword=args.status_keyword,
+        progress=args.progress,
+        system_type=args.system_type,
+        product=args.product,
+        date_from=datetime.fromisoformat(args.date_from) if args.date_from else None,
+        date_to=datetime.fromisoformat(args.date_to) if args.date_to else None,
+        date_field=args.date_field
+    )
+    if not args.all and not any([filters.keyword, filters.content_keyword, filters.status_keyword,
+                                 filters.progress, filters.system_type, filters.product,
+                                 filters.date_from, filters.date_to]):
+        print("NG フィルター条件がありません（全件を対象にする場合は --all を指定してください）")
+        return 1
+
+    result = BulkDeleteService.delete_in_chunks(
+        filters,
+        chunk_size=args.chunk_size,
+        resume_after_id=args.resume_after,
+        progress_callback=print_bulk_progress
+    )
+    print(f"削除{result['deleted_count']}件 / 対象{result['target_count']}件 "
+          f"残り{result['remaining_count']}件 ({result['chunks']}チャンク, 走査{result['passes']}回, "
+          f"{result['elapsed_seconds']}秒, {result['rows_per_second']}行/秒)")
+    if not result["success"]:
+        print(f"NG 中断しました: {result['error']}（--resume-after {result['last_id']} で再開できます）")
+        return 1
+    if not result["completed"]:
+        print("NG ロック中のため削除できなかった行があります（再実行してください）")
+        return 1
+    print("OK 一括削除完了")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重複データ管理システム 管理コマンド")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    create_parser = subparsers.add_parser("create-indexes", help="補助インデックスを作成")
+    create_parser.add_argument(
+        "--no-concurrently", action="store_true",
+        help="CONCURRENTLYを使わずに作成（テーブルロックが発生するため保守時間帯のみ）"
+    )
+    create_parser.set_defaults(func=create_indexes)
+
+    check_parser = subparsers.add_parser("check-indexes", help="補助インデックスの状態を検証")
+    check_parser.set_defaults(func=check_indexes)
+
+    create_search_parser = subparsers.add_parser(
+        "create-search-indexes", help="キーワード検索用のバイグラム関数とインデックスを作成"
+    )
+    create_search_parser.add_argument(
+        "--no-concurrently", action="store_true",
+        help="CONCURRENTLYを使わずに作成（テーブルロックが発生するため保守時間帯のみ）"
+    )
+    create_search_parser.set_defaults(func=create_search_indexes)
+
+    check_search_parser = subparsers.add_parser("check-search-indexes", help="キーワード検索用インデックスの状態を検証")
+    check_search_parser.add_argument(
+        "--verify", nargs="+", metavar="KEYWORD",
+        help="指定したキーワードで ILIKE のみの検索と件数・所要時間・実行計画を比較"
+    )
+    check_search_parser.set_defaults(func=check_search_indexes)
+
+    rebuild_parser = subparsers.add_parser("rebuild-duplicate-index", help="重複グループインデックスを全件再構築")
+    rebuild_parser.set_defaults(func=rebuild_duplicate_index)
+
+    sync_parser = subparsers.add_parser("sync-duplicate-index", help="ウォーターマーク以降の変更を差分反映")
+    sync_parser.set_defaults(func=sync_duplicate_index)
+
+    check_dup_parser = subparsers.add_parser("check-duplicate-index", help="重複グループインデックスの整合性を検証")
+    check_dup_parser.set_defaults(func=check_duplicate_index)
+
+    bulk_parser = subparsers.add_parser("bulk-delete", help="フィルター条件に合致するデータをチャンク単位で論理削除")
+    bulk_parser.add_argument("--keyword", help="キーワード（受付内容・対応状況）")
+    bulk_parser.add_argument("--content-keyword", help="受付内容キーワード")
+    bulk_parser.add_argument("--status-keyword", help="対応状況キーワード")
+    bulk_parser.add_argument("--progress", help="進捗")
+    bulk_parser.add_argument("--system-type", help="システム種別")
+    bulk_parser.add_argument("--product", help="製品")
+    bulk_parser.add_argument("--date-from", help="開始日時（ISO 8601）")
+    bulk_parser.add_argument("--date-to", help="終了日時（ISO 8601）")
+    bulk_parser.add_argument("--date-field", default="reception_datetime", help="日付フィルター対象")
+    bulk_parser.add_argument("--chunk-size", type=int, help="1チャンクの行数（省略時は BULK_CHUNK_SIZE）")
+    bulk_parser.add_argument("--resume-after", type=int, help="中断した処理の last_id（このIDより後から再開）")
+    bulk_parser.add_argument("--all", action="store_true", help="フィルター条件なしで全件を対象にする")
+    bulk_parser.set_defaults(func=bulk_delete)
+
+    joins_parser = subparsers.add_parser("check-query-joins", help="結合の省略で検索結果が変わらないことを検証")
+    joins_parser.add_argument(
+        "--keyword", nargs="+", metavar="KEYWORD",
+        help="指定したキーワードの検索条件でも件数を比較"
+    )
+    joins_parser.set_defaults(func=check_query_joins)
+
+    prepared_parser = subparsers.add_parser(
+        "check-prepared-statements", help="準備済みステートメントの有無で検索系クエリの所要時間を比較"
+    )
+    prepared_parser.add_argument("--iterations", type=int, default=20, help="各クエリの計測回数")
+    prepared_parser.add_argument("--keyword", help="計測に使うキーワード条件")
+    prepared_parser.set_defaults(func=check_prepared_statements)
+
+    args = parser.parse_args()
+    try:
+        exit_code = args.func(args)
+    except Exception as e:
+        print(f"エラーが発生しました: {e}")
+        exit_code = 1
+    finally:
+        db_manager.close_pool()
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
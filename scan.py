@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+重複データ管理システム 重複グループのオフライン全件走査
+
+Webアプリを経由せずに全件を走査して重複グループを検出し、スナップショットファイル（Arrow IPC）を作成する。
+APIは /api/snapshots/duplicates/{duplicate_type} でスナップショットのグループを提供する。
+夜間バッチなど、業務時間外の実行を想定している。
+
+使い方:
+    python scan.py                                  # exact/content/status を全件走査
+    python scan.py --types content --since 2015-01-01 --workers 8
+    python scan.py --output snapshots/duplicates.arrow --report scan_report.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from dotenv import load_dotenv
+
+# 環境変数を読み込み
+load_dotenv()
+
+# アプリケーションのパスを追加
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app'))
+
+from database import db_manager
+from services.duplicate_scan_service import DuplicateScanService, SCAN_TYPES
+
+
+def print_progress(progress: dict):
+    elapsed = progress["elapsed_seconds"]
+    rate = progress["rows"] / elapsed if elapsed else 0
+    print(f"\r  {progress['rows']:,}行 {progress['bytes'] / 1024 / 1024:,.1f}MB "
+          f"({rate:,.0f}行/秒)", end="", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重複グループのオフライン全件走査（スナップショットの作成）")
+    parser.add_argument("--types", default=",".join(SCAN_TYPES),
+                        help=f"走査する重複タイプ（カンマ区切り、デフォルト: {','.join(SCAN_TYPES)}）")
+    parser.add_argument("--since", help="受付日時がこの日時以降の行のみを走査（例: 2015-01-01）")
+    parser.add_argument("--workers", type=int, help="ワーカープロセス数（省略時は SCAN_WORKERS）")
+    parser.add_argument("--batch-bytes", type=int, help="1回にワーカーへ渡すサイズ（省略時は SCAN_BATCH_BYTES）")
+    parser.add_argument("--min-group-size", type=int, default=2, help="グループの最小件数")
+    parser.add_argument("--output", help="スナップショットの出力先（省略時は DUPLICATE_SNAPSHOT_PATH）")
+    parser.add_argument("--report", help="結果JSONの出力先（行数/秒・最大RSSなど）")
+    args = parser.parse_args()
+
+    types = tuple(t.strip() for t in args.types.split(",") if t.strip())
+    since = datetime.fromisoformat(args.since) if args.since else None
+
+    print("=== 重複グループの全件走査 ===")
+    print(f"対象: {', '.join(types)}" + (f"（{args.since} 以降）" if since else ""))
+    try:
+        result = DuplicateScanService.scan(
+            output_path=args.output,
+            types=types,
+            since=since,
+            workers=args.workers,
+            batch_bytes=args.batch_bytes,
+            min_group_size=max(2, args.min_group_size),
+            progress=print_progress
+        )
+    except Exception as e:
+        print(f"\nエラーが発生しました: {e}")
+        return 1
+    finally:
+        db_manager.close_pool()
+
+    print()
+    for duplicate_type, entry in result["types"].items():
+        print(f"  {duplicate_type}: {entry['groups']:,}グループ / {entry['rows']:,}件")
+    peak = result["peak_rss_mb"]
+    print(f"走査: {result['scanned_rows']:,}行 {result['elapsed_seconds']}秒 ({result['rows_per_second']:,.0f}行/秒)")
+    print(f"最大RSS: メイン {peak['main']}MB / ワーカー {peak['workers']}MB")
+    print(f"出力: {result['output']} ({result['file_bytes'] / 1024 / 1024:.1f}MB)")
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            f.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+
+@pytest.fixture(scope="session")
+def db():
+    """接続先（.env・環境変数の DB_*）のデータベース（接続できない場合はスキップ）"""
+    import psycopg2
+    from database import db_manager
+
+    try:
+        psycopg2.connect(
+            host=db_manager.host,
+            database=db_manager.database,
+            user=db_manager.user,
+            password=db_manager.password,
+            port=db_manager.port,
+            connect_timeout=3
+        ).close()
+    except psycopg2.Error as e:
+        pytest.skip(f"データベースに接続できません: {e}")
+    return db_manager
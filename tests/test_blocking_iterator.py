@@ -0,0 +1,49 @@
+"""ストリーミング応答で読み出すイテレーターの終了処理（クライアント切断時）"""
+
+import asyncio
+import threading
+
+from database import db_manager
+
+
+def test_close_runs_after_in_flight_next_even_if_cancelled():
+    started = threading.Event()
+    release = threading.Event()
+    closed = threading.Event()
+
+    def source():
+        try:
+            started.set()
+            release.wait(5)
+            yield 1
+            yield 2
+        finally:
+            closed.set()
+
+    async def disconnect():
+        iterator = db_manager.blocking_iterator(source())
+        reading = asyncio.ensure_future(iterator.next())
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        # 切断時と同様に、読み出しの待機と終了処理の待機がともにキャンセルされる
+        reading.cancel()
+        closing = asyncio.ensure_future(iterator.aclose())
+        await asyncio.sleep(0)
+        closing.cancel()
+        results = await asyncio.gather(reading, closing, return_exceptions=True)
+        assert isinstance(results[0], asyncio.CancelledError)
+        assert not closed.is_set()
+
+    asyncio.run(disconnect())
+    # ワーカースレッドの読み出しが終わった後で close される
+    release.set()
+    assert closed.wait(5)
+
+
+def test_next_returns_none_at_end():
+    async def read_all():
+        iterator = db_manager.blocking_iterator(iter([1, 2]))
+        values = [await iterator.next() for _ in range(3)]
+        await iterator.aclose()
+        return values
+
+    assert asyncio.run(read_all()) == [1, 2, None]
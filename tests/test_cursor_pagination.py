@@ -0,0 +1,67 @@
+"""長いテキストのソートキーでのキーセットページング（DBが必要）"""
+
+import pytest
+
+from services.data_service import DataService
+from services.query_builder import QueryBuilder
+from utils.cursor import CURSOR_MAX_TEXT_BYTES, decode_cursor, encode_cursor
+from utils.result_cache import result_cache
+
+LONG_CONTENT = "長文の受付内容" * 500
+
+
+def test_long_text_sort_key_is_not_embedded():
+    signature = [("content", "ASC"), ("id", "ASC")]
+    token = encode_cursor(signature, [LONG_CONTENT, 1], 100)
+    assert len(token) < CURSOR_MAX_TEXT_BYTES
+    assert decode_cursor(token, signature) == (None, 100)
+
+    short = encode_cursor(signature, ["短い内容", 1], 100)
+    assert decode_cursor(short, signature) == (["短い内容", 1], 100)
+
+
+@pytest.fixture
+def long_content_record(db, monkeypatch):
+    """受付内容を数KBの文字列に置き換えた行（終了後に元へ戻す）"""
+    monkeypatch.setenv("RESULT_CACHE_ENABLED", "false")
+    rows = db.execute_query(
+        f"""
+        SELECT recepthead.extentid, recepthead.receptno, receptbody.rdata
+        {QueryBuilder.build_from_clause("receptbody.rdata")}
+        AND receptbody.receptno IS NOT NULL AND recepthead.receptmoddt IS NULL
+        ORDER BY recepthead.extentid LIMIT 1
+        """
+    )
+    if not rows:
+        pytest.skip("受付内容のある行がありません")
+    row = rows[0]
+    update = "UPDATE receptbody SET rdata = %s WHERE receptno = %s"
+    db.execute_update(update, (LONG_CONTENT, row["receptno"]))
+    yield row["extentid"]
+    db.execute_update(update, (row["rdata"], row["receptno"]))
+    result_cache.clear()
+
+
+def test_cursor_after_long_content_matches_offset(db, long_content_record):
+    ids = [row["extentid"] for row in db.execute_query(
+        f"""
+        SELECT recepthead.extentid
+        {QueryBuilder.build_from_clause("receptbody.rdata")}
+        AND recepthead.receptmoddt IS NULL
+        {DataService.build_order_by_clause("content,id", "asc,asc")}
+        """
+    )]
+    # 置き換えた行がページの最終行になる件数で取得する
+    limit = ids.index(long_content_record) + 1
+
+    first, _, _, next_cursor, _ = DataService.get_reception_page_by_cursor(
+        limit=limit, sort_by="content", sort_order="asc", count_mode="none"
+    )
+    assert first[-1].id == long_content_record
+    assert next_cursor is not None
+    assert len(next_cursor) < CURSOR_MAX_TEXT_BYTES
+
+    second, _, _, _, _ = DataService.get_reception_page_by_cursor(
+        cursor=next_cursor, limit=limit, sort_by="content", sort_order="asc", count_mode="none"
+    )
+    assert [record.id for record in second] == ids[limit:limit * 2]
@@ -0,0 +1,62 @@
+"""復元時の重複グループインデックスへの反映（DBが必要）"""
+
+import time
+
+import pytest
+
+from models.request_models import RestoreRequest
+from services.duplicate_index_service import DuplicateIndexService, SYNC_LOCK_KEY
+from services.restore_service import RestoreService
+
+
+@pytest.fixture
+def deleted_record(db):
+    """インデックス済みの行を1件削除して同期し、終了後に復元する"""
+    if DuplicateIndexService.get_state() is None:
+        pytest.skip("重複グループインデックスが未構築です")
+    rows = db.execute_query("SELECT MIN(extentid) AS extentid FROM dup_fingerprint")
+    if rows[0]["extentid"] is None:
+        pytest.skip("インデックス済みの行がありません")
+    record_id = rows[0]["extentid"]
+    db.execute_update(
+        "UPDATE recepthead SET receptmoddt = CURRENT_TIMESTAMP AT TIME ZONE 'Asia/Tokyo' WHERE extentid = %s",
+        (record_id,)
+    )
+    DuplicateIndexService.sync(wait=True)
+    yield record_id
+    db.execute_update("UPDATE recepthead SET receptmoddt = NULL WHERE extentid = %s", (record_id,))
+    DuplicateIndexService.sync(extra_ids=[record_id], wait=True)
+
+
+def is_indexed(db, record_id) -> bool:
+    return bool(db.execute_query("SELECT 1 FROM dup_fingerprint WHERE extentid = %s", (record_id,)))
+
+
+def is_pending(db, record_id) -> bool:
+    return bool(db.execute_query("SELECT 1 FROM dup_pending WHERE extentid = %s", (record_id,)))
+
+
+def test_restore_is_synced(db, deleted_record):
+    assert not is_indexed(db, deleted_record)
+    response = RestoreService.restore_records(RestoreRequest(target_ids=[deleted_record]))
+    assert response.restored_count == 1
+    assert is_indexed(db, deleted_record)
+    assert not is_pending(db, deleted_record)
+
+
+def test_restore_does_not_wait_for_running_sync(db, deleted_record):
+    # 他の同期の実行中（ロック保持中）は待たずに応答し、再計算待ちとして次の同期で反映する
+    with db.get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", (SYNC_LOCK_KEY,))
+            started = time.perf_counter()
+            response = RestoreService.restore_records(RestoreRequest(target_ids=[deleted_record]))
+            assert time.perf_counter() - started < 5
+        conn.rollback()
+    assert response.restored_count == 1
+    assert is_pending(db, deleted_record)
+    assert not is_indexed(db, deleted_record)
+
+    DuplicateIndexService.sync(wait=True)
+    assert is_indexed(db, deleted_record)
+    assert not is_pending(db, deleted_record)
@@ -0,0 +1,63 @@
+"""exact の重複検出で受付内容が NULL の行どうしのグループ（DBが必要）"""
+
+import pytest
+
+from services.duplicate_service import DuplicateService
+
+
+def live_exact_groups(db) -> dict:
+    """重複検出クエリの全グループ（group_pos → メンバーID）と集計行"""
+    query, params = DuplicateService.build_duplicate_query("exact", use_index=False)
+    rows = db.execute_query(query, params)
+    groups = {}
+    for row in rows:
+        if row["id"] is not None:
+            groups.setdefault(row["group_pos"], []).append(row)
+    return groups, rows[0]
+
+
+def null_content_groups(groups: dict) -> list:
+    return [
+        frozenset(row["id"] for row in members)
+        for members in groups.values() if members[0]["content"] is None
+    ]
+
+
+def test_every_counted_group_returns_its_members(db):
+    groups, totals = live_exact_groups(db)
+    assert len(groups) == totals["total_groups"]
+    assert sum(len(members) for members in groups.values()) == totals["total_duplicates"]
+
+
+def test_group_members_of_null_content_row(db):
+    groups, _ = live_exact_groups(db)
+    expected = null_content_groups(groups)
+    if not expected:
+        pytest.skip("受付内容が NULL の重複グループがありません")
+    for ids in expected[:5]:
+        group = DuplicateService.get_group_members("exact", min(ids), use_index=False)
+        assert group is not None
+        assert {record.id for record in group.records} == ids
+
+
+def test_snapshot_matches_live_null_content_groups(db, tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    from services.duplicate_scan_service import DuplicateScanService
+    from services.snapshot_service import SnapshotService
+
+    path = str(tmp_path / "duplicates.arrow")
+    DuplicateScanService.scan(output_path=path, types=("exact",), workers=1)
+    monkeypatch.setenv("DUPLICATE_SNAPSHOT_PATH", path)
+    snapshot = SnapshotService.load()["types"]["exact"]
+    starts, ids = snapshot["group_starts"], snapshot["ids"]
+    snapshot_groups = {
+        frozenset(int(member) for member in ids[starts[k]:starts[k + 1]])
+        for k in range(snapshot["total_groups"])
+    }
+
+    groups, totals = live_exact_groups(db)
+    assert snapshot["total_groups"] == totals["total_groups"]
+    assert snapshot["total_duplicates"] == totals["total_duplicates"]
+    live_groups = {frozenset(row["id"] for row in members) for members in groups.values()}
+    assert live_groups == snapshot_groups
+    assert set(null_content_groups(groups)) <= snapshot_groups
@@ -0,0 +1,76 @@
+"""所有プロセスが停止した未完了ジョブの中断扱い（DBが必要）"""
+
+import os
+import subprocess
+import sys
+import threading
+import uuid
+
+import pytest
+from psycopg2.extras import Json
+
+from services.job_service import (
+    JobService, OWNER_HOST, JOB_STATUS_RUNNING, JOB_STATUS_INTERRUPTED,
+)
+
+
+def dead_pid() -> int:
+    """終了済みのプロセスID"""
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+@pytest.fixture
+def jobs(db):
+    """状態を確認するジョブを登録し、終了後に削除する"""
+    JobService.ensure_schema()
+    created = []
+
+    def create(owner_host, owner_pid, heartbeat_age_seconds):
+        job_id = uuid.uuid4().hex
+        heartbeat = "NULL" if heartbeat_age_seconds is None else (
+            f"LOCALTIMESTAMP - make_interval(secs => {heartbeat_age_seconds})"
+        )
+        db.execute_update(
+            f"""
+            INSERT INTO background_job (job_id, job_type, status, params, owner_host, owner_pid, heartbeat_at)
+            VALUES (%s, 'delete', %s, %s, %s, %s, {heartbeat})
+            """,
+            (job_id, JOB_STATUS_RUNNING, Json({}), owner_host, owner_pid)
+        )
+        created.append(job_id)
+        return job_id
+
+    yield create
+    db.execute_update("DELETE FROM background_job WHERE job_id = ANY(%s)", (created,))
+
+
+def status_of(db, job_id) -> str:
+    return db.execute_query("SELECT status FROM background_job WHERE job_id = %s", (job_id,))[0]["status"]
+
+
+def test_recover_only_abandoned_jobs(db, jobs, monkeypatch):
+    monkeypatch.setenv("JOB_HEARTBEAT_TIMEOUT", "60")
+    other_host_alive = jobs("other-host", 1, 5)
+    other_host_stale = jobs("other-host", 1, 600)
+    legacy = jobs(None, None, None)
+    same_host_alive = jobs(OWNER_HOST, os.getppid(), 5)
+    same_host_dead = jobs(OWNER_HOST, dead_pid(), 5)
+    reused_own_pid = jobs(OWNER_HOST, os.getpid(), 5)
+
+    JobService.recover_abandoned_jobs()
+
+    assert status_of(db, other_host_alive) == JOB_STATUS_RUNNING
+    assert status_of(db, same_host_alive) == JOB_STATUS_RUNNING
+    for job_id in (other_host_stale, legacy, same_host_dead, reused_own_pid):
+        assert status_of(db, job_id) == JOB_STATUS_INTERRUPTED
+
+
+def test_own_running_job_is_kept(db, jobs, monkeypatch):
+    # このプロセスで受け付けたジョブは中断扱いにせず、生存時刻を更新する
+    job_id = jobs(OWNER_HOST, os.getpid(), 5)
+    monkeypatch.setattr(JobService, "_cancel_events", {job_id: threading.Event()})
+    JobService.recover_abandoned_jobs()
+    assert JobService.heartbeat() == 1
+    assert status_of(db, job_id) == JOB_STATUS_RUNNING
@@ -0,0 +1,73 @@
+"""ジョブ結果の1件ずつの保存とページ取得（DBが必要）"""
+
+import threading
+import time
+import uuid
+
+import pytest
+from psycopg2.extras import Json
+
+from config.job_config import JobConfig
+from services.job_service import JobService, JobContext, FINISHED_STATUSES, JOB_STATUS_SUCCEEDED
+
+
+@pytest.fixture
+def cleanup_jobs(db):
+    JobService.ensure_schema()
+    job_ids = []
+    yield job_ids
+    db.execute_update("DELETE FROM background_job WHERE job_id = ANY(%s)", (job_ids,))
+
+
+def wait_finished(job_id: str, timeout: float = 60.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = JobService.get_job(job_id)
+        if job["status"] in FINISHED_STATUSES:
+            return job
+        time.sleep(0.1)
+    pytest.fail(f"ジョブが終了しません: {job_id}")
+
+
+def test_duplicate_scan_results_are_paged(db, cleanup_jobs, monkeypatch):
+    monkeypatch.setenv("JOB_RESULT_PAGE_SIZE", "7")
+    job = JobService.submit("duplicate_scan", {"duplicate_type": "exact"})
+    cleanup_jobs.append(job["job_id"])
+    assert wait_finished(job["job_id"])["status"] == JOB_STATUS_SUCCEEDED
+
+    summary = JobService.get_result(job["job_id"])["result"]
+    assert summary["truncated"] is False
+    assert summary["stored_groups"] == summary["total_groups"]
+
+    items, offset = [], 0
+    while True:
+        page = JobService.get_result_items(job["job_id"], offset, 50)
+        assert page["total_items"] == summary["total_groups"]
+        if not page["items"]:
+            break
+        items.extend(page["items"])
+        offset += len(page["items"])
+    assert len(items) == summary["total_groups"]
+    assert sum(len(group["records"]) for group in items) == summary["total_duplicates"]
+
+
+def test_results_stop_at_size_cap(db, cleanup_jobs, monkeypatch):
+    job_id = uuid.uuid4().hex
+    db.execute_update(
+        "INSERT INTO background_job (job_id, job_type, status, params) VALUES (%s, 'duplicate_scan', %s, %s)",
+        (job_id, JOB_STATUS_SUCCEEDED, Json({}))
+    )
+    cleanup_jobs.append(job_id)
+    monkeypatch.setattr(JobConfig, "get_result_max_bytes", staticmethod(lambda: 70))
+    monkeypatch.setenv("JOB_RESULT_PAGE_SIZE", "2")
+
+    context = JobContext(job_id, threading.Event())
+    stored = [context.append_result({"value": "x" * 20}) for _ in range(5)]
+    context.flush_results()
+
+    # 1件あたり33バイトのため、70バイトの上限では2件まで保存する
+    assert stored == [True, True, False, False, False]
+    assert context.result_truncated
+    page = JobService.get_result_items(job_id, 0, 10)
+    assert page["total_items"] == 2
+    assert page["items"] == [{"value": "x" * 20}] * 2
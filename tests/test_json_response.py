@@ -0,0 +1,69 @@
+"""JSONレスポンスの圧縮・コンパクト形式のスキーマ"""
+
+import asyncio
+import gzip
+import json
+
+from models.response_models import (
+    CompactDuplicateGroup, CompactDuplicatesResponse, DuplicateGroup, DuplicatesResponse, ReceptionDataRecord
+)
+from utils.compact_format import compact_duplicates_response, compact_group
+from utils.json_response import FastJSONResponse
+
+
+def send_response(response: FastJSONResponse) -> dict:
+    """ASGIで送信し、ヘッダーと本文を返す"""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(response({"type": "http"}, receive, send))
+    headers = {key.decode(): value.decode() for key, value in messages[0]["headers"]}
+    return {"headers": headers, "body": b"".join(message.get("body", b"") for message in messages[1:])}
+
+
+def test_gzip_is_applied_when_sent(monkeypatch):
+    monkeypatch.setenv("RESPONSE_COMPRESSION", "true")
+    monkeypatch.setenv("RESPONSE_COMPRESSION_MIN_BYTES", "100")
+    content = {"data": ["受付内容"] * 200}
+    response = FastJSONResponse(content, accept_encoding="gzip")
+    # 圧縮は送信時（スレッドプール）まで行わない
+    assert "content-encoding" not in response.headers
+
+    sent = send_response(response)
+    assert sent["headers"]["content-encoding"] == "gzip"
+    assert int(sent["headers"]["content-length"]) == len(sent["body"])
+    assert json.loads(gzip.decompress(sent["body"])) == content
+
+
+def test_small_body_is_not_compressed(monkeypatch):
+    monkeypatch.setenv("RESPONSE_COMPRESSION_MIN_BYTES", "100000")
+    sent = send_response(FastJSONResponse({"data": []}, accept_encoding="gzip"))
+    assert "content-encoding" not in sent["headers"]
+    assert json.loads(sent["body"]) == {"data": []}
+
+
+def make_record(record_id: int, progress: str) -> ReceptionDataRecord:
+    return ReceptionDataRecord(
+        id=record_id, content="同じ内容", status="対応中", result=None, report=None,
+        progress=progress, system_type=None, product=None,
+        reception_moddt=None, reception_datetime=None, update_datetime=None,
+        duplicate_count=2, duplicate_type="exact", duplicate_key="同じ内容|対応中"
+    )
+
+
+def test_compact_format_matches_schema():
+    group = DuplicateGroup(
+        group_id="g1", duplicate_count=2, duplicate_key="同じ内容|対応中",
+        records=[make_record(1, "受付"), make_record(2, "完了")]
+    )
+    compact = compact_group(group)
+    assert CompactDuplicateGroup.model_validate(compact).model_dump(exclude_unset=True) == compact
+
+    response = DuplicatesResponse(duplicates=[group], total_groups=1, total_duplicates=2)
+    compact_response = compact_duplicates_response(response)
+    assert CompactDuplicatesResponse.model_validate(compact_response).model_dump(exclude_unset=True) == compact_response
@@ -0,0 +1,52 @@
+"""準備済みステートメントの登録と接続上のステートメントの一致（DBが必要）"""
+
+import uuid
+
+import psycopg2
+import pytest
+
+import database
+
+
+def assert_registry_matches_server(db):
+    """接続が記録している準備済みステートメントとサーバー側のステートメントが一致すること"""
+    with db.get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT name FROM pg_prepared_statements")
+            server_names = {row["name"] for row in cursor.fetchall()}
+        conn.rollback()
+        assert server_names == set(conn.prepared_statements)
+
+
+def test_failed_planning_sample_does_not_leak_statement(db, monkeypatch):
+    monkeypatch.setenv("DB_PREPARED_STATEMENTS", "true")
+    # PREPARE は成功し、計画時間の測定（EXPLAIN）と実行がパラメータの値で失敗する形
+    query = f"SELECT %s::int AS value -- {uuid.uuid4().hex}"
+    with pytest.raises(psycopg2.DataError):
+        db.execute_prepared(query, ("not a number",))
+    assert_registry_matches_server(db)
+
+    name = db.prepared.statement_name(query)
+    assert not db.prepared.is_unpreparable(name)
+    assert db.execute_prepared(query, (7,))[0]["value"] == 7
+    assert_registry_matches_server(db)
+
+
+def test_savings_count_only_generic_plans(db, monkeypatch):
+    monkeypatch.setenv("DB_PREPARED_STATEMENTS", "true")
+    monkeypatch.setattr(database, "PLAN_COUNT_POLL_SECONDS", 0.0)
+    if not db.prepared.plan_counts_available:
+        pytest.skip("計画の作成回数を取得できないサーバーです")
+    query = f"SELECT %s::int AS value -- {uuid.uuid4().hex}"
+    for value in range(12):
+        assert db.execute_prepared(query, (value,))[0]["value"] == value
+
+    name = db.prepared.statement_name(query)
+    shape = next(item for item in db.prepared.get_stats()["top_shapes"] if item["name"] == name)
+    # 毎回取得しているため、すべての実行が汎用計画・個別計画のどちらかに数えられる
+    assert shape["generic_plans"] + shape["custom_plans"] == shape["executions"] == 12
+    # plan_cache_mode=auto では接続ごとに最初の5回は個別計画を作成する
+    if db.execute_query("SHOW plan_cache_mode")[0]["plan_cache_mode"] == "auto":
+        assert shape["custom_plans"] >= 5
+    assert shape["estimated_saved_ms"] <= shape["planning_ms"] * shape["reuses"]
+
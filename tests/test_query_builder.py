@@ -0,0 +1,106 @@
+"""参照している別名の結合だけで組み立てる FROM 句（QueryBuilder）"""
+
+import pytest
+
+from models.request_models import FilterRequest
+from services.data_service import DataService, RECEPTION_SELECT_COLUMNS
+from services.query_builder import QueryBuilder, JOIN_DEFINITIONS, RECEPTION_BASE_WHERE
+
+RECEPTBODY_JOIN = "\n        LEFT JOIN receptbody ON recepthead.receptno = receptbody.receptno"
+EXECHEAD_JOIN = "\n        LEFT JOIN exechead ON recepthead.receptno = exechead.receptno"
+COND_ITEM_JOIN = "\n        LEFT JOIN m_ctitem AS cond_item ON exechead.condition = cond_item.itemcd"
+EXECBODY_JOIN = "\n        LEFT JOIN execbody ON recepthead.receptno = execbody.receptno"
+PROD_ITEM_JOIN = "\n        LEFT JOIN m_ctitem AS prod_item ON exechead.producttype = prod_item.itemcd"
+
+
+def filter_where(**conditions) -> str:
+    where, _ = DataService.build_filter_conditions(FilterRequest(**conditions))
+    return where
+
+
+@pytest.mark.parametrize("fragments, expected", [
+    ((), []),
+    (("AND recepthead.receptmoddt IS NULL",), []),
+    ((RECEPTION_BASE_WHERE,), ["receptbody"]),
+    # 選択列はすべての結合を参照する
+    ((RECEPTION_SELECT_COLUMNS,), ["exechead", "cond_item", "receptbody", "execbody", "stype_item", "prod_item"]),
+    # マスタ項目の条件は前提となる exechead を含める
+    ((filter_where(progress="完了"),), ["exechead", "cond_item"]),
+    ((filter_where(system_type="A"), filter_where(product="B")), ["exechead", "stype_item", "prod_item"]),
+    ((filter_where(date_field="update_datetime", date_from="2024-01-01", date_to="2024-12-31"),), ["receptbody"]),
+    # 並び順の参照も結合に含める
+    ((DataService.build_order_by_clause("status", "asc"),), ["execbody"]),
+    ((filter_where(progress="完了"), DataService.build_order_by_clause("product,id", "desc,asc")),
+     ["exechead", "cond_item", "prod_item"]),
+])
+def test_required_aliases(fragments, expected):
+    assert QueryBuilder.required_aliases(*fragments) == expected
+
+
+def test_required_aliases_ignores_similar_names():
+    # 別名を含む別の識別子（my_exechead.x など）や「別名.」の形でない参照は結合しない
+    assert QueryBuilder.required_aliases("my_exechead.condition", "exechead_id", "receptbody") == []
+
+
+def test_from_clause_without_conditions():
+    assert QueryBuilder.build_from_clause() == (
+        f"\n        FROM recepthead{RECEPTBODY_JOIN}\n{RECEPTION_BASE_WHERE}"
+    )
+
+
+def test_from_clause_with_master_item_filter():
+    where = filter_where(progress="完了")
+    assert QueryBuilder.build_from_clause(where) == (
+        f"\n        FROM recepthead{EXECHEAD_JOIN}{COND_ITEM_JOIN}{RECEPTBODY_JOIN}\n{RECEPTION_BASE_WHERE}"
+    )
+
+
+def test_from_clause_with_filter_and_sort():
+    where = filter_where(product="B")
+    order_by = DataService.build_order_by_clause("status", "desc")
+    assert QueryBuilder.build_from_clause(where, order_by) == (
+        f"\n        FROM recepthead{EXECHEAD_JOIN}{RECEPTBODY_JOIN}{EXECBODY_JOIN}{PROD_ITEM_JOIN}"
+        f"\n{RECEPTION_BASE_WHERE}"
+    )
+
+
+def test_from_clause_with_table_sample():
+    assert QueryBuilder.build_from_clause(table_sample="TABLESAMPLE SYSTEM (1)").startswith(
+        "\n        FROM recepthead TABLESAMPLE SYSTEM (1)\n        LEFT JOIN receptbody"
+    )
+
+
+def test_full_from_clause_joins_everything_in_order():
+    from_clause = QueryBuilder.build_full_from_clause()
+    positions = [from_clause.index(join) for _, join, _ in JOIN_DEFINITIONS]
+    assert positions == sorted(positions)
+
+
+@pytest.mark.parametrize("conditions", [
+    {},
+    {"content_keyword": "障害"},
+    {"include_deleted": True},
+    {"date_field": "update_datetime", "date_from": "2015-01-01", "date_to": "2030-12-31"},
+])
+def test_pruned_count_matches_full_join(db, conditions):
+    where, params = DataService.build_filter_conditions(FilterRequest(**conditions))
+    result = QueryBuilder.verify_condition(where, params)
+    assert result["matched"], result
+
+
+def test_pruned_count_matches_full_join_for_master_items(db):
+    # 実在するマスタ項目の値で、結合を省いた件数と全結合の件数を比較
+    row = db.execute_query(f"""
+        SELECT cond_item.itemname AS progress, prod_item.itemname AS product
+        {QueryBuilder.build_full_from_clause()}
+        AND cond_item.itemname IS NOT NULL
+        AND prod_item.itemname IS NOT NULL
+        LIMIT 1
+    """)
+    if not row:
+        pytest.skip("マスタ項目が設定された受信データがありません")
+    where, params = DataService.build_filter_conditions(
+        FilterRequest(progress=row[0]["progress"], product=row[0]["product"])
+    )
+    result = QueryBuilder.verify_condition(where, params)
+    assert result["matched"], result
@@ -0,0 +1,53 @@
+"""削除日時で絞り込んだ検索結果キャッシュの無効化（DBが必要）"""
+
+from datetime import datetime
+
+import pytest
+
+from models.request_models import FilterRequest
+from services.query_builder import QueryBuilder
+from services.result_cache_service import ResultCacheService
+from utils.result_cache import result_cache
+
+MODDT_FILTERS = FilterRequest(
+    date_field="reception_moddt",
+    date_from=datetime(2000, 1, 1),
+    date_to=datetime(2000, 1, 2),
+    include_deleted=True,
+)
+
+
+@pytest.fixture
+def cached_moddt_view(monkeypatch):
+    """更新後の削除日時では合致しない期間で絞り込んだ結果をキャッシュに置く"""
+    monkeypatch.setenv("RESULT_CACHE_ENABLED", "true")
+    result_cache.clear()
+    result_cache.get_or_load("test", MODDT_FILTERS, {}, lambda: ["cached"])
+    yield
+    result_cache.clear()
+
+
+def is_cached() -> bool:
+    return result_cache.get_or_load("test", MODDT_FILTERS, {}, lambda: None) == ["cached"]
+
+
+def any_record_id(db) -> int:
+    row = db.execute_query(
+        f"SELECT MIN(recepthead.extentid) AS extentid {QueryBuilder.build_from_clause()}"
+    )[0]
+    if row["extentid"] is None:
+        pytest.skip("recepthead にデータがありません")
+    return row["extentid"]
+
+
+def test_id_change_invalidates_moddt_filtered_view(db, cached_moddt_view):
+    assert is_cached()
+    ResultCacheService.invalidate_ids([any_record_id(db)])
+    assert not is_cached()
+
+
+def test_filtered_restore_by_moddt_invalidates_moddt_filtered_view(db, cached_moddt_view):
+    record_id = any_record_id(db)
+    assert is_cached()
+    ResultCacheService.invalidate_filtered(MODDT_FILTERS, record_id, record_id)
+    assert not is_cached()
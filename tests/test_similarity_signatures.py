@@ -0,0 +1,24 @@
+"""類似重複の署名をバッチ単位で読み込んだ結果（DBが必要）"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from services import similarity_service
+from services.similarity_service import SimilarityService
+
+
+def test_batched_signatures_match_single_batch(db, monkeypatch):
+    hasher = SimilarityService.get_hasher()
+    ids, signatures = SimilarityService.load_signatures(hasher)
+    if ids.size == 0:
+        pytest.skip("受付内容のあるデータがありません")
+
+    # キャッシュを使わず、小さなバッチで全行を計算し直しても同じ署名になる
+    monkeypatch.setattr(similarity_service, "SCAN_ITERSIZE", 7)
+    monkeypatch.setattr(SimilarityService, "ensure_cache", staticmethod(lambda: False))
+    batched_ids, batched_signatures = SimilarityService.load_signatures(hasher)
+
+    order, batched_order = np.argsort(ids), np.argsort(batched_ids)
+    assert np.array_equal(ids[order], batched_ids[batched_order])
+    assert np.array_equal(signatures[order], batched_signatures[batched_order])